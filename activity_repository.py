@@ -0,0 +1,151 @@
+import time
+from collections import OrderedDict
+
+import db_handler
+
+MONTH_CACHE_SIZE = 36 # Jumlah (bulan, filter pimpinan) yang disimpan di memori
+REMOTE_CHECK_SECONDS = 5 # Mode klien: data_version server diperiksa paling sering sekali per sekian detik
+
+def _month_key(activity_date):
+    # 'YYYY-MM-DD' -> (YYYY, MM)
+    return int(activity_date[:4]), int(activity_date[5:7])
+
+
+# Lapisan cache antara GUI (main.py) dan db_handler.
+# Kegiatan di-cache per (tahun, bulan, filter pimpinan) dengan eviksi LRU, sehingga navigasi
+# kalender dan penggantian filter dilayani dari memori. Tulis dari aplikasi ini lewat repository
+# hanya membuang bulan yang terdampak; commit dari thread/proses lain (mis. impor Excel,
+# instance aplikasi lain) terdeteksi lewat PRAGMA data_version dan membuang seluruh cache.
+# data_version db_handler lokal diperiksa di setiap baca; untuk backend lain (satu request /status)
+# paling sering sekali per check_interval detik, sehingga navigasi tidak menunggu jaringan.
+# Dipakai dari satu thread saja (thread Tk).
+# backend: modul db_handler (default) atau api_client.ApiClient untuk mode klien server.
+class ActivityRepository:
+    def __init__(self, max_months=MONTH_CACHE_SIZE, backend=db_handler, check_interval=None):
+        self.max_months = max_months
+        self.backend = backend
+        if check_interval is None:
+            check_interval = 0 if backend is db_handler else REMOTE_CHECK_SECONDS
+        self.check_interval = check_interval
+        self._months = OrderedDict() # (year, month, id_pimpinan_filter) -> {tanggal: [baris kegiatan]}
+        self._pimpinan = None
+        self._data_version = None
+        self._checked_at = None # time.monotonic() pemeriksaan data_version terakhir
+
+    # --- Invalidation ---
+    def _check_data_version(self):
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.check_interval:
+            return
+        self._checked_at = now
+        data_version = self.backend.get_data_version()
+        if data_version != self._data_version:
+            self.clear()
+            self._data_version = data_version
+
+    def clear(self):
+        self._months.clear()
+        self._pimpinan = None
+
+    def invalidate_dates(self, *activity_dates):
+        months = {_month_key(d) for d in activity_dates if d}
+        for key in [key for key in self._months if key[:2] in months]:
+            del self._months[key]
+
+    # --- Pimpinan ---
+    def get_all_pimpinan(self):
+        self._check_data_version()
+        if self._pimpinan is None:
+            self._pimpinan = self.backend.get_all_pimpinan()
+        return self._pimpinan
+
+    def get_pimpinan_by_id(self, pimpinan_id):
+        return self.backend.get_pimpinan_by_id(pimpinan_id)
+
+    def add_pimpinan(self, nama_pimpinan):
+        result = self.backend.add_pimpinan(nama_pimpinan)
+        self.clear()
+        return result
+
+    def delete_pimpinan(self, pimpinan_id):
+        result = self.backend.delete_pimpinan(pimpinan_id)
+        self.clear() # Nama/warna pimpinan ikut tampil di baris kegiatan
+        return result
+
+    def update_pimpinan_color(self, pimpinan_id, new_color):
+        result = self.backend.update_pimpinan_color(pimpinan_id, new_color)
+        self.clear()
+        return result
+
+    # --- Kegiatan ---
+    def _get_month(self, year, month, id_pimpinan_filter):
+        self._check_data_version()
+        key = (year, month, id_pimpinan_filter)
+        activities_by_date = self._months.get(key)
+        if activities_by_date is not None:
+            self._months.move_to_end(key)
+            return activities_by_date
+
+        pimpinan_ids = [id_pimpinan_filter] if id_pimpinan_filter is not None else None
+        activities_by_date = {}
+        for activity in self.backend.get_activities_for_month(year, month, pimpinan_ids):
+            activities_by_date.setdefault(activity['tanggal_kegiatan'], []).append(activity)
+
+        self._months[key] = activities_by_date
+        if len(self._months) > self.max_months:
+            self._months.popitem(last=False)
+        return activities_by_date
+
+    def get_activities_for_month(self, year, month, id_pimpinan_filter=None):
+        # {tanggal: [baris kegiatan terurut berdasarkan waktu mulai]}; jangan diubah oleh pemanggil
+        return self._get_month(year, month, id_pimpinan_filter)
+
+    def get_activities_for_date(self, activity_date, id_pimpinan_filter=None):
+        year, month = _month_key(activity_date)
+        return list(self._get_month(year, month, id_pimpinan_filter).get(activity_date, []))
+
+    def get_activity_by_id(self, activity_id):
+        return self.backend.get_activity_by_id(activity_id)
+
+    def add_activity(self, data):
+        result = self.backend.add_activity(data)
+        if result[0]:
+            self.invalidate_dates(data['tanggal_kegiatan'])
+        return result
+
+    def update_activity(self, activity_id, data):
+        old_activity = self.backend.get_activity_by_id(activity_id)
+        result = self.backend.update_activity(activity_id, data)
+        if result[0]:
+            old_date = old_activity['tanggal_kegiatan'] if old_activity else None
+            self.invalidate_dates(old_date, data['tanggal_kegiatan'])
+        return result
+
+    def delete_activity(self, activity_id):
+        old_activity = self.backend.get_activity_by_id(activity_id)
+        result = self.backend.delete_activity(activity_id)
+        if result[0] and old_activity:
+            self.invalidate_dates(old_activity['tanggal_kegiatan'])
+        return result
+
+    # --- Kegiatan Berulang (satu seri tampil di banyak bulan, jadi seluruh cache dibuang) ---
+    def get_recurring_series(self, series_id):
+        return self.backend.get_recurring_series(series_id)
+
+    def add_recurring_activity(self, data):
+        result = self.backend.add_recurring_activity(data)
+        if result[0]:
+            self.clear()
+        return result
+
+    def update_recurring_series(self, series_id, data):
+        result = self.backend.update_recurring_series(series_id, data)
+        if result[0]:
+            self.clear()
+        return result
+
+    def delete_recurring_series(self, series_id):
+        result = self.backend.delete_recurring_series(series_id)
+        if result[0]:
+            self.clear()
+        return result
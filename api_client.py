@@ -0,0 +1,196 @@
+import json
+import os
+from http.client import HTTPException
+from urllib import request as urllib_request
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode, quote
+
+from db_handler import get_month_window, WORKING_HOURS, WORKING_WEEKDAYS
+
+# Klien untuk api_server. Nama fungsi dan bentuk hasilnya sama dengan db_handler
+# (tuple (success, message[, id]) untuk tulis, dict per baris untuk baca), sehingga
+# ActivityRepository, ReminderScheduler dan ImportJob bisa memakainya sebagai backend.
+
+DEFAULT_TIMEOUT_SECONDS = 10
+IMPORT_TIMEOUT_SECONDS = 600
+
+class ApiError(Exception):
+    pass
+
+
+class ApiClient:
+    def __init__(self, base_url, timeout=DEFAULT_TIMEOUT_SECONDS, token=None):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.token = token # Dikirim sebagai 'Authorization: Bearer <token>' (lihat api_server)
+
+    def _request(self, method, path, payload=None, body=None, content_type='application/json', timeout=None):
+        if payload is not None:
+            body = json.dumps(payload).encode('utf-8')
+        req = urllib_request.Request(self.base_url + path, data=body, method=method)
+        if body is not None:
+            req.add_header('Content-Type', content_type)
+        if self.token:
+            req.add_header('Authorization', f"Bearer {self.token}")
+        try:
+            with urllib_request.urlopen(req, timeout=timeout or self.timeout) as response:
+                return json.loads(response.read().decode('utf-8'))
+        except HTTPError as e:
+            if e.code == 404:
+                return None
+            try:
+                message = json.loads(e.read().decode('utf-8')).get('error', str(e))
+            except ValueError:
+                message = str(e)
+            raise ApiError(message)
+        except URLError as e:
+            raise ApiError(f"Server {self.base_url} tidak dapat dihubungi: {e.reason}")
+        except TimeoutError:
+            # Koneksi diterima tetapi jawaban tidak datang dalam batas waktu (mis. server sibuk)
+            raise ApiError(f"Server {self.base_url} tidak menjawab dalam {timeout or self.timeout} detik.")
+        except (OSError, HTTPException) as e:
+            # Koneksi terputus di tengah jawaban, dsb.
+            raise ApiError(f"Server {self.base_url} tidak dapat dihubungi: {e}")
+
+    def _write(self, method, path, payload=None):
+        # Kegagalan jaringan dilaporkan seperti kegagalan db_handler, bukan sebagai exception
+        try:
+            result = self._request(method, path, payload)
+        except ApiError as e:
+            return False, str(e)
+        if result is None:
+            return False, "Data tidak ditemukan di server."
+        return result['success'], result['message']
+
+    # --- Status ---
+    def get_data_version(self):
+        return self._request('GET', '/status')['data_version']
+
+    def close_db(self):
+        pass # Tidak ada koneksi SQLite lokal
+
+    def get_calendar_id(self):
+        return self._request('GET', '/status')['kalender_id']
+
+    # --- Pimpinan ---
+    def get_all_pimpinan(self):
+        return self._request('GET', '/pimpinan')
+
+    def get_pimpinan_by_id(self, pimpinan_id):
+        return self._request('GET', f'/pimpinan/{pimpinan_id}')
+
+    def add_pimpinan(self, nama_pimpinan):
+        try:
+            result = self._request('POST', '/pimpinan', {'nama': nama_pimpinan})
+        except ApiError as e:
+            return False, str(e), None
+        return result['success'], result['message'], result.get('id')
+
+    def delete_pimpinan(self, pimpinan_id):
+        return self._write('DELETE', f'/pimpinan/{pimpinan_id}')
+
+    def update_pimpinan_color(self, pimpinan_id, new_color):
+        return self._write('PUT', f'/pimpinan/{pimpinan_id}', {'warna': new_color})
+
+    # --- Kegiatan ---
+    def get_activities_in_range(self, start_date, end_date, pimpinan_ids=None):
+        params = [('start', start_date), ('end', end_date)]
+        if pimpinan_ids is not None:
+            pimpinan_ids = list(pimpinan_ids)
+            if not pimpinan_ids:
+                return []
+            params.extend(('pimpinan_id', p) for p in pimpinan_ids)
+        return self._request('GET', '/activities?' + urlencode(params))
+
+    def iter_activities_in_range(self, start_date, end_date, pimpinan_ids=None, batch_size=None):
+        # Server mengirim satu halaman JSON; batch_size hanya untuk kesamaan dengan db_handler
+        return iter(self.get_activities_in_range(start_date, end_date, pimpinan_ids))
+
+    def get_activities_for_month(self, year, month, pimpinan_ids=None, margin_days=0):
+        start_date, end_date = get_month_window(year, month, margin_days)
+        return self.get_activities_in_range(start_date, end_date, pimpinan_ids)
+
+    def get_activity_by_id(self, activity_id):
+        return self._request('GET', f'/activities/{activity_id}')
+
+    def add_activity(self, data):
+        return self._write('POST', '/activities', data)
+
+    def update_activity(self, activity_id, data):
+        return self._write('PUT', f'/activities/{activity_id}', data)
+
+    def delete_activity(self, activity_id):
+        return self._write('DELETE', f'/activities/{activity_id}')
+
+    def validate_activity_overlap(self, activity_date, new_start_time, new_end_time, id_pimpinan,
+                                  new_participants_raw, current_activity_id=None, room_raw=None):
+        result = self._request('POST', '/conflicts/check', {
+            'tanggal_kegiatan': activity_date, 'waktu_mulai_kegiatan': new_start_time,
+            'waktu_akhir_kegiatan': new_end_time, 'id_pimpinan': id_pimpinan,
+            'daftar_peserta': new_participants_raw, 'exclude_id': current_activity_id,
+            'tempat_ruangan': room_raw,
+        })
+        return result['success'], result['message']
+
+    def find_free_slots(self, pimpinan_ids, participants_raw, duration_minutes, start_date, end_date,
+                        working_hours=WORKING_HOURS, limit=10, weekdays=WORKING_WEEKDAYS, not_before=None):
+        return self._request('POST', '/free-slots', {
+            'pimpinan_ids': list(pimpinan_ids or []), 'daftar_peserta': participants_raw, 'durasi': duration_minutes,
+            'start': start_date, 'end': end_date, 'jam_kerja': list(working_hours), 'limit': limit,
+            'hari_kerja': list(weekdays),
+            'not_before': not_before.isoformat(timespec='minutes') if not_before else None,
+        })
+
+    # --- Ruangan ---
+    def get_all_ruangan(self):
+        return self._request('GET', '/rooms')
+
+    def update_ruangan_capacity(self, room_id, capacity):
+        return self._write('PUT', f'/rooms/{room_id}', {'kapasitas': capacity})
+
+    def get_room_occupancy(self, start_date, end_date, room_ids=None):
+        params = [('start', start_date), ('end', end_date)]
+        if room_ids is not None:
+            room_ids = list(room_ids)
+            if not room_ids:
+                return []
+            params.extend(('ruangan_id', r) for r in room_ids)
+        return self._request('GET', '/rooms/occupancy?' + urlencode(params))
+
+    # --- Kegiatan Berulang ---
+    def get_recurring_series(self, series_id):
+        return self._request('GET', f'/series/{series_id}')
+
+    def add_recurring_activity(self, data):
+        try:
+            result = self._request('POST', '/series', data)
+        except ApiError as e:
+            return False, str(e), None
+        return result['success'], result['message'], result.get('id')
+
+    def update_recurring_series(self, series_id, data):
+        return self._write('PUT', f'/series/{series_id}', data)
+
+    def delete_recurring_series(self, series_id):
+        return self._write('DELETE', f'/series/{series_id}')
+
+    # --- Impor ---
+    def import_excel(self, file_path):
+        # Kirim file ke server; impor dijalankan oleh writer server. Hasil: (imported, failed, errors)
+        summary, errors = self.sync_excel(file_path)
+        return summary['inserted'] + summary['updated'], summary['failed'], errors
+
+    def sync_excel(self, file_path, remove_missing=False):
+        # Seperti sync_activities_from_excel: server mengenali file dari namanya, sehingga impor ulang
+        # file yang sama hanya menulis baris yang berubah. Hasil: (summary, errors)
+        with open(file_path, 'rb') as f:
+            body = f.read()
+        path = '/import?filename=' + quote(os.path.basename(file_path))
+        if remove_missing:
+            path += '&remove_missing=1'
+        try:
+            result = self._request('POST', path, body=body, content_type='application/octet-stream',
+                                   timeout=IMPORT_TIMEOUT_SECONDS)
+        except ApiError as e:
+            return {'inserted': 0, 'updated': 0, 'unchanged': 0, 'removed': 0, 'failed': 0}, [str(e)]
+        return result['summary'], result['errors']
@@ -0,0 +1,400 @@
+import argparse
+import asyncio
+import hmac
+import ipaddress
+import json
+import logging
+import os
+import re
+import sqlite3
+import tempfile
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qs
+
+import db_handler
+
+# Server HTTP/JSON lokal (stdlib asyncio) agar beberapa staf bisa memakai satu schedule.db
+# tanpa membuka file SQLite yang sama dari banyak instance Tk.
+#   python -m api_server --port 8765 --db schedule.db        (hanya localhost)
+#   JADWAL_API_TOKEN=<token> python -m api_server --host 0.0.0.0 --port 8765
+#   JADWAL_API_TOKEN=<token> python main.py --server http://alamat-server:8765      (GUI mode klien)
+#
+# - Autentikasi: jika token diset (--token atau JADWAL_API_TOKEN), setiap request harus membawa
+#   header 'Authorization: Bearer <token>'. Bind ke alamat selain loopback wajib memakai token,
+#   karena endpoint tulis (impor, hapus kegiatan, ubah ruangan) tidak punya pembatasan lain.
+# - Baca: dijalankan paralel di ThreadPoolExecutor; setiap thread punya koneksi SQLite sendiri
+#   (db_handler.connect_db per thread), jadi ini adalah pool koneksi baca di atas WAL.
+# - Tulis: semua operasi tulis masuk ke satu antrean dan dijalankan oleh satu writer task di
+#   satu thread. Operasi yang menumpuk digabung dalam satu transaksi (satu commit per batch);
+#   setiap operasi tetap berdiri sendiri lewat SAVEPOINT di db_handler.transaction().
+# - Impor Excel: workbook dibaca di thread impor tersendiri (tanpa menahan writer), lalu tahap
+#   databasenya dijalankan di thread writer sebagai satu transaksi sendiri di antara batch tulis.
+# - Status: data_version dibaca di thread status tersendiri dengan koneksinya sendiri, sehingga
+#   commit dari writer maupun proses lain (mis. python -m cli) terdeteksi tanpa antre di writer.
+#
+# Endpoint:
+#   GET    /status                                  {'data_version', 'kalender_id'}
+#   GET    /activities?start=&end=[&pimpinan_id=]   daftar kegiatan (pimpinan_id bisa diulang)
+#   GET    /activities/<id>
+#   POST   /activities                              body: data kegiatan (seperti add_activity)
+#   PUT    /activities/<id>                         body: data kegiatan
+#   DELETE /activities/<id>                         (id negatif = satu kejadian kegiatan berulang)
+#   GET    /series/<id>, POST /series, PUT /series/<id>, DELETE /series/<id>
+#                                                   kegiatan berulang (body seperti add_recurring_activity)
+#   GET    /pimpinan, GET /pimpinan/<id>
+#   POST   /pimpinan {'nama'}, PUT /pimpinan/<id> {'warna'}, DELETE /pimpinan/<id>
+#   POST   /conflicts/check                         body: tanggal_kegiatan, waktu_mulai_kegiatan,
+#                                                   waktu_akhir_kegiatan, id_pimpinan, daftar_peserta, exclude_id
+#   POST   /free-slots                              body: pimpinan_ids, daftar_peserta, durasi, start, end,
+#                                                   [jam_kerja, limit, hari_kerja, not_before] (lihat db_handler.find_free_slots)
+#   POST   /import?filename=<nama.xlsx>             body: isi file Excel
+
+DEFAULT_HOST = '127.0.0.1'
+TOKEN_ENV = 'JADWAL_API_TOKEN'
+DEFAULT_PORT = 8765
+DEFAULT_READ_WORKERS = 4
+WRITE_BATCH_SIZE = 50 # Maksimum operasi tulis per transaksi
+MAX_BODY_BYTES = 50 * 1024 * 1024
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+HTTP_REASONS = {200: 'OK', 400: 'Bad Request', 401: 'Unauthorized', 404: 'Not Found', 405: 'Method Not Allowed',
+                413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+def _row_to_dict(row):
+    return dict(row) if row is not None else None
+
+def _rows_to_list(rows):
+    return [dict(row) for row in rows]
+
+def _status_result(result):
+    # (success, message[, extra]) dari db_handler -> dict JSON
+    response = {'success': result[0], 'message': result[1]}
+    if len(result) > 2:
+        response['id'] = result[2]
+    return response
+
+def _check_conflicts(activity_date, start_time, end_time, id_pimpinan, participants_raw, exclude_id, room_raw):
+    # Satu pencarian di thread baca: daftar bentrok + pesan yang sama dengan validate_activity_overlap
+    conflicts = db_handler.find_activity_conflicts(activity_date, start_time, end_time, id_pimpinan,
+                                                   participants_raw, exclude_id, room_raw)
+    success, message = db_handler.conflict_validation_result(conflicts, id_pimpinan, room_raw)
+    return {'success': success, 'message': message,
+            'conflicts': [dict(c, participants=sorted(c['participants'])) for c in conflicts]}
+
+
+class ScheduleServer:
+    def __init__(self, read_workers=DEFAULT_READ_WORKERS, write_batch_size=WRITE_BATCH_SIZE, token=None):
+        self.token = token
+        self.read_executor = ThreadPoolExecutor(max_workers=read_workers, thread_name_prefix='api-read')
+        self.write_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='api-write')
+        # Satu thread (= satu koneksi) agar PRAGMA data_version yang dilaporkan /status konsisten
+        self.status_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='api-status')
+        self.import_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='api-import')
+        self.write_batch_size = write_batch_size
+        self.write_queue = None
+        self.calendar_id = None # Tidak pernah berubah setelah create_table; diambil sekali saat serve
+        self.routes = [
+            ('GET', r'/status', self.handle_status),
+            ('GET', r'/activities', self.handle_list_activities),
+            ('GET', r'/activities/(-?\d+)', self.handle_get_activity),
+            ('POST', r'/activities', self.handle_add_activity),
+            ('PUT', r'/activities/(-?\d+)', self.handle_update_activity),
+            ('DELETE', r'/activities/(-?\d+)', self.handle_delete_activity),
+            ('GET', r'/series/(\d+)', self.handle_get_series),
+            ('POST', r'/series', self.handle_add_series),
+            ('PUT', r'/series/(\d+)', self.handle_update_series),
+            ('DELETE', r'/series/(\d+)', self.handle_delete_series),
+            ('GET', r'/pimpinan', self.handle_list_pimpinan),
+            ('GET', r'/pimpinan/(\d+)', self.handle_get_pimpinan),
+            ('POST', r'/pimpinan', self.handle_add_pimpinan),
+            ('PUT', r'/pimpinan/(\d+)', self.handle_update_pimpinan),
+            ('DELETE', r'/pimpinan/(\d+)', self.handle_delete_pimpinan),
+            ('POST', r'/conflicts/check', self.handle_check_conflicts),
+            ('POST', r'/free-slots', self.handle_free_slots),
+            ('GET', r'/rooms', self.handle_list_rooms),
+            ('PUT', r'/rooms/(\d+)', self.handle_update_room),
+            ('GET', r'/rooms/occupancy', self.handle_room_occupancy),
+            ('POST', r'/import', self.handle_import),
+        ]
+        self.routes = [(method, re.compile(pattern + '$'), handler) for method, pattern, handler in self.routes]
+
+    # --- Baca / tulis ---
+    async def read(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.read_executor, func, *args)
+
+    async def write(self, func, *args):
+        future = asyncio.get_running_loop().create_future()
+        await self.write_queue.put((func, args, future))
+        return await future
+
+    async def writer(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.write_queue.get()]
+            while len(batch) < self.write_batch_size and not self.write_queue.empty():
+                batch.append(self.write_queue.get_nowait())
+            outcomes = await loop.run_in_executor(self.write_executor, self._apply_write_batch, batch)
+            for (_, _, future), (ok, value) in zip(batch, outcomes):
+                if future.done():
+                    continue # Klien sudah memutus koneksi
+                if ok:
+                    future.set_result(value)
+                else:
+                    future.set_exception(value)
+
+    def _apply_write_batch(self, batch):
+        # Dijalankan di thread writer: satu transaksi untuk seluruh batch
+        outcomes = []
+        try:
+            with db_handler.transaction():
+                for func, args, _ in batch:
+                    try:
+                        outcomes.append((True, func(*args)))
+                    except Exception as e:
+                        outcomes.append((False, e))
+        except sqlite3.Error as e:
+            return [(False, e) for _ in batch]
+        return outcomes
+
+    # --- Handler ---
+    def _status(self):
+        # PRAGMA data_version koneksi thread status berubah setiap kali koneksi lain (writer server
+        # atau proses lain) melakukan commit
+        return {'data_version': db_handler.get_data_version(), 'kalender_id': self.calendar_id}
+
+    async def handle_status(self, request):
+        return await asyncio.get_running_loop().run_in_executor(self.status_executor, self._status)
+
+    async def handle_list_activities(self, request):
+        query = request['query']
+        start_date = query.get('start', ['0000-01-01'])[0]
+        end_date = query.get('end', ['9999-12-31'])[0]
+        pimpinan_ids = [int(p) for p in query['pimpinan_id']] if 'pimpinan_id' in query else None
+        rows = await self.read(db_handler.get_activities_in_range, start_date, end_date, pimpinan_ids)
+        return _rows_to_list(rows)
+
+    async def handle_get_activity(self, request, activity_id):
+        activity = await self.read(db_handler.get_activity_by_id, int(activity_id))
+        if activity is None:
+            raise HttpError(404, "Kegiatan tidak ditemukan.")
+        return _row_to_dict(activity)
+
+    async def handle_add_activity(self, request):
+        return _status_result(await self.write(db_handler.add_activity, request['json']))
+
+    async def handle_update_activity(self, request, activity_id):
+        return _status_result(await self.write(db_handler.update_activity, int(activity_id), request['json']))
+
+    async def handle_delete_activity(self, request, activity_id):
+        return _status_result(await self.write(db_handler.delete_activity, int(activity_id)))
+
+    async def handle_get_series(self, request, series_id):
+        series = await self.read(db_handler.get_recurring_series, int(series_id))
+        if series is None:
+            raise HttpError(404, "Kegiatan berulang tidak ditemukan.")
+        return _row_to_dict(series)
+
+    async def handle_add_series(self, request):
+        return _status_result(await self.write(db_handler.add_recurring_activity, request['json']))
+
+    async def handle_update_series(self, request, series_id):
+        return _status_result(await self.write(db_handler.update_recurring_series, int(series_id), request['json']))
+
+    async def handle_delete_series(self, request, series_id):
+        return _status_result(await self.write(db_handler.delete_recurring_series, int(series_id)))
+
+    async def handle_list_pimpinan(self, request):
+        return _rows_to_list(await self.read(db_handler.get_all_pimpinan))
+
+    async def handle_get_pimpinan(self, request, pimpinan_id):
+        pimpinan = await self.read(db_handler.get_pimpinan_by_id, int(pimpinan_id))
+        if pimpinan is None:
+            raise HttpError(404, "Pimpinan tidak ditemukan.")
+        return _row_to_dict(pimpinan)
+
+    async def handle_add_pimpinan(self, request):
+        return _status_result(await self.write(db_handler.add_pimpinan, request['json']['nama']))
+
+    async def handle_update_pimpinan(self, request, pimpinan_id):
+        return _status_result(await self.write(db_handler.update_pimpinan_color, int(pimpinan_id), request['json']['warna']))
+
+    async def handle_delete_pimpinan(self, request, pimpinan_id):
+        return _status_result(await self.write(db_handler.delete_pimpinan, int(pimpinan_id)))
+
+    async def handle_check_conflicts(self, request):
+        data = request['json']
+        args = (data['tanggal_kegiatan'], data['waktu_mulai_kegiatan'], data['waktu_akhir_kegiatan'],
+                data.get('id_pimpinan'), data.get('daftar_peserta') or "", data.get('exclude_id'),
+                data.get('tempat_ruangan') or "")
+        return await self.read(_check_conflicts, *args)
+
+    async def handle_free_slots(self, request):
+        data = request['json']
+        not_before = datetime.fromisoformat(data['not_before']) if data.get('not_before') else None
+        return await self.read(db_handler.find_free_slots, data.get('pimpinan_ids') or [], data.get('daftar_peserta') or "",
+                               int(data['durasi']), data['start'], data['end'],
+                               tuple(data.get('jam_kerja') or db_handler.WORKING_HOURS), int(data.get('limit', 10)),
+                               tuple(int(d) for d in data.get('hari_kerja', db_handler.WORKING_WEEKDAYS)), not_before)
+
+    async def handle_list_rooms(self, request):
+        return _rows_to_list(await self.read(db_handler.get_all_ruangan))
+
+    async def handle_update_room(self, request, room_id):
+        return _status_result(await self.write(db_handler.update_ruangan_capacity, int(room_id), request['json']['kapasitas']))
+
+    async def handle_room_occupancy(self, request):
+        query = request['query']
+        room_ids = [int(r) for r in query['ruangan_id']] if 'ruangan_id' in query else None
+        return await self.read(db_handler.get_room_occupancy, query.get('start', ['0000-01-01'])[0],
+                               query.get('end', ['9999-12-31'])[0], room_ids)
+
+    async def handle_import(self, request):
+        from excel_importer import DEFAULT_CHUNK_SIZE, parse_workbook, sync_parsed_workbook # pandas hanya dimuat saat ada impor
+
+        query = request['query']
+        filename = os.path.basename(query.get('filename', ['upload.xlsx'])[0])
+        remove_missing = query.get('remove_missing', ['0'])[0] == '1'
+        suffix = os.path.splitext(filename)[1].lower() or '.xlsx'
+        with tempfile.TemporaryDirectory() as work_dir:
+            file_path = os.path.join(work_dir, f"upload{suffix}")
+            with open(file_path, 'wb') as f:
+                f.write(request['body'])
+            # Membaca workbook (bagian yang lambat) tidak menahan writer
+            parsed = self.import_executor.submit(parse_workbook, file_path, None, DEFAULT_CHUNK_SIZE)
+            try:
+                await asyncio.wrap_future(parsed)
+            except Exception:
+                pass # Kesalahan baca dilempar ulang oleh sync_parsed_workbook dan dilaporkan di errors
+            # Tahap database: satu transaksi sendiri di thread writer, tidak digabung dengan batch tulis lain.
+            # Kunci sumber memakai nama file asli, bukan nama file sementara
+            summary, errors = await asyncio.get_running_loop().run_in_executor(
+                self.write_executor, sync_parsed_workbook, parsed, filename, None, remove_missing)
+        return {'imported': summary['inserted'] + summary['updated'], 'failed': summary['failed'],
+                'summary': summary, 'errors': errors}
+
+    # --- HTTP ---
+    async def handle_connection(self, reader, writer):
+        try:
+            status, payload = await self._handle_request(reader)
+        except HttpError as e:
+            status, payload = e.status, {'error': str(e)}
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+            return
+        except Exception as e:
+            status, payload = 500, {'error': f"{type(e).__name__}: {e}"}
+
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        writer.write(
+            f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: close\r\n\r\n".encode('ascii') + body
+        )
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+        writer.close()
+
+    async def _handle_request(self, reader):
+        request_line = (await reader.readline()).decode('latin-1').strip()
+        try:
+            method, target, _ = request_line.split(' ', 2)
+        except ValueError:
+            raise HttpError(400, "Request tidak valid.")
+
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode('latin-1')
+            if line in ('\r\n', '\n', ''):
+                break
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if self.token and not hmac.compare_digest(headers.get('authorization', '').encode('utf-8'),
+                                                  f"Bearer {self.token}".encode('utf-8')):
+            raise HttpError(401, "Token API tidak valid atau tidak ada.")
+
+        content_length = int(headers.get('content-length', 0) or 0)
+        if content_length > MAX_BODY_BYTES:
+            raise HttpError(413, "Body terlalu besar.")
+        body = await reader.readexactly(content_length) if content_length else b''
+
+        url = urlsplit(target)
+        request = {'method': method, 'path': url.path.rstrip('/') or '/', 'query': parse_qs(url.query),
+                   'headers': headers, 'body': body, 'json': None}
+        if body and headers.get('content-type', '').startswith('application/json'):
+            try:
+                request['json'] = json.loads(body.decode('utf-8'))
+            except ValueError:
+                raise HttpError(400, "Body JSON tidak valid.")
+
+        path_matched = False
+        for route_method, pattern, handler in self.routes:
+            match = pattern.match(request['path'])
+            if not match:
+                continue
+            path_matched = True
+            if route_method == method:
+                try:
+                    return 200, await handler(request, *match.groups())
+                except (KeyError, TypeError, ValueError) as e:
+                    raise HttpError(400, f"Data tidak lengkap atau tidak valid: {e}")
+        raise HttpError(405 if path_matched else 404, "Endpoint tidak ditemukan.")
+
+    async def serve(self, host, port):
+        self.write_queue = asyncio.Queue()
+        # Pastikan skema siap sebelum menerima request (di thread writer)
+        await asyncio.get_running_loop().run_in_executor(self.write_executor, db_handler.create_table)
+        self.calendar_id = await self.read(db_handler.get_calendar_id)
+        writer_task = asyncio.create_task(self.writer())
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f"Server jadwal berjalan di http://{host}:{port} (database: {db_handler.DATABASE_NAME})")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            writer_task.cancel()
+            self.read_executor.shutdown(wait=False)
+            self.status_executor.shutdown(wait=False)
+            self.import_executor.shutdown(wait=False)
+            self.write_executor.shutdown(wait=True)
+            db_handler.close_all_connections()
+
+def _is_loopback(host):
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False # Nama host lain bisa saja mengarah ke antarmuka jaringan
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m api_server", description="Server JSON lokal untuk jadwal kegiatan.")
+    parser.add_argument('--host', default=DEFAULT_HOST, help=f"Alamat bind (default: {DEFAULT_HOST})")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f"Port (default: {DEFAULT_PORT})")
+    parser.add_argument('--db', help=f"Path database SQLite (default: {db_handler.DATABASE_NAME})")
+    parser.add_argument('--token', default=os.environ.get(TOKEN_ENV),
+                        help=f"Token yang wajib dikirim klien (default: env {TOKEN_ENV}); wajib jika host bukan localhost")
+    parser.add_argument('--readers', type=int, default=DEFAULT_READ_WORKERS, help="Jumlah koneksi baca paralel")
+    parser.add_argument('--log-level', default='INFO', help="Level logging (default: INFO); query lambat dicatat sebagai WARNING")
+    args = parser.parse_args(argv)
+    if not args.token and not _is_loopback(args.host):
+        parser.error(f"Server tanpa autentikasi hanya boleh bind ke localhost; set --token atau {TOKEN_ENV}.")
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    if args.db:
+        db_handler.DATABASE_NAME = args.db
+
+    try:
+        asyncio.run(ScheduleServer(read_workers=args.readers, token=args.token).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
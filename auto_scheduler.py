@@ -0,0 +1,219 @@
+from datetime import date, datetime, timedelta
+
+import db_handler
+from conflict_index import parse_participants, room_conflict_key, time_range_to_minutes, minutes_to_time, free_slots
+
+# Penjadwalan otomatis banyak sesi sekaligus (mis. jadwal program PPRA/PPSA yang baru datang).
+# Setiap permintaan berisi uraian, durasi, pimpinan, peserta dan ruangan; mesin ini memilih tanggal dan
+# jam mulai di dalam rentang tanggal dan jam kerja, tanpa bentrok dengan Kegiatan yang sudah ada,
+# kejadian kegiatan berulang, maupun sesi lain dalam batch yang sama.
+#
+# - Penempatan greedy: sesi paling terbatas (paling banyak orang, paling panjang) ditempatkan dulu,
+#   di slot kosong paling awal.
+# - Backtracking terbatas: jika sebuah sesi tidak mendapat slot, penempatan sesi sebelumnya dicoba
+#   ulang dengan kandidat berikutnya (hanya sesi yang berbagi pimpinan/peserta/ruangan), maksimal
+#   max_backtracks kali untuk seluruh batch. Setelah itu sesi yang tidak muat dicatat di laporan
+#   dan penempatan dilanjutkan.
+# - plan_schedule hanya membaca; commit_schedule menyimpan semua penempatan dalam satu transaksi.
+
+DEFAULT_STEP_MINUTES = 15 # Jam mulai dibulatkan ke kelipatan ini
+DEFAULT_MAX_BACKTRACKS = 200
+DEFAULT_MAX_CANDIDATES = 12 # Kandidat slot yang dicoba per sesi saat backtracking
+TEMP_ID_BASE = 1 << 61 # Id sementara sesi batch di index bentrok (di atas id Kegiatan mana pun)
+
+REASON_NO_FREE_TIME = "Tidak ada waktu kosong bersama untuk pimpinan dan peserta dalam rentang tanggal."
+REASON_TAKEN_BY_BATCH = "Semua waktu kosong sudah terpakai oleh sesi lain dalam batch ini."
+
+def _round_up(minutes, step):
+    return -(-minutes // step) * step
+
+def _shares_resources(first, second):
+    if first['id_pimpinan'] is not None and first['id_pimpinan'] == second['id_pimpinan']:
+        return True
+    if first['room'] is not None and first['room'] == second['room']:
+        return True
+    return not first['participants'].isdisjoint(second['participants'])
+
+def _date_range(start_date, end_date, weekdays):
+    first = date.fromisoformat(start_date)
+    last = date.fromisoformat(end_date)
+    days = (first + timedelta(days=i) for i in range((last - first).days + 1))
+    return [day.isoformat() for day in days if day.weekday() in weekdays]
+
+
+class AutoScheduler:
+    def __init__(self, start_date, end_date, working_hours=db_handler.WORKING_HOURS,
+                 weekdays=db_handler.WORKING_WEEKDAYS, step_minutes=DEFAULT_STEP_MINUTES,
+                 max_backtracks=DEFAULT_MAX_BACKTRACKS, max_candidates=DEFAULT_MAX_CANDIDATES):
+        self.start_date = start_date
+        self.end_date = end_date
+        self.day_start, self.day_end = time_range_to_minutes(*working_hours)
+        self.dates = _date_range(start_date, end_date, weekdays)
+        self.step_minutes = step_minutes
+        self.max_backtracks = max_backtracks
+        self.max_candidates = max_candidates
+        self.day_indexes = {}
+
+    def _prepare(self, index, request):
+        # Permintaan -> dict internal; ValueError jika datanya tidak bisa dijadwalkan sama sekali
+        duration = int(request['durasi'])
+        if duration <= 0:
+            raise ValueError("Durasi harus lebih dari 0 menit.")
+        if duration > self.day_end - self.day_start:
+            raise ValueError("Durasi lebih panjang dari jam kerja.")
+        first = max(request.get('tanggal_awal') or self.start_date, self.start_date)
+        last = min(request.get('tanggal_akhir') or self.end_date, self.end_date)
+        return {
+            'index': index,
+            'request': request,
+            'duration': duration,
+            'id_pimpinan': request.get('id_pimpinan'),
+            'participants': parse_participants(request.get('daftar_peserta')),
+            'room': room_conflict_key(request.get('tempat_ruangan')),
+            'dates': [d for d in self.dates if first <= d <= last],
+            'temp_id': TEMP_ID_BASE + index,
+        }
+
+    def _candidates(self, session):
+        # Slot untuk sesi ini pada keadaan index saat ini: per celah kosong, jam mulai paling awal
+        # dan paling akhir (agar sesi lain bisa memakai sisa celah). Dihitung bertahap.
+        pimpinan_ids = [session['id_pimpinan']] if session['id_pimpinan'] is not None else []
+        rooms = [session['room']] if session['room'] is not None else []
+        duration = session['duration']
+        count = 0
+        for activity_date in session['dates']:
+            busy = self.day_indexes[activity_date].busy_intervals(pimpinan_ids, session['participants'], rooms)
+            for gap_start, gap_end in free_slots(busy, self.day_start, self.day_end, duration):
+                first = _round_up(gap_start, self.step_minutes)
+                if gap_end - first < duration:
+                    continue
+                starts = [first]
+                last = (gap_end - duration) // self.step_minutes * self.step_minutes
+                if last > first:
+                    starts.append(last)
+                for start in starts:
+                    yield activity_date, start
+                    count += 1
+                    if count >= self.max_candidates:
+                        return
+
+    def _place(self, session, slot):
+        activity_date, start = slot
+        self.day_indexes[activity_date].add(session['temp_id'], start, start + session['duration'],
+                                            session['id_pimpinan'], session['participants'], session['room'])
+
+    def _unplace(self, session, slot):
+        self.day_indexes[slot[0]].remove(session['temp_id'])
+
+    def plan(self, requests):
+        # requests: list dict (uraian_kegiatan, durasi [menit], id_pimpinan, daftar_peserta, dan opsional
+        # tempat_ruangan, narahubung, kontak_person, tanggal_awal, tanggal_akhir)
+        report = {'start_date': self.start_date, 'end_date': self.end_date,
+                  'placed': [], 'unplaced': [], 'backtracks': 0}
+        sessions = []
+        for index, request in enumerate(requests):
+            try:
+                sessions.append(self._prepare(index, request))
+            except (KeyError, TypeError, ValueError) as e:
+                report['unplaced'].append({'index': index, 'request': request, 'reason': f"Data tidak valid: {e}"})
+
+        if sessions:
+            self.day_indexes = db_handler.get_conflict_indexes_snapshot(self.dates)
+        # Paling terbatas dulu: banyak orang/ruangan terlibat, durasi panjang, rentang tanggal sempit
+        sessions.sort(key=lambda s: (-(len(s['participants']) + (s['id_pimpinan'] is not None) + (s['room'] is not None)),
+                                     -s['duration'], len(s['dates']), s['index']))
+
+        # Sesi yang tidak punya slot bahkan tanpa sesi batch lain tidak akan pernah muat: lewati tanpa backtracking
+        feasible = [next(self._candidates(session), None) is not None for session in sessions]
+
+        slots = [None] * len(sessions)
+        iterators = [None] * len(sessions)
+        i = 0
+        while i < len(sessions):
+            session = sessions[i]
+            if slots[i] is not None:
+                self._unplace(session, slots[i])
+                slots[i] = None
+            if not feasible[i]:
+                i += 1
+                continue
+            if iterators[i] is None:
+                iterators[i] = self._candidates(session)
+
+            slot = next(iterators[i], None)
+            if slot is not None:
+                self._place(session, slot)
+                slots[i] = slot
+                i += 1
+                continue
+
+            iterators[i] = None
+            # Backjump ke sesi terakhir yang berbagi pimpinan/peserta/ruangan (hanya sesi itu yang bisa
+            # membebaskan slot); sesi di antaranya dilepas dan dihitung ulang
+            previous = next((j for j in range(i - 1, -1, -1)
+                             if slots[j] is not None and _shares_resources(sessions[j], session)), None)
+            if previous is None or report['backtracks'] >= self.max_backtracks:
+                i += 1
+                continue
+            report['backtracks'] += 1
+            for j in range(previous + 1, i):
+                if slots[j] is not None:
+                    self._unplace(sessions[j], slots[j])
+                    slots[j] = None
+                iterators[j] = None
+            i = previous
+
+        for i, session in enumerate(sessions):
+            request = session['request']
+            if slots[i] is None:
+                reason = REASON_TAKEN_BY_BATCH if feasible[i] else REASON_NO_FREE_TIME
+                report['unplaced'].append({'index': session['index'], 'request': request, 'reason': reason})
+                continue
+            activity_date, start = slots[i]
+            report['placed'].append({'index': session['index'], 'request': request, 'data': {
+                'tanggal_kegiatan': activity_date,
+                'waktu_mulai_kegiatan': minutes_to_time(start),
+                'waktu_akhir_kegiatan': minutes_to_time(start + session['duration']),
+                'uraian_kegiatan': request.get('uraian_kegiatan') or "",
+                'tempat_ruangan': request.get('tempat_ruangan') or "",
+                'id_pimpinan': session['id_pimpinan'],
+                'daftar_peserta': request.get('daftar_peserta') or "",
+                'narahubung': request.get('narahubung') or "",
+                'kontak_person': request.get('kontak_person') or "",
+            }})
+        report['placed'].sort(key=lambda p: (p['data']['tanggal_kegiatan'], p['data']['waktu_mulai_kegiatan']))
+        report['unplaced'].sort(key=lambda u: u['index'])
+        return report
+
+
+def plan_schedule(requests, start_date, end_date, **options):
+    return AutoScheduler(start_date, end_date, **options).plan(requests)
+
+def commit_schedule(report):
+    # Simpan semua penempatan dalam satu transaksi. Penempatan dicek ulang di dalam transaksi
+    # (kunci tulis sudah dipegang); jika jadwal berubah sejak plan_schedule, tidak ada yang disimpan.
+    # Kembalikan (success, message, daftar id baru)
+    placed = [p['data'] for p in report['placed']]
+    if not placed:
+        return True, "Tidak ada sesi untuk disimpan.", []
+    now = datetime.now()
+    records = [dict(data, tanggal_input=now.strftime('%Y-%m-%d'), waktu_input=now.strftime('%H:%M')) for data in placed]
+    try:
+        with db_handler.transaction():
+            indexes = db_handler.get_conflict_indexes_snapshot({data['tanggal_kegiatan'] for data in records})
+            for i, data in enumerate(records):
+                start, end = time_range_to_minutes(data['waktu_mulai_kegiatan'], data['waktu_akhir_kegiatan'])
+                participants = parse_participants(data['daftar_peserta'])
+                room = room_conflict_key(data['tempat_ruangan'])
+                day_index = indexes[data['tanggal_kegiatan']]
+                if day_index.find_conflicts(start, end, data['id_pimpinan'], participants, room=room):
+                    raise db_handler.sqlite3.IntegrityError(
+                        f"jadwal {data['tanggal_kegiatan']} {data['waktu_mulai_kegiatan']} sudah berubah, jalankan ulang penjadwalan"
+                    )
+                day_index.add(TEMP_ID_BASE + i, start, end, data['id_pimpinan'], participants, room)
+            success, message, new_ids = db_handler.add_activities_bulk(records)
+            if not success:
+                raise db_handler.sqlite3.DatabaseError(message)
+        return True, f"{len(new_ids)} sesi berhasil dijadwalkan!", new_ids
+    except db_handler.sqlite3.Error as e:
+        return False, f"Penjadwalan tidak disimpan: {e}", []
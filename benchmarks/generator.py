@@ -0,0 +1,122 @@
+import random
+from datetime import date, timedelta
+
+# Generator jadwal sintetis (deterministik untuk seed yang sama) untuk benchmark.
+# Jadwal yang dihasilkan bebas bentrok: per tanggal, interval setiap pimpinan dan setiap
+# peserta tidak saling beririsan, sehingga semua baris lolos validasi db_handler/excel_importer.
+
+EXCEL_HEADERS = [
+    'No', 'TANGGAL', 'WAKTU', 'KEGIATAN', 'TEMPAT/RUANGAN', 'PIMPINAN', 'PELAKSANA/PESERTA',
+    'KETERANGAN', 'PIC', 'KONTAK PERSON', 'TGL INPUT', 'WKT INPUT'
+]
+
+ACTIVITY_TYPES = ['Rapat Koordinasi', 'Briefing Mingguan', 'Webinar', 'Kunjungan Kerja', 'Diskusi Panel',
+                  'Sidang Pleno', 'Evaluasi Program', 'Penyusunan Laporan', 'Audiensi', 'Seminar Nasional']
+TOPICS = ['Strategi', 'Anggaran', 'Kualitas SDM', 'Ketahanan Pangan', 'Geopolitik', 'Keamanan Siber',
+          'Kurikulum PPRA', 'Kerja Sama Internasional', 'Reformasi Birokrasi', 'Pengawasan Internal']
+ROOMS = ['Ruang Cendrawasih', 'Ruang Rapat A', 'Ruang Rapat B', 'Auditorium', 'Ruang Dwi Warna',
+         'Ruang Gatot Kaca', 'Ruang Kresna', 'Ruang Pancasila', 'Online (Zoom)']
+BASE_PARTICIPANTS = ['Staf Ahli', 'Karo Umum', 'Tim Divisi A', 'Tim Divisi B', 'Seluruh Pegawai',
+                     'Tenaga Pengajar', 'Peserta PPRA', 'Biro Perencanaan', 'Biro Humas', 'Inspektorat']
+PIC_NAMES = ['Ibu Ana', 'Bapak Budi', 'Ibu Citra', 'Bapak Dedi', 'Ibu Endah', 'Bapak Fajar']
+
+DAY_START_MINUTES = 7 * 60
+DAY_END_MINUTES = 18 * 60
+DURATIONS_MINUTES = [30, 60, 60, 90, 120, 180]
+MAX_PLACEMENT_TRIES = 20
+
+def _overlaps(intervals, start, end):
+    return any(start < other_end and end > other_start for other_start, other_end in intervals)
+
+def _format_minutes(total_minutes):
+    return f"{total_minutes // 60:02d}:{total_minutes % 60:02d}"
+
+def generate_pimpinan(n_pimpinan):
+    base = ['Gubernur', 'Wakil Gubernur', 'Sekretaris Utama', 'Deputi Pendidikan', 'Deputi Pengkajian',
+            'Deputi Pemantapan', 'Kadiv Umum', 'Inspektur Utama']
+    return [base[i] if i < len(base) else f"Pimpinan {i + 1:03d}" for i in range(n_pimpinan)]
+
+def generate_participant_pool(size):
+    return BASE_PARTICIPANTS[:size] + [f"Peserta {i + 1:04d}" for i in range(max(0, size - len(BASE_PARTICIPANTS)))]
+
+def generate_activities(n_activities, pimpinan_names, start_date, years=1, seed=0,
+                        participant_pool_size=200, max_participants=4):
+    # Kembalikan list dict berformat data add_activity, dengan tambahan kunci 'pimpinan_nama'.
+    # id_pimpinan diisi oleh pemanggil setelah pimpinan dibuat di database.
+    rng = random.Random(seed)
+    participant_pool = generate_participant_pool(participant_pool_size)
+    n_days = max(1, int(round(365 * years)))
+    busy = {} # (tanggal, 'p'/'s', nama) -> [(start, end)]
+
+    activities = []
+    attempts = 0
+    while len(activities) < n_activities and attempts < n_activities * MAX_PLACEMENT_TRIES:
+        attempts += 1
+        day = start_date + timedelta(days=rng.randrange(n_days))
+        date_str = day.strftime('%Y-%m-%d')
+        duration = rng.choice(DURATIONS_MINUTES)
+        start = rng.randrange(DAY_START_MINUTES, DAY_END_MINUTES - duration + 1, 15)
+        end = start + duration
+        pimpinan_nama = rng.choice(pimpinan_names)
+        participants = rng.sample(participant_pool, rng.randint(1, max_participants))
+
+        keys = [(date_str, 'p', pimpinan_nama)] + [(date_str, 's', p.lower()) for p in participants]
+        if any(_overlaps(busy.get(key, ()), start, end) for key in keys):
+            continue
+        for key in keys:
+            busy.setdefault(key, []).append((start, end))
+
+        input_day = day - timedelta(days=rng.randint(1, 30))
+        activities.append({
+            'tanggal_kegiatan': date_str,
+            'waktu_mulai_kegiatan': _format_minutes(start),
+            'waktu_akhir_kegiatan': _format_minutes(end),
+            'uraian_kegiatan': f"{rng.choice(ACTIVITY_TYPES)} {rng.choice(TOPICS)}",
+            'tempat_ruangan': rng.choice(ROOMS),
+            'pimpinan_nama': pimpinan_nama,
+            'id_pimpinan': None,
+            'daftar_peserta': ", ".join(participants),
+            'tanggal_input': input_day.strftime('%Y-%m-%d'),
+            'waktu_input': _format_minutes(rng.randrange(7 * 60, 17 * 60, 5)),
+            'narahubung': rng.choice(PIC_NAMES),
+            'kontak_person': f"8{rng.randrange(10 ** 9, 10 ** 10)}",
+        })
+
+    activities.sort(key=lambda a: (a['tanggal_kegiatan'], a['waktu_mulai_kegiatan']))
+    return activities
+
+def write_excel(file_path, activities, sheet_size=None):
+    # Tulis kegiatan dalam layout dummy_jadwal.xlsx (openpyxl write_only, semua sel teks).
+    # sheet_size: jika diisi, kegiatan dipecah ke beberapa sheet berisi paling banyak sheet_size baris.
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet_size = sheet_size or max(1, len(activities))
+    for sheet_index in range(0, max(1, len(activities)), sheet_size):
+        sheet = workbook.create_sheet(f"Sheet{sheet_index // sheet_size + 1}")
+        sheet.append(EXCEL_HEADERS)
+        for row_no, activity in enumerate(activities[sheet_index:sheet_index + sheet_size], start=1):
+            sheet.append([
+                str(row_no),
+                _to_excel_date(activity['tanggal_kegiatan']),
+                f"{activity['waktu_mulai_kegiatan']} - {activity['waktu_akhir_kegiatan']}",
+                activity['uraian_kegiatan'],
+                activity['tempat_ruangan'],
+                activity['pimpinan_nama'],
+                activity['daftar_peserta'],
+                '',
+                activity['narahubung'],
+                activity['kontak_person'],
+                _to_excel_date(activity['tanggal_input']),
+                activity['waktu_input'],
+            ])
+    workbook.save(file_path)
+    return file_path
+
+def _to_excel_date(date_str):
+    # 'YYYY-MM-DD' -> 'DD-MM-YYYY' (format TANGGAL di file Excel)
+    year, month, day = date_str.split('-')
+    return f"{day}-{month}-{year}"
+
+def default_start_date():
+    return date(date.today().year, 1, 1)
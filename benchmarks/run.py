@@ -0,0 +1,198 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+import db_handler
+from benchmarks.generator import (
+    generate_pimpinan, generate_activities, generate_participant_pool, write_excel, default_start_date
+)
+
+# Benchmark headless (tanpa Tk) untuk db_handler, excel_importer dan logika pengingat.
+# Jalankan dari root repo:
+#   python -m benchmarks.run --output hasil.json
+#   python -m benchmarks.run --baseline baseline.json   (exit code 1 jika ada regresi)
+
+DEFAULT_TOLERANCE = 0.5 # Regresi jika per_op_ms > baseline * (1 + tolerance)
+
+def _timed(ops, func):
+    started = time.perf_counter()
+    func()
+    seconds = time.perf_counter() - started
+    return {'ops': ops, 'seconds': round(seconds, 6), 'per_op_ms': round(seconds * 1000 / max(ops, 1), 6)}
+
+def _best_of(repeat, ops, func):
+    # Ambil waktu terbaik dari beberapa pengulangan (untuk benchmark yang hanya membaca)
+    return min((_timed(ops, func) for _ in range(repeat)), key=lambda r: r['seconds'])
+
+def _with_pimpinan_ids(activities, pimpinan_ids):
+    for activity in activities:
+        activity['id_pimpinan'] = pimpinan_ids[activity['pimpinan_nama']]
+    return activities
+
+def run_benchmarks(args, work_dir):
+    db_handler.DATABASE_NAME = os.path.join(work_dir, 'benchmark.db')
+    db_handler.create_table()
+
+    pimpinan_names = generate_pimpinan(args.pimpinan)
+    pimpinan_ids = {}
+    for name in pimpinan_names:
+        success, message, new_id = db_handler.add_pimpinan(name)
+        if not success:
+            raise RuntimeError(message)
+        pimpinan_ids[name] = new_id
+
+    # Tiga rentang tanggal terpisah: data awal, add_activity, dan file Excel, agar tidak saling bentrok
+    start_date = default_start_date()
+    n_days = int(round(365 * args.years))
+    base = _with_pimpinan_ids(generate_activities(args.activities, pimpinan_names, start_date, args.years, args.seed),
+                              pimpinan_ids)
+    add_start = start_date + timedelta(days=n_days)
+    extra = _with_pimpinan_ids(generate_activities(args.add, pimpinan_names, add_start, 0.25, args.seed + 1),
+                               pimpinan_ids)
+    import_start = add_start + timedelta(days=92)
+    import_rows = generate_activities(args.import_rows, pimpinan_names, import_start, 0.5, args.seed + 2)
+    excel_path = write_excel(os.path.join(work_dir, 'benchmark.xlsx'), import_rows)
+
+    results = {}
+
+    def populate():
+        success, message, _ = db_handler.add_activities_bulk(base)
+        if not success:
+            raise RuntimeError(message)
+    results['add_activities_bulk'] = _timed(len(base), populate)
+
+    def add_each():
+        for data in extra:
+            db_handler.add_activity(data)
+    results['add_activity'] = _timed(len(extra), add_each)
+
+    rng = random.Random(args.seed + 3)
+    queries = []
+    for _ in range(args.queries):
+        activity = rng.choice(base)
+        other = rng.choice(base)
+        queries.append((activity['tanggal_kegiatan'], other['waktu_mulai_kegiatan'], other['waktu_akhir_kegiatan'],
+                        other['id_pimpinan'], other['daftar_peserta']))
+
+    def validate_all():
+        for query in queries:
+            db_handler.validate_activity_overlap(*query)
+    db_handler.clear_conflict_indexes()
+    results['validate_activity_overlap'] = _timed(len(queries), validate_all)
+
+    results['get_all_activities'] = _best_of(args.repeat, 1, db_handler.get_all_activities)
+
+    def load_months():
+        for month in range(1, 13):
+            db_handler.get_activities_for_month(start_date.year, month)
+    results['get_activities_for_month'] = _best_of(args.repeat, 12, load_months)
+
+    # Pencarian waktu kosong satu bulan penuh untuk satu pimpinan dan 20 peserta (tanpa berhenti di limit)
+    free_slot_args = ([pimpinan_ids[pimpinan_names[0]]], ", ".join(generate_participant_pool(20)), 60,
+                      start_date.isoformat(), (start_date + timedelta(days=30)).isoformat())
+    results['find_free_slots'] = _best_of(args.repeat, 1, lambda: db_handler.find_free_slots(*free_slot_args, limit=10000))
+
+    from excel_importer import import_activities_from_excel
+    import_result = {}
+    def import_excel():
+        import_result['imported'], import_result['failed'], _ = import_activities_from_excel(excel_path)
+    results['import_activities_from_excel'] = _timed(len(import_rows), import_excel)
+    results['import_activities_from_excel'].update(import_result)
+
+    # Logika pengingat (pengganti App.check_upcoming_activities) tanpa thread dan tanpa Tk
+    from reminder_scheduler import ReminderScheduler
+    busiest_date = Counter(a['tanggal_kegiatan'] for a in base).most_common(1)[0][0]
+    day_start = datetime.strptime(busiest_date, '%Y-%m-%d')
+    scheduler = ReminderScheduler(lambda activity, lead: None)
+    results['reminder_load_window'] = _best_of(args.repeat, 1, lambda: scheduler._load_window(day_start))
+
+    def fire_every_minute():
+        # Simulasi satu hari penuh: periksa pengingat yang jatuh tempo setiap menit
+        day_scheduler = ReminderScheduler(lambda activity, lead: None)
+        day_scheduler._load_window(day_start)
+        for minute in range(24 * 60):
+            day_scheduler.fire_due_reminders(day_start + timedelta(minutes=minute))
+    results['reminder_fire_due'] = _best_of(args.repeat, 24 * 60, fire_every_minute)
+
+    db_handler.close_all_connections()
+    return results
+
+def compare_with_baseline(results, baseline, tolerance):
+    regressions = []
+    lines = []
+    for name, result in results.items():
+        base = baseline.get('benchmarks', {}).get(name)
+        if not base or not base.get('per_op_ms'):
+            lines.append(f"{name:32s} {result['per_op_ms']:12.4f} ms/op   (tidak ada baseline)")
+            continue
+        ratio = result['per_op_ms'] / base['per_op_ms']
+        status = "REGRESI" if ratio > 1 + tolerance else "ok"
+        if status == "REGRESI":
+            regressions.append(name)
+        lines.append(f"{name:32s} {result['per_op_ms']:12.4f} ms/op   baseline {base['per_op_ms']:12.4f}   x{ratio:5.2f}  {status}")
+    return regressions, lines
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark headless db_handler/excel_importer dengan data sintetis.")
+    parser.add_argument('--pimpinan', type=int, default=8, help="Jumlah pimpinan (default: 8)")
+    parser.add_argument('--activities', type=int, default=5000, help="Jumlah kegiatan awal (default: 5000)")
+    parser.add_argument('--years', type=float, default=2, help="Rentang tahun kegiatan awal (default: 2)")
+    parser.add_argument('--add', type=int, default=200, help="Jumlah panggilan add_activity (default: 200)")
+    parser.add_argument('--queries', type=int, default=1000, help="Jumlah validate_activity_overlap (default: 1000)")
+    parser.add_argument('--import-rows', type=int, default=2000, help="Jumlah baris file Excel (default: 2000)")
+    parser.add_argument('--repeat', type=int, default=5, help="Pengulangan benchmark baca, diambil yang tercepat (default: 5)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="Simpan hasil ke file JSON ini")
+    parser.add_argument('--baseline', help="Bandingkan dengan file JSON hasil sebelumnya")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="Batas kenaikan waktu relatif sebelum dianggap regresi (default: 0.5)")
+    args = parser.parse_args(argv)
+
+    original_database = db_handler.DATABASE_NAME
+    try:
+        with tempfile.TemporaryDirectory() as work_dir:
+            results = run_benchmarks(args, work_dir)
+    finally:
+        db_handler.close_all_connections()
+        db_handler.DATABASE_NAME = original_database
+
+    report = {
+        'meta': {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'params': {k: v for k, v in vars(args).items() if k not in ('output', 'baseline', 'tolerance')},
+        },
+        'benchmarks': results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('meta', {}).get('params') != report['meta']['params']:
+            print("Peringatan: parameter benchmark berbeda dengan baseline.")
+        regressions, lines = compare_with_baseline(results, baseline, args.tolerance)
+    else:
+        lines = [f"{name:32s} {r['per_op_ms']:12.4f} ms/op   ({r['ops']} ops, {r['seconds']:.3f} s)" for name, r in results.items()]
+    print("\n".join(lines))
+
+    if regressions:
+        print(f"Regresi terdeteksi: {', '.join(regressions)}")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
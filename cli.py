@@ -0,0 +1,460 @@
+import argparse
+import csv
+import json
+import logging
+import os
+import sys
+from datetime import datetime, timedelta
+
+import db_handler
+
+# Antarmuka baris perintah tanpa GUI (tidak mengimpor customtkinter/tkcalendar), untuk
+# impor terjadwal dan laporan di server. Hasil ditulis ke stdout sebagai CSV atau JSON lines.
+#   python -m cli import jadwal/                  impor semua workbook di folder (satu transaksi per file)
+#   python -m cli list --start 2025-07-01 --end 2025-07-31 --format jsonl
+#   python -m cli export --pimpinan Gubernur > gubernur.csv
+#   python -m cli export --start 2025-01-01 --end 2025-12-31 --xlsx jadwal_2025.xlsx
+#   python -m cli export --pimpinan Gubernur --ics gubernur.ics
+#   python -m cli feeds /var/www/kalender       tulis ulang hanya feed .ics pimpinan yang berubah
+#   python -m cli import-ics kalender.ics        upsert berdasarkan UID
+#   python -m cli conflicts --start 2025-01-01 --end 2025-12-31 [--pimpinan Gubernur]   hanya bentrok yang melibatkan pimpinan ini
+#   python -m cli conflicts --date 2025-07-01 --time 09:00-10:00 --pimpinan Gubernur --peserta "Staf Ahli"
+#   python -m cli stats --start 2025-01-01 --end 2025-12-31
+#   python -m cli rooms --start 2025-07-01 --end 2025-07-07 --ruangan "Aula Utama"
+#   python -m cli free-slots --pimpinan Gubernur --peserta "Staf Ahli, Biro Humas" --duration 90 --days 30
+#   python -m cli schedule sesi_ppra.csv --start 2025-08-04 --end 2025-08-29 --commit
+#
+# Exit code: 0 = sukses, 1 = ada baris gagal validasi / bentrok ditemukan, 2 = argumen atau file salah.
+
+EXIT_OK = 0
+EXIT_VALIDATION_FAILED = 1
+EXIT_USAGE = 2
+
+EXCEL_EXTENSIONS = ('.xlsx', '.xlsm', '.xls')
+MIN_DATE = '0000-01-01'
+MAX_DATE = '9999-12-31'
+
+class CliError(Exception):
+    pass
+
+
+# --- Output ---
+class RecordWriter:
+    # Tulis dict satu per satu ke stream sebagai CSV (header dari record pertama) atau JSON lines
+    def __init__(self, stream, output_format):
+        self.stream = stream
+        self.output_format = output_format
+        self._csv_writer = None
+
+    def write(self, record):
+        if self.output_format == 'jsonl':
+            self.stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+            return
+        if self._csv_writer is None:
+            self._csv_writer = csv.DictWriter(self.stream, fieldnames=list(record.keys()), extrasaction='ignore')
+            self._csv_writer.writeheader()
+        self._csv_writer.writerow(record)
+
+
+def _parse_date(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').strftime('%Y-%m-%d')
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Tanggal '{value}' tidak valid, gunakan YYYY-MM-DD.")
+
+def _resolve_pimpinan_ids(names):
+    if not names:
+        return None
+    pimpinan_by_name = {p['nama'].lower(): p['id'] for p in db_handler.get_all_pimpinan()}
+    ids = []
+    for name in names:
+        if name.lower() not in pimpinan_by_name:
+            raise CliError(f"Pimpinan '{name}' tidak ditemukan.")
+        ids.append(pimpinan_by_name[name.lower()])
+    return ids
+
+def _date_range(args, default_days=None):
+    start = args.start
+    end = args.end
+    if default_days is not None and start is None and end is None:
+        start = datetime.now().strftime('%Y-%m-%d')
+        end = (datetime.now() + timedelta(days=default_days)).strftime('%Y-%m-%d')
+    return start or MIN_DATE, end or MAX_DATE
+
+
+# --- Perintah ---
+def _collect_workbooks(paths):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                # Lewati file kunci Excel (~$nama.xlsx)
+                if name.lower().endswith(EXCEL_EXTENSIONS) and not name.startswith('~$'):
+                    files.append(os.path.join(path, name))
+        elif os.path.isfile(path):
+            files.append(path)
+        else:
+            raise CliError(f"File atau folder '{path}' tidak ditemukan.")
+    return files
+
+def command_import(args, writer):
+    # pandas/openpyxl hanya dimuat untuk perintah ini
+    from excel_importer import sync_activities_from_excel, sync_workbooks_parallel
+
+    files = _collect_workbooks(args.paths)
+    if not files:
+        raise CliError("Tidak ada file Excel yang ditemukan.")
+    if args.source and len(files) > 1:
+        raise CliError("--source hanya bisa dipakai untuk satu file.")
+    if args.jobs < 0:
+        raise CliError("--jobs tidak boleh negatif.")
+
+    if args.jobs != 1 and len(files) > 1:
+        # Workbook dibaca paralel; penulisan tetap satu per satu sesuai urutan file
+        results = sync_workbooks_parallel(files, sheet_names=args.sheet, chunk_size=args.chunk_size,
+                                          max_workers=args.jobs or None, remove_missing=args.remove_missing)
+    else:
+        # Setiap file diimpor dalam satu transaksi (import_excel_streaming); baris yang tidak berubah
+        # sejak impor sebelumnya dari file yang sama dilewati
+        results = ((file_path, *sync_activities_from_excel(file_path, sheet_names=args.sheet,
+                                                           chunk_size=args.chunk_size, source_name=args.source,
+                                                           remove_missing=args.remove_missing))
+                   for file_path in files)
+
+    exit_code = EXIT_OK
+    for file_path, summary, errors in results:
+        writer.write(dict({'file': file_path}, **summary, errors=len(errors)))
+        for error in errors:
+            print(f"{os.path.basename(file_path)}: {error}", file=sys.stderr)
+        if summary['failed'] or errors:
+            exit_code = EXIT_VALIDATION_FAILED
+    return exit_code
+
+def command_list(args, writer, default_days=7):
+    start_date, end_date = _date_range(args, default_days)
+    pimpinan_ids = _resolve_pimpinan_ids(args.pimpinan)
+    for activity in db_handler.iter_activities_in_range(start_date, end_date, pimpinan_ids):
+        writer.write(dict(activity))
+    return EXIT_OK
+
+def command_export(args, writer):
+    # Sama seperti list, tetapi tanpa rentang bawaan (semua kegiatan jika --start/--end tidak diberikan).
+    # Dengan --xlsx: tulis workbook dengan format yang sama seperti file impor (satu sheet per bulan)
+    # Dengan --ics: tulis satu file iCalendar
+    if not args.xlsx and not args.ics:
+        return command_list(args, writer, default_days=None)
+    start_date, end_date = _date_range(args)
+    pimpinan_ids = _resolve_pimpinan_ids(args.pimpinan)
+    if args.xlsx:
+        from excel_exporter import export_activities_to_excel
+        file_path = args.xlsx
+        success, message, row_count = export_activities_to_excel(start_date, end_date, pimpinan_ids, file_path)
+    else:
+        from ics_calendar import export_activities_to_ics
+        file_path = args.ics
+        success, message, row_count = export_activities_to_ics(start_date, end_date, pimpinan_ids, file_path)
+    if not success:
+        raise CliError(message)
+    writer.write({'file': file_path, 'exported': row_count})
+    return EXIT_OK
+
+def command_feeds(args, writer):
+    from ics_calendar import update_ics_feeds
+
+    success, message, summary = update_ics_feeds(args.output_dir, args.start, args.end, force=args.force)
+    if not success:
+        raise CliError(message)
+    for status in ('written', 'unchanged', 'removed'):
+        for file_name in summary[status]:
+            writer.write({'file': file_name, 'status': status})
+    return EXIT_OK
+
+def command_import_ics(args, writer):
+    from ics_calendar import import_ics
+
+    exit_code = EXIT_OK
+    for file_path in args.paths:
+        if not os.path.isfile(file_path):
+            raise CliError(f"File '{file_path}' tidak ditemukan.")
+        summary, errors = import_ics(file_path)
+        writer.write(dict({'file': file_path}, **summary, errors=len(errors)))
+        for error in errors:
+            print(f"{os.path.basename(file_path)}: {error}", file=sys.stderr)
+        if summary['failed'] or errors:
+            exit_code = EXIT_VALIDATION_FAILED
+    return exit_code
+
+def _conflict_record(activity_date, activity_id, conflict, start, end):
+    return {
+        'tanggal': activity_date,
+        'kegiatan_id': activity_id,
+        'waktu': f"{db_handler.minutes_to_time(start)}-{db_handler.minutes_to_time(end)}",
+        'bentrok_dengan_id': conflict['id'],
+        'waktu_bentrok': f"{db_handler.minutes_to_time(conflict['start'])}-{db_handler.minutes_to_time(conflict['end'])}",
+        'pimpinan': conflict['pimpinan'],
+        'ruangan': conflict['ruangan'],
+        'peserta': "; ".join(sorted(conflict['participants'])),
+    }
+
+def _check_candidate(args, writer):
+    try:
+        start_time, end_time = [part.strip() for part in args.time.split('-')]
+        start, end = db_handler.time_range_to_minutes(start_time, end_time)
+    except ValueError:
+        raise CliError(f"Waktu '{args.time}' tidak valid, gunakan HH:MM-HH:MM.")
+    pimpinan_ids = _resolve_pimpinan_ids(args.pimpinan)
+    id_pimpinan = pimpinan_ids[0] if pimpinan_ids else None
+
+    conflicts = db_handler.find_activity_conflicts(args.date, start_time, end_time, id_pimpinan, args.peserta or "",
+                                                   room_raw=args.ruangan)
+    for conflict in conflicts:
+        writer.write(_conflict_record(args.date, None, conflict, start, end))
+    return EXIT_VALIDATION_FAILED if conflicts else EXIT_OK
+
+SCAN_DATES_PER_BATCH = 100
+
+def _scan_dates(activity_dates, writer, pimpinan_ids=None):
+    # pimpinan_ids: hanya bentrok yang melibatkan kegiatan pimpinan ini (None = semua)
+    found = 0
+    indexes = db_handler.get_conflict_indexes_snapshot(activity_dates)
+    for activity_date in activity_dates:
+        index = indexes[activity_date]
+        selected = {activity_id for activity_id, entry in index.activities.items()
+                    if pimpinan_ids is None or entry[2] in pimpinan_ids}
+        for activity_id, (start, end, id_pimpinan, participants, room) in sorted(index.activities.items()):
+            if activity_id not in selected:
+                continue
+            for conflict in index.find_conflicts(start, end, id_pimpinan, participants, exclude_id=activity_id, room=room):
+                # Setiap pasangan hanya dilaporkan sekali
+                if conflict['id'] > activity_id or conflict['id'] not in selected:
+                    writer.write(_conflict_record(activity_date, activity_id, conflict, start, end))
+                    found += 1
+    return found
+
+def command_conflicts(args, writer):
+    if args.date:
+        if not args.time:
+            raise CliError("--time wajib diisi bersama --date.")
+        return _check_candidate(args, writer)
+
+    # Tanpa --date: cari bentrok di antara kegiatan yang sudah tersimpan (mis. data lama sebelum validasi)
+    start_date, end_date = _date_range(args)
+    pimpinan_ids = _resolve_pimpinan_ids(args.pimpinan)
+    scan_ids = set(pimpinan_ids) if pimpinan_ids is not None else None
+    found = 0
+    batch = []
+    for activity in db_handler.iter_activities_in_range(start_date, end_date, pimpinan_ids):
+        activity_date = activity['tanggal_kegiatan']
+        if not batch or batch[-1] != activity_date:
+            if len(batch) >= SCAN_DATES_PER_BATCH:
+                found += _scan_dates(batch, writer, scan_ids)
+                batch = []
+            batch.append(activity_date)
+    if batch:
+        found += _scan_dates(batch, writer, scan_ids)
+    return EXIT_VALIDATION_FAILED if found else EXIT_OK
+
+def command_stats(args, writer):
+    start_date, end_date = _date_range(args)
+    total = 0
+    for row in db_handler.count_activities_by_pimpinan(start_date, end_date):
+        writer.write({'kelompok': 'pimpinan', 'kunci': row['pimpinan_nama'] or '(tanpa pimpinan)', 'jumlah': row['jumlah']})
+        total += row['jumlah']
+    for row in db_handler.count_activities_by_month(start_date, end_date):
+        writer.write({'kelompok': 'bulan', 'kunci': row['bulan'], 'jumlah': row['jumlah']})
+    writer.write({'kelompok': 'peserta', 'kunci': 'terdaftar', 'jumlah': len(db_handler.get_all_peserta())})
+    writer.write({'kelompok': 'total', 'kunci': 'kegiatan', 'jumlah': total})
+    return EXIT_OK
+
+
+def command_rooms(args, writer):
+    # Okupansi ruangan (default: 7 hari ke depan)
+    start_date, end_date = _date_range(args, 7)
+    room_ids = None
+    if args.ruangan:
+        rooms_by_key = {room['nama_kunci']: room['id'] for room in db_handler.get_all_ruangan()}
+        room_ids = []
+        for name in args.ruangan:
+            key = db_handler.room_name_key(name)
+            if key not in rooms_by_key:
+                raise CliError(f"Ruangan '{name}' tidak ditemukan.")
+            room_ids.append(rooms_by_key[key])
+    for row in db_handler.get_room_occupancy(start_date, end_date, room_ids):
+        writer.write(row)
+    return EXIT_OK
+
+def _parse_working_hours(value):
+    try:
+        working_hours = tuple(part.strip() for part in value.split('-'))
+        db_handler.time_range_to_minutes(*working_hours)
+    except (TypeError, ValueError):
+        raise CliError(f"Jam kerja '{value}' tidak valid, gunakan HH:MM-HH:MM.")
+    return working_hours
+
+def command_free_slots(args, writer):
+    working_hours = _parse_working_hours(args.hours)
+    start_date = args.start or datetime.now().strftime('%Y-%m-%d')
+    end_date = args.end or (datetime.strptime(start_date, '%Y-%m-%d') + timedelta(days=args.days - 1)).strftime('%Y-%m-%d')
+    slots = db_handler.find_free_slots(_resolve_pimpinan_ids(args.pimpinan), args.peserta or "", args.duration,
+                                       start_date, end_date, working_hours, args.limit)
+    for slot in slots:
+        writer.write(slot)
+    return EXIT_OK if slots else EXIT_VALIDATION_FAILED
+
+SCHEDULE_COLUMNS = ('uraian_kegiatan', 'durasi', 'pimpinan', 'daftar_peserta', 'tempat_ruangan',
+                    'narahubung', 'kontak_person', 'tanggal_awal', 'tanggal_akhir')
+
+def _read_schedule_requests(path):
+    # CSV (header = SCHEDULE_COLUMNS, hanya uraian_kegiatan dan durasi yang wajib) atau JSON list / JSON lines
+    if not os.path.isfile(path):
+        raise CliError(f"File '{path}' tidak ditemukan.")
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        if path.lower().endswith('.json'):
+            rows = json.load(f)
+        elif path.lower().endswith('.jsonl'):
+            rows = [json.loads(line) for line in f if line.strip()]
+        else:
+            rows = list(csv.DictReader(f))
+    pimpinan_by_name = {p['nama'].lower(): p['id'] for p in db_handler.get_all_pimpinan()}
+    requests = []
+    for line_number, row in enumerate(rows, start=1):
+        request = {key: (str(row[key]).strip() if row.get(key) is not None else "") for key in SCHEDULE_COLUMNS}
+        name = request.pop('pimpinan')
+        if name and name.lower() not in pimpinan_by_name:
+            raise CliError(f"Baris {line_number}: pimpinan '{name}' tidak ditemukan.")
+        request['id_pimpinan'] = pimpinan_by_name[name.lower()] if name else None
+        requests.append(request)
+    return requests
+
+def command_schedule(args, writer):
+    # auto_scheduler hanya dimuat untuk perintah ini
+    from auto_scheduler import plan_schedule, commit_schedule
+
+    working_hours = _parse_working_hours(args.hours)
+    start_date = args.start or datetime.now().strftime('%Y-%m-%d')
+    end_date = args.end or (datetime.strptime(start_date, '%Y-%m-%d') + timedelta(days=args.days - 1)).strftime('%Y-%m-%d')
+    requests = _read_schedule_requests(args.path)
+    report = plan_schedule(requests, start_date, end_date, working_hours=working_hours,
+                           max_backtracks=args.max_backtracks)
+
+    for placement in report['placed']:
+        data = placement['data']
+        writer.write({'baris': placement['index'] + 1, 'status': 'ditempatkan', 'kegiatan': data['uraian_kegiatan'],
+                      'tanggal': data['tanggal_kegiatan'],
+                      'waktu': f"{data['waktu_mulai_kegiatan']}-{data['waktu_akhir_kegiatan']}", 'alasan': ""})
+    for item in report['unplaced']:
+        writer.write({'baris': item['index'] + 1, 'status': 'tidak_ditempatkan',
+                      'kegiatan': item['request'].get('uraian_kegiatan', ""), 'tanggal': "", 'waktu': "",
+                      'alasan': item['reason']})
+    print(f"{len(report['placed'])} sesi ditempatkan, {len(report['unplaced'])} tidak ditempatkan "
+          f"({report['backtracks']} backtrack).", file=sys.stderr)
+
+    if args.commit:
+        success, message, _ = commit_schedule(report)
+        print(message, file=sys.stderr)
+        if not success:
+            return EXIT_VALIDATION_FAILED
+    return EXIT_VALIDATION_FAILED if report['unplaced'] else EXIT_OK
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m cli", description="Operasi batch jadwal kegiatan tanpa GUI.")
+    parser.add_argument('--db', help=f"Path database SQLite (default: {db_handler.DATABASE_NAME})")
+    parser.add_argument('--format', choices=['csv', 'jsonl'], default='csv', help="Format output (default: csv)")
+    parser.add_argument('--log-level', default='WARNING', help="Level logging ke stderr (default: WARNING)")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = subparsers.add_parser('import', help="Impor workbook Excel (file atau folder)")
+    import_parser.add_argument('paths', nargs='+', help="File .xlsx/.xls atau folder berisi workbook")
+    import_parser.add_argument('--sheet', action='append', help="Nama sheet yang diimpor (bisa diulang; default: semua)")
+    import_parser.add_argument('--chunk-size', type=int, default=500)
+    import_parser.add_argument('--remove-missing', action='store_true',
+                               help="Hapus kegiatan hasil impor sebelumnya yang tidak ada lagi di sheet")
+    import_parser.add_argument('--jobs', '-j', type=int, default=1,
+                               help="Jumlah proses pembaca workbook untuk impor banyak file (0 = jumlah CPU)")
+    import_parser.add_argument('--source', help="Nama sumber (default: nama file); pakai nama lama untuk revisi yang diganti namanya")
+    import_parser.set_defaults(handler=command_import)
+
+    for name, handler, help_text in [
+        ('list', command_list, "Tampilkan kegiatan (default: 7 hari ke depan)"),
+        ('export', command_export, "Ekspor kegiatan (default: semua)"),
+        ('conflicts', command_conflicts, "Cari bentrok di data tersimpan, atau cek satu kegiatan dengan --date/--time"),
+        ('stats', command_stats, "Jumlah kegiatan per pimpinan dan per bulan"),
+        ('rooms', command_rooms, "Okupansi ruangan (default: 7 hari ke depan)"),
+    ]:
+        sub = subparsers.add_parser(name, help=help_text)
+        sub.add_argument('--start', type=_parse_date, help="Tanggal awal YYYY-MM-DD (inklusif)")
+        sub.add_argument('--end', type=_parse_date, help="Tanggal akhir YYYY-MM-DD (inklusif)")
+        if name in ('list', 'export', 'conflicts'):
+            sub.add_argument('--pimpinan', action='append', help="Nama pimpinan (bisa diulang)")
+        if name == 'rooms':
+            sub.add_argument('--ruangan', action='append', help="Nama ruangan (bisa diulang)")
+        if name == 'export':
+            output = sub.add_mutually_exclusive_group()
+            output.add_argument('--xlsx', help="Tulis ke workbook Excel (format impor, satu sheet per bulan)")
+            output.add_argument('--ics', help="Tulis ke file iCalendar (.ics)")
+        if name == 'conflicts':
+            sub.add_argument('--date', type=_parse_date, help="Tanggal kegiatan yang akan dicek")
+            sub.add_argument('--time', help="Rentang waktu HH:MM-HH:MM")
+            sub.add_argument('--peserta', help="Daftar peserta, dipisah koma")
+            sub.add_argument('--ruangan', help="Tempat/ruangan kegiatan")
+        sub.set_defaults(handler=handler)
+
+    slots_parser = subparsers.add_parser('free-slots', help="Cari waktu kosong bersama untuk pimpinan dan peserta")
+    slots_parser.add_argument('--pimpinan', action='append', help="Nama pimpinan (bisa diulang)")
+    slots_parser.add_argument('--peserta', help="Daftar peserta, dipisah koma")
+    slots_parser.add_argument('--duration', type=int, default=60, help="Durasi kegiatan dalam menit (default: 60)")
+    slots_parser.add_argument('--start', type=_parse_date, help="Tanggal awal pencarian (default: hari ini)")
+    slots_parser.add_argument('--end', type=_parse_date, help="Tanggal akhir pencarian (default: start + --days)")
+    slots_parser.add_argument('--days', type=int, default=30, help="Lama pencarian dalam hari jika --end kosong (default: 30)")
+    slots_parser.add_argument('--hours', default="-".join(db_handler.WORKING_HOURS),
+                              help=f"Jam kerja HH:MM-HH:MM (default: {'-'.join(db_handler.WORKING_HOURS)})")
+    slots_parser.add_argument('--limit', type=int, default=10, help="Jumlah slot maksimum (default: 10)")
+    slots_parser.set_defaults(handler=command_free_slots)
+
+    feeds_parser = subparsers.add_parser('feeds', help="Perbarui feed .ics per pimpinan (hanya yang berubah)")
+    feeds_parser.add_argument('output_dir', help="Folder tujuan feed (mis. folder yang disajikan web server)")
+    feeds_parser.add_argument('--start', type=_parse_date, help="Tanggal awal feed (default: 30 hari yang lalu)")
+    feeds_parser.add_argument('--end', type=_parse_date, help="Tanggal akhir feed (default: 365 hari ke depan)")
+    feeds_parser.add_argument('--force', action='store_true', help="Tulis ulang semua feed")
+    feeds_parser.set_defaults(handler=command_feeds)
+
+    import_ics_parser = subparsers.add_parser('import-ics', help="Impor file .ics (upsert berdasarkan UID)")
+    import_ics_parser.add_argument('paths', nargs='+', help="File .ics")
+    import_ics_parser.set_defaults(handler=command_import_ics)
+
+    schedule_parser = subparsers.add_parser('schedule', help="Tempatkan banyak sesi otomatis dalam rentang tanggal")
+    schedule_parser.add_argument('path', help=f"File CSV/JSON/JSONL permintaan sesi (kolom: {', '.join(SCHEDULE_COLUMNS)})")
+    schedule_parser.add_argument('--start', type=_parse_date, help="Tanggal awal rentang (default: hari ini)")
+    schedule_parser.add_argument('--end', type=_parse_date, help="Tanggal akhir rentang (default: start + --days)")
+    schedule_parser.add_argument('--days', type=int, default=30, help="Lama rentang dalam hari jika --end kosong (default: 30)")
+    schedule_parser.add_argument('--hours', default="-".join(db_handler.WORKING_HOURS),
+                                 help=f"Jam kerja HH:MM-HH:MM (default: {'-'.join(db_handler.WORKING_HOURS)})")
+    schedule_parser.add_argument('--max-backtracks', type=int, default=200, help="Batas backtracking (default: 200)")
+    schedule_parser.add_argument('--commit', action='store_true',
+                                 help="Simpan sesi yang ditempatkan (satu transaksi); tanpa ini hanya laporan")
+    schedule_parser.set_defaults(handler=command_schedule)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    # Log (mis. query lambat) ke stderr agar tidak tercampur dengan output CSV/JSONL di stdout
+    logging.basicConfig(level=args.log_level.upper(), stream=sys.stderr, format="%(levelname)s %(name)s: %(message)s")
+    if args.db:
+        db_handler.DATABASE_NAME = args.db
+
+    writer = RecordWriter(sys.stdout, args.format)
+    try:
+        db_handler.create_table()
+        return args.handler(args, writer)
+    except CliError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    except BrokenPipeError:
+        # Output dipotong (mis. `| head`); bukan kesalahan
+        sys.stderr.close()
+        return EXIT_OK
+    finally:
+        db_handler.close_all_connections()
+
+if __name__ == '__main__':
+    sys.exit(main())
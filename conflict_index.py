@@ -0,0 +1,197 @@
+from bisect import bisect_left, bisect_right, insort
+
+END_OF_DAY_MINUTES = 23 * 60 + 59
+
+# --- Fungsi Bantu Konversi Waktu ---
+def time_to_minutes(time_str):
+    # 'HH:MM' -> menit sejak 00:00 (tanpa datetime.strptime)
+    hours, minutes = time_str.strip().split(':')
+    hours, minutes = int(hours), int(minutes)
+    if not (0 <= hours < 24 and 0 <= minutes < 60):
+        raise ValueError(f"Waktu '{time_str}' tidak valid.")
+    return hours * 60 + minutes
+
+def minutes_to_time(total_minutes):
+    return f"{total_minutes // 60:02d}:{total_minutes % 60:02d}"
+
+def time_range_to_minutes(start_time_str, end_time_str):
+    start = time_to_minutes(start_time_str)
+    end = time_to_minutes(end_time_str)
+    # Kegiatan yang melewati tengah malam dianggap berakhir di akhir hari (sama seperti is_time_overlap)
+    if end < start:
+        end = END_OF_DAY_MINUTES
+    return start, end
+
+def split_participants(participants_raw):
+    # 'A, b ,C' -> ['A', 'b', 'C'] (nama tampilan, tanpa spasi berlebih)
+    if not participants_raw:
+        return []
+    return [p.strip() for p in participants_raw.split(',') if p.strip()]
+
+def parse_participants(participants_raw):
+    # 'A, b ,C' -> {'a', 'b', 'c'} (kunci pembanding, tidak peka huruf besar/kecil)
+    return set(p.lower() for p in split_participants(participants_raw))
+
+# Tempat yang boleh dipakai beberapa kegiatan sekaligus (rapat daring), tidak dicek bentroknya
+SHARED_ROOM_KEYWORDS = ('zoom', 'online', 'daring', 'virtual', 'vicon', 'webex', 'teams', 'google meet')
+
+def room_name_key(room_raw):
+    # ' Aula  Utama ' -> 'aula utama'; None jika kosong atau hanya tanda baca (mis. '-')
+    if not room_raw:
+        return None
+    key = " ".join(room_raw.split()).lower()
+    return key if any(ch.isalnum() for ch in key) else None
+
+def room_conflict_key(room_raw):
+    # Kunci ruangan untuk pengecekan bentrok; None untuk tempat kosong atau ruangan bersama
+    key = room_name_key(room_raw)
+    if key is None or any(keyword in key for keyword in SHARED_ROOM_KEYWORDS):
+        return None
+    return key
+
+
+class IntervalIndex:
+    # Daftar interval [start, end) terurut berdasarkan start, dalam menit.
+    # max_duration dipakai untuk membatasi pencarian: interval yang mungkin
+    # beririsan dengan [s, e) pasti punya start di (s - max_duration, e).
+    def __init__(self):
+        self._items = [] # (start, end, activity_id)
+        self._max_duration = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def add(self, start, end, activity_id):
+        insort(self._items, (start, end, activity_id))
+        self._max_duration = max(self._max_duration, end - start)
+
+    def remove(self, activity_id):
+        self._items = [item for item in self._items if item[2] != activity_id]
+
+    def intervals(self):
+        return [(start, end) for start, end, _ in self._items]
+
+    def overlapping(self, start, end):
+        # Semua activity_id yang intervalnya beririsan dengan [start, end)
+        lo = bisect_right(self._items, (start - self._max_duration, float('inf')))
+        hi = bisect_left(self._items, (end,))
+        return [item for item in self._items[lo:hi] if item[1] > start]
+
+
+class DayConflictIndex:
+    # Index bentrok untuk satu tanggal: interval per pimpinan, per peserta dan per ruangan
+    def __init__(self, activity_date):
+        self.activity_date = activity_date
+        self.by_pimpinan = {} # id_pimpinan -> IntervalIndex
+        self.by_participant = {} # nama peserta (lowercase) -> IntervalIndex
+        self.by_room = {} # room_conflict_key -> IntervalIndex
+        self.activities = {} # activity_id -> (start, end, id_pimpinan, participants, room)
+
+    @classmethod
+    def from_rows(cls, activity_date, rows, participants_by_activity=None):
+        # rows: baris Kegiatan dengan kolom id, waktu_mulai_kegiatan, waktu_akhir_kegiatan,
+        # id_pimpinan dan (jika participants_by_activity tidak diberikan) daftar_peserta.
+        # participants_by_activity: activity_id -> set nama peserta (lowercase), mis. dari Kegiatan_Peserta
+        # Ruangan diambil dari kolom ruangan_kunci (Ruangan.nama_kunci) jika ada, selain itu tempat_ruangan.
+        index = cls(activity_date)
+        for row in rows:
+            columns = row.keys()
+            try:
+                start, end = time_range_to_minutes(row['waktu_mulai_kegiatan'], row['waktu_akhir_kegiatan'])
+            except ValueError:
+                continue # Baris lama dengan format waktu rusak tidak bisa bentrok
+            if participants_by_activity is not None:
+                participants = participants_by_activity.get(row['id'], set())
+            else:
+                participants = parse_participants(row['daftar_peserta'])
+            if 'ruangan_kunci' in columns:
+                room = room_conflict_key(row['ruangan_kunci'])
+            else:
+                room = room_conflict_key(row['tempat_ruangan']) if 'tempat_ruangan' in columns else None
+            index.add(row['id'], start, end, row['id_pimpinan'], participants, room)
+        return index
+
+    def add(self, activity_id, start, end, id_pimpinan, participants, room=None):
+        # room: room_conflict_key, None jika tidak perlu dicek
+        self.activities[activity_id] = (start, end, id_pimpinan, participants, room)
+        if id_pimpinan is not None:
+            self.by_pimpinan.setdefault(id_pimpinan, IntervalIndex()).add(start, end, activity_id)
+        for participant in participants:
+            self.by_participant.setdefault(participant, IntervalIndex()).add(start, end, activity_id)
+        if room is not None:
+            self.by_room.setdefault(room, IntervalIndex()).add(start, end, activity_id)
+
+    def remove(self, activity_id):
+        activity = self.activities.pop(activity_id, None)
+        if activity is None:
+            return
+        _, _, id_pimpinan, participants, room = activity
+        if id_pimpinan in self.by_pimpinan:
+            self.by_pimpinan[id_pimpinan].remove(activity_id)
+        for participant in participants:
+            if participant in self.by_participant:
+                self.by_participant[participant].remove(activity_id)
+        if room in self.by_room:
+            self.by_room[room].remove(activity_id)
+
+    def busy_intervals(self, pimpinan_ids, participants, rooms=()):
+        # Semua interval sibuk (start, end) milik pimpinan/peserta/ruangan ini, belum digabung
+        intervals = []
+        for room in rooms:
+            if room in self.by_room:
+                intervals.extend(self.by_room[room].intervals())
+        for id_pimpinan in pimpinan_ids:
+            if id_pimpinan in self.by_pimpinan:
+                intervals.extend(self.by_pimpinan[id_pimpinan].intervals())
+        for participant in participants:
+            if participant in self.by_participant:
+                intervals.extend(self.by_participant[participant].intervals())
+        return intervals
+
+    def find_conflicts(self, start, end, id_pimpinan, participants, exclude_id=None, room=None):
+        # Kembalikan semua bentrok, terurut berdasarkan waktu mulai, sebagai dict:
+        # {'id', 'start', 'end', 'pimpinan': bool, 'ruangan': bool, 'participants': set}
+        conflicts = {}
+
+        def conflict_for(other_start, other_end, other_id):
+            return conflicts.setdefault(other_id, {
+                'id': other_id, 'start': other_start, 'end': other_end,
+                'pimpinan': False, 'ruangan': False, 'participants': set()
+            })
+
+        if id_pimpinan is not None and id_pimpinan in self.by_pimpinan:
+            for other_start, other_end, other_id in self.by_pimpinan[id_pimpinan].overlapping(start, end):
+                if other_id != exclude_id:
+                    conflict_for(other_start, other_end, other_id)['pimpinan'] = True
+
+        if room is not None and room in self.by_room:
+            for other_start, other_end, other_id in self.by_room[room].overlapping(start, end):
+                if other_id != exclude_id:
+                    conflict_for(other_start, other_end, other_id)['ruangan'] = True
+
+        for participant in participants:
+            if participant not in self.by_participant:
+                continue
+            for other_start, other_end, other_id in self.by_participant[participant].overlapping(start, end):
+                if other_id != exclude_id:
+                    conflict_for(other_start, other_end, other_id)['participants'].add(participant)
+
+        return sorted(conflicts.values(), key=lambda c: (c['start'], c['id']))
+
+
+def free_slots(busy_intervals, day_start, day_end, duration):
+    # Sweep-line: interval sibuk diurutkan lalu digabung sambil berjalan; celah [start, end)
+    # di dalam [day_start, day_end) yang panjangnya minimal duration dikembalikan berurutan
+    gaps = []
+    cursor = day_start
+    for start, end in sorted(busy_intervals):
+        if start >= day_end:
+            break
+        if start - cursor >= duration:
+            gaps.append((cursor, start))
+        cursor = max(cursor, end)
+        if cursor >= day_end:
+            return gaps
+    if day_end - cursor >= duration:
+        gaps.append((cursor, day_end))
+    return gaps
@@ -1,323 +1,1544 @@
-import sqlite3
-from datetime import datetime, timedelta
-import random # Untuk warna acak awal
-
-DATABASE_NAME = "schedule.db"
-
-def connect_db():
-    conn = sqlite3.connect(DATABASE_NAME)
-    # Configure row_factory to return rows as dictionaries for easier column access
-    conn.row_factory = sqlite3.Row
-    return conn
-
-def create_table():
-    conn = connect_db()
-    cursor = conn.cursor()
-
-    # Tabel Pimpinan (BARU)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS Pimpinan (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            nama TEXT NOT NULL UNIQUE,
-            warna TEXT NOT NULL
-        )
-    ''')
-
-    # Tabel Kegiatan (Diubah: pimpinan -> id_pimpinan)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS Kegiatan (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            tanggal_kegiatan TEXT NOT NULL,
-            waktu_mulai_kegiatan TEXT NOT NULL,
-            waktu_akhir_kegiatan TEXT NOT NULL,
-            uraian_kegiatan TEXT,
-            tempat_ruangan TEXT,
-            id_pimpinan INTEGER, -- Diubah dari TEXT ke INTEGER
-            daftar_peserta TEXT,
-            tanggal_input TEXT,
-            waktu_input TEXT,
-            narahubung TEXT,
-            kontak_person TEXT,
-            FOREIGN KEY (id_pimpinan) REFERENCES Pimpinan(id) ON DELETE SET NULL
-        )
-    ''')
-    conn.commit()
-    conn.close()
-
-# --- Fungsi Manajemen Pimpinan (BARU) ---
-def get_all_pimpinan():
-    conn = connect_db()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM Pimpinan ORDER BY nama")
-    pimpinan_list = cursor.fetchall()
-    conn.close()
-    return pimpinan_list
-
-def add_pimpinan(nama_pimpinan):
-    conn = connect_db()
-    cursor = conn.cursor()
-    try:
-        # Generate random hex color
-        color = '#%06x' % random.randint(0, 0xFFFFFF)
-        cursor.execute("INSERT INTO Pimpinan (nama, warna) VALUES (?, ?)", (nama_pimpinan, color))
-        conn.commit()
-        conn.close()
-        return True, "Pimpinan berhasil ditambahkan!", cursor.lastrowid
-    except sqlite3.IntegrityError:
-        conn.close()
-        return False, "Nama pimpinan sudah ada.", None
-    except sqlite3.Error as e:
-        conn.close()
-        return False, f"Error saat menambahkan pimpinan: {e}", None
-
-def delete_pimpinan(pimpinan_id):
-    conn = connect_db()
-    cursor = conn.cursor()
-    try:
-        # Check if there are any activities associated with this pimpinan
-        cursor.execute("SELECT COUNT(*) FROM Kegiatan WHERE id_pimpinan = ?", (pimpinan_id,))
-        if cursor.fetchone()[0] > 0:
-            # If activities are found, set id_pimpinan to NULL before deleting pimpinan
-            cursor.execute("UPDATE Kegiatan SET id_pimpinan = NULL WHERE id_pimpinan = ?", (pimpinan_id,))
-            conn.commit() # Commit the update before deleting pimpinan
-            
-        cursor.execute("DELETE FROM Pimpinan WHERE id = ?", (pimpinan_id,))
-        conn.commit()
-        conn.close()
-        return True, "Pimpinan berhasil dihapus!"
-    except sqlite3.Error as e:
-        conn.close()
-        return False, f"Error saat menghapus pimpinan: {e}"
-
-def get_pimpinan_by_id(pimpinan_id):
-    conn = connect_db()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM Pimpinan WHERE id = ?", (pimpinan_id,))
-    pimpinan = cursor.fetchone()
-    conn.close()
-    return pimpinan
-
-def update_pimpinan_color(pimpinan_id, new_color):
-    conn = connect_db()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("UPDATE Pimpinan SET warna = ? WHERE id = ?", (new_color, pimpinan_id))
-        conn.commit()
-        conn.close()
-        return True, "Warna pimpinan berhasil diperbarui!"
-    except sqlite3.Error as e:
-        conn.close()
-        return False, f"Error saat memperbarui warna pimpinan: {e}"
-
-# --- Fungsi Bantu Validasi Waktu ---
-def is_time_overlap(start_time1_str, end_time1_str, start_time2_str, end_time2_str):
-    fmt = '%H:%M'
-    start1 = datetime.strptime(start_time1_str, fmt).time()
-    end1 = datetime.strptime(end_time1_str, fmt).time()
-    start2 = datetime.strptime(start_time2_str, fmt).time()
-    end2 = datetime.strptime(end_time2_str, fmt).time()
-
-    # Handle cases where end time is on the next day (e.g., 23:00 - 01:00)
-    # For simplicity, we assume activities don't span across midnight in the current context.
-    # If they do, the logic here needs to be more complex, possibly involving datetime objects with dates.
-    # For now, if end time is before start time, treat it as end of day for overlap check
-    if end1 < start1:
-        end1 = datetime.strptime("23:59", fmt).time() # Treat as end of day for overlap check
-    if end2 < start2:
-        end2 = datetime.strptime("23:59", fmt).time()
-
-    return start1 < end2 and start2 < end1
-
-def validate_activity_overlap(activity_date, new_start_time, new_end_time, id_pimpinan, new_participants_raw, current_activity_id=None):
-    conn = connect_db()
-    cursor = conn.cursor()
-
-    # Get pimpinan name for validation message (if needed)
-    pimpinan_name = ""
-    if id_pimpinan: # Ensure id_pimpinan is not None/empty
-        pimpinan_row = get_pimpinan_by_id(id_pimpinan)
-        if pimpinan_row:
-            pimpinan_name = pimpinan_row['nama']
-    
-    new_participants = set(p.strip().lower() for p in new_participants_raw.split(',') if p.strip())
-
-    # Ambil semua kegiatan pada tanggal yang sama
-    query = "SELECT id, waktu_mulai_kegiatan, waktu_akhir_kegiatan, id_pimpinan, daftar_peserta FROM Kegiatan WHERE tanggal_kegiatan = ?"
-    params = [activity_date]
-    
-    if current_activity_id is not None:
-        query += " AND id != ?" # Kecualikan kegiatan yang sedang diedit
-        params.append(current_activity_id)
-
-    cursor.execute(query, params)
-    clashing_activities = cursor.fetchall()
-    conn.close()
-
-    for activity_row in clashing_activities:
-        existing_id = activity_row['id']
-        existing_start_time = activity_row['waktu_mulai_kegiatan']
-        existing_end_time = activity_row['waktu_akhir_kegiatan']
-        existing_id_pimpinan = activity_row['id_pimpinan']
-        existing_participants_raw = activity_row['daftar_peserta']
-
-        existing_participants = set(p.strip().lower() for p in existing_participants_raw.split(',') if p.strip())
-
-        # Check for time overlap
-        if is_time_overlap(new_start_time, new_end_time, existing_start_time, existing_end_time):
-            # Check for pimpinan overlap (if same pimpinan)
-            if id_pimpinan is not None and existing_id_pimpinan == id_pimpinan:
-                return False, f"Pimpinan '{pimpinan_name}' sudah terjadwal pada waktu tersebut ({existing_start_time}-{existing_end_time})."
-            
-            # Check for participants overlap (if any common participants)
-            if new_participants and not new_participants.isdisjoint(existing_participants):
-                return False, f"Beberapa peserta sudah terjadwal pada waktu tersebut ({existing_start_time}-{existing_end_time})."
-    
-    return True, "" # No overlap found
-
-def add_activity(data):
-    conn = connect_db()
-    cursor = conn.cursor()
-
-    # Validasi tumpang tindih sebelum insert
-    is_valid, message = validate_activity_overlap(
-        data['tanggal_kegiatan'],
-        data['waktu_mulai_kegiatan'],
-        data['waktu_akhir_kegiatan'],
-        data.get('id_pimpinan'),
-        data['daftar_peserta']
-    )
-    if not is_valid:
-        conn.close()
-        return False, message
-
-    try:
-        cursor.execute('''
-            INSERT INTO Kegiatan (
-                tanggal_kegiatan, waktu_mulai_kegiatan, waktu_akhir_kegiatan, uraian_kegiatan,
-                tempat_ruangan, id_pimpinan, daftar_peserta, tanggal_input, waktu_input,
-                narahubung, kontak_person
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            data['tanggal_kegiatan'], data['waktu_mulai_kegiatan'], data['waktu_akhir_kegiatan'],
-            data['uraian_kegiatan'], data['tempat_ruangan'], data.get('id_pimpinan'),
-            data['daftar_peserta'], data['tanggal_input'], data['waktu_input'],
-            data['narahubung'], data['kontak_person']
-        ))
-        conn.commit()
-        conn.close()
-        return True, "Kegiatan berhasil ditambahkan!"
-    except sqlite3.Error as e:
-        conn.close()
-        return False, f"Error saat menambahkan kegiatan: {e}"
-
-def get_activity_by_id(activity_id):
-    conn = connect_db()
-    cursor = conn.cursor()
-    # Join with Pimpinan table to get pimpinan name and color
-    cursor.execute('''
-        SELECT
-            K.id, K.tanggal_kegiatan, K.waktu_mulai_kegiatan, K.waktu_akhir_kegiatan,
-            K.uraian_kegiatan, K.tempat_ruangan, K.id_pimpinan,
-            K.daftar_peserta, K.tanggal_input, K.waktu_input, K.narahubung, K.kontak_person,
-            P.nama AS pimpinan_nama, P.warna AS pimpinan_warna
-        FROM Kegiatan AS K
-        LEFT JOIN Pimpinan AS P ON K.id_pimpinan = P.id
-        WHERE K.id = ?
-    ''', (activity_id,))
-    activity = cursor.fetchone()
-    conn.close()
-    return activity
-
-def update_activity(activity_id, data):
-    conn = connect_db()
-    cursor = conn.cursor()
-
-    # Validasi tumpang tindih sebelum update
-    is_valid, message = validate_activity_overlap(
-        data['tanggal_kegiatan'],
-        data['waktu_mulai_kegiatan'],
-        data['waktu_akhir_kegiatan'],
-        data.get('id_pimpinan'),
-        data['daftar_peserta'],
-        current_activity_id=activity_id
-    )
-    if not is_valid:
-        conn.close()
-        return False, message
-
-    try:
-        cursor.execute('''
-            UPDATE Kegiatan SET
-                tanggal_kegiatan = ?,
-                waktu_mulai_kegiatan = ?,
-                waktu_akhir_kegiatan = ?,
-                uraian_kegiatan = ?,
-                tempat_ruangan = ?,
-                id_pimpinan = ?,
-                daftar_peserta = ?,
-                narahubung = ?,
-                kontak_person = ?
-            WHERE id = ?
-        ''', (
-            data['tanggal_kegiatan'], data['waktu_mulai_kegiatan'], data['waktu_akhir_kegiatan'],
-            data['uraian_kegiatan'], data['tempat_ruangan'], data.get('id_pimpinan'),
-            data['daftar_peserta'], data['narahubung'], data['kontak_person'],
-            activity_id
-        ))
-        conn.commit()
-        conn.close()
-        return True, "Kegiatan berhasil diperbarui!"
-    except sqlite3.Error as e:
-        conn.close()
-        return False, f"Error saat memperbarui kegiatan: {e}"
-
-# Fungsi untuk mengambil semua kegiatan, ditambah informasi pimpinan
-def get_all_activities(id_pimpinan_filter=None):
-    conn = connect_db()
-    cursor = conn.cursor()
-    
-    query = '''
-        SELECT
-            K.id, K.tanggal_kegiatan, K.waktu_mulai_kegiatan, K.waktu_akhir_kegiatan,
-            K.uraian_kegiatan, K.tempat_ruangan, P.nama AS pimpinan_nama,
-            K.daftar_peserta, K.tanggal_input, K.waktu_input, K.narahubung, K.kontak_person,
-            P.id AS id_pimpinan, P.warna AS pimpinan_warna
-        FROM Kegiatan AS K
-        LEFT JOIN Pimpinan AS P ON K.id_pimpinan = P.id
-    '''
-    params = []
-
-    if id_pimpinan_filter is not None:
-        query += " WHERE K.id_pimpinan = ?"
-        params.append(id_pimpinan_filter)
-
-    query += " ORDER BY K.tanggal_kegiatan, K.waktu_mulai_kegiatan"
-    
-    # DEBUG PRINT: Cetak query dan parameter
-    print(f"DEBUG DB: Executing query: {query}")
-    print(f"DEBUG DB: With parameters: {params}")
-
-    cursor.execute(query, params)
-    activities = cursor.fetchall() # Returns Row objects (dictionary-like)
-    conn.close()
-    return activities
-
-def delete_activity(activity_id):
-    conn = connect_db()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("DELETE FROM Kegiatan WHERE id = ?", (activity_id,))
-        conn.commit()
-        conn.close()
-        return True, "Kegiatan berhasil dihapus."
-    except sqlite3.Error as e:
-        conn.close()
-        return False, f"Error saat menghapus kegiatan: {e}"
-
-if __name__ == '__main__':
-    create_table()
-    print("Database and tables 'Kegiatan' and 'Pimpinan' created/checked.")
-    # Add some dummy pimpinan for testing
-    add_pimpinan("Gubernur")
-    add_pimpinan("Sekretaris")
+import heapq
+import sqlite3
+import threading
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+import random # Untuk warna acak awal
+import secrets
+
+from instrumentation import instrumented, record_connection_open
+from conflict_index import (
+    DayConflictIndex, parse_participants, split_participants, room_name_key, room_conflict_key,
+    time_range_to_minutes, minutes_to_time, free_slots
+)
+from recurrence import RecurrenceRule, occurrence_id, parse_occurrence_id, parse_weekdays, format_weekdays
+
+DATABASE_NAME = "schedule.db"
+
+# --- Manajemen Koneksi ---
+# Satu koneksi jangka panjang per thread (thread GUI, thread notifikasi, dst.),
+# dibuka sekali lalu dipakai ulang oleh semua fungsi di modul ini.
+BUSY_TIMEOUT_MS = 5000
+CACHE_SIZE_KB = 20000 # ~20 MB page cache per koneksi
+MMAP_SIZE_BYTES = 256 * 1024 * 1024
+
+_thread_local = threading.local()
+_open_connections = set() # Semua koneksi yang terbuka, untuk close_all_connections()
+_open_connections_lock = threading.Lock()
+
+def _open_connection(database_name):
+    # isolation_level=None: transaksi dikelola eksplisit lewat transaction()
+    conn = sqlite3.connect(database_name, timeout=BUSY_TIMEOUT_MS / 1000,
+                           isolation_level=None, check_same_thread=False)
+    record_connection_open(database_name)
+    # Configure row_factory to return rows as dictionaries for easier column access
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA synchronous = NORMAL") # Aman dengan WAL, tanpa fsync di setiap commit
+    conn.execute(f"PRAGMA cache_size = -{CACHE_SIZE_KB}")
+    conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE_BYTES}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    return conn
+
+def connect_db():
+    # Kembalikan koneksi milik thread ini; buka baru jika belum ada
+    # atau jika DATABASE_NAME sudah diganti sejak koneksi dibuka.
+    conn = getattr(_thread_local, 'conn', None)
+    if conn is not None and _thread_local.database_name == DATABASE_NAME:
+        return conn
+    if conn is not None:
+        close_db()
+
+    conn = _open_connection(DATABASE_NAME)
+    _thread_local.conn = conn
+    _thread_local.database_name = DATABASE_NAME
+    _thread_local.transaction_depth = 0
+    with _open_connections_lock:
+        _open_connections.add(conn)
+    return conn
+
+def close_db():
+    # Tutup koneksi milik thread ini (mis. saat thread selesai)
+    conn = getattr(_thread_local, 'conn', None)
+    if conn is None:
+        return
+    with _open_connections_lock:
+        _open_connections.discard(conn)
+    conn.close()
+    _thread_local.conn = None
+    _thread_local.transaction_depth = 0
+
+def close_all_connections():
+    # Dipanggil saat aplikasi ditutup
+    with _open_connections_lock:
+        connections = list(_open_connections)
+        _open_connections.clear()
+    for conn in connections:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+    _thread_local.conn = None
+
+@contextmanager
+def transaction():
+    # Context manager transaksi: commit jika blok selesai, rollback jika terjadi exception.
+    # Transaksi bersarang memakai SAVEPOINT sehingga kegagalan di dalam (mis. satu
+    # add_activity di tengah impor massal) tidak membatalkan transaksi luar.
+    conn = connect_db()
+    depth = _thread_local.transaction_depth
+    savepoint = f"sp_{depth}"
+    if depth == 0:
+        conn.execute("BEGIN IMMEDIATE")
+    else:
+        conn.execute(f"SAVEPOINT {savepoint}")
+    _thread_local.transaction_depth = depth + 1
+    try:
+        yield conn
+    except BaseException:
+        if depth == 0:
+            conn.execute("ROLLBACK")
+        else:
+            conn.execute(f"ROLLBACK TO {savepoint}")
+            conn.execute(f"RELEASE {savepoint}")
+        clear_conflict_indexes() # Index mungkin sudah ditambal dengan data yang dibatalkan
+        raise
+    else:
+        if depth == 0:
+            conn.execute("COMMIT")
+        else:
+            conn.execute(f"RELEASE {savepoint}")
+    finally:
+        _thread_local.transaction_depth = depth
+
+# --- Cache Index Bentrok per Tanggal ---
+# Disimpan per thread (mengikuti koneksinya). Penulisan dari koneksi lain/proses lain
+# terdeteksi lewat PRAGMA data_version; penulisan sendiri menambal/menghapus index.
+CONFLICT_INDEX_CACHE_SIZE = 64
+
+def _get_conflict_index_cache():
+    data_version = get_data_version()
+    cache = getattr(_thread_local, 'conflict_indexes', None)
+    if cache is None or _thread_local.conflict_data_version != data_version:
+        cache = OrderedDict()
+        _thread_local.conflict_indexes = cache
+        _thread_local.conflict_data_version = data_version
+    return cache
+
+def get_data_version():
+    # Berubah setiap kali koneksi lain (thread/proses lain) melakukan commit
+    return connect_db().execute("PRAGMA data_version").fetchone()[0]
+
+def clear_conflict_indexes():
+    _thread_local.conflict_indexes = None
+
+def invalidate_conflict_index(*activity_dates):
+    cache = getattr(_thread_local, 'conflict_indexes', None)
+    if cache:
+        for activity_date in activity_dates:
+            cache.pop(activity_date, None)
+
+SQLITE_PARAM_CHUNK = 500 # Batas jumlah parameter per klausa IN (...)
+
+@instrumented
+def _build_conflict_indexes(conn, activity_dates):
+    # Bangun DayConflictIndex untuk beberapa tanggal sekaligus (dua query per potongan tanggal)
+    activity_dates = sorted(set(activity_dates))
+    rows_by_date = {activity_date: [] for activity_date in activity_dates}
+    participants_by_activity = {}
+    for i in range(0, len(activity_dates), SQLITE_PARAM_CHUNK):
+        chunk = activity_dates[i:i + SQLITE_PARAM_CHUNK]
+        placeholders = ", ".join("?" for _ in chunk)
+        # Ruangan ikut dalam query yang sama (satu lookup primary key per baris)
+        for row in conn.execute(f'''
+            SELECT K.id, K.tanggal_kegiatan, K.waktu_mulai_kegiatan, K.waktu_akhir_kegiatan, K.id_pimpinan,
+                   R.nama_kunci AS ruangan_kunci
+            FROM Kegiatan AS K
+            LEFT JOIN Ruangan AS R ON R.id = K.id_ruangan
+            WHERE K.tanggal_kegiatan IN ({placeholders})
+        ''', chunk):
+            rows_by_date[row['tanggal_kegiatan']].append(row)
+        # Peserta diambil dari tabel ternormalisasi, tanpa memecah string daftar_peserta
+        for row in conn.execute(f'''
+            SELECT KP.kegiatan_id, P.nama_kunci
+            FROM Kegiatan_Peserta AS KP
+            JOIN Peserta AS P ON P.id = KP.peserta_id
+            WHERE KP.kegiatan_id IN (SELECT id FROM Kegiatan WHERE tanggal_kegiatan IN ({placeholders}))
+        ''', chunk):
+            participants_by_activity.setdefault(row['kegiatan_id'], set()).add(row['nama_kunci'])
+
+    indexes = {
+        activity_date: DayConflictIndex.from_rows(activity_date, rows, participants_by_activity)
+        for activity_date, rows in rows_by_date.items()
+    }
+    if not activity_dates:
+        return indexes
+
+    # Kejadian kegiatan berulang dihitung dari aturannya, hanya untuk tanggal yang diminta
+    days = []
+    for activity_date in activity_dates:
+        day = _parse_day(activity_date)
+        if day is not None:
+            days.append((activity_date, day))
+    for series, rule, overrides in _load_series(conn, activity_dates[0], activity_dates[-1]):
+        for activity_date, day in days:
+            if not rule.occurs_on(day):
+                continue
+            override = overrides.get(activity_date)
+            if override is not None and override['dibatalkan']:
+                continue
+            occurrence = _occurrence_row(series, day, override)
+            try:
+                start, end = time_range_to_minutes(occurrence['waktu_mulai_kegiatan'], occurrence['waktu_akhir_kegiatan'])
+            except ValueError:
+                continue
+            indexes[activity_date].add(occurrence['id'], start, end, occurrence['id_pimpinan'],
+                                       parse_participants(occurrence['daftar_peserta']),
+                                       room_conflict_key(occurrence['tempat_ruangan']))
+    return indexes
+
+def get_conflict_index(activity_date):
+    cache = _get_conflict_index_cache()
+    index = cache.get(activity_date)
+    if index is not None:
+        cache.move_to_end(activity_date)
+        return index
+
+    index = _build_conflict_indexes(connect_db(), [activity_date])[activity_date]
+    cache[activity_date] = index
+    if len(cache) > CONFLICT_INDEX_CACHE_SIZE:
+        cache.popitem(last=False)
+    return index
+
+def get_conflict_indexes_snapshot(activity_dates):
+    # Salinan index bentrok untuk banyak tanggal (mis. impor massal). Tidak disimpan di cache,
+    # sehingga pemanggil bebas menambahkan kegiatan sementara ke dalamnya.
+    return _build_conflict_indexes(connect_db(), activity_dates)
+
+@instrumented
+def create_table():
+    conn = connect_db()
+    cursor = conn.cursor()
+
+    # Tabel Pimpinan (BARU)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS Pimpinan (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nama TEXT NOT NULL UNIQUE,
+            warna TEXT NOT NULL
+        )
+    ''')
+
+    # Tabel Kegiatan (Diubah: pimpinan -> id_pimpinan)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS Kegiatan (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            tanggal_kegiatan TEXT NOT NULL,
+            waktu_mulai_kegiatan TEXT NOT NULL,
+            waktu_akhir_kegiatan TEXT NOT NULL,
+            uraian_kegiatan TEXT,
+            tempat_ruangan TEXT,
+            id_pimpinan INTEGER, -- Diubah dari TEXT ke INTEGER
+            daftar_peserta TEXT,
+            tanggal_input TEXT,
+            waktu_input TEXT,
+            narahubung TEXT,
+            kontak_person TEXT,
+            id_ruangan INTEGER, -- Diisi dari tempat_ruangan; tempat_ruangan tetap dipakai untuk tampilan
+            kunci_sumber TEXT, -- Identitas di sumber impor (mis. 'ics:<UID>'); NULL = dibuat di aplikasi
+            sidik_jari TEXT, -- Hash isi baris sumber saat terakhir diimpor (impor ulang Excel)
+            FOREIGN KEY (id_pimpinan) REFERENCES Pimpinan(id) ON DELETE SET NULL,
+            FOREIGN KEY (id_ruangan) REFERENCES Ruangan(id) ON DELETE SET NULL
+        )
+    ''')
+
+    # Index komposit untuk query berdasarkan tanggal (tampilan harian/bulanan, validasi)
+    # dan berdasarkan pimpinan + tanggal (filter pimpinan)
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_kegiatan_tanggal_waktu
+        ON Kegiatan (tanggal_kegiatan, waktu_mulai_kegiatan)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_kegiatan_pimpinan_tanggal
+        ON Kegiatan (id_pimpinan, tanggal_kegiatan)
+    ''')
+
+    # Tabel Peserta (nama unik, dibandingkan tanpa peka huruf besar/kecil lewat nama_kunci)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS Peserta (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nama TEXT NOT NULL,
+            nama_kunci TEXT NOT NULL UNIQUE
+        )
+    ''')
+
+    # Tabel relasi Kegiatan <-> Peserta. tanggal dan menit mulai/akhir disalin dari Kegiatan
+    # agar pengecekan "peserta ini sibuk jam sekian?" cukup memakai satu index.
+    # daftar_peserta di Kegiatan tetap menjadi sumber data untuk tampilan.
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS Kegiatan_Peserta (
+            kegiatan_id INTEGER NOT NULL,
+            peserta_id INTEGER NOT NULL,
+            tanggal TEXT NOT NULL,
+            menit_mulai INTEGER,
+            menit_akhir INTEGER,
+            PRIMARY KEY (kegiatan_id, peserta_id),
+            FOREIGN KEY (kegiatan_id) REFERENCES Kegiatan(id) ON DELETE CASCADE,
+            FOREIGN KEY (peserta_id) REFERENCES Peserta(id) ON DELETE CASCADE
+        )
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_kegiatan_peserta_tanggal
+        ON Kegiatan_Peserta (peserta_id, tanggal, menit_mulai)
+    ''')
+
+    # Tabel Kegiatan Berulang: satu baris per seri (aturan + data kegiatan), kejadiannya
+    # dihitung saat dibutuhkan (lihat recurrence.py), tidak disimpan per tanggal.
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS Kegiatan_Berulang (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            tanggal_mulai TEXT NOT NULL,
+            tanggal_akhir TEXT, -- NULL = tanpa batas
+            frekuensi TEXT NOT NULL, -- 'harian', 'mingguan' atau 'bulanan'
+            selang INTEGER NOT NULL DEFAULT 1, -- setiap N hari/minggu/bulan
+            hari_minggu TEXT, -- mingguan: '0,2,4' (0 = Senin)
+            waktu_mulai_kegiatan TEXT NOT NULL,
+            waktu_akhir_kegiatan TEXT NOT NULL,
+            uraian_kegiatan TEXT,
+            tempat_ruangan TEXT,
+            id_pimpinan INTEGER,
+            daftar_peserta TEXT,
+            tanggal_input TEXT,
+            waktu_input TEXT,
+            narahubung TEXT,
+            kontak_person TEXT,
+            FOREIGN KEY (id_pimpinan) REFERENCES Pimpinan(id) ON DELETE SET NULL
+        )
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_kegiatan_berulang_rentang
+        ON Kegiatan_Berulang (tanggal_mulai, tanggal_akhir)
+    ''')
+
+    # Pengecualian per kejadian: dibatalkan, atau override kolom (NULL = ikut seri)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS Kegiatan_Berulang_Pengecualian (
+            seri_id INTEGER NOT NULL,
+            tanggal TEXT NOT NULL,
+            dibatalkan INTEGER NOT NULL DEFAULT 0,
+            waktu_mulai_kegiatan TEXT,
+            waktu_akhir_kegiatan TEXT,
+            uraian_kegiatan TEXT,
+            tempat_ruangan TEXT,
+            daftar_peserta TEXT,
+            narahubung TEXT,
+            kontak_person TEXT,
+            PRIMARY KEY (seri_id, tanggal),
+            FOREIGN KEY (seri_id) REFERENCES Kegiatan_Berulang(id) ON DELETE CASCADE
+        )
+    ''')
+
+    # Tabel Ruangan (nama unik lewat nama_kunci seperti Peserta). Dibuat otomatis dari tempat_ruangan;
+    # kapasitas diisi lewat update_ruangan_capacity.
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS Ruangan (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nama TEXT NOT NULL,
+            nama_kunci TEXT NOT NULL UNIQUE,
+            kapasitas INTEGER -- NULL = belum diketahui
+        )
+    ''')
+
+    # Informasi database (kunci -> nilai). 'kalender_id' acak per database, dipakai di UID .ics agar
+    # UID kegiatan dari database lain (id sama, isi berbeda) tidak tertukar saat diimpor.
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS Info_Database (
+            kunci TEXT PRIMARY KEY,
+            nilai TEXT NOT NULL
+        )
+    ''')
+    cursor.execute("INSERT OR IGNORE INTO Info_Database (kunci, nilai) VALUES ('kalender_id', ?)",
+                   (secrets.token_hex(4),))
+
+    # Nomor revisi jadwal per pimpinan (0 = kegiatan tanpa pimpinan), dinaikkan oleh trigger di bawah
+    # setiap kali kegiatan, seri berulang atau nama pimpinan berubah. Dipakai ics_calendar untuk
+    # menulis ulang hanya feed pimpinan yang berubah sejak ekspor terakhir.
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS Revisi_Jadwal (
+            id_pimpinan INTEGER PRIMARY KEY,
+            revisi INTEGER NOT NULL
+        )
+    ''')
+    for trigger_name, event, pimpinan_expr in REVISION_TRIGGERS:
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {trigger_name} AFTER {event}
+            BEGIN
+                INSERT INTO Revisi_Jadwal (id_pimpinan, revisi) VALUES (COALESCE(({pimpinan_expr}), 0), 1)
+                ON CONFLICT (id_pimpinan) DO UPDATE SET revisi = revisi + 1;
+            END
+        ''')
+
+    migrate_schema()
+
+    # Dibuat setelah migrasi: database lama baru punya kolom id_ruangan setelah versi 2.
+    # Index untuk okupansi/jadwal per ruangan; waktu 'HH:MM' terurut sama seperti menit.
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_kegiatan_ruangan_tanggal
+        ON Kegiatan (id_ruangan, tanggal_kegiatan, waktu_mulai_kegiatan)
+    ''')
+    cursor.execute('''
+        CREATE VIEW IF NOT EXISTS Okupansi_Ruangan AS
+        SELECT
+            R.id AS id_ruangan, R.nama AS ruangan_nama, R.kapasitas,
+            K.id AS kegiatan_id, K.tanggal_kegiatan, K.waktu_mulai_kegiatan, K.waktu_akhir_kegiatan,
+            K.uraian_kegiatan, K.id_pimpinan,
+            (SELECT COUNT(*) FROM Kegiatan_Peserta AS KP WHERE KP.kegiatan_id = K.id) AS jumlah_peserta
+        FROM Kegiatan AS K
+        JOIN Ruangan AS R ON R.id = K.id_ruangan
+    ''')
+    # Kolom kunci_sumber ada sejak versi 3; hanya baris hasil impor yang punya kunci
+    cursor.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_kegiatan_kunci_sumber
+        ON Kegiatan (kunci_sumber) WHERE kunci_sumber IS NOT NULL
+    ''')
+
+# Trigger revisi: (nama, kejadian, ekspresi id pimpinan yang feed-nya berubah).
+# UPDATE dicatat untuk pimpinan lama dan baru, karena kegiatan bisa dipindah ke pimpinan lain.
+_SERIES_PIMPINAN = "SELECT id_pimpinan FROM Kegiatan_Berulang WHERE id = {row}.seri_id"
+REVISION_TRIGGERS = [
+    ('trg_revisi_kegiatan_insert', "INSERT ON Kegiatan FOR EACH ROW", "NEW.id_pimpinan"),
+    ('trg_revisi_kegiatan_update_lama', "UPDATE ON Kegiatan FOR EACH ROW", "OLD.id_pimpinan"),
+    ('trg_revisi_kegiatan_update_baru', "UPDATE ON Kegiatan FOR EACH ROW WHEN NEW.id_pimpinan IS NOT OLD.id_pimpinan",
+     "NEW.id_pimpinan"),
+    ('trg_revisi_kegiatan_delete', "DELETE ON Kegiatan FOR EACH ROW", "OLD.id_pimpinan"),
+    ('trg_revisi_seri_insert', "INSERT ON Kegiatan_Berulang FOR EACH ROW", "NEW.id_pimpinan"),
+    ('trg_revisi_seri_update_lama', "UPDATE ON Kegiatan_Berulang FOR EACH ROW", "OLD.id_pimpinan"),
+    ('trg_revisi_seri_update_baru', "UPDATE ON Kegiatan_Berulang FOR EACH ROW WHEN NEW.id_pimpinan IS NOT OLD.id_pimpinan",
+     "NEW.id_pimpinan"),
+    ('trg_revisi_seri_delete', "DELETE ON Kegiatan_Berulang FOR EACH ROW", "OLD.id_pimpinan"),
+    ('trg_revisi_pengecualian_insert', "INSERT ON Kegiatan_Berulang_Pengecualian FOR EACH ROW",
+     _SERIES_PIMPINAN.format(row="NEW")),
+    ('trg_revisi_pengecualian_update', "UPDATE ON Kegiatan_Berulang_Pengecualian FOR EACH ROW",
+     _SERIES_PIMPINAN.format(row="NEW")),
+    ('trg_revisi_pengecualian_delete', "DELETE ON Kegiatan_Berulang_Pengecualian FOR EACH ROW",
+     _SERIES_PIMPINAN.format(row="OLD")),
+    ('trg_revisi_pimpinan_nama', "UPDATE OF nama ON Pimpinan FOR EACH ROW", "NEW.id"),
+    ('trg_revisi_pimpinan_delete', "DELETE ON Pimpinan FOR EACH ROW", "OLD.id"),
+]
+
+# --- Migrasi Skema ---
+# Versi skema disimpan di PRAGMA user_version; setiap langkah dijalankan sekali.
+SCHEMA_VERSION = 4
+
+def migrate_schema():
+    conn = connect_db()
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version >= SCHEMA_VERSION:
+        return
+
+    with transaction() as conn:
+        if version < 1:
+            _backfill_participants(conn)
+        if version < 2:
+            _add_room_column(conn)
+            _backfill_rooms(conn)
+        if version < 3:
+            _add_source_key_column(conn)
+        if version < 4:
+            _add_fingerprint_column(conn)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    clear_conflict_indexes()
+
+def _backfill_participants(conn):
+    # Isi Peserta/Kegiatan_Peserta dari kolom daftar_peserta kegiatan yang sudah ada
+    peserta_ids = {}
+    rows = conn.execute(
+        "SELECT id, tanggal_kegiatan, waktu_mulai_kegiatan, waktu_akhir_kegiatan, daftar_peserta FROM Kegiatan"
+    ).fetchall()
+    for row in rows:
+        _sync_activity_participants(conn, row['id'], row['tanggal_kegiatan'], row['waktu_mulai_kegiatan'],
+                                    row['waktu_akhir_kegiatan'], row['daftar_peserta'], peserta_ids)
+
+def _add_room_column(conn):
+    columns = {row['name'] for row in conn.execute("PRAGMA table_info(Kegiatan)")}
+    if 'id_ruangan' not in columns:
+        conn.execute("ALTER TABLE Kegiatan ADD COLUMN id_ruangan INTEGER REFERENCES Ruangan(id) ON DELETE SET NULL")
+
+def _add_source_key_column(conn):
+    columns = {row['name'] for row in conn.execute("PRAGMA table_info(Kegiatan)")}
+    if 'kunci_sumber' not in columns:
+        conn.execute("ALTER TABLE Kegiatan ADD COLUMN kunci_sumber TEXT")
+
+def _add_fingerprint_column(conn):
+    columns = {row['name'] for row in conn.execute("PRAGMA table_info(Kegiatan)")}
+    if 'sidik_jari' not in columns:
+        conn.execute("ALTER TABLE Kegiatan ADD COLUMN sidik_jari TEXT")
+
+def _backfill_rooms(conn):
+    # Normalisasi tempat_ruangan (teks bebas) ke tabel Ruangan: 'Aula  utama' dan 'aula Utama' jadi satu ruangan
+    ruangan_ids = {}
+    updates = []
+    for row in conn.execute("SELECT id, tempat_ruangan FROM Kegiatan WHERE tempat_ruangan IS NOT NULL").fetchall():
+        room_id = _get_or_create_ruangan_id(conn, row['tempat_ruangan'], ruangan_ids)
+        if room_id is not None:
+            updates.append((room_id, row['id']))
+    conn.executemany("UPDATE Kegiatan SET id_ruangan = ? WHERE id = ?", updates)
+
+# --- Revisi Jadwal ---
+def get_calendar_id():
+    return connect_db().execute("SELECT nilai FROM Info_Database WHERE kunci = 'kalender_id'").fetchone()['nilai']
+
+def get_schedule_revisions():
+    # {id_pimpinan: revisi}; 0 = kegiatan tanpa pimpinan. Pimpinan yang belum pernah berubah tidak ada di sini
+    return {row['id_pimpinan']: row['revisi'] for row in connect_db().execute("SELECT * FROM Revisi_Jadwal")}
+
+# --- Fungsi Ruangan ---
+def _get_or_create_ruangan_id(conn, room_raw, ruangan_ids=None):
+    # Kembalikan id Ruangan untuk teks tempat_ruangan (dibuat jika belum ada), None jika kosong
+    # ruangan_ids: cache opsional {nama_kunci: id} untuk operasi massal
+    key = room_name_key(room_raw)
+    if key is None:
+        return None
+    if ruangan_ids is not None and key in ruangan_ids:
+        return ruangan_ids[key]
+    row = conn.execute("SELECT id FROM Ruangan WHERE nama_kunci = ?", (key,)).fetchone()
+    if row is not None:
+        room_id = row['id']
+    else:
+        room_id = conn.execute("INSERT INTO Ruangan (nama, nama_kunci) VALUES (?, ?)",
+                               (" ".join(room_raw.split()), key)).lastrowid
+    if ruangan_ids is not None:
+        ruangan_ids[key] = room_id
+    return room_id
+
+@instrumented
+def get_all_ruangan():
+    return connect_db().execute("SELECT * FROM Ruangan ORDER BY nama").fetchall()
+
+@instrumented
+def update_ruangan_capacity(room_id, capacity):
+    try:
+        with transaction() as conn:
+            conn.execute("UPDATE Ruangan SET kapasitas = ? WHERE id = ?", (capacity, room_id))
+        return True, "Kapasitas ruangan berhasil diperbarui!"
+    except sqlite3.Error as e:
+        return False, f"Error saat memperbarui kapasitas ruangan: {e}"
+
+@instrumented
+def get_room_occupancy(start_date, end_date, room_ids=None):
+    # Pemakaian ruangan dalam [start_date, end_date] dari view Okupansi_Ruangan (memakai
+    # idx_kegiatan_ruangan_tanggal), ditambah kejadian kegiatan berulang. Terurut per ruangan lalu waktu.
+    conn = connect_db()
+    query = "SELECT * FROM Okupansi_Ruangan WHERE tanggal_kegiatan BETWEEN ? AND ?"
+    params = [start_date, end_date]
+    if room_ids is not None:
+        room_ids = list(room_ids)
+        if not room_ids:
+            return []
+        query += f" AND id_ruangan IN ({', '.join('?' for _ in room_ids)})"
+        params.extend(room_ids)
+    rows = [dict(row) for row in conn.execute(query, params)]
+
+    rooms_by_key = {row['nama_kunci']: row for row in conn.execute("SELECT * FROM Ruangan")}
+    for occurrence in _iter_occurrences_in_range(conn, start_date, end_date):
+        room = rooms_by_key.get(room_name_key(occurrence['tempat_ruangan']))
+        if room is None or (room_ids is not None and room['id'] not in room_ids):
+            continue
+        rows.append({
+            'id_ruangan': room['id'], 'ruangan_nama': room['nama'], 'kapasitas': room['kapasitas'],
+            'kegiatan_id': occurrence['id'], 'tanggal_kegiatan': occurrence['tanggal_kegiatan'],
+            'waktu_mulai_kegiatan': occurrence['waktu_mulai_kegiatan'],
+            'waktu_akhir_kegiatan': occurrence['waktu_akhir_kegiatan'],
+            'uraian_kegiatan': occurrence['uraian_kegiatan'], 'id_pimpinan': occurrence['id_pimpinan'],
+            'jumlah_peserta': len(parse_participants(occurrence['daftar_peserta'])),
+        })
+    rows.sort(key=lambda row: (row['ruangan_nama'].lower(), row['tanggal_kegiatan'], row['waktu_mulai_kegiatan']))
+    return rows
+
+# --- Fungsi Peserta ---
+def _get_or_create_peserta_ids(conn, participant_names, peserta_ids=None):
+    # participant_names: nama tampilan; kembalikan {nama_kunci: peserta_id}
+    # peserta_ids: cache opsional {nama_kunci: peserta_id} untuk operasi massal
+    if peserta_ids is None:
+        peserta_ids = {}
+    names_by_key = {}
+    for name in participant_names:
+        names_by_key.setdefault(name.lower(), name)
+
+    missing = [key for key in names_by_key if key not in peserta_ids]
+    if missing:
+        placeholders = ", ".join("?" for _ in missing)
+        for row in conn.execute(f"SELECT id, nama_kunci FROM Peserta WHERE nama_kunci IN ({placeholders})", missing):
+            peserta_ids[row['nama_kunci']] = row['id']
+        for key in missing:
+            if key not in peserta_ids:
+                cursor = conn.execute("INSERT INTO Peserta (nama, nama_kunci) VALUES (?, ?)", (names_by_key[key], key))
+                peserta_ids[key] = cursor.lastrowid
+
+    return {key: peserta_ids[key] for key in names_by_key}
+
+def _sync_activity_participants(conn, activity_id, activity_date, start_time, end_time, participants_raw, peserta_ids=None):
+    # Tulis ulang baris Kegiatan_Peserta untuk satu kegiatan
+    conn.execute("DELETE FROM Kegiatan_Peserta WHERE kegiatan_id = ?", (activity_id,))
+    names = split_participants(participants_raw)
+    if not names:
+        return
+    try:
+        start, end = time_range_to_minutes(start_time, end_time)
+    except ValueError:
+        start, end = None, None # Format waktu rusak: tetap tercatat, tapi tidak pernah bentrok
+    ids_by_key = _get_or_create_peserta_ids(conn, names, peserta_ids)
+    conn.executemany(
+        "INSERT INTO Kegiatan_Peserta (kegiatan_id, peserta_id, tanggal, menit_mulai, menit_akhir) VALUES (?, ?, ?, ?, ?)",
+        [(activity_id, peserta_id, activity_date, start, end) for peserta_id in ids_by_key.values()]
+    )
+
+# --- Fungsi Manajemen Pimpinan (BARU) ---
+@instrumented
+def get_all_pimpinan():
+    conn = connect_db()
+    cursor = conn.cursor()
+    cursor.execute("SELECT * FROM Pimpinan ORDER BY nama")
+    pimpinan_list = cursor.fetchall()
+    return pimpinan_list
+
+@instrumented
+def add_pimpinan(nama_pimpinan):
+    try:
+        with transaction() as conn:
+            # Generate random hex color
+            color = '#%06x' % random.randint(0, 0xFFFFFF)
+            cursor = conn.execute("INSERT INTO Pimpinan (nama, warna) VALUES (?, ?)", (nama_pimpinan, color))
+        return True, "Pimpinan berhasil ditambahkan!", cursor.lastrowid
+    except sqlite3.IntegrityError:
+        return False, "Nama pimpinan sudah ada.", None
+    except sqlite3.Error as e:
+        return False, f"Error saat menambahkan pimpinan: {e}", None
+
+@instrumented
+def delete_pimpinan(pimpinan_id):
+    try:
+        with transaction() as conn:
+            # Activities of this pimpinan are kept but detached (id_pimpinan -> NULL)
+            conn.execute("UPDATE Kegiatan SET id_pimpinan = NULL WHERE id_pimpinan = ?", (pimpinan_id,))
+            conn.execute("UPDATE Kegiatan_Berulang SET id_pimpinan = NULL WHERE id_pimpinan = ?", (pimpinan_id,))
+            conn.execute("DELETE FROM Pimpinan WHERE id = ?", (pimpinan_id,))
+            clear_conflict_indexes() # id_pimpinan berubah di banyak tanggal
+        return True, "Pimpinan berhasil dihapus!"
+    except sqlite3.Error as e:
+        return False, f"Error saat menghapus pimpinan: {e}"
+
+@instrumented
+def get_pimpinan_by_id(pimpinan_id):
+    conn = connect_db()
+    cursor = conn.cursor()
+    cursor.execute("SELECT * FROM Pimpinan WHERE id = ?", (pimpinan_id,))
+    pimpinan = cursor.fetchone()
+    return pimpinan
+
+@instrumented
+def update_pimpinan_color(pimpinan_id, new_color):
+    try:
+        with transaction() as conn:
+            conn.execute("UPDATE Pimpinan SET warna = ? WHERE id = ?", (new_color, pimpinan_id))
+        return True, "Warna pimpinan berhasil diperbarui!"
+    except sqlite3.Error as e:
+        return False, f"Error saat memperbarui warna pimpinan: {e}"
+
+# --- Fungsi Bantu Validasi Waktu ---
+def is_time_overlap(start_time1_str, end_time1_str, start_time2_str, end_time2_str):
+    # Activities are assumed not to span midnight; an end time before the start time
+    # is treated as end of day (see conflict_index.time_range_to_minutes)
+    start1, end1 = time_range_to_minutes(start_time1_str, end_time1_str)
+    start2, end2 = time_range_to_minutes(start_time2_str, end_time2_str)
+    return start1 < end2 and start2 < end1
+
+@instrumented
+def find_activity_conflicts(activity_date, new_start_time, new_end_time, id_pimpinan, new_participants_raw,
+                            current_activity_id=None, room_raw=None):
+    # Semua kegiatan yang bentrok (pimpinan, ruangan dan/atau peserta), terurut berdasarkan waktu mulai
+    start, end = time_range_to_minutes(new_start_time, new_end_time)
+    index = get_conflict_index(activity_date)
+    return index.find_conflicts(start, end, id_pimpinan, parse_participants(new_participants_raw),
+                                exclude_id=current_activity_id, room=room_conflict_key(room_raw))
+
+def format_conflict_message(conflicts, pimpinan_name, room_name=""):
+    # Pesan untuk bentrok pertama (bentrok pimpinan didahulukan, lalu ruangan), seperti sebelumnya
+    conflict = next((c for c in conflicts if c['pimpinan']), None)
+    if conflict is None:
+        conflict = next((c for c in conflicts if c.get('ruangan')), conflicts[0])
+    time_range = f"{minutes_to_time(conflict['start'])}-{minutes_to_time(conflict['end'])}"
+    if conflict['pimpinan']:
+        message = f"Pimpinan '{pimpinan_name}' sudah terjadwal pada waktu tersebut ({time_range})."
+    elif conflict.get('ruangan'):
+        message = f"Ruangan '{room_name.strip()}' sudah dipakai pada waktu tersebut ({time_range})."
+    else:
+        message = f"Beberapa peserta sudah terjadwal pada waktu tersebut ({time_range})."
+    if len(conflicts) > 1:
+        message += f" Total {len(conflicts)} kegiatan bentrok."
+    return message
+
+@instrumented
+def validate_activity_overlap(activity_date, new_start_time, new_end_time, id_pimpinan, new_participants_raw,
+                              current_activity_id=None, room_raw=None):
+    conflicts = find_activity_conflicts(activity_date, new_start_time, new_end_time, id_pimpinan,
+                                        new_participants_raw, current_activity_id, room_raw)
+    return conflict_validation_result(conflicts, id_pimpinan, room_raw)
+
+def conflict_validation_result(conflicts, id_pimpinan, room_raw=None):
+    # (success, message) dari hasil find_activity_conflicts yang sudah ada, tanpa mencari ulang
+    if not conflicts:
+        return True, "" # No overlap found
+
+    # Get pimpinan name for validation message (if needed), on the same connection
+    pimpinan_name = ""
+    if id_pimpinan: # Ensure id_pimpinan is not None/empty
+        pimpinan_row = get_pimpinan_by_id(id_pimpinan)
+        if pimpinan_row:
+            pimpinan_name = pimpinan_row['nama']
+    return False, format_conflict_message(conflicts, pimpinan_name, room_raw or "")
+
+@instrumented
+def add_activity(data):
+    try:
+        # Validasi dan insert dalam satu transaksi agar tidak ada kegiatan lain
+        # yang masuk di antara pengecekan dan penyimpanan
+        with transaction() as conn:
+            # Validasi tumpang tindih sebelum insert
+            is_valid, message = validate_activity_overlap(
+                data['tanggal_kegiatan'],
+                data['waktu_mulai_kegiatan'],
+                data['waktu_akhir_kegiatan'],
+                data.get('id_pimpinan'),
+                data['daftar_peserta'],
+                room_raw=data['tempat_ruangan']
+            )
+            if not is_valid:
+                return False, message
+            _insert_activity(conn, data)
+        return True, "Kegiatan berhasil ditambahkan!"
+    except sqlite3.Error as e:
+        return False, f"Error saat menambahkan kegiatan: {e}"
+
+def _insert_activity(conn, data):
+    # Insert satu kegiatan yang sudah divalidasi, di dalam transaksi pemanggil
+    cursor = conn.execute('''
+        INSERT INTO Kegiatan (
+            tanggal_kegiatan, waktu_mulai_kegiatan, waktu_akhir_kegiatan, uraian_kegiatan,
+            tempat_ruangan, id_pimpinan, daftar_peserta, tanggal_input, waktu_input,
+            narahubung, kontak_person, id_ruangan, kunci_sumber, sidik_jari
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', (
+        data['tanggal_kegiatan'], data['waktu_mulai_kegiatan'], data['waktu_akhir_kegiatan'],
+        data['uraian_kegiatan'], data['tempat_ruangan'], data.get('id_pimpinan'),
+        data['daftar_peserta'], data['tanggal_input'], data['waktu_input'],
+        data['narahubung'], data['kontak_person'], _get_or_create_ruangan_id(conn, data['tempat_ruangan']),
+        data.get('kunci_sumber'), data.get('sidik_jari')
+    ))
+    _sync_activity_participants(conn, cursor.lastrowid, data['tanggal_kegiatan'], data['waktu_mulai_kegiatan'],
+                                data['waktu_akhir_kegiatan'], data['daftar_peserta'])
+    # Tambal index bentrok tanggal ini alih-alih membangunnya ulang
+    start, end = time_range_to_minutes(data['waktu_mulai_kegiatan'], data['waktu_akhir_kegiatan'])
+    get_conflict_index(data['tanggal_kegiatan']).add(
+        cursor.lastrowid, start, end, data.get('id_pimpinan'), parse_participants(data['daftar_peserta']),
+        room_conflict_key(data['tempat_ruangan'])
+    )
+    return cursor.lastrowid
+
+@instrumented
+def add_activities_bulk(data_list):
+    # Insert banyak kegiatan sekaligus dengan executemany dalam satu transaksi.
+    # Tidak memvalidasi bentrok: pemanggil (mis. excel_importer) sudah memvalidasi
+    # terhadap snapshot index di dalam transaksi yang sama.
+    # Kembalikan (success, message, daftar id baru sesuai urutan data_list)
+    if not data_list:
+        return True, "Tidak ada kegiatan untuk ditambahkan.", []
+    try:
+        with transaction() as conn:
+            last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM Kegiatan").fetchone()[0]
+            ruangan_ids = {}
+            conn.executemany('''
+                INSERT INTO Kegiatan (
+                    tanggal_kegiatan, waktu_mulai_kegiatan, waktu_akhir_kegiatan, uraian_kegiatan,
+                    tempat_ruangan, id_pimpinan, daftar_peserta, tanggal_input, waktu_input,
+                    narahubung, kontak_person, id_ruangan, kunci_sumber, sidik_jari
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', [(
+                data['tanggal_kegiatan'], data['waktu_mulai_kegiatan'], data['waktu_akhir_kegiatan'],
+                data['uraian_kegiatan'], data['tempat_ruangan'], data.get('id_pimpinan'),
+                data['daftar_peserta'], data['tanggal_input'], data['waktu_input'],
+                data['narahubung'], data['kontak_person'],
+                _get_or_create_ruangan_id(conn, data['tempat_ruangan'], ruangan_ids),
+                data.get('kunci_sumber'), data.get('sidik_jari')
+            ) for data in data_list])
+            # Transaksi memegang kunci tulis, jadi id baru adalah semua id > last_id sesuai urutan insert
+            new_ids = [row['id'] for row in conn.execute("SELECT id FROM Kegiatan WHERE id > ? ORDER BY id", (last_id,))]
+
+            peserta_ids = {}
+            for activity_id, data in zip(new_ids, data_list):
+                _sync_activity_participants(conn, activity_id, data['tanggal_kegiatan'], data['waktu_mulai_kegiatan'],
+                                            data['waktu_akhir_kegiatan'], data['daftar_peserta'], peserta_ids)
+            invalidate_conflict_index(*set(data['tanggal_kegiatan'] for data in data_list))
+        return True, f"{len(new_ids)} kegiatan berhasil ditambahkan!", new_ids
+    except sqlite3.Error as e:
+        return False, f"Error saat menambahkan kegiatan: {e}", []
+
+@instrumented
+def update_activities_bulk(updates):
+    # Update banyak kegiatan sekaligus, termasuk kunci_sumber/sidik_jari. Seperti add_activities_bulk,
+    # tidak memvalidasi bentrok (sudah divalidasi pemanggil di transaksi yang sama).
+    # updates: list (activity_id, data, tanggal lama). Kembalikan (success, message)
+    if not updates:
+        return True, "Tidak ada kegiatan untuk diperbarui."
+    try:
+        with transaction() as conn:
+            ruangan_ids = {}
+            conn.executemany('''
+                UPDATE Kegiatan SET
+                    tanggal_kegiatan = ?, waktu_mulai_kegiatan = ?, waktu_akhir_kegiatan = ?,
+                    uraian_kegiatan = ?, tempat_ruangan = ?, id_pimpinan = ?, daftar_peserta = ?,
+                    narahubung = ?, kontak_person = ?, id_ruangan = ?, kunci_sumber = ?, sidik_jari = ?
+                WHERE id = ?
+            ''', [(
+                data['tanggal_kegiatan'], data['waktu_mulai_kegiatan'], data['waktu_akhir_kegiatan'],
+                data['uraian_kegiatan'], data['tempat_ruangan'], data.get('id_pimpinan'), data['daftar_peserta'],
+                data['narahubung'], data['kontak_person'],
+                _get_or_create_ruangan_id(conn, data['tempat_ruangan'], ruangan_ids),
+                data.get('kunci_sumber'), data.get('sidik_jari'), activity_id
+            ) for activity_id, data, _ in updates])
+
+            peserta_ids = {}
+            for activity_id, data, _ in updates:
+                _sync_activity_participants(conn, activity_id, data['tanggal_kegiatan'], data['waktu_mulai_kegiatan'],
+                                            data['waktu_akhir_kegiatan'], data['daftar_peserta'], peserta_ids)
+            invalidate_conflict_index(*{old_date for _, _, old_date in updates},
+                                      *{data['tanggal_kegiatan'] for _, data, _ in updates})
+        return True, f"{len(updates)} kegiatan berhasil diperbarui!"
+    except sqlite3.Error as e:
+        return False, f"Error saat memperbarui kegiatan: {e}"
+
+@instrumented
+def delete_activities_bulk(activity_ids):
+    # Hapus banyak Kegiatan (bukan kejadian kegiatan berulang) dalam satu transaksi
+    activity_ids = list(activity_ids)
+    if not activity_ids:
+        return True, "Tidak ada kegiatan untuk dihapus."
+    try:
+        with transaction() as conn:
+            for i in range(0, len(activity_ids), SQLITE_PARAM_CHUNK):
+                chunk = activity_ids[i:i + SQLITE_PARAM_CHUNK]
+                placeholders = ", ".join("?" for _ in chunk)
+                dates = [row['tanggal_kegiatan'] for row in conn.execute(
+                    f"SELECT DISTINCT tanggal_kegiatan FROM Kegiatan WHERE id IN ({placeholders})", chunk)]
+                conn.execute(f"DELETE FROM Kegiatan WHERE id IN ({placeholders})", chunk)
+                conn.execute(f"DELETE FROM Kegiatan_Peserta WHERE kegiatan_id IN ({placeholders})", chunk)
+                invalidate_conflict_index(*dates)
+        return True, f"{len(activity_ids)} kegiatan berhasil dihapus."
+    except sqlite3.Error as e:
+        return False, f"Error saat menghapus kegiatan: {e}"
+
+@instrumented
+def get_activity_by_id(activity_id):
+    conn = connect_db()
+    occurrence = parse_occurrence_id(activity_id)
+    if occurrence is not None:
+        # Kejadian kegiatan berulang (id negatif)
+        loaded = _load_occurrence(conn, *occurrence)
+        return _occurrence_row(loaded[0], occurrence[1], loaded[1]) if loaded else None
+
+    cursor = conn.cursor()
+    # Join with Pimpinan table to get pimpinan name and color
+    cursor.execute('''
+        SELECT
+            K.id, K.tanggal_kegiatan, K.waktu_mulai_kegiatan, K.waktu_akhir_kegiatan,
+            K.uraian_kegiatan, K.tempat_ruangan, K.id_pimpinan,
+            K.daftar_peserta, K.tanggal_input, K.waktu_input, K.narahubung, K.kontak_person,
+            P.nama AS pimpinan_nama, P.warna AS pimpinan_warna, NULL AS seri_id, K.kunci_sumber
+        FROM Kegiatan AS K
+        LEFT JOIN Pimpinan AS P ON K.id_pimpinan = P.id
+        WHERE K.id = ?
+    ''', (activity_id,))
+    activity = cursor.fetchone()
+    return activity
+
+def get_activity_id_by_source_key(source_key):
+    row = connect_db().execute("SELECT id FROM Kegiatan WHERE kunci_sumber = ?", (source_key,)).fetchone()
+    return row['id'] if row else None
+
+@instrumented
+def get_activities_by_source_prefix(prefix):
+    # Kegiatan yang kunci_sumber-nya diawali prefix (mis. semua baris satu sheet Excel).
+    # Rentang [prefix, prefix + U+10FFFF) memakai idx_kegiatan_kunci_sumber, bukan LIKE yang memindai tabel
+    return connect_db().execute('''
+        SELECT id, kunci_sumber, sidik_jari, tanggal_kegiatan FROM Kegiatan
+        WHERE kunci_sumber >= ? AND kunci_sumber < ?
+    ''', (prefix, prefix + '\U0010ffff')).fetchall()
+
+def _get_activity_date(conn, activity_id):
+    row = conn.execute("SELECT tanggal_kegiatan FROM Kegiatan WHERE id = ?", (activity_id,)).fetchone()
+    return row['tanggal_kegiatan'] if row else None
+
+@instrumented
+def update_activity(activity_id, data):
+    occurrence = parse_occurrence_id(activity_id)
+    if occurrence is not None:
+        return _update_occurrence(activity_id, *occurrence, data)
+    try:
+        with transaction() as conn:
+            old_date = _get_activity_date(conn, activity_id)
+            # Validasi tumpang tindih sebelum update
+            is_valid, message = validate_activity_overlap(
+                data['tanggal_kegiatan'],
+                data['waktu_mulai_kegiatan'],
+                data['waktu_akhir_kegiatan'],
+                data.get('id_pimpinan'),
+                data['daftar_peserta'],
+                current_activity_id=activity_id,
+                room_raw=data['tempat_ruangan']
+            )
+            if not is_valid:
+                return False, message
+
+            conn.execute('''
+                UPDATE Kegiatan SET
+                    tanggal_kegiatan = ?,
+                    waktu_mulai_kegiatan = ?,
+                    waktu_akhir_kegiatan = ?,
+                    uraian_kegiatan = ?,
+                    tempat_ruangan = ?,
+                    id_pimpinan = ?,
+                    daftar_peserta = ?,
+                    narahubung = ?,
+                    kontak_person = ?,
+                    id_ruangan = ?
+                WHERE id = ?
+            ''', (
+                data['tanggal_kegiatan'], data['waktu_mulai_kegiatan'], data['waktu_akhir_kegiatan'],
+                data['uraian_kegiatan'], data['tempat_ruangan'], data.get('id_pimpinan'),
+                data['daftar_peserta'], data['narahubung'], data['kontak_person'],
+                _get_or_create_ruangan_id(conn, data['tempat_ruangan']), activity_id
+            ))
+            _sync_activity_participants(conn, activity_id, data['tanggal_kegiatan'], data['waktu_mulai_kegiatan'],
+                                        data['waktu_akhir_kegiatan'], data['daftar_peserta'])
+            invalidate_conflict_index(old_date, data['tanggal_kegiatan'])
+        return True, "Kegiatan berhasil diperbarui!"
+    except sqlite3.Error as e:
+        return False, f"Error saat memperbarui kegiatan: {e}"
+
+# Query dasar kegiatan + informasi pimpinan, dipakai oleh semua fungsi pengambilan kegiatan
+ACTIVITY_SELECT_QUERY = '''
+        SELECT
+            K.id, K.tanggal_kegiatan, K.waktu_mulai_kegiatan, K.waktu_akhir_kegiatan,
+            K.uraian_kegiatan, K.tempat_ruangan, P.nama AS pimpinan_nama,
+            K.daftar_peserta, K.tanggal_input, K.waktu_input, K.narahubung, K.kontak_person,
+            P.id AS id_pimpinan, P.warna AS pimpinan_warna, NULL AS seri_id, K.kunci_sumber
+        FROM Kegiatan AS K
+        LEFT JOIN Pimpinan AS P ON K.id_pimpinan = P.id
+    '''
+
+# Fungsi untuk mengambil semua kegiatan, ditambah informasi pimpinan
+@instrumented
+def get_all_activities(id_pimpinan_filter=None):
+    conn = connect_db()
+    cursor = conn.cursor()
+    
+    query = ACTIVITY_SELECT_QUERY
+    params = []
+
+    if id_pimpinan_filter is not None:
+        query += " WHERE K.id_pimpinan = ?"
+        params.append(id_pimpinan_filter)
+
+    query += " ORDER BY K.tanggal_kegiatan, K.waktu_mulai_kegiatan"
+
+    cursor.execute(query, params)
+    activities = cursor.fetchall() # Returns Row objects (dictionary-like)
+    return activities
+
+# --- Fungsi Pengambilan Kegiatan Berdasarkan Rentang Tanggal ---
+# Memakai index idx_kegiatan_tanggal_waktu / idx_kegiatan_pimpinan_tanggal,
+# sehingga tidak perlu membaca seluruh tabel lalu memfilter di Python.
+def _activities_in_range_query(start_date, end_date, pimpinan_ids):
+    query = ACTIVITY_SELECT_QUERY + " WHERE K.tanggal_kegiatan BETWEEN ? AND ?"
+    params = [start_date, end_date]
+
+    if pimpinan_ids is not None:
+        placeholders = ", ".join("?" for _ in pimpinan_ids)
+        query += f" AND K.id_pimpinan IN ({placeholders})"
+        params.extend(pimpinan_ids)
+
+    query += " ORDER BY K.tanggal_kegiatan, K.waktu_mulai_kegiatan"
+    return query, params
+
+def _activity_sort_key(activity):
+    return activity['tanggal_kegiatan'], activity['waktu_mulai_kegiatan']
+
+@instrumented
+def get_activities_in_range(start_date, end_date, pimpinan_ids=None):
+    # start_date dan end_date berformat 'YYYY-MM-DD' (inklusif).
+    # Termasuk kejadian kegiatan berulang dalam rentang ini (dict dengan seri_id terisi).
+    if pimpinan_ids is not None:
+        pimpinan_ids = list(pimpinan_ids)
+        if not pimpinan_ids:
+            return []
+    query, params = _activities_in_range_query(start_date, end_date, pimpinan_ids)
+
+    conn = connect_db()
+    cursor = conn.cursor()
+    cursor.execute(query, params)
+    activities = cursor.fetchall()
+    occurrences = list(_iter_occurrences_in_range(conn, start_date, end_date, pimpinan_ids))
+    if not occurrences:
+        return activities
+    return list(heapq.merge(activities, occurrences, key=_activity_sort_key))
+
+def iter_activities_in_range(start_date, end_date, pimpinan_ids=None, batch_size=1000):
+    # Seperti get_activities_in_range, tetapi baris dibaca bertahap (fetchmany) untuk ekspor besar
+    if pimpinan_ids is not None:
+        pimpinan_ids = list(pimpinan_ids)
+        if not pimpinan_ids:
+            return
+    query, params = _activities_in_range_query(start_date, end_date, pimpinan_ids)
+
+    conn = connect_db()
+    cursor = conn.execute(query, params)
+
+    def fetch_rows():
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield from rows
+
+    yield from heapq.merge(fetch_rows(), _iter_occurrences_in_range(conn, start_date, end_date, pimpinan_ids),
+                           key=_activity_sort_key)
+
+def get_activities_for_date(activity_date, id_pimpinan_filter=None):
+    pimpinan_ids = [id_pimpinan_filter] if id_pimpinan_filter is not None else None
+    return get_activities_in_range(activity_date, activity_date, pimpinan_ids)
+
+def get_month_window(year, month, margin_days=0):
+    # Rentang tanggal satu bulan, opsional diperlebar margin_days ke depan/belakang
+    # (mis. untuk minggu bulan sebelumnya/berikutnya yang ikut tampil di kalender)
+    first_day = datetime(year, month, 1).date()
+    if month == 12:
+        last_day = datetime(year + 1, 1, 1).date() - timedelta(days=1)
+    else:
+        last_day = datetime(year, month + 1, 1).date() - timedelta(days=1)
+    start = first_day - timedelta(days=margin_days)
+    end = last_day + timedelta(days=margin_days)
+    return start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d')
+
+def get_activities_for_month(year, month, pimpinan_ids=None, margin_days=0):
+    start_date, end_date = get_month_window(year, month, margin_days)
+    return get_activities_in_range(start_date, end_date, pimpinan_ids)
+
+# --- Statistik Kegiatan ---
+# Kejadian kegiatan berulang ikut dihitung (diekspansi di Python, hanya dalam rentang)
+@instrumented
+def count_activities_by_pimpinan(start_date, end_date):
+    conn = connect_db()
+    rows = conn.execute('''
+        SELECT P.nama AS pimpinan_nama, COUNT(*) AS jumlah
+        FROM Kegiatan AS K
+        LEFT JOIN Pimpinan AS P ON K.id_pimpinan = P.id
+        WHERE K.tanggal_kegiatan BETWEEN ? AND ?
+        GROUP BY K.id_pimpinan
+        ORDER BY jumlah DESC
+    ''', (start_date, end_date)).fetchall()
+    occurrence_counts = Counter(o['pimpinan_nama'] for o in _iter_occurrences_in_range(conn, start_date, end_date))
+    if not occurrence_counts:
+        return rows
+    counts = Counter({row['pimpinan_nama']: row['jumlah'] for row in rows})
+    counts.update(occurrence_counts)
+    return [{'pimpinan_nama': name, 'jumlah': jumlah} for name, jumlah in counts.most_common()]
+
+@instrumented
+def count_activities_by_month(start_date, end_date):
+    conn = connect_db()
+    rows = conn.execute('''
+        SELECT substr(tanggal_kegiatan, 1, 7) AS bulan, COUNT(*) AS jumlah
+        FROM Kegiatan
+        WHERE tanggal_kegiatan BETWEEN ? AND ?
+        GROUP BY bulan
+        ORDER BY bulan
+    ''', (start_date, end_date)).fetchall()
+    occurrence_counts = Counter(o['tanggal_kegiatan'][:7] for o in _iter_occurrences_in_range(conn, start_date, end_date))
+    if not occurrence_counts:
+        return rows
+    counts = Counter({row['bulan']: row['jumlah'] for row in rows})
+    counts.update(occurrence_counts)
+    return [{'bulan': bulan, 'jumlah': counts[bulan]} for bulan in sorted(counts)]
+
+# --- Pencarian Waktu Kosong ---
+WORKING_HOURS = ('08:00', '16:00')
+WORKING_WEEKDAYS = (0, 1, 2, 3, 4) # Senin-Jumat
+FREE_SLOT_BATCH_DAYS = 7 # Index bentrok dibangun per minggu; pencarian berhenti begitu limit terpenuhi
+FREE_SLOT_ROUND_MINUTES = 15
+
+@instrumented
+def find_free_slots(pimpinan_ids, participants_raw, duration_minutes, start_date, end_date,
+                    working_hours=WORKING_HOURS, limit=10, weekdays=WORKING_WEEKDAYS, not_before=None):
+    # Waktu kosong bersama untuk semua pimpinan dan peserta ini dalam [start_date, end_date]:
+    # list dict (tanggal_kegiatan, waktu_mulai_kegiatan, waktu_akhir_kegiatan, bebas_sampai), paling awal dulu.
+    # Interval sibuk diambil dari index bentrok per tanggal (kegiatan biasa + kejadian kegiatan berulang).
+    # not_before: datetime opsional, mis. sekarang, agar slot yang sudah lewat tidak disarankan.
+    day_start, day_end = time_range_to_minutes(*working_hours)
+    if duration_minutes <= 0 or day_end - day_start < duration_minutes or limit <= 0:
+        return []
+    first = date.fromisoformat(start_date)
+    if not_before is not None:
+        first = max(first, not_before.date())
+    days = [first + timedelta(days=i) for i in range((date.fromisoformat(end_date) - first).days + 1)]
+    days = [day.isoformat() for day in days if day.weekday() in weekdays]
+    pimpinan_ids = [p for p in (pimpinan_ids or []) if p is not None]
+    participants = parse_participants(participants_raw)
+
+    slots = []
+    conn = connect_db()
+    for i in range(0, len(days), FREE_SLOT_BATCH_DAYS):
+        batch = days[i:i + FREE_SLOT_BATCH_DAYS]
+        indexes = _build_conflict_indexes(conn, batch)
+        for activity_date in batch:
+            earliest = day_start
+            if not_before is not None and activity_date == not_before.date().isoformat():
+                minute = not_before.hour * 60 + not_before.minute
+                earliest = max(day_start, -(-minute // FREE_SLOT_ROUND_MINUTES) * FREE_SLOT_ROUND_MINUTES)
+            busy = indexes[activity_date].busy_intervals(pimpinan_ids, participants)
+            for gap_start, gap_end in free_slots(busy, earliest, day_end, duration_minutes):
+                slots.append({
+                    'tanggal_kegiatan': activity_date,
+                    'waktu_mulai_kegiatan': minutes_to_time(gap_start),
+                    'waktu_akhir_kegiatan': minutes_to_time(gap_start + duration_minutes),
+                    'bebas_sampai': minutes_to_time(gap_end),
+                })
+                if len(slots) >= limit:
+                    return slots
+    return slots
+
+# --- Fungsi Jadwal Peserta (memakai idx_kegiatan_peserta_tanggal) ---
+# Hanya kegiatan biasa: kejadian kegiatan berulang tidak punya baris Kegiatan_Peserta.
+@instrumented
+def find_busy_participants(activity_date, start_time, end_time, participants_raw, exclude_activity_id=None):
+    # "Apakah ada peserta ini yang sudah sibuk antara start_time dan end_time pada tanggal ini?"
+    # Kembalikan baris (kegiatan_id, peserta_nama, menit_mulai, menit_akhir) yang bentrok
+    participant_keys = sorted(parse_participants(participants_raw))
+    if not participant_keys:
+        return []
+    start, end = time_range_to_minutes(start_time, end_time)
+
+    placeholders = ", ".join("?" for _ in participant_keys)
+    query = f'''
+        SELECT KP.kegiatan_id, P.nama AS peserta_nama, KP.menit_mulai, KP.menit_akhir
+        FROM Peserta AS P
+        JOIN Kegiatan_Peserta AS KP ON KP.peserta_id = P.id
+        WHERE P.nama_kunci IN ({placeholders})
+          AND KP.tanggal = ? AND KP.menit_mulai < ? AND KP.menit_akhir > ?
+    '''
+    params = participant_keys + [activity_date, end, start]
+    if exclude_activity_id is not None:
+        query += " AND KP.kegiatan_id != ?"
+        params.append(exclude_activity_id)
+    query += " ORDER BY KP.menit_mulai, KP.kegiatan_id"
+
+    return connect_db().execute(query, params).fetchall()
+
+@instrumented
+def get_participant_schedule(participant_name, start_date=None, end_date=None):
+    # Semua kegiatan seorang peserta (opsional dalam rentang tanggal), tanpa memindai tabel Kegiatan
+    query = ACTIVITY_SELECT_QUERY + '''
+        JOIN Kegiatan_Peserta AS KP ON KP.kegiatan_id = K.id
+        JOIN Peserta AS PS ON PS.id = KP.peserta_id
+        WHERE PS.nama_kunci = ? AND KP.tanggal BETWEEN ? AND ?
+        ORDER BY KP.tanggal, KP.menit_mulai
+    '''
+    params = [participant_name.strip().lower(), start_date or '0000-00-00', end_date or '9999-99-99']
+    return connect_db().execute(query, params).fetchall()
+
+@instrumented
+def get_all_peserta():
+    return connect_db().execute("SELECT * FROM Peserta ORDER BY nama").fetchall()
+
+@instrumented
+def delete_activity(activity_id):
+    occurrence = parse_occurrence_id(activity_id)
+    if occurrence is not None:
+        return _cancel_occurrence(*occurrence)
+    try:
+        with transaction() as conn:
+            old_date = _get_activity_date(conn, activity_id)
+            conn.execute("DELETE FROM Kegiatan WHERE id = ?", (activity_id,))
+            conn.execute("DELETE FROM Kegiatan_Peserta WHERE kegiatan_id = ?", (activity_id,))
+            invalidate_conflict_index(old_date)
+        return True, "Kegiatan berhasil dihapus."
+    except sqlite3.Error as e:
+        return False, f"Error saat menghapus kegiatan: {e}"
+
+# --- Kegiatan Berulang ---
+# Satu baris Kegiatan_Berulang per seri; kejadiannya diekspansi hanya untuk rentang yang sedang
+# dibaca, divalidasi atau dicek pengingatnya. Setiap kejadian punya id negatif (recurrence.occurrence_id),
+# sehingga get_activity_by_id/update_activity/delete_activity bisa dipakai untuk satu kejadian.
+RECURRENCE_HORIZON_DAYS = 730 # Seri tanpa tanggal akhir diekspansi/dibandingkan paling jauh 2 tahun
+MAX_DATE = '9999-12-31'
+OVERRIDE_FIELDS = ('waktu_mulai_kegiatan', 'waktu_akhir_kegiatan', 'uraian_kegiatan', 'tempat_ruangan',
+                   'daftar_peserta', 'narahubung', 'kontak_person')
+
+SERIES_SELECT_QUERY = '''
+        SELECT S.*, P.nama AS pimpinan_nama, P.warna AS pimpinan_warna
+        FROM Kegiatan_Berulang AS S
+        LEFT JOIN Pimpinan AS P ON S.id_pimpinan = P.id
+    '''
+
+def _parse_day(activity_date):
+    try:
+        return date.fromisoformat(activity_date)
+    except (TypeError, ValueError):
+        return None
+
+def _load_series(conn, start_date, end_date, pimpinan_ids=None):
+    # Seri yang aktif dalam [start_date, end_date] beserta aturannya dan pengecualian dalam rentang itu:
+    # [(baris seri, RecurrenceRule, {tanggal: baris pengecualian})]
+    query = SERIES_SELECT_QUERY + " WHERE S.tanggal_mulai <= ? AND (S.tanggal_akhir IS NULL OR S.tanggal_akhir >= ?)"
+    params = [end_date, start_date]
+    if pimpinan_ids is not None:
+        placeholders = ", ".join("?" for _ in pimpinan_ids)
+        query += f" AND S.id_pimpinan IN ({placeholders})"
+        params.extend(pimpinan_ids)
+    series_rows = conn.execute(query, params).fetchall()
+    if not series_rows:
+        return []
+
+    overrides = {}
+    series_ids = [row['id'] for row in series_rows]
+    for i in range(0, len(series_ids), SQLITE_PARAM_CHUNK):
+        chunk = series_ids[i:i + SQLITE_PARAM_CHUNK]
+        placeholders = ", ".join("?" for _ in chunk)
+        for row in conn.execute(
+            f"SELECT * FROM Kegiatan_Berulang_Pengecualian WHERE seri_id IN ({placeholders}) AND tanggal BETWEEN ? AND ?",
+            chunk + [start_date, end_date]
+        ):
+            overrides.setdefault(row['seri_id'], {})[row['tanggal']] = row
+    return [(row, RecurrenceRule.from_row(row), overrides.get(row['id'], {})) for row in series_rows]
+
+def _occurrence_row(series, day, override=None):
+    # Satu kejadian seri sebagai dict dengan kolom yang sama seperti ACTIVITY_SELECT_QUERY
+    activity = {
+        'id': occurrence_id(series['id'], day),
+        'tanggal_kegiatan': day.isoformat(),
+        'id_pimpinan': series['id_pimpinan'],
+        'pimpinan_nama': series['pimpinan_nama'],
+        'pimpinan_warna': series['pimpinan_warna'],
+        'tanggal_input': series['tanggal_input'],
+        'waktu_input': series['waktu_input'],
+        'seri_id': series['id'],
+        'kunci_sumber': None,
+    }
+    for field in OVERRIDE_FIELDS:
+        value = override[field] if override is not None else None
+        activity[field] = value if value is not None else series[field]
+    return activity
+
+def _series_occurrences(series, rule, overrides, start_date, end_date):
+    # Kejadian satu seri dalam rentang (tanpa yang dibatalkan), terurut berdasarkan tanggal
+    first = date.fromisoformat(max(start_date, series['tanggal_mulai']))
+    if series['tanggal_akhir'] is None:
+        # Rentang terbuka (mis. ekspor semua) tidak mengekspansi seri tanpa batas sampai tahun 9999
+        horizon = max(first, date.today()) + timedelta(days=RECURRENCE_HORIZON_DAYS)
+        end_date = min(end_date, horizon.isoformat())
+    last = _parse_day(end_date)
+    if last is None:
+        return
+    for day in rule.occurrences(first, last):
+        override = overrides.get(day.isoformat())
+        if override is not None and override['dibatalkan']:
+            continue
+        yield _occurrence_row(series, day, override)
+
+def _iter_occurrences_in_range(conn, start_date, end_date, pimpinan_ids=None):
+    series_list = _load_series(conn, start_date, end_date, pimpinan_ids)
+    return heapq.merge(*(_series_occurrences(series, rule, overrides, start_date, end_date)
+                         for series, rule, overrides in series_list), key=_activity_sort_key)
+
+def _load_occurrence(conn, series_id, day):
+    # (baris seri, baris pengecualian atau None) jika seri memang terjadi pada tanggal itu
+    series = conn.execute(SERIES_SELECT_QUERY + " WHERE S.id = ?", (series_id,)).fetchone()
+    if series is None or not RecurrenceRule.from_row(series).occurs_on(day):
+        return None
+    override = conn.execute("SELECT * FROM Kegiatan_Berulang_Pengecualian WHERE seri_id = ? AND tanggal = ?",
+                            (series_id, day.isoformat())).fetchone()
+    if override is not None and override['dibatalkan']:
+        return None
+    return series, override
+
+def _save_override(conn, series_id, day, values=None):
+    # values=None: kejadian dibatalkan; selain itu hanya kolom yang berbeda dari seri yang disimpan
+    conn.execute(f'''
+        INSERT OR REPLACE INTO Kegiatan_Berulang_Pengecualian (seri_id, tanggal, dibatalkan, {", ".join(OVERRIDE_FIELDS)})
+        VALUES (?, ?, ?, {", ".join("?" for _ in OVERRIDE_FIELDS)})
+    ''', [series_id, day.isoformat(), int(values is None)] + [values.get(field) if values else None for field in OVERRIDE_FIELDS])
+
+def _update_occurrence(activity_id, series_id, day, data):
+    # Ubah satu kejadian: disimpan sebagai override pada tanggal aslinya. Jika tanggal atau pimpinan
+    # diubah, kejadian dibatalkan dari seri dan disimpan sebagai kegiatan biasa.
+    try:
+        with transaction() as conn:
+            loaded = _load_occurrence(conn, series_id, day)
+            if loaded is None:
+                return False, "Kejadian kegiatan berulang tidak ditemukan."
+            series, _ = loaded
+            is_valid, message = validate_activity_overlap(
+                data['tanggal_kegiatan'],
+                data['waktu_mulai_kegiatan'],
+                data['waktu_akhir_kegiatan'],
+                data.get('id_pimpinan'),
+                data['daftar_peserta'],
+                current_activity_id=activity_id,
+                room_raw=data['tempat_ruangan']
+            )
+            if not is_valid:
+                return False, message
+
+            if data['tanggal_kegiatan'] != day.isoformat() or data.get('id_pimpinan') != series['id_pimpinan']:
+                _save_override(conn, series_id, day)
+                get_conflict_index(day.isoformat()).remove(activity_id)
+                _insert_activity(conn, dict(data, tanggal_input=series['tanggal_input'], waktu_input=series['waktu_input']))
+                return True, "Kejadian dipisahkan dari seri dan disimpan sebagai kegiatan biasa."
+            _save_override(conn, series_id, day, {
+                field: data[field] for field in OVERRIDE_FIELDS if data.get(field) != series[field]
+            })
+            invalidate_conflict_index(day.isoformat())
+        return True, "Kejadian kegiatan berulang berhasil diperbarui!"
+    except sqlite3.Error as e:
+        return False, f"Error saat memperbarui kegiatan: {e}"
+
+def _cancel_occurrence(series_id, day):
+    try:
+        with transaction() as conn:
+            if _load_occurrence(conn, series_id, day) is None:
+                return False, "Kejadian kegiatan berulang tidak ditemukan."
+            _save_override(conn, series_id, day)
+            invalidate_conflict_index(day.isoformat())
+        return True, "Kejadian kegiatan berulang berhasil dihapus."
+    except sqlite3.Error as e:
+        return False, f"Error saat menghapus kegiatan: {e}"
+
+def _rule_from_data(data, series=None):
+    # data: tanggal_kegiatan (tanggal mulai seri), frekuensi, selang, hari_minggu (list 0-6), tanggal_akhir.
+    # Kolom aturan yang tidak ada di data diambil dari seri lama (untuk update).
+    def value(key, column):
+        if key in data or series is None:
+            return data.get(key)
+        return series[column]
+    start_date = date.fromisoformat(value('tanggal_kegiatan', 'tanggal_mulai'))
+    weekdays = data['hari_minggu'] if 'hari_minggu' in data else parse_weekdays(series['hari_minggu'] if series else None)
+    until = value('tanggal_akhir', 'tanggal_akhir')
+    return RecurrenceRule(start_date, value('frekuensi', 'frekuensi'), int(value('selang', 'selang') or 1),
+                          weekdays, date.fromisoformat(until) if until else None)
+
+def _rule_columns(rule):
+    return (rule.start_date.isoformat(), rule.until.isoformat() if rule.until else None, rule.frequency,
+            rule.interval, format_weekdays(rule.weekdays) if rule.frequency == 'mingguan' else None)
+
+def _occurs_on(rule, activity_date):
+    day = _parse_day(activity_date)
+    return day is not None and rule.occurs_on(day)
+
+def _series_candidate_dates(conn, rule, start, end, id_pimpinan, participants, exclude_series_id=None, room=None):
+    # Tanggal yang mungkin bentrok dengan sebuah seri, tanpa mengekspansi seluruh kejadiannya:
+    # kegiatan biasa dicari lewat index (pimpinan/ruangan/peserta + tanggal) lalu dicek dengan rule.occurs_on,
+    # seri lain hanya dibandingkan dalam rentang tanggal yang beririsan.
+    first = rule.start_date.isoformat()
+    last = rule.until.isoformat() if rule.until else MAX_DATE
+    candidates = set()
+
+    if id_pimpinan is not None:
+        for row in conn.execute(
+            "SELECT tanggal_kegiatan, waktu_mulai_kegiatan, waktu_akhir_kegiatan FROM Kegiatan WHERE id_pimpinan = ? AND tanggal_kegiatan BETWEEN ? AND ?",
+            (id_pimpinan, first, last)
+        ):
+            try:
+                other_start, other_end = time_range_to_minutes(row['waktu_mulai_kegiatan'], row['waktu_akhir_kegiatan'])
+            except ValueError:
+                continue
+            if other_start < end and start < other_end and _occurs_on(rule, row['tanggal_kegiatan']):
+                candidates.add(row['tanggal_kegiatan'])
+
+    if room is not None:
+        for row in conn.execute('''
+            SELECT K.tanggal_kegiatan, K.waktu_mulai_kegiatan, K.waktu_akhir_kegiatan
+            FROM Ruangan AS R
+            JOIN Kegiatan AS K ON K.id_ruangan = R.id
+            WHERE R.nama_kunci = ? AND K.tanggal_kegiatan BETWEEN ? AND ?
+        ''', (room, first, last)):
+            try:
+                other_start, other_end = time_range_to_minutes(row['waktu_mulai_kegiatan'], row['waktu_akhir_kegiatan'])
+            except ValueError:
+                continue
+            if other_start < end and start < other_end and _occurs_on(rule, row['tanggal_kegiatan']):
+                candidates.add(row['tanggal_kegiatan'])
+
+    participant_keys = sorted(participants)
+    for i in range(0, len(participant_keys), SQLITE_PARAM_CHUNK):
+        chunk = participant_keys[i:i + SQLITE_PARAM_CHUNK]
+        placeholders = ", ".join("?" for _ in chunk)
+        for row in conn.execute(f'''
+            SELECT DISTINCT KP.tanggal
+            FROM Peserta AS P
+            JOIN Kegiatan_Peserta AS KP ON KP.peserta_id = P.id
+            WHERE P.nama_kunci IN ({placeholders})
+              AND KP.tanggal BETWEEN ? AND ? AND KP.menit_mulai < ? AND KP.menit_akhir > ?
+        ''', chunk + [first, last, end, start]):
+            if _occurs_on(rule, row['tanggal']):
+                candidates.add(row['tanggal'])
+
+    # Seri tanpa batas dibandingkan dengan seri lain sampai RECURRENCE_HORIZON_DAYS saja
+    horizon = rule.until or rule.start_date + timedelta(days=RECURRENCE_HORIZON_DAYS)
+    for series, other_rule, _ in _load_series(conn, first, horizon.isoformat()):
+        if series['id'] == exclude_series_id:
+            continue
+        window_end = min(horizon, other_rule.until) if other_rule.until else horizon
+        for day in rule.occurrences(other_rule.start_date, window_end):
+            if other_rule.occurs_on(day):
+                candidates.add(day.isoformat())
+
+    if exclude_series_id is not None:
+        # Kejadian seri sendiri yang dibatalkan atau waktunya di-override tidak ikut berubah
+        for row in conn.execute(
+            "SELECT tanggal FROM Kegiatan_Berulang_Pengecualian WHERE seri_id = ? AND (dibatalkan = 1 OR waktu_mulai_kegiatan IS NOT NULL OR waktu_akhir_kegiatan IS NOT NULL)",
+            (exclude_series_id,)
+        ):
+            candidates.discard(row['tanggal'])
+    return sorted(candidates)
+
+@instrumented
+def find_series_conflicts(rule, start_time, end_time, id_pimpinan, participants_raw, exclude_series_id=None,
+                          room_raw=None):
+    # Bentrok antara seri (aturan + waktu) dan kegiatan/seri lain: [(tanggal, dict bentrok)] terurut
+    start, end = time_range_to_minutes(start_time, end_time)
+    participants = parse_participants(participants_raw)
+    room = room_conflict_key(room_raw)
+    conn = connect_db()
+    candidate_dates = _series_candidate_dates(conn, rule, start, end, id_pimpinan, participants, exclude_series_id, room)
+    if not candidate_dates:
+        return []
+
+    conflicts = []
+    indexes = _build_conflict_indexes(conn, candidate_dates)
+    for activity_date in candidate_dates:
+        exclude_id = None
+        if exclude_series_id is not None:
+            exclude_id = occurrence_id(exclude_series_id, date.fromisoformat(activity_date))
+        for conflict in indexes[activity_date].find_conflicts(start, end, id_pimpinan, participants,
+                                                              exclude_id=exclude_id, room=room):
+            conflicts.append((activity_date, conflict))
+    return conflicts
+
+@instrumented
+def validate_series_overlap(rule, start_time, end_time, id_pimpinan, participants_raw, exclude_series_id=None,
+                            room_raw=None):
+    conflicts = find_series_conflicts(rule, start_time, end_time, id_pimpinan, participants_raw, exclude_series_id,
+                                      room_raw)
+    if not conflicts:
+        return True, ""
+
+    pimpinan_name = ""
+    if id_pimpinan:
+        pimpinan_row = get_pimpinan_by_id(id_pimpinan)
+        if pimpinan_row:
+            pimpinan_name = pimpinan_row['nama']
+    first_date = conflicts[0][0]
+    message = f"Tanggal {first_date}: " + format_conflict_message(
+        [conflict for activity_date, conflict in conflicts if activity_date == first_date], pimpinan_name, room_raw or "")
+    other_dates = len({activity_date for activity_date, _ in conflicts}) - 1
+    if other_dates:
+        message += f" Bentrok juga pada {other_dates} tanggal lain."
+    return False, message
+
+@instrumented
+def get_recurring_series(series_id):
+    return connect_db().execute(SERIES_SELECT_QUERY + " WHERE S.id = ?", (series_id,)).fetchone()
+
+@instrumented
+def add_recurring_activity(data):
+    # data: kolom kegiatan seperti add_activity (tanggal_kegiatan = tanggal mulai seri) ditambah
+    # frekuensi, selang, hari_minggu dan tanggal_akhir. Kembalikan (success, message, seri_id)
+    try:
+        rule = _rule_from_data(data)
+    except (KeyError, TypeError, ValueError) as e:
+        return False, f"Aturan pengulangan tidak valid: {e}", None
+    try:
+        with transaction() as conn:
+            is_valid, message = validate_series_overlap(rule, data['waktu_mulai_kegiatan'], data['waktu_akhir_kegiatan'],
+                                                        data.get('id_pimpinan'), data['daftar_peserta'],
+                                                        room_raw=data['tempat_ruangan'])
+            if not is_valid:
+                return False, message, None
+            cursor = conn.execute('''
+                INSERT INTO Kegiatan_Berulang (
+                    tanggal_mulai, tanggal_akhir, frekuensi, selang, hari_minggu,
+                    waktu_mulai_kegiatan, waktu_akhir_kegiatan, uraian_kegiatan, tempat_ruangan,
+                    id_pimpinan, daftar_peserta, tanggal_input, waktu_input, narahubung, kontak_person
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', _rule_columns(rule) + (
+                data['waktu_mulai_kegiatan'], data['waktu_akhir_kegiatan'], data['uraian_kegiatan'],
+                data['tempat_ruangan'], data.get('id_pimpinan'), data['daftar_peserta'],
+                data['tanggal_input'], data['waktu_input'], data['narahubung'], data['kontak_person']
+            ))
+            clear_conflict_indexes() # Seri baru muncul di banyak tanggal
+        return True, f"Kegiatan berulang berhasil ditambahkan! ({rule.describe()})", cursor.lastrowid
+    except sqlite3.Error as e:
+        return False, f"Error saat menambahkan kegiatan berulang: {e}", None
+
+@instrumented
+def update_recurring_series(series_id, data):
+    # Ubah seluruh seri. Override per kejadian tetap berlaku untuk kolom yang di-override.
+    try:
+        with transaction() as conn:
+            series = conn.execute("SELECT * FROM Kegiatan_Berulang WHERE id = ?", (series_id,)).fetchone()
+            if series is None:
+                return False, "Kegiatan berulang tidak ditemukan."
+            try:
+                rule = _rule_from_data(data, series)
+            except (TypeError, ValueError) as e:
+                return False, f"Aturan pengulangan tidak valid: {e}"
+            is_valid, message = validate_series_overlap(rule, data['waktu_mulai_kegiatan'], data['waktu_akhir_kegiatan'],
+                                                        data.get('id_pimpinan'), data['daftar_peserta'],
+                                                        exclude_series_id=series_id, room_raw=data['tempat_ruangan'])
+            if not is_valid:
+                return False, message
+            conn.execute('''
+                UPDATE Kegiatan_Berulang SET
+                    tanggal_mulai = ?, tanggal_akhir = ?, frekuensi = ?, selang = ?, hari_minggu = ?,
+                    waktu_mulai_kegiatan = ?, waktu_akhir_kegiatan = ?, uraian_kegiatan = ?, tempat_ruangan = ?,
+                    id_pimpinan = ?, daftar_peserta = ?, narahubung = ?, kontak_person = ?
+                WHERE id = ?
+            ''', _rule_columns(rule) + (
+                data['waktu_mulai_kegiatan'], data['waktu_akhir_kegiatan'], data['uraian_kegiatan'],
+                data['tempat_ruangan'], data.get('id_pimpinan'), data['daftar_peserta'],
+                data['narahubung'], data['kontak_person'], series_id
+            ))
+            clear_conflict_indexes()
+        return True, "Kegiatan berulang berhasil diperbarui!"
+    except sqlite3.Error as e:
+        return False, f"Error saat memperbarui kegiatan berulang: {e}"
+
+@instrumented
+def delete_recurring_series(series_id):
+    try:
+        with transaction() as conn:
+            conn.execute("DELETE FROM Kegiatan_Berulang_Pengecualian WHERE seri_id = ?", (series_id,))
+            conn.execute("DELETE FROM Kegiatan_Berulang WHERE id = ?", (series_id,))
+            clear_conflict_indexes()
+        return True, "Seluruh seri kegiatan berulang berhasil dihapus."
+    except sqlite3.Error as e:
+        return False, f"Error saat menghapus kegiatan berulang: {e}"
+
+if __name__ == '__main__':
+    create_table()
+    print("Database and tables 'Kegiatan' and 'Pimpinan' created/checked.")
+    # Add some dummy pimpinan for testing
+    add_pimpinan("Gubernur")
+    add_pimpinan("Sekretaris")
     add_pimpinan("Kadiv Umum")
\ No newline at end of file
@@ -0,0 +1,81 @@
+import logging
+import os
+from datetime import datetime
+
+import db_handler
+from instrumentation import profile
+
+logger = logging.getLogger(__name__)
+
+# Ekspor jadwal ke Excel dengan tata letak kolom yang sama seperti yang dibaca excel_importer,
+# satu sheet per bulan (mis. "JUNI 2025"). Baris dibaca bertahap dari cursor (fetchmany) dan ditulis
+# ke worksheet openpyxl write_only, sehingga ekspor bertahun-tahun tetap memakai memori konstan.
+# Semua sel ditulis sebagai teks agar impor ulang membaca nilai yang persis sama
+# (mis. nomor telepon tidak berubah menjadi angka).
+
+EXPORT_COLUMNS = ('TANGGAL', 'WAKTU', 'KEGIATAN', 'TEMPAT/RUANGAN', 'PIMPINAN', 'PELAKSANA/PESERTA',
+                  'PIC', 'KONTAK PERSON', 'TGL INPUT', 'WKT INPUT')
+COLUMN_WIDTHS = (12, 15, 50, 30, 25, 40, 20, 18, 12, 10)
+MONTH_NAMES = ('JANUARI', 'FEBRUARI', 'MARET', 'APRIL', 'MEI', 'JUNI', 'JULI', 'AGUSTUS',
+               'SEPTEMBER', 'OKTOBER', 'NOVEMBER', 'DESEMBER')
+FETCH_BATCH_SIZE = 1000
+
+def _sheet_title(activity_date):
+    # '2025-06-14' -> 'JUNI 2025'
+    year, month = activity_date[:4], int(activity_date[5:7])
+    return f"{MONTH_NAMES[month - 1]} {year}"
+
+def _export_row(activity):
+    # Format sama dengan yang diterima normalize_dataframe: TANGGAL DD-MM-YYYY, WAKTU 'HH:MM - HH:MM'
+    return [
+        datetime.strptime(activity['tanggal_kegiatan'], '%Y-%m-%d').strftime('%d-%m-%Y'),
+        f"{activity['waktu_mulai_kegiatan']} - {activity['waktu_akhir_kegiatan']}",
+        activity['uraian_kegiatan'] or "",
+        activity['tempat_ruangan'] or "",
+        activity['pimpinan_nama'] or "",
+        activity['daftar_peserta'] or "",
+        activity['narahubung'] or "",
+        activity['kontak_person'] or "",
+        activity['tanggal_input'] or "",
+        activity['waktu_input'] or "",
+    ]
+
+def export_activities_to_excel(start_date, end_date, pimpinan_ids, file_path, backend=db_handler):
+    # start_date/end_date: 'YYYY-MM-DD' (inklusif); pimpinan_ids: None = semua pimpinan.
+    # Kejadian kegiatan berulang ikut diekspor sebagai baris biasa.
+    # backend: db_handler atau api_client.ApiClient. Kembalikan (success, message, jumlah baris)
+    target_dir = os.path.dirname(os.path.abspath(file_path))
+    if not os.path.isdir(target_dir):
+        # Cek sebelum membaca data; openpyxl baru membuka file tujuan saat save
+        return False, f"Folder '{target_dir}' tidak ditemukan.", 0
+    from openpyxl import Workbook # Hanya dimuat saat ekspor
+
+    workbook = Workbook(write_only=True)
+    sheet = None
+    sheet_title = None
+    row_count = 0
+    try:
+        with profile('export_excel'):
+            for activity in backend.iter_activities_in_range(start_date, end_date, pimpinan_ids,
+                                                             batch_size=FETCH_BATCH_SIZE):
+                title = _sheet_title(activity['tanggal_kegiatan'])
+                if title != sheet_title:
+                    # Baris terurut berdasarkan tanggal, jadi setiap bulan ditulis sekali secara berurutan
+                    sheet = workbook.create_sheet(title)
+                    for i, width in enumerate(COLUMN_WIDTHS):
+                        sheet.column_dimensions[chr(ord('A') + i)].width = width
+                    sheet.freeze_panes = 'A2'
+                    sheet.append(list(EXPORT_COLUMNS))
+                    sheet_title = title
+                sheet.append(_export_row(activity))
+                row_count += 1
+
+            if sheet is None:
+                # Workbook harus punya minimal satu sheet; tetap tulis header agar bisa diimpor ulang
+                workbook.create_sheet("KOSONG").append(list(EXPORT_COLUMNS))
+            workbook.save(file_path)
+    except (OSError, ValueError, db_handler.sqlite3.Error) as e:
+        logger.warning("Ekspor Excel ke %s gagal: %s", file_path, e)
+        return False, f"Error saat mengekspor ke Excel: {e}", 0
+    logger.info("%d kegiatan diekspor ke %s", row_count, file_path)
+    return True, f"{row_count} kegiatan berhasil diekspor.", row_count
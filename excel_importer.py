@@ -1,152 +1,797 @@
-import pandas as pd
-from datetime import datetime
-import sqlite3 # Diperlukan untuk create_table di bagian __main__ untuk pengujian
-
-# Import fungsi dari db_handler yang sudah diupdate
-from db_handler import add_activity, get_all_pimpinan, add_pimpinan, create_table
-
-# Fungsi import_activities_from_excel
-def import_activities_from_excel(file_path):
-    imported_count = 0
-    failed_count = 0
-    errors = []
-
-    try:
-        df = pd.read_excel(file_path, header=0, dtype=str)
-
-        # Mapping header Excel ke nama kolom database kita
-        # 'PIMPINAN' sekarang akan digunakan untuk mencari id_pimpinan
-        column_mapping = {
-            'TANGGAL': 'tanggal_kegiatan',
-            'KEGIATAN': 'uraian_kegiatan',
-            'TEMPAT/RUANGAN': 'tempat_ruangan',
-            # 'PIMPINAN' akan diurai terpisah
-            'PELAKSANA/PESERTA': 'daftar_peserta',
-            'TGL INPUT': 'tanggal_input',
-            'WKT INPUT': 'waktu_input',
-            'PIC': 'narahubung',
-            'KONTAK PERSON': 'kontak_person'
-        }
-
-        # Cache pimpinan data to avoid repeated DB queries
-        # pimpinan_name -> pimpinan_id
-        pimpinan_cache = {p['nama'].lower(): p['id'] for p in get_all_pimpinan()}
-
-        for row_idx, row_series in df.iterrows():
-            excel_row_number = row_idx + 2 
-
-            data = {}
-            for excel_col, db_col in column_mapping.items():
-                cell_value = str(row_series.get(excel_col, '')).strip()
-                if cell_value.lower() == 'nan':
-                    cell_value = ''
-                data[db_col] = cell_value
-
-            # --- Tangani Kolom PIMPINAN dari Excel ---
-            pimpinan_excel_name = str(row_series.get('PIMPINAN', '')).strip()
-            if not pimpinan_excel_name:
-                errors.append(f"Baris {excel_row_number}: Kolom PIMPINAN kosong. Kegiatan tidak akan ditambahkan.")
-                failed_count += 1
-                continue
-            
-            id_pimpinan_found = pimpinan_cache.get(pimpinan_excel_name.lower())
-            
-            if id_pimpinan_found is None:
-                # Pimpinan tidak ditemukan, tambahkan sebagai pimpinan baru
-                success_add_pimpinan, msg_add_pimpinan, new_pimpinan_id = add_pimpinan(pimpinan_excel_name)
-                if success_add_pimpinan:
-                    id_pimpinan_found = new_pimpinan_id
-                    pimpinan_cache[pimpinan_excel_name.lower()] = new_pimpinan_id # Update cache
-                    print(f"DEBUG: Pimpinan '{pimpinan_excel_name}' ditambahkan otomatis.")
-                else:
-                    errors.append(f"Baris {excel_row_number}: Gagal menambahkan pimpinan otomatis '{pimpinan_excel_name}': {msg_add_pimpinan}. Kegiatan tidak ditambahkan.")
-                    failed_count += 1
-                    continue
-            
-            data['id_pimpinan'] = id_pimpinan_found
-
-            # --- Tangani kolom WAKTU dari Excel untuk waktu_mulai_kegiatan dan waktu_akhir_kegiatan ---
-            excel_time_raw = str(row_series.get('WAKTU', '')).strip()
-            
-            if not excel_time_raw:
-                errors.append(f"Baris {excel_row_number}: Kolom WAKTU kosong. Baris dilewati.")
-                failed_count += 1
-                continue
-
-            try:
-                start_time_str, end_time_str = excel_time_raw.split('-')
-                data['waktu_mulai_kegiatan'] = start_time_str.strip()
-                data['waktu_akhir_kegiatan'] = end_time_str.strip()
-            except ValueError:
-                errors.append(f"Baris {excel_row_number}: Format WAKTU '{excel_time_raw}' tidak valid. Harap gunakan 'HH:MM - HH:MM'.")
-                failed_count += 1
-                continue
-
-            # Lewati baris jika kolom kegiatan utama (tanggal, waktu_mulai, waktu_akhir, uraian) kosong
-            if not all([data['tanggal_kegiatan'], data['waktu_mulai_kegiatan'], data['waktu_akhir_kegiatan'], data['uraian_kegiatan']]):
-                errors.append(f"Baris {excel_row_number}: Data utama (Tanggal, Waktu, Uraian) tidak lengkap.")
-                failed_count += 1
-                continue
-
-            # Auto-fill 'tanggal_input' dan 'waktu_input' jika tidak ada di Excel
-            if not data.get('tanggal_input'):
-                data['tanggal_input'] = datetime.now().strftime('%Y-%m-%d')
-            if not data.get('waktu_input'):
-                data['waktu_input'] = datetime.now().strftime('%H:%M')
-
-            # --- Validasi dan Konversi Format Tanggal Kegiatan ---
-            try:
-                tanggal_kegiatan_obj = datetime.strptime(data['tanggal_kegiatan'], '%d-%m-%Y').date() # Assuming DD-MM-YYYY
-                data['tanggal_kegiatan'] = tanggal_kegiatan_obj.strftime('%Y-%m-%d')
-            except ValueError as ve:
-                errors.append(f"Baris {excel_row_number}: Format TANGGAL '{data.get('tanggal_kegiatan')}' tidak valid. (Harap pakai DD-MM-YYYY). Error: {ve}")
-                failed_count += 1
-                continue 
-            
-            # --- Validasi Format Waktu Mulai dan Waktu Akhir ---
-            try:
-                start_time_obj = datetime.strptime(data['waktu_mulai_kegiatan'], '%H:%M').time()
-                end_time_obj = datetime.strptime(data['waktu_akhir_kegiatan'], '%H:%M').time()
-                if start_time_obj >= end_time_obj:
-                    errors.append(f"Baris {excel_row_number}: Waktu Mulai ({data['waktu_mulai_kegiatan']}) harus lebih awal dari Waktu Akhir ({data['waktu_akhir_kegiatan']}).")
-                    failed_count += 1
-                    continue
-            except ValueError as ve:
-                errors.append(f"Baris {excel_row_number}: Format Waktu Mulai atau Waktu Akhir tidak valid. (Harap pakai HH:MM). Error: {ve}")
-                failed_count += 1
-                continue
-
-            success, message = add_activity(data)
-            
-            if success:
-                imported_count += 1
-            else:
-                failed_count += 1
-                errors.append(f"Baris {excel_row_number}: {message} (Kegiatan: {data.get('uraian_kegiatan', 'N/A')})")
-    
-    except FileNotFoundError:
-        errors.append("File Excel tidak ditemukan.")
-    except pd.errors.EmptyDataError:
-        errors.append("File Excel kosong atau tidak memiliki data yang valid.")
-    except Exception as e:
-        errors.append(f"Terjadi kesalahan saat membaca file Excel: {e}")
-    
-    return imported_count, failed_count, errors
-
-if __name__ == '__main__':
-    import os
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    
-    # Ganti dengan path ke file Excel yang Anda ingin uji
-    test_excel_path = os.path.join(current_dir, 'Jadwal Giat Pimpinan Lemhannas RI.xlsx - JUNI 2025.xlsx')
-
-    # Pastikan tabel sudah dibuat
-    create_table()
-
-    print(f"Mencoba mengimpor dari: {test_excel_path}")
-    imported, failed, errs = import_activities_from_excel(test_excel_path)
-    print(f"Import Selesai. Berhasil: {imported}, Gagal: {failed}")
-    if errs:
-        print("Detail Error:")
-        for err in errs:
-            print(err)
\ No newline at end of file
+import pandas as pd
+from collections import deque
+from datetime import datetime, date, time
+import hashlib
+from itertools import islice
+import logging
+import os
+import queue
+import threading
+import sqlite3 # Diperlukan untuk create_table di bagian __main__ untuk pengujian
+
+# Import fungsi dari db_handler yang sudah diupdate
+from db_handler import (
+    add_activity, add_activities_bulk, update_activities_bulk, delete_activities_bulk, get_all_pimpinan,
+    add_pimpinan, create_table, transaction, get_conflict_indexes_snapshot, format_conflict_message, close_db,
+    get_activity_by_id, get_activities_by_source_prefix
+)
+from conflict_index import parse_participants, room_conflict_key, time_range_to_minutes
+from instrumentation import profile
+
+logger = logging.getLogger(__name__)
+
+# Mapping header Excel ke nama kolom database kita
+# 'PIMPINAN' sekarang akan digunakan untuk mencari id_pimpinan
+COLUMN_MAPPING = {
+    'TANGGAL': 'tanggal_kegiatan',
+    'KEGIATAN': 'uraian_kegiatan',
+    'TEMPAT/RUANGAN': 'tempat_ruangan',
+    # 'PIMPINAN' akan diurai terpisah
+    'PELAKSANA/PESERTA': 'daftar_peserta',
+    'TGL INPUT': 'tanggal_input',
+    'WKT INPUT': 'waktu_input',
+    'PIC': 'narahubung',
+    'KONTAK PERSON': 'kontak_person'
+}
+
+# Format TANGGAL yang diterima: DD-MM-YYYY (teks), atau sel bertipe tanggal di Excel
+# yang terbaca sebagai teks 'YYYY-MM-DD HH:MM:SS' karena dtype=str
+DATE_FORMATS = ['%d-%m-%Y', '%Y-%m-%d %H:%M:%S']
+TIME_FORMAT = '%H:%M'
+
+def _text_column(df, excel_col):
+    # Kolom teks yang sudah di-strip; sel kosong/NaN menjadi ''
+    if excel_col not in df.columns:
+        return pd.Series('', index=df.index, dtype=object)
+    values = df[excel_col].astype(object).where(df[excel_col].notna(), '').astype(str).str.strip()
+    return values.mask(values.str.lower() == 'nan', '')
+
+def _parse_dates(values):
+    parsed = pd.Series(pd.NaT, index=values.index, dtype='datetime64[ns]')
+    for date_format in DATE_FORMATS:
+        missing = parsed.isna()
+        if not missing.any():
+            break
+        parsed[missing] = pd.to_datetime(values[missing], format=date_format, errors='coerce')
+    return parsed
+
+# Tahap pra-proses tervektorisasi: seluruh kolom diurai dengan operasi pandas sekaligus,
+# menghasilkan kolom bertipe dan mask error dalam satu lintasan.
+# Index df = nomor baris Excel - 2 (header di baris 1). row_prefix mis. "[JUNI 2025] " untuk
+# membedakan sheet pada workbook dengan banyak sheet.
+# Kembalikan (DataFrame baris valid, list pesan error per baris sesuai urutan baris).
+# Kolom hasil: kolom database + 'row_label' ("Baris N") dan 'pimpinan_nama' (nama PIMPINAN dari Excel).
+def normalize_dataframe(df, row_prefix=""):
+    row_label = row_prefix + "Baris " + pd.Series(df.index + 2, index=df.index).astype(str)
+    prefix = row_label + ": "
+
+    out = pd.DataFrame({db_col: _text_column(df, excel_col) for excel_col, db_col in COLUMN_MAPPING.items()},
+                       index=df.index)
+    pimpinan = _text_column(df, 'PIMPINAN')
+    waktu = _text_column(df, 'WAKTU')
+
+    # WAKTU "HH:MM - HH:MM" -> dua bagian (tepat satu tanda '-')
+    waktu_parts = waktu.str.extract(r'^([^-]*)-([^-]*)$')
+    start_raw = waktu_parts[0].fillna('').str.strip()
+    end_raw = waktu_parts[1].fillna('').str.strip()
+    start_dt = pd.to_datetime(start_raw, format=TIME_FORMAT, errors='coerce')
+    end_dt = pd.to_datetime(end_raw, format=TIME_FORMAT, errors='coerce')
+    tanggal_dt = _parse_dates(out['tanggal_kegiatan'])
+
+    # Urutan pengecekan sama dengan validasi per baris sebelumnya; pesan pertama yang gagal yang dipakai
+    checks = [
+        (pimpinan == '',
+         prefix + "Kolom PIMPINAN kosong. Kegiatan tidak akan ditambahkan."),
+        (waktu == '',
+         prefix + "Kolom WAKTU kosong. Baris dilewati."),
+        (waktu_parts[0].isna(),
+         prefix + "Format WAKTU '" + waktu + "' tidak valid. Harap gunakan 'HH:MM - HH:MM'."),
+        ((out['tanggal_kegiatan'] == '') | (start_raw == '') | (end_raw == '') | (out['uraian_kegiatan'] == ''),
+         prefix + "Data utama (Tanggal, Waktu, Uraian) tidak lengkap."),
+        (tanggal_dt.isna(),
+         prefix + "Format TANGGAL '" + out['tanggal_kegiatan'] + "' tidak valid. (Harap pakai DD-MM-YYYY)."),
+        (start_dt.isna() | end_dt.isna(),
+         prefix + "Format Waktu Mulai atau Waktu Akhir ('" + start_raw + "' - '" + end_raw + "') tidak valid. (Harap pakai HH:MM)."),
+        (start_dt >= end_dt,
+         prefix + "Waktu Mulai (" + start_raw + ") harus lebih awal dari Waktu Akhir (" + end_raw + ")."),
+    ]
+    error = pd.Series(None, index=df.index, dtype=object)
+    for mask, message in reversed(checks):
+        error = error.mask(mask, message)
+    error_mask = error.notna()
+
+    valid = ~error_mask
+    out['tanggal_kegiatan'] = tanggal_dt.dt.strftime('%Y-%m-%d')
+    out['waktu_mulai_kegiatan'] = start_dt.dt.strftime(TIME_FORMAT)
+    out['waktu_akhir_kegiatan'] = end_dt.dt.strftime(TIME_FORMAT)
+    # Auto-fill 'tanggal_input' dan 'waktu_input' jika tidak ada di Excel
+    now = datetime.now()
+    out['tanggal_input'] = out['tanggal_input'].mask(out['tanggal_input'] == '', now.strftime('%Y-%m-%d'))
+    out['waktu_input'] = out['waktu_input'].mask(out['waktu_input'] == '', now.strftime('%H:%M'))
+    out['row_label'] = row_label
+    out['pimpinan_nama'] = pimpinan
+
+    return out[valid], error[error_mask].tolist()
+
+# Cari id_pimpinan untuk setiap nama PIMPINAN unik (tidak peka huruf besar/kecil),
+# tambahkan pimpinan baru secara otomatis jika belum ada.
+# pimpinan_cache: {nama_lowercase: id}, dipakai bersama antar-chunk
+# Kembalikan (DataFrame baris dengan kolom id_pimpinan, list pesan error)
+def _resolve_pimpinan(valid_rows, pimpinan_cache):
+    errors = []
+    failed_keys = {}
+
+    pimpinan_keys = valid_rows['pimpinan_nama'].str.lower()
+    for key, pimpinan_excel_name in zip(pimpinan_keys, valid_rows['pimpinan_nama']):
+        if key in pimpinan_cache or key in failed_keys:
+            continue
+        # Pimpinan tidak ditemukan, tambahkan sebagai pimpinan baru
+        success_add_pimpinan, msg_add_pimpinan, new_pimpinan_id = add_pimpinan(pimpinan_excel_name)
+        if success_add_pimpinan:
+            pimpinan_cache[key] = new_pimpinan_id # Update cache
+            logger.info("Pimpinan '%s' ditambahkan otomatis.", pimpinan_excel_name)
+        else:
+            failed_keys[key] = msg_add_pimpinan
+
+    if failed_keys:
+        failed = pimpinan_keys.isin(list(failed_keys))
+        for row_label, pimpinan_excel_name, key in zip(valid_rows.loc[failed, 'row_label'],
+                                                       valid_rows.loc[failed, 'pimpinan_nama'],
+                                                       pimpinan_keys[failed]):
+            errors.append(f"{row_label}: Gagal menambahkan pimpinan otomatis '{pimpinan_excel_name}': {failed_keys[key]}. Kegiatan tidak ditambahkan.")
+        valid_rows = valid_rows[~failed]
+        pimpinan_keys = pimpinan_keys[~failed]
+
+    valid_rows = valid_rows.assign(id_pimpinan=pimpinan_keys.map(pimpinan_cache))
+    return valid_rows, errors
+
+def _rows_to_records(valid_rows):
+    # DataFrame -> list (row_label, data, nama_pimpinan) untuk tahap database
+    records = []
+    for row in valid_rows.to_dict('records'):
+        data = {db_col: row[db_col] for db_col in COLUMN_MAPPING.values()}
+        data['waktu_mulai_kegiatan'] = row['waktu_mulai_kegiatan']
+        data['waktu_akhir_kegiatan'] = row['waktu_akhir_kegiatan']
+        data['id_pimpinan'] = int(row['id_pimpinan'])
+        records.append((row['row_label'], data, row['pimpinan_nama']))
+    return records
+
+def _prepare_rows(df, pimpinan_cache, row_prefix=""):
+    # Pra-proses tervektorisasi + resolusi pimpinan; hanya baris yang lolos yang sampai ke tahap database
+    valid_rows, errors = normalize_dataframe(df, row_prefix)
+    valid_rows, pimpinan_errors = _resolve_pimpinan(valid_rows, pimpinan_cache)
+    errors.extend(pimpinan_errors)
+    return _rows_to_records(valid_rows), errors
+
+TEMP_ID_BASE = 1 << 62
+VALIDATOR_MAX_DATES = 366 # Index bentrok per tanggal yang disimpan BatchValidator sebelum yang terlama dibuang
+
+# --- Impor Ulang Idempoten ---
+# Setiap baris yang diimpor menyimpan kunci_sumber 'excel:<file>/<sheet>/<tanggal>/<id_pimpinan>/<n>'
+# (n = urutan kegiatan pimpinan itu pada tanggal itu di sheet) dan sidik_jari (hash isi baris).
+# Saat sheet yang direvisi diimpor lagi: baris dengan sidik jari sama dilewati tanpa validasi,
+# baris yang berubah diperbarui di tempat, baris baru ditambahkan, dan (opsional) baris yang
+# hilang dari sheet dihapus. Identitas memakai tanggal + pimpinan + urutan, bukan nomor baris
+# Excel, sehingga menyisipkan baris di tengah sheet tidak menggeser identitas tanggal lain; baris
+# dengan tanggal dan pimpinan yang sama dicocokkan lebih dulu berdasarkan sidik jarinya.
+# '/' tidak boleh ada di nama file maupun nama sheet Excel, jadi aman sebagai pemisah.
+SOURCE_KEY_PREFIX = 'excel:'
+FINGERPRINT_FIELDS = ('tanggal_kegiatan', 'waktu_mulai_kegiatan', 'waktu_akhir_kegiatan', 'uraian_kegiatan',
+                      'tempat_ruangan', 'id_pimpinan', 'daftar_peserta', 'narahubung', 'kontak_person')
+
+def activity_fingerprint(data):
+    # tanggal_input/waktu_input tidak ikut: keduanya diisi otomatis dengan waktu impor jika kosong
+    content = "\x1f".join(str(data.get(field) or '') for field in FINGERPRINT_FIELDS)
+    return hashlib.blake2b(content.encode('utf-8'), digest_size=8).hexdigest()
+
+def source_key_prefix(source_name, sheet_name=None):
+    prefix = f"{SOURCE_KEY_PREFIX}{source_name}/"
+    return prefix if sheet_name is None else f"{prefix}{sheet_name}/"
+
+def _empty_summary():
+    return {'inserted': 0, 'updated': 0, 'unchanged': 0, 'removed': 0, 'failed': 0}
+
+class SourceRows:
+    # Baris hasil impor sebelumnya dari satu file (dalam cakupan impor ini), dikelompokkan per
+    # identitas sheet/tanggal/pimpinan agar baris yang tidak berubah dikenali walau urutannya bergeser
+    def __init__(self, source_name, sheet_names=None):
+        self.source_name = source_name
+        self.prefixes = ([source_key_prefix(source_name)] if sheet_names is None else
+                         [source_key_prefix(source_name, sheet_name) for sheet_name in sheet_names])
+        self.rows = {} # kunci_sumber -> (id, sidik_jari, tanggal)
+        self.unclaimed = {} # identitas -> {kunci_sumber: sidik_jari} yang belum dipakai baris file ini
+        self.ordinals = {} # identitas -> urutan yang sudah dipakai
+        for prefix in self.prefixes:
+            for row in get_activities_by_source_prefix(prefix):
+                key = row['kunci_sumber']
+                identity, ordinal = key.rsplit('/', 1)
+                self.rows[key] = (row['id'], row['sidik_jari'], row['tanggal_kegiatan'])
+                self.unclaimed.setdefault(identity, {})[key] = row['sidik_jari']
+                self.ordinals.setdefault(identity, set()).add(int(ordinal))
+        self.ids = {activity_id for activity_id, _, _ in self.rows.values()}
+        self.sheets_with_errors = set()
+
+    def _claim(self, key):
+        identity = key.rsplit('/', 1)[0]
+        del self.unclaimed[identity][key]
+
+    def classify(self, sheet_name, parsed_rows):
+        # Beri kunci dan sidik jari pada setiap baris. Kembalikan (baris yang perlu divalidasi sebagai
+        # (row_label, data, nama_pimpinan, id lama atau None, tanggal lama), jumlah baris tidak berubah)
+        rows = []
+        unchanged = 0
+        # Tahap 1: baris yang isinya sama dengan baris lama pada tanggal/pimpinan yang sama -> tidak berubah
+        for row_label, data, pimpinan_name in parsed_rows:
+            identity = f"{source_key_prefix(self.source_name, sheet_name)}{data['tanggal_kegiatan']}/{data['id_pimpinan']}"
+            fingerprint = activity_fingerprint(data)
+            candidates = self.unclaimed.get(identity, {})
+            key = next((k for k, f in candidates.items() if f == fingerprint), None)
+            if key is not None:
+                self._claim(key)
+                unchanged += 1
+                continue
+            rows.append((row_label, data, pimpinan_name, identity, fingerprint))
+
+        # Tahap 2: sisanya memperbarui baris lama yang belum dipakai (urutan terkecil), atau menjadi baris baru
+        to_validate = []
+        for row_label, data, pimpinan_name, identity, fingerprint in rows:
+            candidates = self.unclaimed.get(identity)
+            if candidates:
+                key = min(candidates, key=lambda k: int(k.rsplit('/', 1)[1]))
+                self._claim(key)
+                activity_id, _, old_date = self.rows[key]
+            else:
+                used = self.ordinals.setdefault(identity, set())
+                ordinal = len(used) + 1
+                while ordinal in used:
+                    ordinal += 1
+                used.add(ordinal)
+                key = f"{identity}/{ordinal}"
+                activity_id, old_date = None, None
+            data = dict(data, kunci_sumber=key, sidik_jari=fingerprint)
+            to_validate.append((row_label, data, pimpinan_name, activity_id, old_date))
+        return to_validate, unchanged
+
+    def missing(self):
+        # (id, tanggal) baris lama yang tidak ada lagi di file. Sheet yang punya baris gagal dibaca dilewati:
+        # baris itu tidak mendapat kunci, padahal mungkin masih ada di sheet. Baris yang gagal karena
+        # bentrok tetap punya kunci, jadi baris lamanya tidak ikut terhapus.
+        skipped = tuple(source_key_prefix(self.source_name, sheet_name) for sheet_name in self.sheets_with_errors)
+        return [(activity_id, old_date)
+                for candidates in self.unclaimed.values() for key in candidates
+                if not key.startswith(skipped)
+                for activity_id, _, old_date in [self.rows[key]]]
+
+# Validasi bentrok baris impor di memori: terhadap snapshot index bentrok tanggal-tanggal
+# yang terlibat (diambil sekali per tanggal), dan terhadap baris lain di file yang sama.
+# Satu validator dipakai untuk seluruh chunk/sheet dalam satu impor. Paling banyak max_dates index
+# tanggal disimpan: tanggal yang paling lama tidak dipakai dibuang, dan jika muncul lagi dibangun ulang
+# dari database (di dalam transaksi impor, sehingga baris yang sudah ditulis ikut terbaca).
+class BatchValidator:
+    def __init__(self, deferrable_ids=None, max_dates=None):
+        self.day_indexes = {} # tanggal -> DayConflictIndex (snapshot + baris impor yang diterima), urut terakhir dipakai
+        self.max_dates = max_dates or VALIDATOR_MAX_DATES
+        self.row_labels = {} # id (sementara atau id kegiatan yang diperbarui) -> label baris Excel
+        # Baris yang hanya bentrok dengan kegiatan ini (baris hasil impor sebelumnya dari file yang sama,
+        # yang mungkin masih akan pindah waktu atau dihapus) tidak langsung ditolak, tetapi ditampung
+        # di deferred dan divalidasi ulang oleh retry_deferred di akhir impor
+        self.deferrable_ids = deferrable_ids or set()
+        self.deferred = []
+        self._next_temp_id = TEMP_ID_BASE
+
+    def _load_dates(self, dates):
+        for activity_date in dates & self.day_indexes.keys():
+            self.day_indexes[activity_date] = self.day_indexes.pop(activity_date) # Tandai baru dipakai
+        new_dates = dates - self.day_indexes.keys()
+        if new_dates:
+            self.day_indexes.update(get_conflict_indexes_snapshot(new_dates))
+        self._evict(len(self.day_indexes) - max(self.max_dates, len(dates)))
+
+    def _evict(self, count):
+        # Buang index tanggal yang paling lama tidak dipakai (tidak pernah tanggal chunk ini, yang ada
+        # di akhir dict). Label baris ikut dibuang: setelah dibangun ulang, baris file ini yang sudah
+        # ditulis muncul dengan id aslinya dan dilaporkan sebagai kegiatan biasa
+        for activity_date in list(self.day_indexes)[:max(count, 0)]:
+            for index_id in self.day_indexes.pop(activity_date).activities:
+                self.row_labels.pop(index_id, None)
+
+    def _find_identical(self, data, conflicts):
+        # Kegiatan tanpa kunci_sumber (mis. diimpor sebelum ada sidik jari, atau diketik ulang) yang isinya
+        # sama persis dengan baris ini: diadopsi sebagai baris ini, bukan dilaporkan sebagai bentrok
+        for conflict in conflicts:
+            if conflict['id'] <= 0 or conflict['id'] in self.row_labels:
+                continue
+            activity = get_activity_by_id(conflict['id'])
+            if activity is not None and activity['kunci_sumber'] is None and \
+                    activity_fingerprint(dict(activity)) == data['sidik_jari']:
+                return conflict['id'], activity['tanggal_kegiatan']
+        return None, None
+
+    def _release(self, activity_id, old_date, released):
+        # Lepas posisi lama kegiatan yang diperbarui dari index; disimpan di released agar bisa
+        # dikembalikan jika barisnya tidak jadi ditulis
+        day_index = self.day_indexes[old_date]
+        if activity_id in day_index.activities:
+            released[activity_id] = (old_date, day_index.activities[activity_id])
+            day_index.remove(activity_id)
+
+    def _place(self, row, released):
+        # Cek satu baris (list [row_label, data, nama_pimpinan, id lama, tanggal lama]) terhadap index.
+        # Kembalikan (id di index, None) jika diterima, (None, pesan error) jika gagal, (None, None) jika ditunda
+        row_label, data, pimpinan_name, activity_id, old_date = row
+        start, end = time_range_to_minutes(data['waktu_mulai_kegiatan'], data['waktu_akhir_kegiatan'])
+        participants = parse_participants(data['daftar_peserta'])
+        room = room_conflict_key(data['tempat_ruangan'])
+        day_index = self.day_indexes[data['tanggal_kegiatan']]
+
+        # Baris yang diperbarui tidak bentrok dengan versi lamanya sendiri
+        conflicts = day_index.find_conflicts(start, end, data['id_pimpinan'], participants,
+                                             exclude_id=activity_id, room=room)
+        if conflicts and activity_id is None and 'sidik_jari' in data:
+            identical_id, identical_date = self._find_identical(data, conflicts)
+            if identical_id is not None:
+                row[3], row[4] = identical_id, identical_date
+                self._release(identical_id, identical_date, released)
+                activity_id = identical_id
+                conflicts = [c for c in conflicts if c['id'] != identical_id]
+        if conflicts and all(c['id'] in self.deferrable_ids for c in conflicts):
+            return None, None
+        if conflicts:
+            message = format_conflict_message(conflicts, pimpinan_name, data['tempat_ruangan'] or "")
+            # Baris dari file ini disimpan di index dengan id sementara (lihat row_labels)
+            sheet_rows = [self.row_labels[c['id']] for c in conflicts if c['id'] in self.row_labels]
+            if sheet_rows:
+                message += f" Bentrok dengan {', '.join(sheet_rows)} di file ini."
+            return None, f"{row_label}: {message} (Kegiatan: {data.get('uraian_kegiatan', 'N/A')})"
+
+        if activity_id is None:
+            # Id sementara di atas id Kegiatan mana pun; id negatif dipakai kejadian kegiatan berulang
+            index_id = self._next_temp_id
+            self._next_temp_id += 1
+        else:
+            index_id = activity_id
+        self.row_labels[index_id] = row_label
+        day_index.add(index_id, start, end, data['id_pimpinan'], participants, room)
+        return index_id, None
+
+    def _unplace(self, index_id, row):
+        self.day_indexes[row[1]['tanggal_kegiatan']].remove(index_id)
+        del self.row_labels[index_id]
+
+    def validate(self, parsed_rows):
+        # parsed_rows: list (row_label, data, nama_pimpinan[, id kegiatan lama, tanggal lama]);
+        # id lama diisi untuk baris yang memperbarui kegiatan hasil impor sebelumnya.
+        # Kembalikan (list (data, id lama atau None, tanggal lama) yang lolos, list pesan error);
+        # baris yang ditunda masuk ke self.deferred
+        rows = [list(row) if len(row) == 5 else [*row, None, None] for row in parsed_rows]
+        self._load_dates({row[1]['tanggal_kegiatan'] for row in rows} | {row[4] for row in rows if row[4]})
+
+        # Posisi lama semua baris yang diperbarui dilepas lebih dulu, sehingga baris yang bertukar atau
+        # bergeser waktu tidak bentrok dengan posisi lama satu sama lain, apa pun urutannya di sheet
+        released = {}
+        for row in rows:
+            if row[3] is not None:
+                self._release(row[3], row[4], released)
+
+        results = [self._place(row, released) for row in rows]
+        placed = {index_id: position for position, (index_id, _) in enumerate(results) if index_id is not None}
+
+        # Baris yang diperbarui tetapi gagal/ditunda tetap di posisi lamanya. Baris lain yang sudah diterima
+        # di posisi itu dicek ulang; jika ikut gagal, posisi lamanya juga dikembalikan, dan seterusnya
+        pending = [row[3] for row, (index_id, _) in zip(rows, results) if index_id is None and row[3] in released]
+        while pending:
+            activity_id = pending.pop()
+            old_date, entry = released.pop(activity_id)
+            start, end, id_pimpinan, participants, room = entry
+            day_index = self.day_indexes[old_date]
+            clashes = [c['id'] for c in day_index.find_conflicts(start, end, id_pimpinan, participants, room=room)
+                       if c['id'] in placed]
+            day_index.add(activity_id, *entry)
+            for index_id in clashes:
+                position = placed.pop(index_id)
+                self._unplace(index_id, rows[position])
+                results[position] = self._place(rows[position], released)
+                if results[position][0] is not None:
+                    placed[results[position][0]] = position
+                elif rows[position][3] in released:
+                    pending.append(rows[position][3])
+
+        accepted = []
+        errors = []
+        for row, (index_id, error) in zip(rows, results):
+            if index_id is not None:
+                accepted.append((row[1], row[3], row[4]))
+            elif error is not None:
+                errors.append(error)
+            else:
+                self.deferred.append(tuple(row))
+        return accepted, errors
+
+    def retry_deferred(self, removed=()):
+        # Validasi ulang baris yang ditunda, setelah semua baris file diproses.
+        # removed: list (id, tanggal) kegiatan yang baru dihapus karena hilang dari sheet
+        for activity_id, activity_date in removed:
+            if activity_date in self.day_indexes:
+                self.day_indexes[activity_date].remove(activity_id)
+        deferred, self.deferred = self.deferred, []
+        self.deferrable_ids = set()
+        return self.validate(deferred)
+
+# --- Pembacaan Workbook Secara Streaming ---
+DEFAULT_CHUNK_SIZE = 500
+STREAMING_EXTENSIONS = ('.xlsx', '.xlsm')
+
+def _cell_to_text(value):
+    # Samakan nilai sel openpyxl dengan hasil pd.read_excel(dtype=str)
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, date):
+        return value.strftime('%Y-%m-%d 00:00:00')
+    if isinstance(value, time):
+        return value.strftime('%H:%M')
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value)) # mis. nomor telepon yang tersimpan sebagai angka
+    return str(value)
+
+def list_excel_sheets(file_path):
+    if file_path.lower().endswith(STREAMING_EXTENSIONS):
+        from openpyxl import load_workbook
+        workbook = load_workbook(file_path, read_only=True)
+        try:
+            return list(workbook.sheetnames)
+        finally:
+            workbook.close()
+    return list(pd.ExcelFile(file_path).sheet_names)
+
+def estimate_excel_rows(file_path, sheet_names=None):
+    # Perkiraan jumlah baris data (tanpa header) dari dimensi sheet, tanpa membaca isinya.
+    # Kembalikan None jika tidak bisa diperkirakan.
+    if not file_path.lower().endswith(STREAMING_EXTENSIONS):
+        return None
+    from openpyxl import load_workbook
+    workbook = load_workbook(file_path, read_only=True)
+    try:
+        total = 0
+        for sheet_name in (sheet_names or workbook.sheetnames):
+            max_row = workbook[sheet_name].max_row
+            if max_row is None:
+                return None
+            total += max(max_row - 1, 0)
+        return total
+    finally:
+        workbook.close()
+
+def iter_excel_chunks(file_path, sheet_names=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    # Hasilkan (nama_sheet, DataFrame chunk) untuk semua sheet (atau sheet_names saja).
+    # .xlsx dibaca dengan openpyxl read_only + iter_rows(values_only=True), sehingga memori
+    # yang dipakai sebatas satu chunk. Index DataFrame = nomor baris Excel - 2.
+    if not file_path.lower().endswith(STREAMING_EXTENSIONS):
+        # Format lama (.xls) tidak didukung openpyxl: baca per sheet dengan pandas lalu potong
+        for sheet_name in (sheet_names or list_excel_sheets(file_path)):
+            df = pd.read_excel(file_path, sheet_name=sheet_name, header=0, dtype=str)
+            for start in range(0, len(df), chunk_size):
+                yield sheet_name, df.iloc[start:start + chunk_size]
+        return
+
+    from openpyxl import load_workbook
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        for sheet_name in (sheet_names or workbook.sheetnames):
+            rows = workbook[sheet_name].iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                continue # Sheet kosong
+            columns = [str(h).strip() if h is not None else f"_kolom_{i}" for i, h in enumerate(header)]
+
+            buffer, index = [], []
+            for excel_row_number, values in enumerate(rows, start=2):
+                if all(v is None or (isinstance(v, str) and not v.strip()) for v in values):
+                    continue # Baris kosong
+                values = list(values[:len(columns)]) + [None] * (len(columns) - len(values))
+                buffer.append([_cell_to_text(v) for v in values])
+                index.append(excel_row_number - 2)
+                if len(buffer) >= chunk_size:
+                    yield sheet_name, pd.DataFrame(buffer, columns=columns, index=index)
+                    buffer, index = [], []
+            if buffer:
+                yield sheet_name, pd.DataFrame(buffer, columns=columns, index=index)
+    finally:
+        workbook.close()
+
+class ImportCancelled(Exception):
+    pass
+
+def _write_accepted(accepted, summary):
+    # accepted: hasil BatchValidator.validate; baris baru ditambahkan, baris lama diperbarui di tempat
+    inserts = [data for data, activity_id, _ in accepted if activity_id is None]
+    updates = [(activity_id, data, old_date) for data, activity_id, old_date in accepted if activity_id is not None]
+    success, message, new_ids = add_activities_bulk(inserts)
+    if success:
+        success, message = update_activities_bulk(updates)
+    if not success:
+        # Penulisan gagal: batalkan seluruh transaksi, tidak ada baris yang tersimpan
+        raise RuntimeError(message)
+    summary['inserted'] += len(new_ids)
+    summary['updated'] += len(updates)
+
+def _normalized_chunks(file_path, sheet_names, chunk_size):
+    # Baca sheet_names chunk demi chunk dan validasi format setiap baris, tanpa menyentuh database.
+    # Hasilkan (nama_sheet, jumlah baris, DataFrame baris valid, list pesan error)
+    multi_sheet = len(sheet_names) > 1
+    for sheet_name, chunk in iter_excel_chunks(file_path, sheet_names, chunk_size):
+        row_prefix = f"[{sheet_name}] " if multi_sheet else ""
+        valid_rows, errors = normalize_dataframe(chunk, row_prefix)
+        yield sheet_name, len(chunk), valid_rows, errors
+
+def _sync_chunks(chunks, source_name, scope_sheets, progress_callback=None, cancel_event=None, remove_missing=False):
+    # Tahap database impor: resolusi pimpinan, klasifikasi terhadap impor sebelumnya, validasi bentrok
+    # dan penulisan, semuanya dalam satu transaksi. chunks: hasil _normalized_chunks.
+    # scope_sheets: sheet yang diimpor, atau None jika seluruh file (cakupan remove_missing)
+    summary = _empty_summary()
+    rows_read = 0
+    errors = []
+
+    # Cache pimpinan data to avoid repeated DB queries
+    # pimpinan_name -> pimpinan_id
+    pimpinan_cache = {p['nama'].lower(): p['id'] for p in get_all_pimpinan()}
+    source_rows = SourceRows(source_name, scope_sheets)
+    validator = BatchValidator(set(source_rows.ids))
+
+    with transaction():
+        for sheet_name, chunk_rows, valid_rows, chunk_errors in chunks:
+            if cancel_event is not None and cancel_event.is_set():
+                raise ImportCancelled()
+            valid_rows, pimpinan_errors = _resolve_pimpinan(valid_rows, pimpinan_cache)
+            chunk_errors = chunk_errors + pimpinan_errors
+            if chunk_errors:
+                source_rows.sheets_with_errors.add(sheet_name)
+            to_validate, unchanged = source_rows.classify(sheet_name, _rows_to_records(valid_rows))
+            accepted, conflict_errors = validator.validate(to_validate)
+            chunk_errors.extend(conflict_errors)
+
+            _write_accepted(accepted, summary)
+
+            rows_read += chunk_rows
+            summary['unchanged'] += unchanged
+            summary['failed'] += len(chunk_errors)
+            errors.extend(chunk_errors)
+            if progress_callback:
+                progress_callback({
+                    'type': 'progress',
+                    'sheet': sheet_name,
+                    'rows_read': rows_read,
+                    'rows_imported': summary['inserted'] + summary['updated'],
+                    'rows_unchanged': summary['unchanged'],
+                    'rows_failed': summary['failed'],
+                })
+
+        if cancel_event is not None and cancel_event.is_set():
+            raise ImportCancelled()
+
+        missing = []
+        if remove_missing:
+            missing = source_rows.missing()
+            success, message = delete_activities_bulk([activity_id for activity_id, _ in missing])
+            if not success:
+                raise RuntimeError(message)
+            summary['removed'] = len(missing)
+            for sheet_name in sorted(source_rows.sheets_with_errors):
+                errors.append(f"[{sheet_name}] Ada baris yang tidak valid, jadi kegiatan yang hilang dari sheet ini tidak dihapus.")
+        # Baris yang tadinya bentrok dengan baris lama file ini yang sudah pindah waktu atau dihapus
+        accepted, deferred_errors = validator.retry_deferred(missing)
+        _write_accepted(accepted, summary)
+        summary['failed'] += len(deferred_errors)
+        errors.extend(deferred_errors)
+
+    return summary, errors
+
+def import_excel_streaming(file_path, sheet_names=None, chunk_size=DEFAULT_CHUNK_SIZE, progress_callback=None,
+                           cancel_event=None, source_name=None, remove_missing=False):
+    # Impor semua sheet (atau sheet_names) chunk demi chunk dalam satu transaksi.
+    # Baris yang sudah pernah diimpor dari file ini (source_name, default nama file) dan tidak berubah
+    # dilewati, yang berubah diperbarui; remove_missing=True menghapus baris yang hilang dari sheet.
+    # progress_callback(event) dipanggil setiap selesai satu chunk dengan dict:
+    # {'type': 'progress', 'sheet', 'rows_read', 'rows_imported', 'rows_unchanged', 'rows_failed'}
+    # cancel_event (threading.Event) diperiksa di antara chunk; jika diset, ImportCancelled
+    # dilempar dan seluruh transaksi dibatalkan.
+    # Kembalikan (summary {'inserted', 'updated', 'unchanged', 'removed', 'failed'}, list pesan error)
+    scope_sheets = sheet_names
+    if sheet_names is None:
+        sheet_names = list_excel_sheets(file_path)
+    return _sync_chunks(_normalized_chunks(file_path, sheet_names, chunk_size),
+                        source_name or os.path.basename(file_path), scope_sheets,
+                        progress_callback, cancel_event, remove_missing)
+
+def _run_sync(func, *args):
+    # Jalankan func (-> (summary, errors)); kesalahan membaca file dilaporkan di errors
+    # dan jika transaksi dibatalkan summary berisi nol.
+    summary = _empty_summary()
+    errors = []
+    try:
+        summary, errors = func(*args)
+    except ImportCancelled:
+        errors.append("Impor dibatalkan. Tidak ada kegiatan yang disimpan.")
+    except FileNotFoundError:
+        errors.append("File Excel tidak ditemukan.")
+    except pd.errors.EmptyDataError:
+        errors.append("File Excel kosong atau tidak memiliki data yang valid.")
+    except Exception as e:
+        errors.append(f"Terjadi kesalahan saat membaca file Excel: {e}")
+    return summary, errors
+
+# Impor satu file dan kembalikan (summary, errors) seperti import_excel_streaming.
+def sync_activities_from_excel(file_path, sheet_names=None, chunk_size=DEFAULT_CHUNK_SIZE, progress_callback=None,
+                               cancel_event=None, source_name=None, remove_missing=False):
+    return _run_sync(import_excel_streaming, file_path, sheet_names, chunk_size, progress_callback,
+                     cancel_event, source_name, remove_missing)
+
+# --- Impor Banyak Workbook Secara Paralel ---
+# Membaca .xlsx (openpyxl/pandas) memakan CPU, jadi pembacaan dan validasi format baris dijalankan
+# di ProcessPoolExecutor, satu workbook per tugas. Hasilnya (DataFrame baris yang sudah dinormalisasi)
+# dikirim ke satu penulis di proses utama yang me-resolve nama pimpinan (termasuk menambah pimpinan
+# baru), mengecek bentrok (juga terhadap file yang sudah ditulis sebelumnya) dan commit per file.
+# Penulis memproses file sesuai urutan masukan, bukan urutan selesainya worker, sehingga hasil
+# (id pimpinan baru, baris mana yang dinyatakan bentrok) selalu sama seperti impor serial.
+
+def parse_workbook(file_path, sheet_names=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    # Dijalankan di proses worker. Kembalikan list chunk hasil _normalized_chunks
+    if sheet_names is None:
+        sheet_names = list_excel_sheets(file_path)
+    return list(_normalized_chunks(file_path, sheet_names, chunk_size))
+
+def _sync_parsed_workbook(future, file_path, sheet_names, remove_missing):
+    # future.result() melempar ulang kesalahan baca dari worker (mis. FileNotFoundError)
+    return _sync_chunks(future.result(), os.path.basename(file_path), sheet_names, remove_missing=remove_missing)
+
+def sync_parsed_workbook(future, file_path, sheet_names=None, remove_missing=False):
+    # Tahap database untuk workbook yang dibaca parse_workbook di executor lain (future), mis. oleh
+    # api_server. Sumber = nama file dari file_path. Hasil (summary, errors) seperti sync_activities_from_excel
+    return _run_sync(_sync_parsed_workbook, future, file_path, sheet_names, remove_missing)
+
+def sync_workbooks_parallel(file_paths, sheet_names=None, chunk_size=DEFAULT_CHUNK_SIZE, max_workers=None,
+                            remove_missing=False):
+    # Hasilkan (file_path, summary, errors) untuk setiap file, sesuai urutan file_paths.
+    # Paling banyak 2 x max_workers workbook dibaca lebih dulu, agar memori tidak menampung semua file.
+    from concurrent.futures import ProcessPoolExecutor
+
+    file_paths = list(file_paths)
+    max_workers = max(1, min(max_workers or os.cpu_count() or 1, len(file_paths)))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        pending = deque()
+        remaining = iter(file_paths)
+        for file_path in islice(remaining, 2 * max_workers):
+            pending.append((file_path, executor.submit(parse_workbook, file_path, sheet_names, chunk_size)))
+        while pending:
+            file_path, future = pending.popleft()
+            next_path = next(remaining, None)
+            if next_path is not None:
+                pending.append((next_path, executor.submit(parse_workbook, next_path, sheet_names, chunk_size)))
+            summary, errors = sync_parsed_workbook(future, file_path, sheet_names, remove_missing)
+            yield file_path, summary, errors
+
+# Fungsi import_activities_from_excel
+# batch=True: impor streaming semua sheet (atau sheet_names), divalidasi di memori dan ditulis
+#             dalam satu transaksi; jika gagal di tengah jalan tidak ada yang tersimpan.
+#             imported = baris baru + baris yang diperbarui; baris yang tidak berubah tidak dihitung.
+# batch=False: add_activity per baris untuk sheet pertama saja (perilaku lama).
+def import_activities_from_excel(file_path, batch=True, sheet_names=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                                 progress_callback=None, cancel_event=None):
+    if batch:
+        summary, errors = sync_activities_from_excel(file_path, sheet_names, chunk_size, progress_callback,
+                                                     cancel_event)
+        return summary['inserted'] + summary['updated'], summary['failed'], errors
+
+    imported_count = 0
+    failed_count = 0
+    errors = []
+    try:
+        df = pd.read_excel(file_path, header=0, dtype=str)
+        imported_count, failed_count, errors = _import_dataframe_per_row(df)
+    except FileNotFoundError:
+        errors.append("File Excel tidak ditemukan.")
+    except pd.errors.EmptyDataError:
+        errors.append("File Excel kosong atau tidak memiliki data yang valid.")
+    except Exception as e:
+        errors.append(f"Terjadi kesalahan saat membaca file Excel: {e}")
+
+    return imported_count, failed_count, errors
+
+def _import_dataframe_per_row(df):
+    imported_count = 0
+    # Cache pimpinan data to avoid repeated DB queries
+    pimpinan_cache = {p['nama'].lower(): p['id'] for p in get_all_pimpinan()}
+    parsed_rows, errors = _prepare_rows(df, pimpinan_cache)
+    failed_count = len(errors)
+
+    for row_label, data, _ in parsed_rows:
+        success, message = add_activity(data)
+
+        if success:
+            imported_count += 1
+        else:
+            failed_count += 1
+            errors.append(f"{row_label}: {message} (Kegiatan: {data.get('uraian_kegiatan', 'N/A')})")
+
+    return imported_count, failed_count, errors
+
+# --- Impor di Latar Belakang ---
+# Menjalankan impor di worker thread (dengan koneksi SQLite miliknya sendiri).
+# Event dikirim lewat queue `events` agar GUI bisa mengambilnya dengan after():
+# {'type': 'start', 'total_rows'}, event 'progress' dari import_excel_streaming, dan
+# {'type': 'done', 'imported', 'failed', 'errors', 'summary', 'cancelled'}.
+# client: api_client.ApiClient untuk mode klien; file dikirim ke server dan diimpor di sana
+# (tanpa event progress dan tanpa pembatalan setelah file terkirim).
+class ImportJob:
+    def __init__(self, file_path, sheet_names=None, chunk_size=DEFAULT_CHUNK_SIZE, client=None, remove_missing=False):
+        self.file_path = file_path
+        self.sheet_names = sheet_names
+        self.chunk_size = chunk_size
+        self.client = client
+        self.remove_missing = remove_missing
+        self.events = queue.Queue()
+        self.cancel_event = threading.Event()
+        self.result = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def is_alive(self):
+        return self._thread.is_alive()
+
+    def _run(self):
+        if self.client is not None:
+            self.events.put({'type': 'start', 'total_rows': None})
+            summary, errors = self.client.sync_excel(self.file_path, remove_missing=self.remove_missing)
+            self._finish(summary, errors)
+            return
+
+        try:
+            try:
+                total_rows = estimate_excel_rows(self.file_path, self.sheet_names)
+            except Exception:
+                total_rows = None
+            self.events.put({'type': 'start', 'total_rows': total_rows})
+            with profile('import_excel'):
+                summary, errors = sync_activities_from_excel(
+                    self.file_path, sheet_names=self.sheet_names, chunk_size=self.chunk_size,
+                    progress_callback=self.events.put, cancel_event=self.cancel_event,
+                    remove_missing=self.remove_missing
+                )
+        finally:
+            close_db() # Koneksi thread ini tidak dipakai lagi
+        self._finish(summary, errors)
+
+    def _finish(self, summary, errors):
+        imported = summary['inserted'] + summary['updated']
+        self.result = (imported, summary['failed'], errors)
+        self.events.put({
+            'type': 'done',
+            'imported': imported,
+            'failed': summary['failed'],
+            'errors': errors,
+            'summary': summary,
+            'cancelled': self.cancel_event.is_set() and imported == 0 and summary['removed'] == 0,
+        })
+
+if __name__ == '__main__':
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+
+    # Ganti dengan path ke file Excel yang Anda ingin uji
+    test_excel_path = os.path.join(current_dir, 'Jadwal Giat Pimpinan Lemhannas RI.xlsx - JUNI 2025.xlsx')
+
+    # Pastikan tabel sudah dibuat
+    create_table()
+
+    print(f"Mencoba mengimpor dari: {test_excel_path}")
+    imported, failed, errs = import_activities_from_excel(test_excel_path)
+    print(f"Import Selesai. Berhasil: {imported}, Gagal: {failed}")
+    if errs:
+        print("Detail Error:")
+        for err in errs:
+            print(err)
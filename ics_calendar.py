@@ -0,0 +1,477 @@
+import json
+import logging
+import os
+from datetime import date, datetime, timedelta, timezone
+
+import db_handler
+from instrumentation import profile
+from recurrence import occurrence_id, parse_occurrence_id
+
+logger = logging.getLogger(__name__)
+
+# Ekspor/impor iCalendar (.ics, RFC 5545) agar jadwal bisa dilanggan dari kalender ponsel.
+# - UID stabil: 'kegiatan-<id>@<kalender_id>.<UID_DOMAIN>' untuk Kegiatan, 'seri-<seri_id>-<YYYYMMDD>@...'
+#   untuk kejadian kegiatan berulang, atau UID aslinya untuk kegiatan yang diimpor dari .ics
+#   (kunci_sumber 'ics:<UID>'). kalender_id acak per database, jadi UID dari database lain tidak
+#   pernah dianggap sebagai id lokal.
+# - update_ics_feeds menulis satu feed per pimpinan ditambah feed semua pimpinan, dan hanya menulis
+#   ulang feed yang revisinya (Revisi_Jadwal, dinaikkan oleh trigger) berubah sejak ekspor terakhir.
+# - import_ics membaca file baris demi baris dan melakukan upsert berdasarkan UID.
+# Waktu di database adalah waktu lokal (WIB); di file ditulis dengan TZID Asia/Jakarta.
+
+PRODID = "-//Lemhannas//Jadwal Kegiatan Pimpinan//ID"
+UID_DOMAIN = "jadwal.lemhannas.local"
+ICS_TZID = "Asia/Jakarta"
+LOCAL_TZ = timezone(timedelta(hours=7), "WIB")
+VTIMEZONE_LINES = (
+    "BEGIN:VTIMEZONE", f"TZID:{ICS_TZID}",
+    "BEGIN:STANDARD", "DTSTART:19700101T000000", "TZOFFSETFROM:+0700", "TZOFFSETTO:+0700", "TZNAME:WIB",
+    "END:STANDARD", "END:VTIMEZONE",
+)
+SOURCE_KEY_PREFIX = "ics:"
+MAX_LINE_OCTETS = 75
+
+# Properti X- membawa kolom yang tidak punya padanan standar, agar impor ulang tidak kehilangan data
+X_PROPERTIES = (
+    ('X-JADWAL-PIMPINAN', 'pimpinan_nama'),
+    ('X-JADWAL-PESERTA', 'daftar_peserta'),
+    ('X-JADWAL-PIC', 'narahubung'),
+    ('X-JADWAL-KONTAK', 'kontak_person'),
+)
+COMPARED_FIELDS = ('tanggal_kegiatan', 'waktu_mulai_kegiatan', 'waktu_akhir_kegiatan', 'uraian_kegiatan',
+                   'tempat_ruangan', 'id_pimpinan', 'daftar_peserta', 'narahubung', 'kontak_person')
+
+FEED_MANIFEST_NAME = ".feeds.json"
+ALL_FEED_NAME = "semua.ics"
+DEFAULT_FEED_PAST_DAYS = 30
+DEFAULT_FEED_FUTURE_DAYS = 365
+
+# --- Format Teks ---
+def _escape_text(value):
+    return (value.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+            .replace('\r\n', '\\n').replace('\n', '\\n'))
+
+def _unescape_text(value):
+    result = []
+    chars = iter(value)
+    for char in chars:
+        if char == '\\':
+            char = next(chars, '')
+            result.append('\n' if char in ('n', 'N') else char)
+        else:
+            result.append(char)
+    return "".join(result)
+
+def _fold_line(line):
+    # Baris lebih dari 75 oktet dilipat (CRLF + spasi) tanpa memotong karakter UTF-8 multi-byte
+    if len(line.encode('utf-8')) <= MAX_LINE_OCTETS:
+        return line
+    parts = []
+    current, size, limit = [], 0, MAX_LINE_OCTETS
+    for char in line:
+        char_size = len(char.encode('utf-8'))
+        if size + char_size > limit:
+            parts.append("".join(current))
+            current, size, limit = [], 0, MAX_LINE_OCTETS - 1 # Spasi pembuka ikut dihitung
+        current.append(char)
+        size += char_size
+    parts.append("".join(current))
+    return "\r\n ".join(parts)
+
+def _format_local(activity_date, time_text):
+    return activity_date.replace('-', '') + 'T' + time_text.replace(':', '') + '00'
+
+def _format_utc(activity_date, time_text):
+    local = datetime.strptime(f"{activity_date} {time_text}", '%Y-%m-%d %H:%M').replace(tzinfo=LOCAL_TZ)
+    return local.astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+# --- Ekspor ---
+def _uid_host(calendar_id):
+    return f"{calendar_id}.{UID_DOMAIN}"
+
+def activity_uid(activity, calendar_id):
+    source_key = activity['kunci_sumber']
+    if source_key and source_key.startswith(SOURCE_KEY_PREFIX):
+        return source_key[len(SOURCE_KEY_PREFIX):]
+    occurrence = parse_occurrence_id(activity['id'])
+    if occurrence is not None:
+        return f"seri-{occurrence[0]}-{occurrence[1]:%Y%m%d}@{_uid_host(calendar_id)}"
+    return f"kegiatan-{activity['id']}@{_uid_host(calendar_id)}"
+
+def _event_lines(activity, calendar_id):
+    activity_date = activity['tanggal_kegiatan']
+    start_time = activity['waktu_mulai_kegiatan']
+    end_time = activity['waktu_akhir_kegiatan']
+    # DTSTAMP dari waktu input agar isi feed hanya berubah jika kegiatannya berubah
+    try:
+        stamp = _format_utc(activity['tanggal_input'], activity['waktu_input'])
+    except (TypeError, ValueError):
+        stamp = _format_utc(activity_date, start_time)
+    if end_time <= start_time:
+        end_time = '23:59' # Sama seperti time_range_to_minutes: tidak melewati tengah malam
+
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{activity_uid(activity, calendar_id)}",
+        f"DTSTAMP:{stamp}",
+        f"DTSTART;TZID={ICS_TZID}:{_format_local(activity_date, start_time)}",
+        f"DTEND;TZID={ICS_TZID}:{_format_local(activity_date, end_time)}",
+        f"SUMMARY:{_escape_text(activity['uraian_kegiatan'] or '')}",
+    ]
+    if activity['tempat_ruangan']:
+        lines.append(f"LOCATION:{_escape_text(activity['tempat_ruangan'])}")
+    if activity['pimpinan_nama']:
+        lines.append(f"CATEGORIES:{_escape_text(activity['pimpinan_nama'])}")
+    description = [f"{label}: {activity[field]}" for label, field in
+                   (("Pimpinan", 'pimpinan_nama'), ("Peserta", 'daftar_peserta'),
+                    ("PIC", 'narahubung'), ("Kontak", 'kontak_person')) if activity[field]]
+    if description:
+        lines.append(f"DESCRIPTION:{_escape_text(chr(10).join(description))}")
+    for name, field in X_PROPERTIES:
+        if activity[field]:
+            lines.append(f"{name}:{_escape_text(activity[field])}")
+    lines.append("END:VEVENT")
+    return lines
+
+def iter_calendar_lines(activities, calendar_name, calendar_id):
+    yield "BEGIN:VCALENDAR"
+    yield "VERSION:2.0"
+    yield f"PRODID:{PRODID}"
+    yield "CALSCALE:GREGORIAN"
+    yield "METHOD:PUBLISH"
+    yield f"X-WR-CALNAME:{_escape_text(calendar_name)}"
+    yield f"X-WR-TIMEZONE:{ICS_TZID}"
+    yield from VTIMEZONE_LINES
+    for activity in activities:
+        yield from _event_lines(activity, calendar_id)
+    yield "END:VCALENDAR"
+
+def write_ics(activities, file_path, calendar_name, calendar_id):
+    # Tulis ke file sementara lalu ganti, agar pelanggan feed tidak pernah membaca file setengah jadi.
+    # Kembalikan jumlah kegiatan yang ditulis
+    count = 0
+    def counted(rows):
+        nonlocal count
+        for row in rows:
+            count += 1
+            yield row
+
+    temp_path = file_path + ".tmp"
+    try:
+        with open(temp_path, 'w', encoding='utf-8', newline='') as f:
+            for line in iter_calendar_lines(counted(activities), calendar_name, calendar_id):
+                f.write(_fold_line(line) + "\r\n")
+        os.replace(temp_path, file_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return count
+
+def export_activities_to_ics(start_date, end_date, pimpinan_ids, file_path, backend=db_handler, calendar_name=None):
+    # Seperti excel_exporter.export_activities_to_excel; kejadian kegiatan berulang ditulis sebagai
+    # event biasa (tanpa RRULE). Kembalikan (success, message, jumlah kegiatan)
+    if calendar_name is None:
+        calendar_name = "Jadwal Kegiatan Pimpinan"
+        if pimpinan_ids is not None and len(pimpinan_ids) == 1:
+            pimpinan = backend.get_pimpinan_by_id(pimpinan_ids[0])
+            if pimpinan:
+                calendar_name = f"Jadwal {pimpinan['nama']}"
+    try:
+        with profile('export_ics'):
+            count = write_ics(backend.iter_activities_in_range(start_date, end_date, pimpinan_ids),
+                              file_path, calendar_name, backend.get_calendar_id())
+    except (OSError, db_handler.sqlite3.Error) as e:
+        logger.warning("Ekspor .ics ke %s gagal: %s", file_path, e)
+        return False, f"Error saat mengekspor ke .ics: {e}", 0
+    logger.info("%d kegiatan diekspor ke %s", count, file_path)
+    return True, f"{count} kegiatan berhasil diekspor.", count
+
+# --- Feed Inkremental ---
+def feed_file_name(pimpinan_id):
+    # Nama file mengikuti id, bukan nama, agar URL langganan tidak berubah saat pimpinan diganti nama
+    return f"pimpinan-{pimpinan_id}.ics"
+
+def default_feed_window(today=None):
+    today = today or date.today()
+    return ((today - timedelta(days=DEFAULT_FEED_PAST_DAYS)).isoformat(),
+            (today + timedelta(days=DEFAULT_FEED_FUTURE_DAYS)).isoformat())
+
+def _load_manifest(output_dir):
+    try:
+        with open(os.path.join(output_dir, FEED_MANIFEST_NAME), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_manifest(output_dir, manifest):
+    manifest_path = os.path.join(output_dir, FEED_MANIFEST_NAME)
+    with open(manifest_path + ".tmp", 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(manifest_path + ".tmp", manifest_path)
+
+def update_ics_feeds(output_dir, start_date=None, end_date=None, force=False):
+    # Tulis feed per pimpinan dan semua.ics ke output_dir untuk rentang tanggal ini.
+    # Feed yang revisi pimpinannya dan rentangnya sama dengan ekspor terakhir (dicatat di .feeds.json)
+    # tidak dibaca maupun ditulis ulang; feed pimpinan yang sudah dihapus ikut dihapus.
+    # Kembalikan (success, message, {'written': [...], 'unchanged': [...], 'removed': [...]})
+    if start_date is None or end_date is None:
+        default_start, default_end = default_feed_window()
+        start_date, end_date = start_date or default_start, end_date or default_end
+    summary = {'written': [], 'unchanged': [], 'removed': []}
+    try:
+        os.makedirs(output_dir, exist_ok=True)
+        manifest = {} if force else _load_manifest(output_dir)
+        # Revisi dibaca sebelum data: perubahan di antaranya paling buruk membuat feed ditulis sekali lagi
+        revisions = db_handler.get_schedule_revisions()
+        calendar_id = db_handler.get_calendar_id()
+        feeds = [(feed_file_name(p['id']), [p['id']], f"Jadwal {p['nama']}", revisions.get(p['id'], 0))
+                 for p in db_handler.get_all_pimpinan()]
+        feeds.append((ALL_FEED_NAME, None, "Jadwal Kegiatan Pimpinan", sum(revisions.values())))
+
+        new_manifest = {}
+        with profile('update_ics_feeds'):
+            for file_name, pimpinan_ids, calendar_name, revision in feeds:
+                stamp = {'start': start_date, 'end': end_date, 'revisi': revision}
+                file_path = os.path.join(output_dir, file_name)
+                new_manifest[file_name] = stamp
+                if manifest.get(file_name) == stamp and os.path.exists(file_path):
+                    summary['unchanged'].append(file_name)
+                    continue
+                write_ics(db_handler.iter_activities_in_range(start_date, end_date, pimpinan_ids),
+                          file_path, calendar_name, calendar_id)
+                summary['written'].append(file_name)
+
+        for file_name in sorted(set(manifest) - set(new_manifest)):
+            file_path = os.path.join(output_dir, file_name)
+            if os.path.exists(file_path):
+                os.remove(file_path)
+            summary['removed'].append(file_name)
+        _save_manifest(output_dir, new_manifest)
+    except (OSError, db_handler.sqlite3.Error) as e:
+        logger.warning("Pembaruan feed .ics di %s gagal: %s", output_dir, e)
+        return False, f"Error saat memperbarui feed .ics: {e}", summary
+    return True, (f"{len(summary['written'])} feed ditulis, {len(summary['unchanged'])} tidak berubah, "
+                  f"{len(summary['removed'])} dihapus."), summary
+
+# --- Impor ---
+def _iter_unfolded_lines(f):
+    # Gabungkan baris lanjutan (diawali spasi/tab) tanpa membaca seluruh file
+    current = None
+    for raw_line in f:
+        line = raw_line.rstrip('\r\n')
+        if line[:1] in (' ', '\t') and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line
+    if current:
+        yield current
+
+def _split_property(line):
+    # 'DTSTART;TZID=Asia/Jakarta:20250701T090000' -> ('DTSTART', {'TZID': 'Asia/Jakarta'}, '20250701T090000')
+    in_quotes = False
+    for i, char in enumerate(line):
+        if char == '"':
+            in_quotes = not in_quotes
+        elif char == ':' and not in_quotes:
+            head, value = line[:i], line[i + 1:]
+            break
+    else:
+        return None
+    name, *raw_params = head.split(';')
+    params = {}
+    for raw_param in raw_params:
+        key, _, param_value = raw_param.partition('=')
+        params[key.upper()] = param_value.strip('"')
+    return name.upper(), params, value
+
+def iter_ics_events(file_path):
+    # Yield (nomor urut event, {nama properti: (params, value)}) untuk setiap VEVENT.
+    # Komponen di dalam VEVENT (mis. VALARM) dilewati.
+    with open(file_path, encoding='utf-8-sig') as f:
+        event = None
+        nested = 0
+        number = 0
+        for line in _iter_unfolded_lines(f):
+            parsed = _split_property(line)
+            if parsed is None:
+                continue
+            name, params, value = parsed
+            if name == 'BEGIN':
+                if value.upper() == 'VEVENT' and event is None:
+                    event = {}
+                elif event is not None:
+                    nested += 1
+            elif name == 'END':
+                if event is not None and nested:
+                    nested -= 1
+                elif event is not None and value.upper() == 'VEVENT':
+                    number += 1
+                    yield number, event
+                    event = None
+            elif event is not None and not nested:
+                event.setdefault(name, (params, value))
+
+def _parse_datetime(params, value):
+    # Kembalikan datetime lokal (naive, WIB), atau date untuk event sepanjang hari
+    if params.get('VALUE') == 'DATE' or len(value) == 8:
+        return datetime.strptime(value, '%Y%m%d').date()
+    parsed = datetime.strptime(value.rstrip('Z')[:15], '%Y%m%dT%H%M%S')
+    if value.endswith('Z'):
+        return parsed.replace(tzinfo=timezone.utc).astimezone(LOCAL_TZ).replace(tzinfo=None)
+    tzid = params.get('TZID')
+    if tzid and tzid != ICS_TZID:
+        try:
+            from zoneinfo import ZoneInfo
+            return parsed.replace(tzinfo=ZoneInfo(tzid)).astimezone(LOCAL_TZ).replace(tzinfo=None)
+        except (ImportError, KeyError, ValueError):
+            pass # Zona tidak dikenal: anggap sudah waktu lokal
+    return parsed
+
+def _parse_duration(value):
+    # 'PT1H30M' / 'P1D' -> timedelta (bentuk sederhana yang dipakai aplikasi kalender umum)
+    sign = -1 if value.startswith('-') else 1
+    value = value.lstrip('+-')
+    if not value.startswith('P'):
+        raise ValueError(f"DURATION '{value}' tidak valid")
+    total = timedelta()
+    number = ""
+    units = {'W': timedelta(weeks=1), 'D': timedelta(days=1), 'H': timedelta(hours=1),
+             'M': timedelta(minutes=1), 'S': timedelta(seconds=1)}
+    for char in value[1:]:
+        if char.isdigit():
+            number += char
+        elif char == 'T':
+            continue
+        elif char in units and number:
+            total += int(number) * units[char]
+            number = ""
+        else:
+            raise ValueError(f"DURATION '{value}' tidak valid")
+    return sign * total
+
+def _event_to_data(event):
+    # Event -> (uid, data kegiatan, nama pimpinan); ValueError jika tidak bisa disimpan sebagai Kegiatan
+    def text(name):
+        return _unescape_text(event[name][1]).strip() if name in event else ""
+
+    uid = event.get('UID', ({}, ''))[1].strip()
+    if not uid:
+        raise ValueError("UID kosong")
+    if 'RRULE' in event:
+        raise ValueError("event berulang (RRULE) tidak didukung, ekspor sebagai event terpisah")
+    if 'DTSTART' not in event:
+        raise ValueError("DTSTART kosong")
+    start = _parse_datetime(*event['DTSTART'])
+    if not isinstance(start, datetime):
+        raise ValueError("event sepanjang hari tidak didukung")
+    if 'DTEND' in event:
+        end = _parse_datetime(*event['DTEND'])
+    elif 'DURATION' in event:
+        end = start + _parse_duration(event['DURATION'][1])
+    else:
+        end = start
+    if not isinstance(end, datetime) or end < start:
+        raise ValueError("DTEND tidak valid")
+    if end.date() != start.date():
+        if end == datetime.combine(start.date() + timedelta(days=1), datetime.min.time()):
+            end = end - timedelta(minutes=1) # Berakhir tepat tengah malam
+        else:
+            raise ValueError("kegiatan melewati tengah malam tidak didukung")
+
+    pimpinan_name = text('X-JADWAL-PIMPINAN') or text('CATEGORIES').split(',')[0].strip()
+    data = {
+        'tanggal_kegiatan': start.strftime('%Y-%m-%d'),
+        'waktu_mulai_kegiatan': start.strftime('%H:%M'),
+        'waktu_akhir_kegiatan': end.strftime('%H:%M'),
+        'uraian_kegiatan': text('SUMMARY'),
+        'tempat_ruangan': text('LOCATION'),
+        'daftar_peserta': text('X-JADWAL-PESERTA'),
+        'narahubung': text('X-JADWAL-PIC'),
+        'kontak_person': text('X-JADWAL-KONTAK'),
+    }
+    return uid, data, pimpinan_name
+
+def _find_existing(uid, calendar_id):
+    # Kegiatan yang sudah ada untuk UID ini: UID buatan database ini menunjuk langsung ke id-nya,
+    # UID lain dicari lewat kunci_sumber. Kegiatan hasil impor Excel (kunci 'excel:...') tetap
+    # diekspor dengan UID buatan database ini. Kembalikan baris kegiatan atau None
+    local_part, _, host = uid.partition('@')
+    if host == _uid_host(calendar_id):
+        activity_id = None
+        kind, _, rest = local_part.partition('-')
+        try:
+            if kind == 'kegiatan':
+                activity_id = int(rest)
+            elif kind == 'seri':
+                series_id, _, day = rest.partition('-')
+                activity_id = occurrence_id(int(series_id), datetime.strptime(day, '%Y%m%d').date())
+        except ValueError:
+            activity_id = None
+        if activity_id is not None:
+            activity = db_handler.get_activity_by_id(activity_id)
+            if activity is not None and not (activity['kunci_sumber'] or '').startswith(SOURCE_KEY_PREFIX):
+                return activity
+    activity_id = db_handler.get_activity_id_by_source_key(SOURCE_KEY_PREFIX + uid)
+    return db_handler.get_activity_by_id(activity_id) if activity_id is not None else None
+
+def _resolve_pimpinan_id(pimpinan_name, pimpinan_cache):
+    # Sama seperti impor Excel: pimpinan yang belum ada dibuat otomatis
+    if not pimpinan_name:
+        return None
+    key = pimpinan_name.lower()
+    if key not in pimpinan_cache:
+        success, _, new_id = db_handler.add_pimpinan(pimpinan_name)
+        if not success:
+            raise ValueError(f"pimpinan '{pimpinan_name}' tidak dapat ditambahkan")
+        logger.info("Pimpinan '%s' ditambahkan otomatis.", pimpinan_name)
+        pimpinan_cache[key] = new_id
+    return pimpinan_cache[key]
+
+def import_ics(file_path):
+    # Upsert setiap VEVENT berdasarkan UID dalam satu transaksi: event yang sama persis dilewati,
+    # yang berubah diperbarui (dengan validasi bentrok seperti edit biasa), yang baru ditambahkan.
+    # Kembalikan (summary {'inserted', 'updated', 'unchanged', 'failed'}, daftar pesan error)
+    summary = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'failed': 0}
+    errors = []
+    now = datetime.now()
+    pimpinan_cache = {p['nama'].lower(): p['id'] for p in db_handler.get_all_pimpinan()}
+    calendar_id = db_handler.get_calendar_id()
+    try:
+        with profile('import_ics'), db_handler.transaction():
+            for number, event in iter_ics_events(file_path):
+                try:
+                    uid, data, pimpinan_name = _event_to_data(event)
+                    data['id_pimpinan'] = _resolve_pimpinan_id(pimpinan_name, pimpinan_cache)
+                except ValueError as e:
+                    summary['failed'] += 1
+                    errors.append(f"Event {number}: {e}.")
+                    continue
+
+                existing = _find_existing(uid, calendar_id)
+                if existing is None:
+                    success, message = db_handler.add_activity(dict(
+                        data, tanggal_input=now.strftime('%Y-%m-%d'), waktu_input=now.strftime('%H:%M'),
+                        kunci_sumber=SOURCE_KEY_PREFIX + uid,
+                    ))
+                    outcome = 'inserted'
+                elif all((existing[field] or None) == (data[field] or None) for field in COMPARED_FIELDS):
+                    summary['unchanged'] += 1
+                    continue
+                else:
+                    success, message = db_handler.update_activity(existing['id'], data)
+                    outcome = 'updated'
+                if success:
+                    summary[outcome] += 1
+                else:
+                    summary['failed'] += 1
+                    errors.append(f"Event {number} ({data['tanggal_kegiatan']} {data['waktu_mulai_kegiatan']}): {message}")
+    except (OSError, UnicodeDecodeError) as e:
+        # Transaksi dibatalkan: tidak ada event yang tersimpan
+        summary = dict.fromkeys(summary, 0)
+        errors.append(f"Error saat membaca file .ics: {e}")
+    except db_handler.sqlite3.Error as e:
+        summary = dict.fromkeys(summary, 0)
+        errors.append(f"Error database saat mengimpor .ics: {e}")
+    return summary, errors
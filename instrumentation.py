@@ -0,0 +1,141 @@
+import cProfile
+import functools
+import io
+import logging
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+
+# Instrumentasi ringan untuk db_handler: jumlah panggilan, latensi, jumlah baris dan jumlah
+# koneksi yang dibuka, plus log query lambat lewat logging dan cProfile opsional.
+# Listener tambahan (mis. exporter metrik) bisa didaftarkan dengan add_listener.
+
+logger = logging.getLogger(__name__)
+
+SLOW_CALL_MS = 200 # Panggilan db_handler yang lebih lama dari ini dicatat sebagai warning
+PROFILE_TOP_FUNCTIONS = 25
+
+_lock = threading.Lock()
+_stats = {} # nama fungsi -> {'calls', 'total_seconds', 'max_seconds', 'rows', 'errors'}
+_counters = {'connections_opened': 0}
+_listeners = []
+_enabled = True
+slow_call_ms = SLOW_CALL_MS
+
+_profiling_enabled = False
+_profile_dir = None
+_profile_active = False
+_profiles = {} # nama blok -> teks pstats terakhir
+
+def set_enabled(enabled):
+    global _enabled
+    _enabled = enabled
+
+def add_listener(callback):
+    # callback(name, seconds, rows, error) dipanggil setelah setiap panggilan yang diinstrumentasi
+    _listeners.append(callback)
+
+def remove_listener(callback):
+    if callback in _listeners:
+        _listeners.remove(callback)
+
+def _count_rows(result):
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, tuple):
+        return 0 # (success, message[, id])
+    return 0 if result is None else 1
+
+def record_call(name, seconds, rows=0, error=False):
+    with _lock:
+        stat = _stats.get(name)
+        if stat is None:
+            stat = _stats[name] = {'calls': 0, 'total_seconds': 0.0, 'max_seconds': 0.0, 'rows': 0, 'errors': 0}
+        stat['calls'] += 1
+        stat['total_seconds'] += seconds
+        stat['max_seconds'] = max(stat['max_seconds'], seconds)
+        stat['rows'] += rows
+        stat['errors'] += int(error)
+    if seconds * 1000 >= slow_call_ms:
+        logger.warning("Slow db call %s: %.1f ms (%d rows, thread %s)", name, seconds * 1000, rows,
+                       threading.current_thread().name)
+    for listener in list(_listeners):
+        listener(name, seconds, rows, error)
+
+def record_connection_open(database_name):
+    with _lock:
+        _counters['connections_opened'] += 1
+    logger.debug("Opened SQLite connection to %s (thread %s)", database_name, threading.current_thread().name)
+
+def instrumented(func):
+    # Dekorator untuk fungsi db_handler
+    name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _enabled:
+            return func(*args, **kwargs)
+        started = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            record_call(name, time.perf_counter() - started, error=True)
+            raise
+        record_call(name, time.perf_counter() - started, _count_rows(result))
+        return result
+    return wrapper
+
+def snapshot():
+    # Salinan statistik untuk panel diagnostik: (stats per fungsi, counter global)
+    with _lock:
+        return {name: dict(stat) for name, stat in _stats.items()}, dict(_counters)
+
+def reset():
+    with _lock:
+        _stats.clear()
+        _counters['connections_opened'] = 0
+
+# --- cProfile opsional ---
+def enable_profiling(enabled=True, output_dir=None):
+    # output_dir: jika diisi, setiap profil juga disimpan sebagai <nama>-<timestamp>.prof
+    global _profiling_enabled, _profile_dir
+    _profiling_enabled = enabled
+    _profile_dir = output_dir
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+def is_profiling_enabled():
+    return _profiling_enabled
+
+@contextmanager
+def profile(name):
+    # Jalankan blok di bawah cProfile jika profiling aktif; hasil terakhir per nama disimpan
+    global _profile_active
+    with _lock:
+        # Hanya satu cProfile yang aktif: blok bersarang ikut terukur di blok luar, blok di thread lain dilewati
+        start_profile = _profiling_enabled and not _profile_active
+        if start_profile:
+            _profile_active = True
+    if not start_profile:
+        yield
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        with _lock:
+            _profile_active = False
+        output = io.StringIO()
+        pstats.Stats(profiler, stream=output).sort_stats('cumulative').print_stats(PROFILE_TOP_FUNCTIONS)
+        with _lock:
+            _profiles[name] = output.getvalue()
+        if _profile_dir:
+            profiler.dump_stats(os.path.join(_profile_dir, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}.prof"))
+
+def get_profiles():
+    with _lock:
+        return dict(_profiles)
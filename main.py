@@ -1,799 +1,1690 @@
-from tkcalendar import Calendar, DateEntry
-import customtkinter as ctk
-from datetime import datetime, timedelta, date
-import calendar as py_calendar
-from tkinter import filedialog, messagebox, colorchooser
-import threading
-import time
-from PIL import ImageTk
-import os
-
-# Import functions from db_handler (updated)
-from db_handler import (
-    create_table, add_activity, get_all_activities, delete_activity,
-    get_activity_by_id, update_activity,
-    get_all_pimpinan, add_pimpinan, delete_pimpinan, get_pimpinan_by_id,
-    update_pimpinan_color
-)
-# Import from excel_importer
-from excel_importer import import_activities_from_excel
-
-ctk.set_appearance_mode("System")
-ctk.set_default_color_theme("dark-blue")
-
-class App(ctk.CTk):
-    def __init__(self):
-        super().__init__()
-
-        self.title("Aplikasi Penjadwalan Kegiatan Lemhanas")
-        self.geometry("1400x800")
-        self.iconpath = ImageTk.PhotoImage(file=os.path.join("assets","Logo_Lembaga_Ketahanan_Nasional.png"))
-        self.wm_iconbitmap()
-        self.iconphoto(False, self.iconpath)
-
-        self.grid_columnconfigure(0, weight=0) # Sidebar
-        self.grid_columnconfigure(1, weight=1) # Main content
-        self.grid_rowconfigure(0, weight=1)
-
-        create_table() # Ensure database tables exist
-        self.pimpinan_data = {} # To store pimpinan ID -> name mapping
-        self.pimpinan_colors = {} # To store pimpinan ID -> color mapping
-        self._load_pimpinan_data() # Load pimpinan at startup
-
-        self.current_filter_id_pimpinan = None # Default: show all pimpinan
-
-        self.create_widgets()
-        self.notification_thread = None
-        self._notified_activities = set()
-        self.start_notification_checker()
-        
-        # Initial load: display activities for the currently selected date (default: today)
-        self.load_activities_for_date(self.calendar.get_date())
-        self.update_calendar_markers() # Initial markers for activities
-
-    def _load_pimpinan_data(self):
-        self.pimpinan_data = {}
-        self.pimpinan_colors = {}
-        all_pimpinan = get_all_pimpinan()
-        for p in all_pimpinan:
-            self.pimpinan_data[p['id']] = p['nama']
-            self.pimpinan_colors[p['id']] = p['warna']
-
-    def create_widgets(self):
-        # Sidebar Frame
-        self.sidebar_frame = ctk.CTkFrame(self, width=200, corner_radius=0)
-        self.sidebar_frame.grid(row=0, column=0, rowspan=4, sticky="nsew")
-        self.sidebar_frame.grid_rowconfigure(6, weight=1) # Adjust row configure for new buttons
-
-        self.logo_label = ctk.CTkLabel(self.sidebar_frame, text="Menu Aplikasi", font=ctk.CTkFont(size=20, weight="bold"))
-        self.logo_label.grid(row=0, column=0, padx=20, pady=(20, 10))
-
-        self.add_activity_button = ctk.CTkButton(self.sidebar_frame, text="Tambah Kegiatan", command=self.open_add_activity_form)
-        self.add_activity_button.grid(row=1, column=0, padx=20, pady=10)
-
-        self.import_excel_button = ctk.CTkButton(self.sidebar_frame, text="Import dari Excel", command=self.import_excel_dialog)
-        self.import_excel_button.grid(row=2, column=0, padx=20, pady=10)
-
-        self.manage_pimpinan_button = ctk.CTkButton(self.sidebar_frame, text="Kelola Pimpinan", command=self.open_manage_pimpinan_form)
-        self.manage_pimpinan_button.grid(row=3, column=0, padx=20, pady=10)
-        
-        # Filter Section
-        self.filter_label = ctk.CTkLabel(self.sidebar_frame, text="Filter Pimpinan:", font=ctk.CTkFont(size=14, weight="bold"))
-        self.filter_label.grid(row=4, column=0, padx=20, pady=(10, 5), sticky="w")
-
-        pimpinan_names_for_filter = ["Semua Pimpinan"] + [p['nama'] for p in get_all_pimpinan()]
-        self.pimpinan_filter_combobox = ctk.CTkComboBox(self.sidebar_frame, values=pimpinan_names_for_filter,
-                                                        command=self._apply_pimpinan_filter)
-        self.pimpinan_filter_combobox.set("Semua Pimpinan")
-        self.pimpinan_filter_combobox.grid(row=5, column=0, padx=20, pady=5, sticky="ew")
-
-        self.refresh_button = ctk.CTkButton(self.sidebar_frame, text="Refresh Jadwal & Kalender", command=self.refresh_all)
-        self.refresh_button.grid(row=6, column=0, padx=20, pady=10)
-
-        # Main Content Frame
-        self.main_content_frame = ctk.CTkFrame(self, corner_radius=0)
-        self.main_content_frame.grid(row=0, column=1, sticky="nsew", padx=10, pady=10)
-        self.main_content_frame.grid_rowconfigure(1, weight=1) # Calendar takes minimal, activity list takes the rest
-        self.main_content_frame.grid_columnconfigure(0, weight=1)
-
-        self.calendar_frame = ctk.CTkFrame(self.main_content_frame)
-        self.calendar_frame.grid(row=0, column=0, padx=10, pady=10, sticky="ew")
-        self.calendar_frame.grid_columnconfigure(0, weight=1)
-
-        self.calendar_label = ctk.CTkLabel(self.calendar_frame, text="Kalender Kegiatan", font=ctk.CTkFont(size=20, weight="bold"))
-        self.calendar_label.pack(pady=(0, 10))
-
-        self.calendar = Calendar(self.calendar_frame, selectmode='day',
-                                 date_pattern='y-mm-dd',
-                                 font="Arial 12",
-                                 tooltipdelay=100,
-                                 showweeknumbers=False,
-                                 cursor="hand1")
-        self.calendar.pack(expand=True, fill="both")
-        # Bind events to update the daily activity view
-        self.calendar.bind("<<CalendarSelected>>", self.on_date_selected)
-        # We also need to refresh markers when month changes, but not the activity list below
-        self.calendar.bind("<<CalendarMonthChanged>>", self.on_month_changed) 
-
-        # Bottom section for Activities on Selected Date (REVERTED TO OLDER STRUCTURE)
-        self.activity_list_frame = ctk.CTkFrame(self.main_content_frame)
-        self.activity_list_frame.grid(row=1, column=0, padx=10, pady=10, sticky="nsew")
-        self.activity_list_frame.grid_rowconfigure(1, weight=1) # For scrollable frame
-        self.activity_list_frame.grid_columnconfigure(0, weight=1)
-
-        self.activity_list_label = ctk.CTkLabel(self.activity_list_frame, text="Kegiatan pada Tanggal Dipilih:", font=ctk.CTkFont(size=18, weight="bold"))
-        self.activity_list_label.grid(row=0, column=0, padx=10, pady=(10, 5), sticky="w")
-
-        self.activity_display_frame = ctk.CTkScrollableFrame(self.activity_list_frame)
-        self.activity_display_frame.grid(row=1, column=0, padx=10, pady=10, sticky="nsew")
-        self.activity_display_frame.grid_columnconfigure(0, weight=1)
-
-        self.activity_labels = [] # To store references to activity data labels
-
-
-    # --- Filter Pimpinan Logic ---
-    def _apply_pimpinan_filter(self, selected_pimpinan_name):
-        self.current_filter_id_pimpinan = None
-        if selected_pimpinan_name != "Semua Pimpinan":
-            # Compare names in a case-insensitive manner
-            for p_id, p_name in self.pimpinan_data.items():
-                if p_name.lower() == selected_pimpinan_name.lower():
-                    self.current_filter_id_pimpinan = p_id
-                    break
-        self.refresh_all() # Refresh the view with the new filter
-
-    # --- New/Modified Functions for Calendar View & Activity List ---
-    def on_month_changed(self, event=None):
-        # When month changes, only update calendar markers, not the daily activity list below
-        self.update_calendar_markers()
-
-    def on_date_selected(self, event=None):
-        # When a date is selected, load activities for that specific date
-        selected_date = self.calendar.get_date()
-        self.load_activities_for_date(selected_date)
-
-
-    def load_activities_for_date(self, date_str):
-        # Clear existing labels
-        for widget in self.activity_display_frame.winfo_children():
-            widget.destroy()
-        self.activity_labels = []
-
-        all_activities = get_all_activities(id_pimpinan_filter=self.current_filter_id_pimpinan) # Apply filter
-        filtered_activities = [act for act in all_activities if act['tanggal_kegiatan'] == date_str] # Access by key
-
-        self.activity_list_label.configure(text=f"Kegiatan pada Tanggal: {date_str}")
-
-        if not filtered_activities:
-            no_data_label = ctk.CTkLabel(self.activity_display_frame, text="Tidak ada kegiatan untuk tanggal ini.", font=ctk.CTkFont(size=16))
-            no_data_label.grid(row=0, column=0, padx=20, pady=20)
-            return
-
-        # Create header row
-        headers = ["ID", "Waktu", "Uraian Kegiatan", "Tempat", "Pimpinan", "Aksi"]
-        
-        # Configure columns for header (adjust width weights for buttons)
-        for col_idx, header_text in enumerate(headers):
-            header_label = ctk.CTkLabel(self.activity_display_frame, text=header_text, font=ctk.CTkFont(weight="bold"))
-            header_label.grid(row=0, column=col_idx, padx=5, pady=5, sticky="w")
-            if header_text == "Uraian Kegiatan":
-                self.activity_display_frame.grid_columnconfigure(col_idx, weight=3)
-            elif header_text == "Aksi":
-                self.activity_display_frame.grid_columnconfigure(col_idx, weight=0, minsize=140) # Space for 2 buttons
-            else:
-                self.activity_display_frame.grid_columnconfigure(col_idx, weight=1)
-
-        # Sort activities by start time
-        filtered_activities.sort(key=lambda x: datetime.strptime(x['waktu_mulai_kegiatan'], '%H:%M').time())
-
-        for row_idx, activity in enumerate(filtered_activities):
-            # activity is a Row object (dictionary-like)
-            activity_id = activity['id']
-            activity_time_range = f"{activity['waktu_mulai_kegiatan']} - {activity['waktu_akhir_kegiatan']}"
-            activity_uraian = activity['uraian_kegiatan']
-            activity_tempat = activity['tempat_ruangan']
-            pimpinan_name = activity['pimpinan_nama']
-            pimpinan_color = activity['pimpinan_warna']
-
-            # Display cells
-            id_label = ctk.CTkLabel(self.activity_display_frame, text=str(activity_id))
-            id_label.grid(row=row_idx + 1, column=0, padx=5, pady=2, sticky="w")
-
-            time_label = ctk.CTkLabel(self.activity_display_frame, text=activity_time_range)
-            time_label.grid(row=row_idx + 1, column=1, padx=5, pady=2, sticky="w")
-
-            uraian_label = ctk.CTkLabel(self.activity_display_frame, text=activity_uraian)
-            uraian_label.grid(row=row_idx + 1, column=2, padx=5, pady=2, sticky="w")
-
-            tempat_label = ctk.CTkLabel(self.activity_display_frame, text=activity_tempat)
-            tempat_label.grid(row=row_idx + 1, column=3, padx=5, pady=2, sticky="w")
-
-            pimpinan_label = ctk.CTkLabel(self.activity_display_frame, text=pimpinan_name,
-                                           fg_color=pimpinan_color, text_color="black", corner_radius=5)
-            pimpinan_label.grid(row=row_idx + 1, column=4, padx=5, pady=2, sticky="w")
-
-
-            # Action buttons (Edit and Delete)
-            action_frame = ctk.CTkFrame(self.activity_display_frame, fg_color="transparent")
-            action_frame.grid(row=row_idx + 1, column=5, padx=5, pady=2, sticky="ew")
-            action_frame.grid_columnconfigure(0, weight=1)
-            action_frame.grid_columnconfigure(1, weight=1)
-
-            edit_button = ctk.CTkButton(action_frame, text="Edit",
-                                        command=lambda a_id=activity_id: self.open_edit_activity_form(a_id),
-                                        width=60, fg_color="gray", hover_color="#696969")
-            edit_button.grid(row=0, column=0, padx=(0, 5), sticky="w")
-
-            delete_button = ctk.CTkButton(action_frame, text="Hapus",
-                                        command=lambda a_id=activity_id: self.confirm_delete_activity(a_id),
-                                        width=60, fg_color="red", hover_color="#8b0000")
-            delete_button.grid(row=0, column=1, sticky="w")
-
-    # The show_activity_context_menu will no longer be called as buttons are direct
-    # but I'll keep it just in case you want to re-enable it for some reason.
-    def show_activity_context_menu(self, event, activity_id):
-        # Create a Toplevel window for the context menu
-        menu = ctk.CTkToplevel(self)
-        menu.overrideredirect(True) # Make it behave like a popup menu
-
-        # Position the menu at the mouse click location
-        menu.geometry(f"+{event.x_root}+{event.y_root}")
-        
-        # Edit button
-        edit_button = ctk.CTkButton(menu, text="Edit", 
-                                    command=lambda: (menu.destroy(), self.open_edit_activity_form(activity_id)))
-        edit_button.pack(fill="x", padx=5, pady=2)
-
-        # Delete button
-        delete_button = ctk.CTkButton(menu, text="Hapus", 
-                                      command=lambda: (menu.destroy(), self.confirm_delete_activity(activity_id)),
-                                      fg_color="red", hover_color="#8b0000")
-        delete_button.pack(fill="x", padx=5, pady=2)
-
-        # Bind a click outside to close the menu
-        def close_menu_on_click_outside(event):
-            if not (menu.winfo_exists() and menu.winfo_containing(event.x_root, event.y_root) == menu):
-                menu.destroy()
-        self.bind("<Button-1>", close_menu_on_click_outside, add="+")
-        menu.bind("<Button-1>", lambda e: "break", add="+") # Prevent click on menu from closing it immediately
-        
-        menu.focus_set()
-
-
-    def update_calendar_markers(self):
-        self.calendar.calevent_remove('all')
-
-        all_activities = get_all_activities(id_pimpinan_filter=self.current_filter_id_pimpinan) # Apply filter to markers
-        
-        activity_dates = {}
-        for activity in all_activities:
-            date_str = activity['tanggal_kegiatan']
-            if date_str not in activity_dates:
-                activity_dates[date_str] = []
-            activity_dates[date_str].append(activity)
-
-        for date_str, activities in activity_dates.items():
-            try:
-                dt_obj = datetime.strptime(date_str, '%Y-%m-%d').date()
-                tooltip_text = "Kegiatan:\n" + "\n".join([f"- {a['waktu_mulai_kegiatan']}-{a['waktu_akhir_kegiatan']} {a['uraian_kegiatan']}" for a in activities]) 
-                self.calendar.calevent_create(dt_obj, tooltip_text, 'activity')
-            except ValueError:
-                print(f"Invalid date format found in DB: {date_str}")
-        self.calendar.tag_config('activity', background='lightblue', foreground='black')
-
-
-    def open_add_activity_form(self):
-        add_form = AddActivityForm(self)
-        self.wait_window(add_form)
-        self.refresh_all()
-
-    def open_edit_activity_form(self, activity_id):
-        activity_data = get_activity_by_id(activity_id)
-        if activity_data:
-            edit_form = EditActivityForm(self, activity_data)
-            self.wait_window(edit_form)
-            self.refresh_all()
-        else:
-            messagebox.showerror("Error", "Kegiatan tidak ditemukan.")
-
-    def confirm_delete_activity(self, activity_id):
-        if messagebox.askyesno("Konfirmasi Hapus", f"Apakah Anda yakin ingin menghapus kegiatan ID {activity_id}?"):
-            success, message = delete_activity(activity_id)
-            if success:
-                messagebox.showinfo("Berhasil", message)
-                self.refresh_all()
-            else:
-                messagebox.showerror("Error", message)
-
-    def import_excel_dialog(self):
-        file_path = filedialog.askopenfilename(filetypes=[("Excel files", "*.xlsx *.xls")])
-        if file_path:
-            imported, failed, errors = import_activities_from_excel(file_path)
-            if imported > 0:
-                messagebox.showinfo("Import Selesai", f"Berhasil mengimpor {imported} kegiatan.\nGagal: {failed}")
-                if errors:
-                    error_msg = "\n".join(errors)
-                    messagebox.showwarning("Peringatan Impor", f"Beberapa kegiatan gagal diimpor:\n{error_msg}")
-            else:
-                messagebox.showwarning("Import Gagal", f"Tidak ada kegiatan yang berhasil diimpor. Total gagal: {failed}")
-                if errors:
-                    error_msg = "\n".join(errors)
-                    messagebox.showerror("Error Impor", f"Detail Error:\n{error_msg}")
-            self.refresh_all()
-
-    def refresh_all(self):
-        self._load_pimpinan_data() # Reload pimpinan data
-        # Refresh the activity list for the currently selected date
-        self.load_activities_for_date(self.calendar.get_date())
-        self.update_calendar_markers() # Refresh markers (will use the current filter)
-        self._notified_activities.clear()
-
-    # --- Manage Pimpinan Form (BARU) ---
-    def open_manage_pimpinan_form(self):
-        manage_form = ManagePimpinanForm(self)
-        self.wait_window(manage_form)
-        self.refresh_all() # Refresh after managing pimpinan
-
-    # Notification part is mostly the same, only activity data access changes from tuple to dict
-    def start_notification_checker(self):
-        if self.notification_thread is None or not self.notification_thread.is_alive():
-            self.notification_thread = threading.Thread(target=self._check_for_notifications, daemon=True)
-            self.notification_thread.start()
-
-    def _check_for_notifications(self):
-        while True:
-            self.check_upcoming_activities()
-            time.sleep(60)
-
-    def check_upcoming_activities(self):
-        now = datetime.now()
-        all_activities = get_all_activities() # Get all activities, no filter for notifications
-
-        for activity in all_activities:
-            try:
-                # activity is now a Row object (dictionary-like)
-                activity_start_datetime_str = f"{activity['tanggal_kegiatan']} {activity['waktu_mulai_kegiatan']}"
-                activity_start_dt_obj = datetime.strptime(activity_start_datetime_str, '%Y-%m-%d %H:%M')
-
-                notification_time = activity_start_dt_obj - timedelta(minutes=15)
-
-                if now >= notification_time and now < activity_start_dt_obj:
-                    if activity['id'] not in self._notified_activities:
-                        self.show_notification(activity)
-                        self._notified_activities.add(activity['id'])
-
-            except ValueError as e:
-                print(f"Error parsing date/time for activity ID {activity.get('id', 'N/A')}: {e}")
-            except Exception as e:
-                print(f"An unexpected error occurred during notification check: {e}")
-
-    def show_notification(self, activity_data):
-        self.after(0, lambda: self._display_notification_popup(activity_data))
-
-    def _display_notification_popup(self, activity_data):
-        # activity_data is a Row object
-        activity_id = activity_data['id']
-        activity_uraian = activity_data['uraian_kegiatan']
-        activity_start_time = activity_data['waktu_mulai_kegiatan']
-        activity_end_time = activity_data['waktu_akhir_kegiatan']
-        activity_place = activity_data['tempat_ruangan']
-
-        messagebox.showinfo(
-            "Peringatan Kegiatan Mendatang!",
-            f"Kegiatan: {activity_uraian}\n"
-            f"Waktu: {activity_start_time} - {activity_end_time}\n"
-            f"Tempat: {activity_place}\n\n"
-            f"Kegiatan akan segera dimulai!"
-        )
-
-    def on_closing(self):
-        self.destroy()
-
-
-# --- Form untuk Tambah Kegiatan (Modifikasi untuk ComboBox Pimpinan) ---
-class AddActivityForm(ctk.CTkToplevel):
-    def __init__(self, master):
-        super().__init__(master)
-        self.title("Tambah Kegiatan Baru")
-        self.geometry("600x720") # Tinggi disesuaikan
-        self.transient(master)
-        self.grab_set()
-        self.protocol("WM_DELETE_WINDOW", self.on_closing)
-
-        self.master_app = master # Reference to the main App instance
-        self.pimpinan_options = self.master_app.pimpinan_data # ID -> Name
-        self.create_form_widgets()
-
-    def create_form_widgets(self):
-        self.frame = ctk.CTkFrame(self)
-        self.frame.pack(padx=20, pady=20, fill="both", expand=True)
-
-        labels = [
-            "Tanggal Kegiatan (YYYY-MM-DD):",
-            "Waktu MULAI (HH:MM):",
-            "Waktu AKHIR (HH:MM):",
-            "Uraian Kegiatan:",
-            "Tempat Ruangan:",
-            "Pimpinan:", # Label untuk ComboBox
-            "Daftar Peserta/Jumlah:",
-            "Narahubung:",
-            "Kontak Person:",
-        ]
-
-        self.entries = {}
-        # Mapping label ke key dictionary entries
-        label_to_entry_key = {
-            "Tanggal Kegiatan (YYYY-MM-DD):": 'tanggal_kegiatan',
-            "Waktu MULAI (HH:MM):": 'waktu_mulai_kegiatan',
-            "Waktu AKHIR (HH:MM):": 'waktu_akhir_kegiatan',
-            "Uraian Kegiatan:": 'uraian_kegiatan',
-            "Tempat Ruangan:": 'tempat_ruangan',
-            "Pimpinan:": 'id_pimpinan', # Key untuk ComboBox
-            "Daftar Peserta/Jumlah:": 'daftar_peserta',
-            "Narahubung:": 'narahubung',
-            "Kontak Person:": 'kontak_person',
-        }
-
-        for i, label_text in enumerate(labels):
-            label = ctk.CTkLabel(self.frame, text=label_text)
-            label.grid(row=i, column=0, padx=10, pady=5, sticky="w")
-            
-            entry_key = label_to_entry_key[label_text]
-
-            if entry_key == 'tanggal_kegiatan':
-                self.entries[entry_key] = DateEntry(self.frame, width=20, background='darkblue', foreground='white', bordercolor='darkblue',
-                                                            headersbackground='darkblue', headersforeground='white', selectbackground='lightblue',
-                                                            selectforeground='black', normalbackground='lightgray', normalforeground='black',
-                                                            locale='id_ID', date_pattern='yyyy-mm-dd')
-                self.entries[entry_key].grid(row=i, column=1, padx=10, pady=5, sticky="ew")
-                self.entries[entry_key].set_date(datetime.now().date())
-            elif entry_key == 'id_pimpinan': # Custom for Pimpinan ComboBox
-                pimpinan_names = sorted(list(self.pimpinan_options.values()))
-                self.pimpinan_combobox = ctk.CTkComboBox(self.frame, values=["Pilih Pimpinan"] + pimpinan_names,
-                                                            command=self._update_pimpinan_selection)
-                self.pimpinan_combobox.set("Pilih Pimpinan")
-                self.pimpinan_combobox.grid(row=i, column=1, padx=10, pady=5, sticky="ew")
-                self.entries[entry_key] = None # Will store ID directly in save_activity
-            else:
-                entry = ctk.CTkEntry(self.frame, width=300)
-                entry.grid(row=i, column=1, padx=10, pady=5, sticky="ew")
-                self.entries[entry_key] = entry
-        
-        if 'waktu_mulai_kegiatan' in self.entries:
-            self.entries['waktu_mulai_kegiatan'].insert(0, datetime.now().strftime('%H:%M'))
-        if 'waktu_akhir_kegiatan' in self.entries:
-            # Default waktu akhir bisa 1 jam setelah waktu mulai
-            default_end_time = (datetime.now() + timedelta(hours=1)).strftime('%H:%M')
-            self.entries['waktu_akhir_kegiatan'].insert(0, default_end_time)
-
-
-        self.add_button = ctk.CTkButton(self.frame, text="Simpan Kegiatan", command=self.save_activity)
-        self.add_button.grid(row=len(labels), column=0, columnspan=2, pady=20)
-    
-    def _update_pimpinan_selection(self, selected_name):
-        self.selected_pimpinan_id = None
-        for p_id, p_name in self.pimpinan_options.items():
-            if p_name == selected_name:
-                self.selected_pimpinan_id = p_id
-                break
-
-    def save_activity(self):
-        data = {
-            'tanggal_kegiatan': self.entries['tanggal_kegiatan'].get_date().strftime('%Y-%m-%d'),
-            'waktu_mulai_kegiatan': self.entries['waktu_mulai_kegiatan'].get(),
-            'waktu_akhir_kegiatan': self.entries['waktu_akhir_kegiatan'].get(),
-            'uraian_kegiatan': self.entries['uraian_kegiatan'].get(),
-            'tempat_ruangan': self.entries['tempat_ruangan'].get(),
-            'id_pimpinan': self.selected_pimpinan_id, # Ambil ID pimpinan
-            'daftar_peserta': self.entries['daftar_peserta'].get(),
-            'tanggal_input': datetime.now().strftime('%Y-%m-%d'),
-            'waktu_input': datetime.now().strftime('%H:%M'),
-            'narahubung': self.entries['narahubung'].get(),
-            'kontak_person': self.entries['kontak_person'].get()
-        }
-
-        # Basic validation
-        if not all([data['tanggal_kegiatan'], data['waktu_mulai_kegiatan'], 
-                      data['waktu_akhir_kegiatan'], data['uraian_kegiatan'], data['id_pimpinan']]): # id_pimpinan juga wajib
-            messagebox.showerror("Input Error", "Tanggal Kegiatan, Waktu Mulai, Waktu Akhir, Uraian Kegiatan, dan Pimpinan tidak boleh kosong.")
-            return
-        
-        try:
-            datetime.strptime(data['tanggal_kegiatan'], '%Y-%m-%d')
-        except ValueError:
-            messagebox.showerror("Input Error", "Format Tanggal Kegiatan salah. Gunakan मीडियावर-MM-DD.")
-            return
-        
-        try:
-            start_time_obj = datetime.strptime(data['waktu_mulai_kegiatan'], '%H:%M').time()
-            end_time_obj = datetime.strptime(data['waktu_akhir_kegiatan'], '%H:%M').time()
-            if start_time_obj >= end_time_obj:
-                messagebox.showerror("Input Error", "Waktu Mulai harus lebih awal dari Waktu Akhir.")
-                return
-        except ValueError:
-            messagebox.showerror("Input Error", "Format Waktu Mulai atau Waktu Akhir salah. Gunakan HH:MM.")
-            return
-
-        success, message = add_activity(data)
-        if success:
-            messagebox.showinfo("Berhasil", message)
-            self.destroy()
-        else:
-            messagebox.showerror("Error", message)
-
-    def on_closing(self):
-        self.master_app.focus_set()
-        self.destroy()
-
-# --- Form untuk Edit Kegiatan (Modifikasi untuk ComboBox Pimpinan) ---
-class EditActivityForm(ctk.CTkToplevel):
-    def __init__(self, master, activity_data):
-        super().__init__(master)
-        self.title("Edit Kegiatan")
-        self.geometry("600x720") # Tinggi disesuaikan
-        self.transient(master)
-        self.grab_set()
-        self.protocol("WM_DELETE_WINDOW", self.on_closing)
-
-        self.master_app = master
-        self.activity_id = activity_data['id']
-        self.activity_data = activity_data # This is a Row object (dictionary-like)
-
-        self.pimpinan_options = self.master_app.pimpinan_data # ID -> Name
-        self.create_form_widgets()
-        self.load_activity_data()
-
-    def create_form_widgets(self):
-        self.frame = ctk.CTkFrame(self)
-        self.frame.pack(padx=20, pady=20, fill="both", expand=True)
-
-        labels = [
-            "Tanggal Kegiatan (YYYY-MM-DD):",
-            "Waktu MULAI (HH:MM):",
-            "Waktu AKHIR (HH:MM):",
-            "Uraian Kegiatan:",
-            "Tempat Ruangan:",
-            "Pimpinan:",
-            "Daftar Peserta/Jumlah:",
-            "Narahubung:",
-            "Kontak Person:",
-        ]
-
-        self.entries = {}
-        label_to_entry_key = {
-            "Tanggal Kegiatan (YYYY-MM-DD):": 'tanggal_kegiatan',
-            "Waktu MULAI (HH:MM):": 'waktu_mulai_kegiatan',
-            "Waktu AKHIR (HH:MM):": 'waktu_akhir_kegiatan',
-            "Uraian Kegiatan:": 'uraian_kegiatan',
-            "Tempat Ruangan:": 'tempat_ruangan',
-            "Pimpinan:": 'id_pimpinan',
-            "Daftar Peserta/Jumlah:": 'daftar_peserta',
-            "Narahubung:": 'narahubung',
-            "Kontak Person:": 'kontak_person',
-        }
-
-        for i, label_text in enumerate(labels):
-            label = ctk.CTkLabel(self.frame, text=label_text)
-            label.grid(row=i, column=0, padx=10, pady=5, sticky="w")
-            
-            entry_key = label_to_entry_key[label_text]
-
-            if entry_key == 'tanggal_kegiatan':
-                self.entries[entry_key] = DateEntry(self.frame, width=20, background='darkblue', foreground='white', bordercolor='darkblue',
-                                                            headersbackground='darkblue', headersforeground='white', selectbackground='lightblue',
-                                                            selectforeground='black', normalbackground='lightgray', normalforeground='black',
-                                                            locale='id_ID', date_pattern='yyyy-mm-dd')
-                self.entries[entry_key].grid(row=i, column=1, padx=10, pady=5, sticky="ew")
-            elif entry_key == 'id_pimpinan': # Custom for Pimpinan ComboBox
-                pimpinan_names = sorted(list(self.pimpinan_options.values()))
-                self.pimpinan_combobox = ctk.CTkComboBox(self.frame, values=pimpinan_names,
-                                                            command=self._update_pimpinan_selection)
-                self.pimpinan_combobox.grid(row=i, column=1, padx=10, pady=5, sticky="ew")
-                self.entries[entry_key] = None # Will store ID directly in update_activity
-            else:
-                entry = ctk.CTkEntry(self.frame, width=300)
-                entry.grid(row=i, column=1, padx=10, pady=5, sticky="ew")
-                self.entries[entry_key] = entry
-        
-        self.save_button = ctk.CTkButton(self.frame, text="Update Kegiatan", command=self.update_activity_data)
-        self.save_button.grid(row=len(labels), column=0, columnspan=2, pady=20)
-
-    def _update_pimpinan_selection(self, selected_name):
-        self.selected_pimpinan_id = None
-        for p_id, p_name in self.pimpinan_options.items():
-            if p_name == selected_name:
-                self.selected_pimpinan_id = p_id
-                break
-
-    def load_activity_data(self):
-        self.entries['tanggal_kegiatan'].set_date(datetime.strptime(self.activity_data['tanggal_kegiatan'], '%Y-%m-%d').date())
-        self.entries['waktu_mulai_kegiatan'].insert(0, self.activity_data['waktu_mulai_kegiatan'])
-        self.entries['waktu_akhir_kegiatan'].insert(0, self.activity_data['waktu_akhir_kegiatan'])
-        self.entries['uraian_kegiatan'].insert(0, self.activity_data['uraian_kegiatan'])
-        self.entries['tempat_ruangan'].insert(0, self.activity_data['tempat_ruangan'])
-        
-        # Set ComboBox value based on current pimpinan
-        current_pimpinan_id = self.activity_data['id_pimpinan']
-        if current_pimpinan_id in self.pimpinan_options:
-            self.pimpinan_combobox.set(self.pimpinan_options[current_pimpinan_id])
-            self.selected_pimpinan_id = current_pimpinan_id # Initialize selected_pimpinan_id
-        else:
-            self.pimpinan_combobox.set("Pilih Pimpinan")
-            self.selected_pimpinan_id = None
-
-
-        self.entries['daftar_peserta'].insert(0, self.activity_data['daftar_peserta'])
-        self.entries['narahubung'].insert(0, self.activity_data['narahubung'])
-        self.entries['kontak_person'].insert(0, self.activity_data['kontak_person'])
-
-    def update_activity_data(self): # Renamed to avoid confusion with db_handler.update_activity
-        data = {
-            'tanggal_kegiatan': self.entries['tanggal_kegiatan'].get_date().strftime('%Y-%m-%d'),
-            'waktu_mulai_kegiatan': self.entries['waktu_mulai_kegiatan'].get(),
-            'waktu_akhir_kegiatan': self.entries['waktu_akhir_kegiatan'].get(),
-            'uraian_kegiatan': self.entries['uraian_kegiatan'].get(),
-            'tempat_ruangan': self.entries['tempat_ruangan'].get(),
-            'id_pimpinan': self.selected_pimpinan_id,
-            'daftar_peserta': self.entries['daftar_peserta'].get(),
-            'narahubung': self.entries['narahubung'].get(),
-            'kontak_person': self.entries['kontak_person'].get()
-        }
-
-        if not all([data['tanggal_kegiatan'], data['waktu_mulai_kegiatan'], 
-                      data['waktu_akhir_kegiatan'], data['uraian_kegiatan'], data['id_pimpinan']]):
-            messagebox.showerror("Input Error", "Tanggal Kegiatan, Waktu Mulai, Waktu Akhir, Uraian Kegiatan, dan Pimpinan tidak boleh kosong.")
-            return
-        
-        try:
-            datetime.strptime(data['tanggal_kegiatan'], '%Y-%m-%d')
-        except ValueError:
-            messagebox.showerror("Input Error", "Format Tanggal Kegiatan salah. Gunakan मीडियावर-MM-DD.")
-            return
-
-        try:
-            start_time_obj = datetime.strptime(data['waktu_mulai_kegiatan'], '%H:%M').time()
-            end_time_obj = datetime.strptime(data['waktu_akhir_kegiatan'], '%H:%M').time()
-            if start_time_obj >= end_time_obj:
-                messagebox.showerror("Input Error", "Waktu Mulai harus lebih awal dari Waktu Akhir.")
-                return
-        except ValueError:
-            messagebox.showerror("Input Error", "Format Waktu Mulai atau Waktu Akhir salah. Gunakan HH:MM.")
-            return
-
-        success, message = update_activity(self.activity_id, data)
-        if success:
-            messagebox.showinfo("Berhasil", message)
-            self.destroy()
-        else:
-            messagebox.showerror("Error", message)
-
-    def on_closing(self):
-        self.master_app.focus_set()
-        self.destroy()
-
-# --- Form untuk Kelola Pimpinan (BARU) ---
-class ManagePimpinanForm(ctk.CTkToplevel):
-    def __init__(self, master):
-        super().__init__(master)
-        self.title("Kelola Pimpinan")
-        self.geometry("500x400")
-        self.transient(master)
-        self.grab_set()
-        self.protocol("WM_DELETE_WINDOW", self.on_closing)
-
-        self.master_app = master
-        self.create_widgets()
-        self.load_pimpinan_list()
-
-    def create_widgets(self):
-        self.frame = ctk.CTkFrame(self)
-        self.frame.pack(padx=20, pady=20, fill="both", expand=True)
-
-        self.frame.grid_columnconfigure(0, weight=1)
-
-        self.add_pimpinan_label = ctk.CTkLabel(self.frame, text="Tambah Pimpinan Baru:", font=ctk.CTkFont(weight="bold"))
-        self.add_pimpinan_label.grid(row=0, column=0, padx=10, pady=(10, 5), sticky="w")
-        self.new_pimpinan_entry = ctk.CTkEntry(self.frame, placeholder_text="Nama Pimpinan")
-        self.new_pimpinan_entry.grid(row=1, column=0, padx=10, pady=5, sticky="ew")
-        self.add_pimpinan_button = ctk.CTkButton(self.frame, text="Tambah", command=self.add_new_pimpinan)
-        self.add_pimpinan_button.grid(row=1, column=1, padx=10, pady=5)
-
-        self.pimpinan_list_label = ctk.CTkLabel(self.frame, text="Daftar Pimpinan:", font=ctk.CTkFont(weight="bold"))
-        self.pimpinan_list_label.grid(row=2, column=0, padx=10, pady=(15, 5), sticky="w")
-
-        self.pimpinan_list_frame = ctk.CTkScrollableFrame(self.frame, height=200)
-        self.pimpinan_list_frame.grid(row=3, column=0, columnspan=2, padx=10, pady=5, sticky="nsew")
-        self.pimpinan_list_frame.grid_columnconfigure(0, weight=1) # Name
-        self.pimpinan_list_frame.grid_columnconfigure(1, weight=0) # Color display
-        self.pimpinan_list_frame.grid_columnconfigure(2, weight=0) # Color picker button
-        self.pimpinan_list_frame.grid_columnconfigure(3, weight=0) # Delete button
-
-    def load_pimpinan_list(self):
-        for widget in self.pimpinan_list_frame.winfo_children():
-            widget.destroy()
-        
-        pimpinan_list = get_all_pimpinan() # Get current list of pimpinan
-        
-        if not pimpinan_list:
-            no_pimpinan_label = ctk.CTkLabel(self.pimpinan_list_frame, text="Belum ada pimpinan.")
-            no_pimpinan_label.grid(row=0, column=0, padx=10, pady=10)
-            return
-
-        # Header for the list
-        ctk.CTkLabel(self.pimpinan_list_frame, text="Nama Pimpinan", font=ctk.CTkFont(weight="bold")).grid(row=0, column=0, padx=5, pady=2, sticky="w")
-        ctk.CTkLabel(self.pimpinan_list_frame, text="Warna", font=ctk.CTkFont(weight="bold")).grid(row=0, column=1, padx=5, pady=2, sticky="w")
-        ctk.CTkLabel(self.pimpinan_list_frame, text="Aksi", font=ctk.CTkFont(weight="bold")).grid(row=0, column=2, columnspan=2, padx=5, pady=2, sticky="w")
-
-
-        for i, pimpinan in enumerate(pimpinan_list):
-            pimpinan_id = pimpinan['id']
-            pimpinan_nama = pimpinan['nama']
-            pimpinan_warna = pimpinan['warna']
-
-            # Name Label
-            name_label = ctk.CTkLabel(self.pimpinan_list_frame, text=pimpinan_nama, anchor="w")
-            name_label.grid(row=i+1, column=0, padx=5, pady=2, sticky="ew")
-
-            # Color Display
-            color_display = ctk.CTkLabel(self.pimpinan_list_frame, text="", bg_color=pimpinan_warna, width=30, height=20)
-            color_display.grid(row=i+1, column=1, padx=5, pady=2, sticky="w")
-
-            # Change Color Button
-            change_color_btn = ctk.CTkButton(self.pimpinan_list_frame, text="Ganti Warna", width=80,
-                                              command=lambda pid=pimpinan_id, c_display=color_display: self.change_pimpinan_color(pid, c_display))
-            change_color_btn.grid(row=i+1, column=2, padx=5, pady=2, sticky="w")
-
-            # Delete Button
-            delete_btn = ctk.CTkButton(self.pimpinan_list_frame, text="Hapus", width=60, fg_color="red", hover_color="#8b0000",
-                                        command=lambda pid=pimpinan_id: self.confirm_delete_pimpinan(pid))
-            delete_btn.grid(row=i+1, column=3, padx=5, pady=2, sticky="w")
-
-    def add_new_pimpinan(self):
-        new_name = self.new_pimpinan_entry.get().strip()
-        if new_name:
-            success, message, new_id = add_pimpinan(new_name)
-            if success:
-                messagebox.showinfo("Berhasil", message)
-                self.new_pimpinan_entry.delete(0, ctk.END)
-                self.load_pimpinan_list() # Refresh the list
-            else:
-                messagebox.showerror("Error", message)
-        else:
-            messagebox.showwarning("Input Kosong", "Nama pimpinan tidak boleh kosong.")
-
-    def change_pimpinan_color(self, pimpinan_id, color_display_widget):
-        current_color_str = color_display_widget.cget("bg_color")
-        color_code, hex_color = colorchooser.askcolor(color=current_color_str, title="Pilih Warna Pimpinan")
-        if hex_color: # hex_color will be None if user cancels
-            success, message = update_pimpinan_color(pimpinan_id, hex_color)
-            if success:
-                color_display_widget.configure(bg_color=hex_color) # Update UI immediately
-                messagebox.showinfo("Berhasil", message)
-                # No need to reload pimpinan list, just update the widget
-            else:
-                messagebox.showerror("Error", message)
-
-    def confirm_delete_pimpinan(self, pimpinan_id):
-        pimpinan_info = get_pimpinan_by_id(pimpinan_id)
-        if pimpinan_info:
-            pimpinan_name = pimpinan_info['nama']
-            if messagebox.askyesno("Konfirmasi Hapus", f"Apakah Anda yakin ingin menghapus pimpinan '{pimpinan_name}'? \n\nSemua kegiatan yang terkait dengan pimpinan ini TIDAK AKAN terhapus, tetapi akan menjadi tidak terhubung dengan pimpinan manapun."):
-                success, message = delete_pimpinan(pimpinan_id)
-                if success:
-                    messagebox.showinfo("Berhasil", message)
-                    self.load_pimpinan_list() # Refresh the list
-                else:
-                    messagebox.showerror("Error", message)
-        else:
-            messagebox.showerror("Error", "Pimpinan tidak ditemukan.")
-
-
-    def on_closing(self):
-        self.master_app.focus_set()
-        self.destroy()
-
-
-if __name__ == "__main__":
-    app = App()
-    app.protocol("WM_DELETE_WINDOW", app.on_closing)
+import time
+STARTUP_STARTED = time.perf_counter() # For --profile-startup: measured before the heavy imports below
+
+from tkcalendar import Calendar, DateEntry
+import customtkinter as ctk
+from datetime import datetime, timedelta, date
+from tkinter import filedialog, messagebox, colorchooser, PhotoImage
+import argparse
+import logging
+import queue
+import os
+import threading
+
+# Import functions from db_handler (updated)
+import db_handler
+from db_handler import create_table, close_all_connections
+# Month-scoped cache in front of db_handler (all GUI reads/writes go through it)
+from activity_repository import ActivityRepository
+# Import reminder scheduler
+from reminder_scheduler import ReminderScheduler, DEFAULT_LEAD_MINUTES, LEAD_MINUTES_ENV, parse_lead_minutes
+from recurrence import WEEKDAY_NAMES, parse_occurrence_id
+from api_client import ApiError
+import instrumentation
+# excel_importer/excel_exporter (pandas/openpyxl) are imported lazily when used to keep startup fast
+
+ctk.set_appearance_mode("System")
+ctk.set_default_color_theme("dark-blue")
+
+# --- Profil Waktu Startup (--profile-startup) ---
+class StartupProfiler:
+    def __init__(self, started):
+        self.started = started
+        self.last = started
+        self.phases = [] # (nama fase, detik)
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    def report(self):
+        lines = ["Startup profile:"]
+        for phase, seconds in self.phases:
+            lines.append(f"  {phase:32s} {seconds * 1000:9.1f} ms")
+        lines.append(f"  {'TOTAL':32s} {(self.last - self.started) * 1000:9.1f} ms")
+        return "\n".join(lines)
+
+
+class App(ctk.CTk):
+    def __init__(self, profiler=None, api_client=None, reminder_minutes=DEFAULT_LEAD_MINUTES):
+        super().__init__()
+        self.profiler = profiler
+        self.reminder_minutes = reminder_minutes # Menit sebelum kegiatan untuk pengingat (--pengingat)
+        # Client mode (--server): all data goes through api_server instead of opening SQLite directly
+        self.api_client = api_client
+        self.backend = api_client if api_client is not None else db_handler
+        self._mark_startup("create main window")
+
+        self.title("Aplikasi Penjadwalan Kegiatan Lemhanas")
+        self.geometry("1400x800")
+        # Tk 8.6 reads PNG natively, no need to import PIL just for the window icon
+        self.iconpath = PhotoImage(file=os.path.join("assets","Logo_Lembaga_Ketahanan_Nasional.png"))
+        self.wm_iconbitmap()
+        self.iconphoto(False, self.iconpath)
+
+        self.grid_columnconfigure(0, weight=0) # Sidebar
+        self.grid_columnconfigure(1, weight=1) # Main content
+        self.grid_rowconfigure(0, weight=1)
+
+        if self.api_client is None:
+            create_table() # Ensure database tables exist (the server does this in client mode)
+        self._mark_startup("create_table / migrations")
+        self.repository = ActivityRepository(backend=self.backend)
+        self.pimpinan_data = {} # To store pimpinan ID -> name mapping
+        self.pimpinan_colors = {} # To store pimpinan ID -> color mapping
+        try:
+            self._load_pimpinan_data() # Load pimpinan at startup (cached for the filter combobox)
+        except ApiError as e:
+            # Mode klien: server mati/tidak terjangkau, jendela tetap dibuka dengan data kosong
+            self._show_api_error(e)
+        self._mark_startup("load pimpinan")
+
+        self.current_filter_id_pimpinan = None # Default: show all pimpinan
+        self.calendar_markers = {} # date -> (calevent id, marker signature) currently on the calendar
+        self.marker_tag_colors = {} # tag -> background color already configured on the calendar
+
+        self.create_widgets()
+        self._mark_startup("create widgets")
+        self.import_job = None # Background Excel import (excel_importer.ImportJob)
+        # Event-driven reminders: sleeps until the next reminder is due instead of polling every minute.
+        # Created now so writes can already post to it; the thread starts after the first paint.
+        self.reminder_scheduler = ReminderScheduler(self.show_notification, lead_minutes=self.reminder_minutes,
+                                                    backend=self.backend)
+
+        # Let the window paint first (idle redraws run before the timer), then do the first data load
+        self.after_idle(lambda: self.after(0, self._finish_startup))
+
+    def _mark_startup(self, phase):
+        if self.profiler is not None:
+            self.profiler.mark(phase)
+
+    def _finish_startup(self):
+        self._mark_startup("first paint")
+        # Initial load: display activities for the currently selected date (default: today)
+        self.load_activities_for_date(self.calendar.get_date())
+        self._mark_startup("load activities for date")
+        self.update_calendar_markers() # Initial markers for activities
+        self._mark_startup("calendar markers")
+        self.reminder_scheduler.start()
+        self._mark_startup("start reminder scheduler")
+        if self.profiler is not None:
+            print(self.profiler.report())
+
+    def report_callback_exception(self, exc, val, tb):
+        # Semua callback Tk (tombol, after, event) yang gagal menghubungi server API cukup memberi pesan, bukan traceback
+        if isinstance(val, ApiError):
+            self._show_api_error(val)
+            return
+        super().report_callback_exception(exc, val, tb)
+
+    def _show_api_error(self, error):
+        messagebox.showerror("Server Tidak Dapat Dihubungi", f"Gagal mengambil/menyimpan data di server jadwal:\n{error}")
+
+    def _load_pimpinan_data(self):
+        self.pimpinan_data = {}
+        self.pimpinan_colors = {}
+        all_pimpinan = self.repository.get_all_pimpinan()
+        for p in all_pimpinan:
+            self.pimpinan_data[p['id']] = p['nama']
+            self.pimpinan_colors[p['id']] = p['warna']
+
+    def create_widgets(self):
+        # Sidebar Frame
+        self.sidebar_frame = ctk.CTkFrame(self, width=200, corner_radius=0)
+        self.sidebar_frame.grid(row=0, column=0, rowspan=4, sticky="nsew")
+        self.sidebar_frame.grid_rowconfigure(9, weight=1) # Adjust row configure for new buttons
+
+        self.logo_label = ctk.CTkLabel(self.sidebar_frame, text="Menu Aplikasi", font=ctk.CTkFont(size=20, weight="bold"))
+        self.logo_label.grid(row=0, column=0, padx=20, pady=(20, 10))
+
+        self.add_activity_button = ctk.CTkButton(self.sidebar_frame, text="Tambah Kegiatan", command=self.open_add_activity_form)
+        self.add_activity_button.grid(row=1, column=0, padx=20, pady=10)
+
+        self.import_excel_button = ctk.CTkButton(self.sidebar_frame, text="Import dari Excel", command=self.import_excel_dialog)
+        self.import_excel_button.grid(row=2, column=0, padx=20, pady=10)
+
+        self.export_button = ctk.CTkButton(self.sidebar_frame, text="Export Jadwal", command=self.open_export_dialog)
+        self.export_button.grid(row=3, column=0, padx=20, pady=10)
+
+        self.manage_pimpinan_button = ctk.CTkButton(self.sidebar_frame, text="Kelola Pimpinan", command=self.open_manage_pimpinan_form)
+        self.manage_pimpinan_button.grid(row=4, column=0, padx=20, pady=10)
+
+        self.free_slot_button = ctk.CTkButton(self.sidebar_frame, text="Cari Waktu Kosong", command=self.open_free_slot_dialog)
+        self.free_slot_button.grid(row=5, column=0, padx=20, pady=10)
+
+        self.room_occupancy_button = ctk.CTkButton(self.sidebar_frame, text="Okupansi Ruangan", command=self.open_room_occupancy_window)
+        self.room_occupancy_button.grid(row=6, column=0, padx=20, pady=10)
+        
+        # Filter Section
+        self.filter_label = ctk.CTkLabel(self.sidebar_frame, text="Filter Pimpinan:", font=ctk.CTkFont(size=14, weight="bold"))
+        self.filter_label.grid(row=7, column=0, padx=20, pady=(10, 5), sticky="w")
+
+        pimpinan_names_for_filter = ["Semua Pimpinan"] + list(self.pimpinan_data.values())
+        self.pimpinan_filter_combobox = ctk.CTkComboBox(self.sidebar_frame, values=pimpinan_names_for_filter,
+                                                        command=self._apply_pimpinan_filter)
+        self.pimpinan_filter_combobox.set("Semua Pimpinan")
+        self.pimpinan_filter_combobox.grid(row=8, column=0, padx=20, pady=5, sticky="ew")
+
+        self.refresh_button = ctk.CTkButton(self.sidebar_frame, text="Refresh Jadwal & Kalender", command=self.on_refresh_clicked)
+        self.refresh_button.grid(row=9, column=0, padx=20, pady=10)
+
+        self.diagnostics_button = ctk.CTkButton(self.sidebar_frame, text="Diagnostik", fg_color="gray",
+                                                hover_color="#696969", command=self.open_diagnostics_window)
+        self.diagnostics_button.grid(row=10, column=0, padx=20, pady=(10, 20))
+
+        # Main Content Frame
+        self.main_content_frame = ctk.CTkFrame(self, corner_radius=0)
+        self.main_content_frame.grid(row=0, column=1, sticky="nsew", padx=10, pady=10)
+        self.main_content_frame.grid_rowconfigure(1, weight=1) # Calendar takes minimal, activity list takes the rest
+        self.main_content_frame.grid_columnconfigure(0, weight=1)
+
+        self.calendar_frame = ctk.CTkFrame(self.main_content_frame)
+        self.calendar_frame.grid(row=0, column=0, padx=10, pady=10, sticky="ew")
+        self.calendar_frame.grid_columnconfigure(0, weight=1)
+
+        self.calendar_label = ctk.CTkLabel(self.calendar_frame, text="Kalender Kegiatan", font=ctk.CTkFont(size=20, weight="bold"))
+        self.calendar_label.pack(pady=(0, 10))
+
+        self.calendar = Calendar(self.calendar_frame, selectmode='day',
+                                 date_pattern='y-mm-dd',
+                                 font="Arial 12",
+                                 tooltipdelay=100,
+                                 showweeknumbers=False,
+                                 cursor="hand1")
+        self.calendar.pack(expand=True, fill="both")
+        # Bind events to update the daily activity view
+        self.calendar.bind("<<CalendarSelected>>", self.on_date_selected)
+        # We also need to refresh markers when month changes, but not the activity list below
+        self.calendar.bind("<<CalendarMonthChanged>>", self.on_month_changed) 
+
+        # Bottom section for Activities on Selected Date (REVERTED TO OLDER STRUCTURE)
+        self.activity_list_frame = ctk.CTkFrame(self.main_content_frame)
+        self.activity_list_frame.grid(row=1, column=0, padx=10, pady=10, sticky="nsew")
+        self.activity_list_frame.grid_rowconfigure(1, weight=1) # For scrollable frame
+        self.activity_list_frame.grid_columnconfigure(0, weight=1)
+
+        self.activity_list_label = ctk.CTkLabel(self.activity_list_frame, text="Kegiatan pada Tanggal Dipilih:", font=ctk.CTkFont(size=18, weight="bold"))
+        self.activity_list_label.grid(row=0, column=0, padx=10, pady=(10, 5), sticky="w")
+
+        # Virtualized table: only the visible rows exist as widgets and they are reused on scroll/reload
+        self.activity_table = ActivityTable(self.activity_list_frame,
+                                            on_edit=self.open_edit_activity_form,
+                                            on_delete=self.confirm_delete_activity)
+        self.activity_table.grid(row=1, column=0, padx=10, pady=10, sticky="nsew")
+
+
+    # --- Filter Pimpinan Logic ---
+    def _apply_pimpinan_filter(self, selected_pimpinan_name):
+        self.current_filter_id_pimpinan = None
+        if selected_pimpinan_name != "Semua Pimpinan":
+            # Compare names in a case-insensitive manner
+            for p_id, p_name in self.pimpinan_data.items():
+                if p_name.lower() == selected_pimpinan_name.lower():
+                    self.current_filter_id_pimpinan = p_id
+                    break
+        self.refresh_all() # Refresh the view with the new filter
+
+    # --- New/Modified Functions for Calendar View & Activity List ---
+    def on_month_changed(self, event=None):
+        # When month changes, only update calendar markers, not the daily activity list below
+        self.update_calendar_markers()
+
+    def on_date_selected(self, event=None):
+        # When a date is selected, load activities for that specific date
+        selected_date = self.calendar.get_date()
+        self.load_activities_for_date(selected_date)
+
+
+    def load_activities_for_date(self, date_str):
+        with instrumentation.profile('load_activities_for_date'):
+            # Served from the month cache; only hits the DB for a month/filter not seen yet
+            filtered_activities = self.repository.get_activities_for_date(date_str, id_pimpinan_filter=self.current_filter_id_pimpinan)
+
+            self.activity_list_label.configure(text=f"Kegiatan pada Tanggal: {date_str}")
+
+            # Sort activities by start time
+            filtered_activities.sort(key=lambda x: datetime.strptime(x['waktu_mulai_kegiatan'], '%H:%M').time())
+            self.activity_table.set_activities(filtered_activities)
+
+    # The show_activity_context_menu will no longer be called as buttons are direct
+    # but I'll keep it just in case you want to re-enable it for some reason.
+    def show_activity_context_menu(self, event, activity_id):
+        # Create a Toplevel window for the context menu
+        menu = ctk.CTkToplevel(self)
+        menu.overrideredirect(True) # Make it behave like a popup menu
+
+        # Position the menu at the mouse click location
+        menu.geometry(f"+{event.x_root}+{event.y_root}")
+        
+        # Edit button
+        edit_button = ctk.CTkButton(menu, text="Edit", 
+                                    command=lambda: (menu.destroy(), self.open_edit_activity_form(activity_id)))
+        edit_button.pack(fill="x", padx=5, pady=2)
+
+        # Delete button
+        delete_button = ctk.CTkButton(menu, text="Hapus", 
+                                      command=lambda: (menu.destroy(), self.confirm_delete_activity(activity_id)),
+                                      fg_color="red", hover_color="#8b0000")
+        delete_button.pack(fill="x", padx=5, pady=2)
+
+        # Bind a click outside to close the menu
+        def close_menu_on_click_outside(event):
+            if not (menu.winfo_exists() and menu.winfo_containing(event.x_root, event.y_root) == menu):
+                menu.destroy()
+        self.bind("<Button-1>", close_menu_on_click_outside, add="+")
+        menu.bind("<Button-1>", lambda e: "break", add="+") # Prevent click on menu from closing it immediately
+        
+        menu.focus_set()
+
+
+    def _marker_tag(self, activities):
+        # One pimpinan on the date -> that pimpinan's color; mixed or no pimpinan -> generic 'activity' tag
+        pimpinan_ids = {a['id_pimpinan'] for a in activities}
+        if len(pimpinan_ids) == 1:
+            pimpinan_id = pimpinan_ids.pop()
+            if pimpinan_id is not None and self.pimpinan_colors.get(pimpinan_id):
+                return f"pimpinan_{pimpinan_id}"
+        return 'activity'
+
+    def _configure_marker_tags(self):
+        wanted = {'activity': 'lightblue'}
+        for pimpinan_id, color in self.pimpinan_colors.items():
+            if color:
+                wanted[f"pimpinan_{pimpinan_id}"] = color
+        for tag, color in wanted.items():
+            if self.marker_tag_colors.get(tag) != color:
+                self.calendar.tag_config(tag, background=color, foreground='black')
+                self.marker_tag_colors[tag] = color
+
+    def update_calendar_markers(self):
+        self._configure_marker_tags()
+
+        # Only the displayed month and its neighbours (their first/last weeks are visible too)
+        month, year = self.calendar.get_displayed_month()
+        activity_dates = {}
+        for offset in (-1, 0, 1):
+            y, m = divmod(year * 12 + (month - 1) + offset, 12)
+            activity_dates.update(self.repository.get_activities_for_month(y, m + 1, self.current_filter_id_pimpinan))
+
+        wanted = {}
+        for date_str, activities in activity_dates.items():
+            try:
+                dt_obj = datetime.strptime(date_str, '%Y-%m-%d').date()
+            except ValueError:
+                print(f"Invalid date format found in DB: {date_str}")
+                continue
+            tag = self._marker_tag(activities)
+            signature = (tag,) + tuple((a['id'], a['waktu_mulai_kegiatan'], a['waktu_akhir_kegiatan'], a['uraian_kegiatan'])
+                                       for a in activities)
+            wanted[dt_obj] = (signature, tag, activities)
+
+        # Diff against what is already on the calendar: only touch dates that changed
+        for dt_obj in list(self.calendar_markers):
+            ev_id, signature = self.calendar_markers[dt_obj]
+            if dt_obj not in wanted or wanted[dt_obj][0] != signature:
+                self.calendar.calevent_remove(ev_id)
+                del self.calendar_markers[dt_obj]
+
+        for dt_obj, (signature, tag, activities) in wanted.items():
+            if dt_obj not in self.calendar_markers:
+                ev_id = self.calendar.calevent_create(dt_obj, MarkerTooltipText(activities), tag)
+                self.calendar_markers[dt_obj] = (ev_id, signature)
+
+    def open_add_activity_form(self, prefill=None):
+        add_form = AddActivityForm(self, prefill)
+        self.wait_window(add_form)
+        if add_form.saved_series:
+            self.reminder_scheduler.reload()
+        elif add_form.saved_date is not None:
+            self.reminder_scheduler.refresh_date(add_form.saved_date)
+        self.refresh_all()
+
+    def open_edit_activity_form(self, activity_id):
+        activity_data = self.repository.get_activity_by_id(activity_id)
+        if not activity_data:
+            messagebox.showerror("Error", "Kegiatan tidak ditemukan.")
+            return
+
+        if activity_data['seri_id'] is not None:
+            # Kejadian kegiatan berulang: ubah seluruh seri atau hanya kejadian ini
+            choice = messagebox.askyesnocancel(
+                "Kegiatan Berulang",
+                "Kegiatan ini bagian dari kegiatan berulang.\n\n"
+                "Ya = ubah seluruh seri\nTidak = ubah hanya kejadian tanggal ini"
+            )
+            if choice is None:
+                return
+            if choice:
+                series = self.repository.get_recurring_series(activity_data['seri_id'])
+                if not series:
+                    messagebox.showerror("Error", "Kegiatan berulang tidak ditemukan.")
+                    return
+                edit_form = EditActivityForm(self, dict(series, tanggal_kegiatan=series['tanggal_mulai']), series_id=series['id'])
+                self.wait_window(edit_form)
+                self.reminder_scheduler.reload()
+                self.refresh_all()
+                return
+
+        edit_form = EditActivityForm(self, activity_data)
+        self.wait_window(edit_form)
+        self.reminder_scheduler.refresh_activity(activity_id)
+        self.refresh_all()
+
+    def confirm_delete_activity(self, activity_id):
+        occurrence = parse_occurrence_id(activity_id)
+        if occurrence is not None:
+            choice = messagebox.askyesnocancel(
+                "Hapus Kegiatan Berulang",
+                f"Kegiatan ini bagian dari kegiatan berulang (seri R{occurrence[0]}).\n\n"
+                f"Ya = hapus seluruh seri\nTidak = hapus hanya kejadian {occurrence[1].isoformat()}"
+            )
+            if choice is None:
+                return
+            if choice:
+                success, message = self.repository.delete_recurring_series(occurrence[0])
+            else:
+                success, message = self.repository.delete_activity(activity_id)
+            if success:
+                messagebox.showinfo("Berhasil", message)
+                self.reminder_scheduler.reload()
+                self.refresh_all()
+            else:
+                messagebox.showerror("Error", message)
+            return
+
+        if messagebox.askyesno("Konfirmasi Hapus", f"Apakah Anda yakin ingin menghapus kegiatan ID {activity_id}?"):
+            success, message = self.repository.delete_activity(activity_id)
+            if success:
+                messagebox.showinfo("Berhasil", message)
+                self.reminder_scheduler.remove_activity(activity_id)
+                self.refresh_all()
+            else:
+                messagebox.showerror("Error", message)
+
+    def import_excel_dialog(self):
+        if self.import_job is not None and self.import_job.is_alive():
+            messagebox.showwarning("Impor Berjalan", "Impor sebelumnya masih berjalan.")
+            return
+        file_path = filedialog.askopenfilename(filetypes=[("Excel files", "*.xlsx *.xls")])
+        if file_path:
+            from excel_importer import ImportJob # Lazy: pulls in pandas/openpyxl only when importing
+            # Run the import in a worker thread so the window stays responsive
+            self.import_job = ImportJob(file_path, client=self.api_client)
+            self.import_job.start()
+            self.import_excel_button.configure(state="disabled")
+            ImportProgressDialog(self, self.import_job, os.path.basename(file_path))
+
+    def on_import_finished(self, event):
+        # Called on the Tk thread by ImportProgressDialog once the job is done
+        self.import_excel_button.configure(state="normal")
+        self.import_job = None
+        ImportReportWindow(self, event)
+        if event['imported'] > 0 or event['summary']['removed'] > 0:
+            self.reminder_scheduler.reload()
+            self.refresh_all()
+
+    def refresh_all(self):
+        with instrumentation.profile('refresh_all'):
+            self._load_pimpinan_data() # Reload pimpinan data
+            # Refresh the activity list for the currently selected date
+            self.load_activities_for_date(self.calendar.get_date())
+            self.update_calendar_markers() # Refresh markers (will use the current filter)
+
+    def on_refresh_clicked(self):
+        # Manual refresh also picks up changes made outside the app (e.g. another instance)
+        self.repository.clear()
+        self.reminder_scheduler.reload()
+        self.refresh_all()
+
+    def open_export_dialog(self):
+        ExportDialog(self)
+
+    def open_free_slot_dialog(self):
+        FreeSlotDialog(self)
+
+    def open_room_occupancy_window(self):
+        RoomOccupancyWindow(self, self.calendar.get_date())
+
+    def open_diagnostics_window(self):
+        if getattr(self, 'diagnostics_window', None) is not None and self.diagnostics_window.winfo_exists():
+            self.diagnostics_window.focus_set()
+            return
+        self.diagnostics_window = DiagnosticsWindow(self)
+
+    # --- Manage Pimpinan Form (BARU) ---
+    def open_manage_pimpinan_form(self):
+        manage_form = ManagePimpinanForm(self)
+        self.wait_window(manage_form)
+        self.reminder_scheduler.reload() # Deleting a pimpinan may cascade to activities
+        self.refresh_all() # Refresh after managing pimpinan
+
+    # Called from the reminder scheduler thread; hand the popup over to the Tk thread
+    def show_notification(self, activity_data, lead_minutes):
+        self.after(0, lambda: self._display_notification_popup(activity_data, lead_minutes))
+
+    def _display_notification_popup(self, activity_data, lead_minutes):
+        # activity_data is a Row object
+        activity_id = activity_data['id']
+        activity_uraian = activity_data['uraian_kegiatan']
+        activity_start_time = activity_data['waktu_mulai_kegiatan']
+        activity_end_time = activity_data['waktu_akhir_kegiatan']
+        activity_place = activity_data['tempat_ruangan']
+        # The reminder may fire late (e.g. app started after the lead time), so show the actual time left
+        activity_start = datetime.strptime(f"{activity_data['tanggal_kegiatan']} {activity_start_time}", '%Y-%m-%d %H:%M')
+        minutes_left = max(1, min(lead_minutes, -(-int((activity_start - datetime.now()).total_seconds()) // 60)))
+
+        messagebox.showinfo(
+            "Peringatan Kegiatan Mendatang!",
+            f"Kegiatan: {activity_uraian}\n"
+            f"Waktu: {activity_start_time} - {activity_end_time}\n"
+            f"Tempat: {activity_place}\n\n"
+            f"Kegiatan akan dimulai dalam {minutes_left} menit!"
+        )
+
+    def on_closing(self):
+        self.reminder_scheduler.stop()
+        self.destroy()
+        close_all_connections() # Close the long-lived per-thread SQLite connections
+
+
+# --- Teks Tooltip Kalender (BARU) ---
+# tkcalendar memformat teks event hanya saat tanggalnya ditampilkan di grid, jadi teks tooltip
+# baru dibangun ketika tanggal tersebut benar-benar terlihat, lalu disimpan untuk tampilan berikutnya.
+class MarkerTooltipText:
+    def __init__(self, activities):
+        self.activities = activities
+        self._text = None
+
+    def __str__(self):
+        if self._text is None:
+            self._text = "Kegiatan:\n" + "\n".join([f"- {a['waktu_mulai_kegiatan']}-{a['waktu_akhir_kegiatan']} {a['uraian_kegiatan']}" for a in self.activities])
+        return self._text
+
+    def __format__(self, format_spec):
+        return format(str(self), format_spec)
+
+
+# --- Tabel Kegiatan Virtual (BARU) ---
+# Hanya baris yang terlihat yang dibuat sebagai widget. Kumpulan baris (pool) dipakai ulang saat
+# data diganti atau tabel di-scroll, sehingga waktu redraw tidak bergantung pada jumlah kegiatan.
+class ActivityTable(ctk.CTkFrame):
+    ROW_HEIGHT = 36
+    HEADERS = ["ID", "Waktu", "Uraian Kegiatan", "Tempat", "Pimpinan", "Aksi"]
+    COLUMN_WEIGHTS = [1, 2, 5, 3, 2, 0]
+    ACTION_COLUMN_WIDTH = 140 # Space for 2 buttons
+    MAX_TEXT_LENGTH = 60
+
+    def __init__(self, master, on_edit, on_delete, **kwargs):
+        super().__init__(master, **kwargs)
+        self.on_edit = on_edit
+        self.on_delete = on_delete
+        self.activities = []
+        self.first_index = 0
+        self.row_pool = [] # Reused row widgets; see _create_row
+
+        self.grid_rowconfigure(1, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        self.header_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.header_frame.grid(row=0, column=0, sticky="ew")
+        self._configure_columns(self.header_frame)
+        for col_idx, header_text in enumerate(self.HEADERS):
+            header_label = ctk.CTkLabel(self.header_frame, text=header_text, font=ctk.CTkFont(weight="bold"))
+            header_label.grid(row=0, column=col_idx, padx=5, pady=5, sticky="w")
+
+        self.body_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.body_frame.grid(row=1, column=0, sticky="nsew")
+        self.body_frame.bind("<Configure>", lambda e: self._render())
+        self._bind_scroll(self.body_frame)
+
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.grid(row=1, column=1, sticky="ns")
+
+        self.no_data_label = ctk.CTkLabel(self.body_frame, text="Tidak ada kegiatan untuk tanggal ini.", font=ctk.CTkFont(size=16))
+
+    def _configure_columns(self, frame):
+        for col_idx, weight in enumerate(self.COLUMN_WEIGHTS):
+            if weight:
+                frame.grid_columnconfigure(col_idx, weight=weight, uniform="activity_column")
+            else:
+                frame.grid_columnconfigure(col_idx, weight=0, minsize=self.ACTION_COLUMN_WIDTH)
+
+    def _bind_scroll(self, widget):
+        widget.bind("<MouseWheel>", self._on_mousewheel)
+        widget.bind("<Button-4>", lambda e: self.scroll_rows(-1))
+        widget.bind("<Button-5>", lambda e: self.scroll_rows(1))
+
+    def _create_row(self):
+        slot = len(self.row_pool)
+        frame = ctk.CTkFrame(self.body_frame, height=self.ROW_HEIGHT, corner_radius=0, fg_color="transparent")
+        frame.grid_propagate(False)
+        frame.grid_rowconfigure(0, weight=1)
+        self._configure_columns(frame)
+
+        labels = []
+        for col_idx in range(5):
+            label = ctk.CTkLabel(frame, text="", anchor="w")
+            label.grid(row=0, column=col_idx, padx=5, pady=2, sticky="w")
+            self._bind_scroll(label)
+            labels.append(label)
+        labels[4].configure(text_color="black", corner_radius=5)
+
+        action_frame = ctk.CTkFrame(frame, fg_color="transparent")
+        action_frame.grid(row=0, column=5, padx=5, pady=2, sticky="ew")
+        # The buttons look up the activity shown in their slot at click time, so they never need rebinding
+        edit_button = ctk.CTkButton(action_frame, text="Edit", command=lambda: self._on_action(slot, self.on_edit),
+                                    width=60, fg_color="gray", hover_color="#696969")
+        edit_button.grid(row=0, column=0, padx=(0, 5), sticky="w")
+        delete_button = ctk.CTkButton(action_frame, text="Hapus", command=lambda: self._on_action(slot, self.on_delete),
+                                      width=60, fg_color="red", hover_color="#8b0000")
+        delete_button.grid(row=0, column=1, sticky="w")
+        self._bind_scroll(frame)
+
+        row = {'frame': frame, 'labels': labels, 'shown': None, 'placed': False}
+        self.row_pool.append(row)
+        return row
+
+    def _on_action(self, slot, callback):
+        index = self.first_index + slot
+        if index < len(self.activities):
+            callback(self.activities[index]['id'])
+
+    def _visible_row_count(self):
+        row_height = self._apply_widget_scaling(self.ROW_HEIGHT)
+        return max(1, int(self.body_frame.winfo_height() // row_height))
+
+    def set_activities(self, activities):
+        self.activities = activities
+        self.first_index = 0
+        self._render()
+
+    def scroll_rows(self, delta):
+        self._scroll_to(self.first_index + delta)
+
+    def _scroll_to(self, first_index):
+        max_first = max(0, len(self.activities) - self._visible_row_count())
+        first_index = min(max(0, first_index), max_first)
+        if first_index != self.first_index:
+            self.first_index = first_index
+            self._render()
+
+    def _on_mousewheel(self, event):
+        self.scroll_rows(-1 if event.delta > 0 else 1)
+
+    def _on_scrollbar(self, *args):
+        if args[0] == "moveto":
+            self._scroll_to(round(float(args[1]) * len(self.activities)))
+        elif args[0] == "scroll":
+            step = int(args[1])
+            if len(args) > 2 and args[2] == "pages":
+                step *= self._visible_row_count()
+            self.scroll_rows(step)
+
+    def _render(self):
+        visible_rows = self._visible_row_count()
+        total = len(self.activities)
+
+        if total == 0:
+            self.no_data_label.place(relx=0.5, y=20, anchor="n")
+        else:
+            self.no_data_label.place_forget()
+
+        while len(self.row_pool) < min(visible_rows, total):
+            self._create_row()
+
+        for slot, row in enumerate(self.row_pool):
+            index = self.first_index + slot
+            if slot >= visible_rows or index >= total:
+                if row['placed']:
+                    row['frame'].place_forget()
+                    row['placed'] = False
+                continue
+            activity = self.activities[index]
+            if row['shown'] is not activity: # Only reconfigure slots whose content changed
+                self._fill_row(row, activity)
+                row['shown'] = activity
+            if not row['placed']:
+                row['frame'].place(x=0, y=slot * self.ROW_HEIGHT, relwidth=1.0)
+                row['placed'] = True
+
+        if total > visible_rows:
+            self.scrollbar.set(self.first_index / total, (self.first_index + visible_rows) / total)
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def _fill_row(self, row, activity):
+        uraian = activity['uraian_kegiatan'] or ""
+        if len(uraian) > self.MAX_TEXT_LENGTH:
+            uraian = uraian[:self.MAX_TEXT_LENGTH - 1] + "…"
+        id_label, time_label, uraian_label, tempat_label, pimpinan_label = row['labels']
+        # Kejadian kegiatan berulang ditampilkan dengan nomor serinya (R<seri_id>)
+        id_label.configure(text=str(activity['id']) if activity['seri_id'] is None else f"R{activity['seri_id']}")
+        time_label.configure(text=f"{activity['waktu_mulai_kegiatan']} - {activity['waktu_akhir_kegiatan']}")
+        uraian_label.configure(text=uraian)
+        tempat_label.configure(text=activity['tempat_ruangan'] or "")
+        pimpinan_label.configure(text=activity['pimpinan_nama'] or "", fg_color=activity['pimpinan_warna'] or "transparent")
+
+
+# --- Dialog Cari Waktu Kosong (BARU) ---
+# Mencari slot paling awal ketika pimpinan dan semua peserta sama-sama kosong (db_handler.find_free_slots);
+# tombol "Pakai" membuka AddActivityForm yang sudah terisi tanggal, jam, pimpinan dan peserta.
+class FreeSlotDialog(ctk.CTkToplevel):
+    NO_PIMPINAN = "Tanpa pimpinan"
+    DEFAULT_SEARCH_DAYS = 30
+    MAX_RESULTS = 10
+
+    def __init__(self, master):
+        super().__init__(master)
+        self.title("Cari Waktu Kosong")
+        self.geometry("640x680")
+        self.transient(master)
+
+        self.master_app = master
+        self.pimpinan_options = self.master_app.pimpinan_data # ID -> Name
+        self.create_form_widgets()
+
+    def create_form_widgets(self):
+        form = ctk.CTkFrame(self)
+        form.pack(padx=20, pady=(20, 10), fill="x")
+        form.grid_columnconfigure(1, weight=1)
+
+        ctk.CTkLabel(form, text="Pimpinan:").grid(row=0, column=0, padx=10, pady=5, sticky="w")
+        self.pimpinan_combobox = ctk.CTkComboBox(form, values=[self.NO_PIMPINAN] + sorted(self.pimpinan_options.values()),
+                                                 state="readonly")
+        self.pimpinan_combobox.set(self.NO_PIMPINAN)
+        self.pimpinan_combobox.grid(row=0, column=1, padx=10, pady=5, sticky="ew")
+
+        ctk.CTkLabel(form, text="Daftar Peserta (pisahkan koma):").grid(row=1, column=0, padx=10, pady=5, sticky="w")
+        self.participants_entry = ctk.CTkEntry(form)
+        self.participants_entry.grid(row=1, column=1, padx=10, pady=5, sticky="ew")
+
+        ctk.CTkLabel(form, text="Durasi (menit):").grid(row=2, column=0, padx=10, pady=5, sticky="w")
+        self.duration_entry = ctk.CTkEntry(form)
+        self.duration_entry.insert(0, "60")
+        self.duration_entry.grid(row=2, column=1, padx=10, pady=5, sticky="ew")
+
+        ctk.CTkLabel(form, text="Mulai Tanggal:").grid(row=3, column=0, padx=10, pady=5, sticky="w")
+        self.start_date_entry = DateEntry(form, width=20, locale='id_ID', date_pattern='yyyy-mm-dd')
+        self.start_date_entry.set_date(datetime.now().date())
+        self.start_date_entry.grid(row=3, column=1, padx=10, pady=5, sticky="w")
+
+        ctk.CTkLabel(form, text="Jumlah Hari:").grid(row=4, column=0, padx=10, pady=5, sticky="w")
+        self.days_entry = ctk.CTkEntry(form)
+        self.days_entry.insert(0, str(self.DEFAULT_SEARCH_DAYS))
+        self.days_entry.grid(row=4, column=1, padx=10, pady=5, sticky="ew")
+
+        ctk.CTkLabel(form, text="Jam Kerja (HH:MM):").grid(row=5, column=0, padx=10, pady=5, sticky="w")
+        hours_frame = ctk.CTkFrame(form, fg_color="transparent")
+        hours_frame.grid(row=5, column=1, padx=10, pady=5, sticky="w")
+        self.work_start_entry = ctk.CTkEntry(hours_frame, width=80)
+        self.work_start_entry.insert(0, db_handler.WORKING_HOURS[0])
+        self.work_start_entry.pack(side="left")
+        ctk.CTkLabel(hours_frame, text=" - ").pack(side="left")
+        self.work_end_entry = ctk.CTkEntry(hours_frame, width=80)
+        self.work_end_entry.insert(0, db_handler.WORKING_HOURS[1])
+        self.work_end_entry.pack(side="left")
+
+        ctk.CTkButton(form, text="Cari", command=self.search).grid(row=6, column=0, columnspan=2, pady=10)
+
+        self.results_frame = ctk.CTkScrollableFrame(self, label_text="Slot Tersedia (paling awal)")
+        self.results_frame.pack(padx=20, pady=(0, 20), fill="both", expand=True)
+        self.results_frame.grid_columnconfigure(0, weight=1)
+
+    def _selected_pimpinan_id(self):
+        for p_id, p_name in self.pimpinan_options.items():
+            if p_name == self.pimpinan_combobox.get():
+                return p_id
+        return None
+
+    def search(self):
+        try:
+            duration = int(self.duration_entry.get())
+            days = int(self.days_entry.get())
+            if duration < 1 or days < 1:
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("Input Error", "Durasi dan jumlah hari harus berupa angka 1 atau lebih.", parent=self)
+            return
+        working_hours = (self.work_start_entry.get().strip(), self.work_end_entry.get().strip())
+        try:
+            for value in working_hours:
+                datetime.strptime(value, '%H:%M')
+        except ValueError:
+            messagebox.showerror("Input Error", "Format jam kerja salah. Gunakan HH:MM.", parent=self)
+            return
+
+        start_date = self.start_date_entry.get_date()
+        end_date = start_date + timedelta(days=days - 1)
+        self.pimpinan_id = self._selected_pimpinan_id()
+        self.participants = self.participants_entry.get()
+        slots = self.master_app.backend.find_free_slots(
+            [self.pimpinan_id] if self.pimpinan_id is not None else [], self.participants, duration,
+            start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'),
+            working_hours=working_hours, limit=self.MAX_RESULTS, not_before=datetime.now()
+        )
+        self.show_slots(slots)
+
+    def show_slots(self, slots):
+        for widget in self.results_frame.winfo_children():
+            widget.destroy()
+        if not slots:
+            ctk.CTkLabel(self.results_frame, text="Tidak ada waktu kosong dalam rentang ini.").grid(row=0, column=0, pady=10)
+            return
+        for row, slot in enumerate(slots):
+            day_name = WEEKDAY_NAMES[datetime.strptime(slot['tanggal_kegiatan'], '%Y-%m-%d').weekday()]
+            text = (f"{day_name} {slot['tanggal_kegiatan']}   {slot['waktu_mulai_kegiatan']} - {slot['waktu_akhir_kegiatan']}"
+                    f"   (kosong sampai {slot['bebas_sampai']})")
+            ctk.CTkLabel(self.results_frame, text=text, anchor="w").grid(row=row, column=0, padx=5, pady=3, sticky="ew")
+            ctk.CTkButton(self.results_frame, text="Pakai", width=70,
+                          command=lambda s=slot: self.use_slot(s)).grid(row=row, column=1, padx=5, pady=3)
+
+    def use_slot(self, slot):
+        prefill = dict(slot, id_pimpinan=self.pimpinan_id, daftar_peserta=self.participants)
+        self.destroy()
+        self.master_app.open_add_activity_form(prefill)
+
+
+# --- Okupansi Ruangan (BARU) ---
+# Pemakaian setiap ruangan dalam rentang tanggal (db_handler.get_room_occupancy) dan pengaturan kapasitas.
+# Ruangan dibuat otomatis dari isian "Tempat Ruangan" kegiatan.
+class RoomOccupancyWindow(ctk.CTkToplevel):
+    DEFAULT_DAYS = 7
+
+    def __init__(self, master, start_date):
+        super().__init__(master)
+        self.title("Okupansi Ruangan")
+        self.geometry("820x600")
+        self.transient(master)
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(2, weight=1)
+
+        self.master_app = master
+        self.rooms = {} # nama -> baris Ruangan
+
+        control_frame = ctk.CTkFrame(self, fg_color="transparent")
+        control_frame.grid(row=0, column=0, padx=10, pady=(10, 5), sticky="ew")
+        ctk.CTkLabel(control_frame, text="Mulai Tanggal:").pack(side="left")
+        self.start_date_entry = DateEntry(control_frame, width=12, locale='id_ID', date_pattern='yyyy-mm-dd')
+        self.start_date_entry.set_date(datetime.strptime(start_date, '%Y-%m-%d').date())
+        self.start_date_entry.pack(side="left", padx=(5, 15))
+        ctk.CTkLabel(control_frame, text="Jumlah Hari:").pack(side="left")
+        self.days_entry = ctk.CTkEntry(control_frame, width=60)
+        self.days_entry.insert(0, str(self.DEFAULT_DAYS))
+        self.days_entry.pack(side="left", padx=5)
+        ctk.CTkButton(control_frame, text="Tampilkan", width=100, command=self.show_occupancy).pack(side="left", padx=10)
+
+        capacity_frame = ctk.CTkFrame(self, fg_color="transparent")
+        capacity_frame.grid(row=1, column=0, padx=10, pady=5, sticky="ew")
+        ctk.CTkLabel(capacity_frame, text="Ruangan:").pack(side="left")
+        self.room_combobox = ctk.CTkComboBox(capacity_frame, values=[], state="readonly", width=260,
+                                             command=self._on_room_selected)
+        self.room_combobox.pack(side="left", padx=(5, 15))
+        ctk.CTkLabel(capacity_frame, text="Kapasitas:").pack(side="left")
+        self.capacity_entry = ctk.CTkEntry(capacity_frame, width=80)
+        self.capacity_entry.pack(side="left", padx=5)
+        ctk.CTkButton(capacity_frame, text="Simpan Kapasitas", width=130, command=self.save_capacity).pack(side="left", padx=10)
+
+        self.textbox = ctk.CTkTextbox(self, font=ctk.CTkFont(family="Courier", size=12), wrap="none")
+        self.textbox.grid(row=2, column=0, padx=10, pady=(5, 10), sticky="nsew")
+
+        self.load_rooms()
+        self.show_occupancy()
+
+    def load_rooms(self):
+        self.rooms = {room['nama']: room for room in self.master_app.backend.get_all_ruangan()}
+        names = sorted(self.rooms, key=str.lower)
+        self.room_combobox.configure(values=names)
+        if names and self.room_combobox.get() not in self.rooms:
+            self.room_combobox.set(names[0])
+            self._on_room_selected(names[0])
+
+    def _on_room_selected(self, name):
+        self.capacity_entry.delete(0, "end")
+        room = self.rooms.get(name)
+        if room is not None and room['kapasitas'] is not None:
+            self.capacity_entry.insert(0, str(room['kapasitas']))
+
+    def save_capacity(self):
+        room = self.rooms.get(self.room_combobox.get())
+        if room is None:
+            return
+        value = self.capacity_entry.get().strip()
+        try:
+            capacity = int(value) if value else None
+            if capacity is not None and capacity < 1:
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("Input Error", "Kapasitas harus berupa angka 1 atau lebih, atau dikosongkan.", parent=self)
+            return
+        success, message = self.master_app.backend.update_ruangan_capacity(room['id'], capacity)
+        if not success:
+            messagebox.showerror("Error", message, parent=self)
+            return
+        self.load_rooms()
+        self.show_occupancy()
+
+    def show_occupancy(self):
+        try:
+            days = int(self.days_entry.get())
+            if days < 1:
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("Input Error", "Jumlah hari harus berupa angka 1 atau lebih.", parent=self)
+            return
+        start_date = self.start_date_entry.get_date()
+        end_date = start_date + timedelta(days=days - 1)
+        rows = self.master_app.backend.get_room_occupancy(start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'))
+
+        lines = []
+        current_room = None
+        for row in rows:
+            if row['ruangan_nama'] != current_room:
+                current_room = row['ruangan_nama']
+                capacity = f"kapasitas {row['kapasitas']}" if row['kapasitas'] is not None else "kapasitas belum diisi"
+                if lines:
+                    lines.append("")
+                lines.append(f"=== {current_room} ({capacity}) ===")
+            warning = ""
+            if row['kapasitas'] is not None and row['jumlah_peserta'] > row['kapasitas']:
+                warning = "  [melebihi kapasitas]"
+            lines.append(f"{row['tanggal_kegiatan']}  {row['waktu_mulai_kegiatan']}-{row['waktu_akhir_kegiatan']}  "
+                         f"{row['jumlah_peserta']:3d} peserta  {row['uraian_kegiatan'] or ''}{warning}")
+        self.textbox.configure(state="normal")
+        self.textbox.delete("1.0", "end")
+        self.textbox.insert("1.0", "\n".join(lines) if lines else "Tidak ada pemakaian ruangan dalam rentang ini.")
+        self.textbox.configure(state="disabled")
+
+
+# --- Dialog Ekspor Jadwal (BARU) ---
+# Menulis kegiatan dalam rentang tanggal ke workbook dengan format impor (satu sheet per bulan)
+# atau ke file kalender .ics, memakai filter pimpinan yang sedang aktif. Ekspor berjalan di thread terpisah.
+class ExportDialog(ctk.CTkToplevel):
+    POLL_INTERVAL_MS = 100
+    FORMAT_EXCEL = "Excel (.xlsx)"
+    FORMAT_ICS = "Kalender (.ics)"
+
+    def __init__(self, master):
+        super().__init__(master)
+        self.title("Export Jadwal")
+        self.geometry("420x270")
+        self.resizable(False, False)
+        self.transient(master)
+
+        self.master_app = master
+        self.pimpinan_ids = None if master.current_filter_id_pimpinan is None else [master.current_filter_id_pimpinan]
+        self.results = queue.Queue()
+
+        # Default: bulan yang sedang ditampilkan di kalender
+        month, year = master.calendar.get_displayed_month()
+        start_date, end_date = db_handler.get_month_window(year, month)
+
+        form = ctk.CTkFrame(self, fg_color="transparent")
+        form.pack(padx=20, pady=(20, 5), fill="x")
+        ctk.CTkLabel(form, text="Dari Tanggal:").grid(row=0, column=0, padx=10, pady=5, sticky="w")
+        self.start_date_entry = DateEntry(form, width=12, locale='id_ID', date_pattern='yyyy-mm-dd')
+        self.start_date_entry.set_date(datetime.strptime(start_date, '%Y-%m-%d').date())
+        self.start_date_entry.grid(row=0, column=1, padx=10, pady=5, sticky="w")
+        ctk.CTkLabel(form, text="Sampai Tanggal:").grid(row=1, column=0, padx=10, pady=5, sticky="w")
+        self.end_date_entry = DateEntry(form, width=12, locale='id_ID', date_pattern='yyyy-mm-dd')
+        self.end_date_entry.set_date(datetime.strptime(end_date, '%Y-%m-%d').date())
+        self.end_date_entry.grid(row=1, column=1, padx=10, pady=5, sticky="w")
+        pimpinan_text = master.pimpinan_filter_combobox.get() if self.pimpinan_ids else "Semua Pimpinan"
+        ctk.CTkLabel(form, text="Pimpinan:").grid(row=2, column=0, padx=10, pady=5, sticky="w")
+        ctk.CTkLabel(form, text=pimpinan_text).grid(row=2, column=1, padx=10, pady=5, sticky="w")
+        ctk.CTkLabel(form, text="Format:").grid(row=3, column=0, padx=10, pady=5, sticky="w")
+        self.format_button = ctk.CTkSegmentedButton(form, values=[self.FORMAT_EXCEL, self.FORMAT_ICS])
+        self.format_button.set(self.FORMAT_EXCEL)
+        self.format_button.grid(row=3, column=1, padx=10, pady=5, sticky="w")
+
+        self.status_label = ctk.CTkLabel(self, text="")
+        self.status_label.pack(padx=20, pady=5, anchor="w")
+        self.export_button = ctk.CTkButton(self, text="Export", command=self.start_export)
+        self.export_button.pack(padx=20, pady=(5, 15))
+
+    def start_export(self):
+        start_date = self.start_date_entry.get_date()
+        end_date = self.end_date_entry.get_date()
+        if end_date < start_date:
+            messagebox.showerror("Input Error", "Tanggal akhir tidak boleh sebelum tanggal awal.", parent=self)
+            return
+        is_ics = self.format_button.get() == self.FORMAT_ICS
+        extension = ".ics" if is_ics else ".xlsx"
+        filetypes = [("iCalendar files", "*.ics")] if is_ics else [("Excel files", "*.xlsx")]
+        file_path = filedialog.asksaveasfilename(parent=self, defaultextension=extension, filetypes=filetypes,
+                                                 initialfile=f"jadwal_{start_date:%Y%m%d}_{end_date:%Y%m%d}{extension}")
+        if not file_path:
+            return
+        self.export_button.configure(state="disabled")
+        self.status_label.configure(text="Mengekspor...")
+        args = (start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'), file_path, is_ics)
+        threading.Thread(target=self._run_export, args=args, daemon=True).start()
+        self.after(self.POLL_INTERVAL_MS, self._poll_result)
+
+    def _run_export(self, start_date, end_date, file_path, is_ics):
+        # Lazy: excel_exporter pulls in openpyxl only when exporting
+        if is_ics:
+            from ics_calendar import export_activities_to_ics as export
+        else:
+            from excel_exporter import export_activities_to_excel as export
+        backend = self.master_app.backend
+        try:
+            self.results.put(export(start_date, end_date, self.pimpinan_ids, file_path, backend=backend))
+        except Exception as e: # Server mode: ApiError; always report back to the Tk thread
+            target = ".ics" if is_ics else "Excel" # Sama seperti pesan export_activities_to_ics/_to_excel
+            self.results.put((False, f"Error saat mengekspor ke {target}: {e}", 0))
+        finally:
+            backend.close_db() # Connection opened by this worker thread
+
+    def _poll_result(self):
+        try:
+            success, message, _ = self.results.get_nowait()
+        except queue.Empty:
+            self.after(self.POLL_INTERVAL_MS, self._poll_result)
+            return
+        if success:
+            messagebox.showinfo("Export Selesai", message, parent=self.master_app)
+            self.destroy()
+        else:
+            messagebox.showerror("Error", message, parent=self)
+            self.export_button.configure(state="normal")
+            self.status_label.configure(text="")
+
+
+# --- Panel Diagnostik (BARU) ---
+# Menampilkan counter instrumentation (panggilan db_handler, latensi, baris, koneksi) secara live
+class DiagnosticsWindow(ctk.CTkToplevel):
+    REFRESH_INTERVAL_MS = 1000
+
+    def __init__(self, master):
+        super().__init__(master)
+        self.title("Diagnostik")
+        self.geometry("760x520")
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(1, weight=1)
+
+        control_frame = ctk.CTkFrame(self, fg_color="transparent")
+        control_frame.grid(row=0, column=0, padx=10, pady=(10, 5), sticky="ew")
+        self.summary_label = ctk.CTkLabel(control_frame, text="")
+        self.summary_label.pack(side="left")
+        ctk.CTkButton(control_frame, text="Reset", width=70, command=self.reset_counters).pack(side="right", padx=(5, 0))
+        ctk.CTkButton(control_frame, text="Lihat Profil", width=100, command=self.show_profiles).pack(side="right", padx=(5, 0))
+        self.profiling_switch = ctk.CTkSwitch(control_frame, text="cProfile", command=self.toggle_profiling)
+        self.profiling_switch.pack(side="right", padx=(5, 0))
+        if instrumentation.is_profiling_enabled():
+            self.profiling_switch.select()
+
+        self.textbox = ctk.CTkTextbox(self, font=ctk.CTkFont(family="Courier", size=12), wrap="none")
+        self.textbox.grid(row=1, column=0, padx=10, pady=(5, 10), sticky="nsew")
+
+        self.refresh_counters()
+
+    def refresh_counters(self):
+        if not self.winfo_exists():
+            return
+        stats, counters = instrumentation.snapshot()
+        lines = [f"{'Fungsi':32s} {'Panggilan':>9s} {'Total ms':>10s} {'Rata ms':>9s} {'Maks ms':>9s} {'Baris':>8s} {'Error':>6s}"]
+        for name, stat in sorted(stats.items(), key=lambda item: item[1]['total_seconds'], reverse=True):
+            average_ms = stat['total_seconds'] * 1000 / stat['calls']
+            lines.append(f"{name:32s} {stat['calls']:9d} {stat['total_seconds'] * 1000:10.1f} {average_ms:9.2f} "
+                         f"{stat['max_seconds'] * 1000:9.1f} {stat['rows']:8d} {stat['errors']:6d}")
+        self.summary_label.configure(text=f"Koneksi SQLite dibuka: {counters['connections_opened']}   "
+                                          f"Ambang query lambat: {instrumentation.slow_call_ms} ms")
+        self.textbox.configure(state="normal")
+        self.textbox.delete("1.0", "end")
+        self.textbox.insert("1.0", "\n".join(lines))
+        self.textbox.configure(state="disabled")
+        self.after(self.REFRESH_INTERVAL_MS, self.refresh_counters)
+
+    def reset_counters(self):
+        instrumentation.reset()
+
+    def toggle_profiling(self):
+        instrumentation.enable_profiling(bool(self.profiling_switch.get()))
+
+    def show_profiles(self):
+        profiles = instrumentation.get_profiles()
+        if not profiles:
+            messagebox.showinfo("Profil", "Belum ada profil. Aktifkan cProfile lalu refresh jadwal atau impor Excel.", parent=self)
+            return
+        window = ctk.CTkToplevel(self)
+        window.title("Profil cProfile terakhir")
+        window.geometry("900x600")
+        textbox = ctk.CTkTextbox(window, font=ctk.CTkFont(family="Courier", size=11), wrap="none")
+        textbox.pack(fill="both", expand=True, padx=10, pady=10)
+        textbox.insert("1.0", "\n\n".join(f"=== {name} ===\n{text}" for name, text in profiles.items()))
+        textbox.configure(state="disabled")
+
+
+# --- Dialog Progres Impor Excel (BARU) ---
+class ImportProgressDialog(ctk.CTkToplevel):
+    POLL_INTERVAL_MS = 100
+
+    def __init__(self, master, import_job, file_name):
+        super().__init__(master)
+        self.title("Impor Excel")
+        self.geometry("420x170")
+        self.resizable(False, False)
+        self.transient(master)
+        self.protocol("WM_DELETE_WINDOW", self.cancel_import) # Closing the window cancels the import
+
+        self.master_app = master
+        self.import_job = import_job
+        self.total_rows = None
+
+        self.file_label = ctk.CTkLabel(self, text=f"Mengimpor: {file_name}", font=ctk.CTkFont(weight="bold"))
+        self.file_label.pack(padx=20, pady=(20, 5), anchor="w")
+
+        self.progress_bar = ctk.CTkProgressBar(self, mode="indeterminate")
+        self.progress_bar.pack(padx=20, pady=5, fill="x")
+        self.progress_bar.start()
+
+        self.status_label = ctk.CTkLabel(self, text="Membaca file...")
+        self.status_label.pack(padx=20, pady=5, anchor="w")
+
+        self.cancel_button = ctk.CTkButton(self, text="Batal", fg_color="red", hover_color="#8b0000",
+                                           command=self.cancel_import)
+        self.cancel_button.pack(padx=20, pady=(5, 15))
+
+        self.after(self.POLL_INTERVAL_MS, self._poll_events)
+
+    def _poll_events(self):
+        # Drain events posted by the worker thread; Tk widgets are only touched here
+        try:
+            while True:
+                event = self.import_job.events.get_nowait()
+                if event['type'] == 'start':
+                    self._on_start(event)
+                elif event['type'] == 'progress':
+                    self._on_progress(event)
+                elif event['type'] == 'done':
+                    self.progress_bar.stop()
+                    self.destroy()
+                    self.master_app.on_import_finished(event)
+                    return
+        except queue.Empty:
+            pass
+        self.after(self.POLL_INTERVAL_MS, self._poll_events)
+
+    def _on_start(self, event):
+        self.total_rows = event['total_rows']
+        if self.total_rows:
+            self.progress_bar.stop()
+            self.progress_bar.configure(mode="determinate")
+            self.progress_bar.set(0)
+
+    def _on_progress(self, event):
+        self.status_label.configure(
+            text=f"Sheet {event['sheet']}: {event['rows_read']} baris dibaca, "
+                 f"{event['rows_imported']} diimpor, {event['rows_unchanged']} tidak berubah, {event['rows_failed']} gagal"
+        )
+        if self.total_rows:
+            self.progress_bar.set(min(event['rows_read'] / self.total_rows, 1.0))
+
+    def cancel_import(self):
+        if not self.import_job.cancel_event.is_set():
+            self.import_job.cancel()
+            self.cancel_button.configure(state="disabled")
+            self.status_label.configure(text="Membatalkan impor...")
+
+# --- Jendela Laporan Impor (BARU) ---
+class ImportReportWindow(ctk.CTkToplevel):
+    def __init__(self, master, result):
+        super().__init__(master)
+        self.title("Laporan Impor")
+        self.geometry("800x500")
+        self.transient(master)
+
+        self.errors = result['errors']
+
+        if result['cancelled']:
+            summary = "Impor dibatalkan. Tidak ada kegiatan yang disimpan."
+        else:
+            counts = result['summary']
+            summary = (f"Baru: {counts['inserted']}, diperbarui: {counts['updated']}, tidak berubah: {counts['unchanged']}, "
+                       f"dihapus: {counts['removed']}. Gagal: {counts['failed']}")
+        self.summary_label = ctk.CTkLabel(self, text=summary, font=ctk.CTkFont(size=16, weight="bold"))
+        self.summary_label.pack(padx=20, pady=(20, 10), anchor="w")
+
+        filter_frame = ctk.CTkFrame(self, fg_color="transparent")
+        filter_frame.pack(padx=20, pady=5, fill="x")
+        self.filter_entry = ctk.CTkEntry(filter_frame, placeholder_text="Filter (mis. nama sheet, 'Baris 12', 'Pimpinan')")
+        self.filter_entry.pack(side="left", fill="x", expand=True)
+        self.filter_entry.bind("<KeyRelease>", lambda e: self.apply_filter())
+        self.count_label = ctk.CTkLabel(filter_frame, text="")
+        self.count_label.pack(side="left", padx=(10, 0))
+
+        # A single text widget stays fast even with thousands of error lines
+        self.error_textbox = ctk.CTkTextbox(self, wrap="none")
+        self.error_textbox.pack(padx=20, pady=(5, 10), fill="both", expand=True)
+
+        self.close_button = ctk.CTkButton(self, text="Tutup", command=self.destroy)
+        self.close_button.pack(pady=(0, 15))
+
+        self.apply_filter()
+
+    def apply_filter(self):
+        keyword = self.filter_entry.get().strip().lower()
+        shown = [e for e in self.errors if keyword in e.lower()] if keyword else self.errors
+        self.error_textbox.configure(state="normal")
+        self.error_textbox.delete("1.0", "end")
+        self.error_textbox.insert("1.0", "\n".join(shown) if shown else "Tidak ada error.")
+        self.error_textbox.configure(state="disabled")
+        self.count_label.configure(text=f"{len(shown)} dari {len(self.errors)} error")
+
+# --- Form untuk Tambah Kegiatan (Modifikasi untuk ComboBox Pimpinan) ---
+class AddActivityForm(ctk.CTkToplevel):
+    RECURRENCE_OPTIONS = {"Tidak berulang": None, "Harian": 'harian', "Mingguan": 'mingguan', "Bulanan": 'bulanan'}
+
+    # prefill: dict opsional (tanggal_kegiatan, waktu_mulai_kegiatan, waktu_akhir_kegiatan, id_pimpinan,
+    # daftar_peserta), mis. dari FreeSlotDialog
+    def __init__(self, master, prefill=None):
+        super().__init__(master)
+        self.title("Tambah Kegiatan Baru")
+        self.geometry("600x880") # Tinggi disesuaikan
+        self.transient(master)
+        self.grab_set()
+        self.protocol("WM_DELETE_WINDOW", self.on_closing)
+
+        self.master_app = master # Reference to the main App instance
+        self.saved_date = None # Tanggal kegiatan yang berhasil disimpan (untuk penjadwal pengingat)
+        self.saved_series = False # True jika yang disimpan adalah kegiatan berulang
+        self.selected_pimpinan_id = None
+        self.pimpinan_options = self.master_app.pimpinan_data # ID -> Name
+        self.create_form_widgets()
+        if prefill:
+            self.apply_prefill(prefill)
+
+    def create_form_widgets(self):
+        self.frame = ctk.CTkFrame(self)
+        self.frame.pack(padx=20, pady=20, fill="both", expand=True)
+
+        labels = [
+            "Tanggal Kegiatan (YYYY-MM-DD):",
+            "Waktu MULAI (HH:MM):",
+            "Waktu AKHIR (HH:MM):",
+            "Uraian Kegiatan:",
+            "Tempat Ruangan:",
+            "Pimpinan:", # Label untuk ComboBox
+            "Daftar Peserta/Jumlah:",
+            "Narahubung:",
+            "Kontak Person:",
+        ]
+
+        self.entries = {}
+        # Mapping label ke key dictionary entries
+        label_to_entry_key = {
+            "Tanggal Kegiatan (YYYY-MM-DD):": 'tanggal_kegiatan',
+            "Waktu MULAI (HH:MM):": 'waktu_mulai_kegiatan',
+            "Waktu AKHIR (HH:MM):": 'waktu_akhir_kegiatan',
+            "Uraian Kegiatan:": 'uraian_kegiatan',
+            "Tempat Ruangan:": 'tempat_ruangan',
+            "Pimpinan:": 'id_pimpinan', # Key untuk ComboBox
+            "Daftar Peserta/Jumlah:": 'daftar_peserta',
+            "Narahubung:": 'narahubung',
+            "Kontak Person:": 'kontak_person',
+        }
+
+        for i, label_text in enumerate(labels):
+            label = ctk.CTkLabel(self.frame, text=label_text)
+            label.grid(row=i, column=0, padx=10, pady=5, sticky="w")
+            
+            entry_key = label_to_entry_key[label_text]
+
+            if entry_key == 'tanggal_kegiatan':
+                self.entries[entry_key] = DateEntry(self.frame, width=20, background='darkblue', foreground='white', bordercolor='darkblue',
+                                                            headersbackground='darkblue', headersforeground='white', selectbackground='lightblue',
+                                                            selectforeground='black', normalbackground='lightgray', normalforeground='black',
+                                                            locale='id_ID', date_pattern='yyyy-mm-dd')
+                self.entries[entry_key].grid(row=i, column=1, padx=10, pady=5, sticky="ew")
+                self.entries[entry_key].set_date(datetime.now().date())
+            elif entry_key == 'id_pimpinan': # Custom for Pimpinan ComboBox
+                pimpinan_names = sorted(list(self.pimpinan_options.values()))
+                self.pimpinan_combobox = ctk.CTkComboBox(self.frame, values=["Pilih Pimpinan"] + pimpinan_names,
+                                                            command=self._update_pimpinan_selection)
+                self.pimpinan_combobox.set("Pilih Pimpinan")
+                self.pimpinan_combobox.grid(row=i, column=1, padx=10, pady=5, sticky="ew")
+                self.entries[entry_key] = None # Will store ID directly in save_activity
+            else:
+                entry = ctk.CTkEntry(self.frame, width=300)
+                entry.grid(row=i, column=1, padx=10, pady=5, sticky="ew")
+                self.entries[entry_key] = entry
+        
+        if 'waktu_mulai_kegiatan' in self.entries:
+            self.entries['waktu_mulai_kegiatan'].insert(0, datetime.now().strftime('%H:%M'))
+        if 'waktu_akhir_kegiatan' in self.entries:
+            # Default waktu akhir bisa 1 jam setelah waktu mulai
+            default_end_time = (datetime.now() + timedelta(hours=1)).strftime('%H:%M')
+            self.entries['waktu_akhir_kegiatan'].insert(0, default_end_time)
+
+        # --- Pengulangan (BARU) ---
+        row = len(labels)
+        ctk.CTkLabel(self.frame, text="Pengulangan:").grid(row=row, column=0, padx=10, pady=5, sticky="w")
+        self.recurrence_combobox = ctk.CTkComboBox(self.frame, values=list(self.RECURRENCE_OPTIONS), state="readonly")
+        self.recurrence_combobox.set("Tidak berulang")
+        self.recurrence_combobox.grid(row=row, column=1, padx=10, pady=5, sticky="ew")
+
+        ctk.CTkLabel(self.frame, text="Setiap (hari/minggu/bulan):").grid(row=row + 1, column=0, padx=10, pady=5, sticky="w")
+        self.interval_entry = ctk.CTkEntry(self.frame, width=300)
+        self.interval_entry.insert(0, "1")
+        self.interval_entry.grid(row=row + 1, column=1, padx=10, pady=5, sticky="ew")
+
+        ctk.CTkLabel(self.frame, text="Hari (mingguan):").grid(row=row + 2, column=0, padx=10, pady=5, sticky="w")
+        weekday_frame = ctk.CTkFrame(self.frame, fg_color="transparent")
+        weekday_frame.grid(row=row + 2, column=1, padx=10, pady=5, sticky="ew")
+        self.weekday_checkboxes = []
+        for weekday, name in enumerate(WEEKDAY_NAMES):
+            checkbox = ctk.CTkCheckBox(weekday_frame, text=name, width=40, checkbox_width=18, checkbox_height=18)
+            checkbox.grid(row=weekday // 4, column=weekday % 4, padx=2, pady=2, sticky="w")
+            self.weekday_checkboxes.append(checkbox)
+
+        ctk.CTkLabel(self.frame, text="Berulang sampai (YYYY-MM-DD):").grid(row=row + 3, column=0, padx=10, pady=5, sticky="w")
+        self.until_entry = ctk.CTkEntry(self.frame, width=300, placeholder_text="Kosongkan jika tanpa batas")
+        self.until_entry.grid(row=row + 3, column=1, padx=10, pady=5, sticky="ew")
+
+        self.add_button = ctk.CTkButton(self.frame, text="Simpan Kegiatan", command=self.save_activity)
+        self.add_button.grid(row=row + 4, column=0, columnspan=2, pady=20)
+    
+    def _update_pimpinan_selection(self, selected_name):
+        self.selected_pimpinan_id = None
+        for p_id, p_name in self.pimpinan_options.items():
+            if p_name == selected_name:
+                self.selected_pimpinan_id = p_id
+                break
+
+    def apply_prefill(self, prefill):
+        if prefill.get('tanggal_kegiatan'):
+            self.entries['tanggal_kegiatan'].set_date(datetime.strptime(prefill['tanggal_kegiatan'], '%Y-%m-%d').date())
+        for key in ('waktu_mulai_kegiatan', 'waktu_akhir_kegiatan', 'daftar_peserta'):
+            if prefill.get(key):
+                self.entries[key].delete(0, "end")
+                self.entries[key].insert(0, prefill[key])
+        if prefill.get('id_pimpinan') in self.pimpinan_options:
+            self.pimpinan_combobox.set(self.pimpinan_options[prefill['id_pimpinan']])
+            self.selected_pimpinan_id = prefill['id_pimpinan']
+
+    def save_activity(self):
+        data = {
+            'tanggal_kegiatan': self.entries['tanggal_kegiatan'].get_date().strftime('%Y-%m-%d'),
+            'waktu_mulai_kegiatan': self.entries['waktu_mulai_kegiatan'].get(),
+            'waktu_akhir_kegiatan': self.entries['waktu_akhir_kegiatan'].get(),
+            'uraian_kegiatan': self.entries['uraian_kegiatan'].get(),
+            'tempat_ruangan': self.entries['tempat_ruangan'].get(),
+            'id_pimpinan': self.selected_pimpinan_id, # Ambil ID pimpinan
+            'daftar_peserta': self.entries['daftar_peserta'].get(),
+            'tanggal_input': datetime.now().strftime('%Y-%m-%d'),
+            'waktu_input': datetime.now().strftime('%H:%M'),
+            'narahubung': self.entries['narahubung'].get(),
+            'kontak_person': self.entries['kontak_person'].get()
+        }
+
+        # Basic validation
+        if not all([data['tanggal_kegiatan'], data['waktu_mulai_kegiatan'], 
+                      data['waktu_akhir_kegiatan'], data['uraian_kegiatan'], data['id_pimpinan']]): # id_pimpinan juga wajib
+            messagebox.showerror("Input Error", "Tanggal Kegiatan, Waktu Mulai, Waktu Akhir, Uraian Kegiatan, dan Pimpinan tidak boleh kosong.")
+            return
+        
+        try:
+            datetime.strptime(data['tanggal_kegiatan'], '%Y-%m-%d')
+        except ValueError:
+            messagebox.showerror("Input Error", "Format Tanggal Kegiatan salah. Gunakan मीडियावर-MM-DD.")
+            return
+        
+        try:
+            start_time_obj = datetime.strptime(data['waktu_mulai_kegiatan'], '%H:%M').time()
+            end_time_obj = datetime.strptime(data['waktu_akhir_kegiatan'], '%H:%M').time()
+            if start_time_obj >= end_time_obj:
+                messagebox.showerror("Input Error", "Waktu Mulai harus lebih awal dari Waktu Akhir.")
+                return
+        except ValueError:
+            messagebox.showerror("Input Error", "Format Waktu Mulai atau Waktu Akhir salah. Gunakan HH:MM.")
+            return
+
+        frequency = self.RECURRENCE_OPTIONS[self.recurrence_combobox.get()]
+        if frequency is None:
+            success, message = self.master_app.repository.add_activity(data)
+        else:
+            try:
+                interval = int(self.interval_entry.get())
+                if interval < 1:
+                    raise ValueError
+            except ValueError:
+                messagebox.showerror("Input Error", "Selang pengulangan harus berupa angka 1 atau lebih.")
+                return
+            until = self.until_entry.get().strip() or None
+            if until:
+                try:
+                    datetime.strptime(until, '%Y-%m-%d')
+                except ValueError:
+                    messagebox.showerror("Input Error", "Format tanggal akhir pengulangan salah. Gunakan YYYY-MM-DD.")
+                    return
+            data.update({
+                'frekuensi': frequency,
+                'selang': interval,
+                # Tanpa centang: hari yang sama dengan tanggal kegiatan
+                'hari_minggu': [weekday for weekday, checkbox in enumerate(self.weekday_checkboxes) if checkbox.get()] or None,
+                'tanggal_akhir': until,
+            })
+            success, message, _ = self.master_app.repository.add_recurring_activity(data)
+
+        if success:
+            self.saved_date = data['tanggal_kegiatan']
+            self.saved_series = frequency is not None
+            messagebox.showinfo("Berhasil", message)
+            self.destroy()
+        else:
+            messagebox.showerror("Error", message)
+
+    def on_closing(self):
+        self.master_app.focus_set()
+        self.destroy()
+
+# --- Form untuk Edit Kegiatan (Modifikasi untuk ComboBox Pimpinan) ---
+class EditActivityForm(ctk.CTkToplevel):
+    # series_id: jika diisi, activity_data adalah seri kegiatan berulang (tanggal = tanggal mulai seri)
+    def __init__(self, master, activity_data, series_id=None):
+        super().__init__(master)
+        self.title("Edit Kegiatan Berulang (Seluruh Seri)" if series_id is not None else "Edit Kegiatan")
+        self.geometry("600x720") # Tinggi disesuaikan
+        self.transient(master)
+        self.grab_set()
+        self.protocol("WM_DELETE_WINDOW", self.on_closing)
+
+        self.master_app = master
+        self.activity_id = activity_data['id']
+        self.series_id = series_id
+        self.activity_data = activity_data # This is a Row object (dictionary-like)
+
+        self.pimpinan_options = self.master_app.pimpinan_data # ID -> Name
+        self.create_form_widgets()
+        self.load_activity_data()
+
+    def create_form_widgets(self):
+        self.frame = ctk.CTkFrame(self)
+        self.frame.pack(padx=20, pady=20, fill="both", expand=True)
+
+        labels = [
+            "Tanggal Kegiatan (YYYY-MM-DD):",
+            "Waktu MULAI (HH:MM):",
+            "Waktu AKHIR (HH:MM):",
+            "Uraian Kegiatan:",
+            "Tempat Ruangan:",
+            "Pimpinan:",
+            "Daftar Peserta/Jumlah:",
+            "Narahubung:",
+            "Kontak Person:",
+        ]
+
+        self.entries = {}
+        label_to_entry_key = {
+            "Tanggal Kegiatan (YYYY-MM-DD):": 'tanggal_kegiatan',
+            "Waktu MULAI (HH:MM):": 'waktu_mulai_kegiatan',
+            "Waktu AKHIR (HH:MM):": 'waktu_akhir_kegiatan',
+            "Uraian Kegiatan:": 'uraian_kegiatan',
+            "Tempat Ruangan:": 'tempat_ruangan',
+            "Pimpinan:": 'id_pimpinan',
+            "Daftar Peserta/Jumlah:": 'daftar_peserta',
+            "Narahubung:": 'narahubung',
+            "Kontak Person:": 'kontak_person',
+        }
+
+        for i, label_text in enumerate(labels):
+            label = ctk.CTkLabel(self.frame, text=label_text)
+            label.grid(row=i, column=0, padx=10, pady=5, sticky="w")
+            
+            entry_key = label_to_entry_key[label_text]
+
+            if entry_key == 'tanggal_kegiatan':
+                self.entries[entry_key] = DateEntry(self.frame, width=20, background='darkblue', foreground='white', bordercolor='darkblue',
+                                                            headersbackground='darkblue', headersforeground='white', selectbackground='lightblue',
+                                                            selectforeground='black', normalbackground='lightgray', normalforeground='black',
+                                                            locale='id_ID', date_pattern='yyyy-mm-dd')
+                self.entries[entry_key].grid(row=i, column=1, padx=10, pady=5, sticky="ew")
+            elif entry_key == 'id_pimpinan': # Custom for Pimpinan ComboBox
+                pimpinan_names = sorted(list(self.pimpinan_options.values()))
+                self.pimpinan_combobox = ctk.CTkComboBox(self.frame, values=pimpinan_names,
+                                                            command=self._update_pimpinan_selection)
+                self.pimpinan_combobox.grid(row=i, column=1, padx=10, pady=5, sticky="ew")
+                self.entries[entry_key] = None # Will store ID directly in update_activity
+            else:
+                entry = ctk.CTkEntry(self.frame, width=300)
+                entry.grid(row=i, column=1, padx=10, pady=5, sticky="ew")
+                self.entries[entry_key] = entry
+        
+        self.save_button = ctk.CTkButton(self.frame, text="Update Kegiatan", command=self.update_activity_data)
+        self.save_button.grid(row=len(labels), column=0, columnspan=2, pady=20)
+
+    def _update_pimpinan_selection(self, selected_name):
+        self.selected_pimpinan_id = None
+        for p_id, p_name in self.pimpinan_options.items():
+            if p_name == selected_name:
+                self.selected_pimpinan_id = p_id
+                break
+
+    def load_activity_data(self):
+        self.entries['tanggal_kegiatan'].set_date(datetime.strptime(self.activity_data['tanggal_kegiatan'], '%Y-%m-%d').date())
+        self.entries['waktu_mulai_kegiatan'].insert(0, self.activity_data['waktu_mulai_kegiatan'])
+        self.entries['waktu_akhir_kegiatan'].insert(0, self.activity_data['waktu_akhir_kegiatan'])
+        self.entries['uraian_kegiatan'].insert(0, self.activity_data['uraian_kegiatan'])
+        self.entries['tempat_ruangan'].insert(0, self.activity_data['tempat_ruangan'])
+        
+        # Set ComboBox value based on current pimpinan
+        current_pimpinan_id = self.activity_data['id_pimpinan']
+        if current_pimpinan_id in self.pimpinan_options:
+            self.pimpinan_combobox.set(self.pimpinan_options[current_pimpinan_id])
+            self.selected_pimpinan_id = current_pimpinan_id # Initialize selected_pimpinan_id
+        else:
+            self.pimpinan_combobox.set("Pilih Pimpinan")
+            self.selected_pimpinan_id = None
+
+
+        self.entries['daftar_peserta'].insert(0, self.activity_data['daftar_peserta'])
+        self.entries['narahubung'].insert(0, self.activity_data['narahubung'])
+        self.entries['kontak_person'].insert(0, self.activity_data['kontak_person'])
+
+    def update_activity_data(self): # Renamed to avoid confusion with db_handler.update_activity
+        data = {
+            'tanggal_kegiatan': self.entries['tanggal_kegiatan'].get_date().strftime('%Y-%m-%d'),
+            'waktu_mulai_kegiatan': self.entries['waktu_mulai_kegiatan'].get(),
+            'waktu_akhir_kegiatan': self.entries['waktu_akhir_kegiatan'].get(),
+            'uraian_kegiatan': self.entries['uraian_kegiatan'].get(),
+            'tempat_ruangan': self.entries['tempat_ruangan'].get(),
+            'id_pimpinan': self.selected_pimpinan_id,
+            'daftar_peserta': self.entries['daftar_peserta'].get(),
+            'narahubung': self.entries['narahubung'].get(),
+            'kontak_person': self.entries['kontak_person'].get()
+        }
+
+        if not all([data['tanggal_kegiatan'], data['waktu_mulai_kegiatan'], 
+                      data['waktu_akhir_kegiatan'], data['uraian_kegiatan'], data['id_pimpinan']]):
+            messagebox.showerror("Input Error", "Tanggal Kegiatan, Waktu Mulai, Waktu Akhir, Uraian Kegiatan, dan Pimpinan tidak boleh kosong.")
+            return
+        
+        try:
+            datetime.strptime(data['tanggal_kegiatan'], '%Y-%m-%d')
+        except ValueError:
+            messagebox.showerror("Input Error", "Format Tanggal Kegiatan salah. Gunakan मीडियावर-MM-DD.")
+            return
+
+        try:
+            start_time_obj = datetime.strptime(data['waktu_mulai_kegiatan'], '%H:%M').time()
+            end_time_obj = datetime.strptime(data['waktu_akhir_kegiatan'], '%H:%M').time()
+            if start_time_obj >= end_time_obj:
+                messagebox.showerror("Input Error", "Waktu Mulai harus lebih awal dari Waktu Akhir.")
+                return
+        except ValueError:
+            messagebox.showerror("Input Error", "Format Waktu Mulai atau Waktu Akhir salah. Gunakan HH:MM.")
+            return
+
+        if self.series_id is not None:
+            success, message = self.master_app.repository.update_recurring_series(self.series_id, data)
+        else:
+            success, message = self.master_app.repository.update_activity(self.activity_id, data)
+        if success:
+            messagebox.showinfo("Berhasil", message)
+            self.destroy()
+        else:
+            messagebox.showerror("Error", message)
+
+    def on_closing(self):
+        self.master_app.focus_set()
+        self.destroy()
+
+# --- Form untuk Kelola Pimpinan (BARU) ---
+class ManagePimpinanForm(ctk.CTkToplevel):
+    def __init__(self, master):
+        super().__init__(master)
+        self.title("Kelola Pimpinan")
+        self.geometry("500x400")
+        self.transient(master)
+        self.grab_set()
+        self.protocol("WM_DELETE_WINDOW", self.on_closing)
+
+        self.master_app = master
+        self.create_widgets()
+        self.load_pimpinan_list()
+
+    def create_widgets(self):
+        self.frame = ctk.CTkFrame(self)
+        self.frame.pack(padx=20, pady=20, fill="both", expand=True)
+
+        self.frame.grid_columnconfigure(0, weight=1)
+
+        self.add_pimpinan_label = ctk.CTkLabel(self.frame, text="Tambah Pimpinan Baru:", font=ctk.CTkFont(weight="bold"))
+        self.add_pimpinan_label.grid(row=0, column=0, padx=10, pady=(10, 5), sticky="w")
+        self.new_pimpinan_entry = ctk.CTkEntry(self.frame, placeholder_text="Nama Pimpinan")
+        self.new_pimpinan_entry.grid(row=1, column=0, padx=10, pady=5, sticky="ew")
+        self.add_pimpinan_button = ctk.CTkButton(self.frame, text="Tambah", command=self.add_new_pimpinan)
+        self.add_pimpinan_button.grid(row=1, column=1, padx=10, pady=5)
+
+        self.pimpinan_list_label = ctk.CTkLabel(self.frame, text="Daftar Pimpinan:", font=ctk.CTkFont(weight="bold"))
+        self.pimpinan_list_label.grid(row=2, column=0, padx=10, pady=(15, 5), sticky="w")
+
+        self.pimpinan_list_frame = ctk.CTkScrollableFrame(self.frame, height=200)
+        self.pimpinan_list_frame.grid(row=3, column=0, columnspan=2, padx=10, pady=5, sticky="nsew")
+        self.pimpinan_list_frame.grid_columnconfigure(0, weight=1) # Name
+        self.pimpinan_list_frame.grid_columnconfigure(1, weight=0) # Color display
+        self.pimpinan_list_frame.grid_columnconfigure(2, weight=0) # Color picker button
+        self.pimpinan_list_frame.grid_columnconfigure(3, weight=0) # Delete button
+
+    def load_pimpinan_list(self):
+        for widget in self.pimpinan_list_frame.winfo_children():
+            widget.destroy()
+        
+        pimpinan_list = self.master_app.repository.get_all_pimpinan() # Get current list of pimpinan
+        
+        if not pimpinan_list:
+            no_pimpinan_label = ctk.CTkLabel(self.pimpinan_list_frame, text="Belum ada pimpinan.")
+            no_pimpinan_label.grid(row=0, column=0, padx=10, pady=10)
+            return
+
+        # Header for the list
+        ctk.CTkLabel(self.pimpinan_list_frame, text="Nama Pimpinan", font=ctk.CTkFont(weight="bold")).grid(row=0, column=0, padx=5, pady=2, sticky="w")
+        ctk.CTkLabel(self.pimpinan_list_frame, text="Warna", font=ctk.CTkFont(weight="bold")).grid(row=0, column=1, padx=5, pady=2, sticky="w")
+        ctk.CTkLabel(self.pimpinan_list_frame, text="Aksi", font=ctk.CTkFont(weight="bold")).grid(row=0, column=2, columnspan=2, padx=5, pady=2, sticky="w")
+
+
+        for i, pimpinan in enumerate(pimpinan_list):
+            pimpinan_id = pimpinan['id']
+            pimpinan_nama = pimpinan['nama']
+            pimpinan_warna = pimpinan['warna']
+
+            # Name Label
+            name_label = ctk.CTkLabel(self.pimpinan_list_frame, text=pimpinan_nama, anchor="w")
+            name_label.grid(row=i+1, column=0, padx=5, pady=2, sticky="ew")
+
+            # Color Display
+            color_display = ctk.CTkLabel(self.pimpinan_list_frame, text="", bg_color=pimpinan_warna, width=30, height=20)
+            color_display.grid(row=i+1, column=1, padx=5, pady=2, sticky="w")
+
+            # Change Color Button
+            change_color_btn = ctk.CTkButton(self.pimpinan_list_frame, text="Ganti Warna", width=80,
+                                              command=lambda pid=pimpinan_id, c_display=color_display: self.change_pimpinan_color(pid, c_display))
+            change_color_btn.grid(row=i+1, column=2, padx=5, pady=2, sticky="w")
+
+            # Delete Button
+            delete_btn = ctk.CTkButton(self.pimpinan_list_frame, text="Hapus", width=60, fg_color="red", hover_color="#8b0000",
+                                        command=lambda pid=pimpinan_id: self.confirm_delete_pimpinan(pid))
+            delete_btn.grid(row=i+1, column=3, padx=5, pady=2, sticky="w")
+
+    def add_new_pimpinan(self):
+        new_name = self.new_pimpinan_entry.get().strip()
+        if new_name:
+            success, message, new_id = self.master_app.repository.add_pimpinan(new_name)
+            if success:
+                messagebox.showinfo("Berhasil", message)
+                self.new_pimpinan_entry.delete(0, ctk.END)
+                self.load_pimpinan_list() # Refresh the list
+            else:
+                messagebox.showerror("Error", message)
+        else:
+            messagebox.showwarning("Input Kosong", "Nama pimpinan tidak boleh kosong.")
+
+    def change_pimpinan_color(self, pimpinan_id, color_display_widget):
+        current_color_str = color_display_widget.cget("bg_color")
+        color_code, hex_color = colorchooser.askcolor(color=current_color_str, title="Pilih Warna Pimpinan")
+        if hex_color: # hex_color will be None if user cancels
+            success, message = self.master_app.repository.update_pimpinan_color(pimpinan_id, hex_color)
+            if success:
+                color_display_widget.configure(bg_color=hex_color) # Update UI immediately
+                messagebox.showinfo("Berhasil", message)
+                # No need to reload pimpinan list, just update the widget
+            else:
+                messagebox.showerror("Error", message)
+
+    def confirm_delete_pimpinan(self, pimpinan_id):
+        pimpinan_info = self.master_app.repository.get_pimpinan_by_id(pimpinan_id)
+        if pimpinan_info:
+            pimpinan_name = pimpinan_info['nama']
+            if messagebox.askyesno("Konfirmasi Hapus", f"Apakah Anda yakin ingin menghapus pimpinan '{pimpinan_name}'? \n\nSemua kegiatan yang terkait dengan pimpinan ini TIDAK AKAN terhapus, tetapi akan menjadi tidak terhubung dengan pimpinan manapun."):
+                success, message = self.master_app.repository.delete_pimpinan(pimpinan_id)
+                if success:
+                    messagebox.showinfo("Berhasil", message)
+                    self.load_pimpinan_list() # Refresh the list
+                else:
+                    messagebox.showerror("Error", message)
+        else:
+            messagebox.showerror("Error", "Pimpinan tidak ditemukan.")
+
+
+    def on_closing(self):
+        self.master_app.focus_set()
+        self.destroy()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Aplikasi Penjadwalan Kegiatan Lemhanas")
+    parser.add_argument('--profile-startup', action='store_true',
+                        help="Cetak rincian waktu startup (import, database, widget, pemuatan data)")
+    parser.add_argument('--profile', action='store_true',
+                        help="Aktifkan cProfile untuk refresh_all, load_activities_for_date dan impor Excel")
+    parser.add_argument('--profile-dir', help="Simpan hasil cProfile (.prof) ke folder ini")
+    parser.add_argument('--log-level', default='WARNING', help="Level logging (default: WARNING)")
+    parser.add_argument('--server', help="Mode klien: pakai api_server di URL ini (mis. http://192.168.1.10:8765)")
+    parser.add_argument('--token', default=os.environ.get('JADWAL_API_TOKEN'),
+                        help="Token api_server (default: env JADWAL_API_TOKEN)")
+    parser.add_argument('--pengingat', default=os.environ.get(LEAD_MINUTES_ENV),
+                        help=f"Menit sebelum kegiatan untuk pengingat, dipisah koma, mis. 60,15 "
+                             f"(default: env {LEAD_MINUTES_ENV}, atau {','.join(map(str, DEFAULT_LEAD_MINUTES))})")
+    args = parser.parse_args()
+    reminder_minutes = DEFAULT_LEAD_MINUTES
+    if args.pengingat:
+        try:
+            reminder_minutes = parse_lead_minutes(args.pengingat)
+        except ValueError as e:
+            parser.error(str(e))
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    if args.profile or args.profile_dir:
+        instrumentation.enable_profiling(True, args.profile_dir)
+
+    profiler = None
+    if args.profile_startup:
+        profiler = StartupProfiler(STARTUP_STARTED)
+        profiler.mark("import modules")
+    api_client = None
+    if args.server:
+        from api_client import ApiClient
+        api_client = ApiClient(args.server, token=args.token)
+    app = App(profiler=profiler, api_client=api_client, reminder_minutes=reminder_minutes)
+    app.protocol("WM_DELETE_WINDOW", app.on_closing)
     app.mainloop()
\ No newline at end of file
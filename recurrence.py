@@ -0,0 +1,127 @@
+import calendar
+from datetime import date, timedelta
+
+# Aturan pengulangan kegiatan (harian/mingguan/bulanan). Kejadian dihitung secara aritmetika,
+# sehingga "apakah seri ini terjadi pada tanggal X?" dan "kejadian dalam rentang A..B" bisa
+# dijawab tanpa menyimpan setiap kejadian sebagai baris Kegiatan.
+
+FREQUENCIES = ('harian', 'mingguan', 'bulanan')
+WEEKDAY_NAMES = ('Sen', 'Sel', 'Rab', 'Kam', 'Jum', 'Sab', 'Min') # date.weekday(): 0 = Senin
+
+# Kejadian seri diberi id negatif -(seri_id * OCCURRENCE_ID_BASE + tanggal.toordinal()),
+# sehingga tidak pernah sama dengan id Kegiatan dan tetap bisa dipakai sebagai int di
+# penjadwal pengingat, cache dan index bentrok. toordinal() < 1.000.000 sampai tahun 2700-an.
+OCCURRENCE_ID_BASE = 1000000
+
+def occurrence_id(series_id, day):
+    return -(series_id * OCCURRENCE_ID_BASE + day.toordinal())
+
+def parse_occurrence_id(activity_id):
+    # id kejadian -> (seri_id, date); None untuk id kegiatan biasa
+    if activity_id is None or activity_id >= 0:
+        return None
+    series_id, ordinal = divmod(-activity_id, OCCURRENCE_ID_BASE)
+    return series_id, date.fromordinal(ordinal)
+
+def parse_weekdays(weekdays_text):
+    # '0,2,4' -> (0, 2, 4)
+    if not weekdays_text:
+        return ()
+    return tuple(sorted({int(part) for part in weekdays_text.split(',') if part.strip()}))
+
+def format_weekdays(weekdays):
+    return ",".join(str(day) for day in sorted(set(weekdays)))
+
+def _months_between(first, second):
+    return (second.year - first.year) * 12 + second.month - first.month
+
+
+class RecurrenceRule:
+    # start_date/until: datetime.date (until inklusif, None = tanpa batas)
+    # weekdays: hanya untuk 'mingguan'; default hari dari start_date
+    # 'bulanan' mengikuti tanggal start_date; bulan tanpa tanggal itu (mis. 31) dilewati
+    def __init__(self, start_date, frequency, interval=1, weekdays=None, until=None):
+        if frequency not in FREQUENCIES:
+            raise ValueError(f"Frekuensi '{frequency}' tidak dikenal.")
+        if interval < 1:
+            raise ValueError("Selang pengulangan minimal 1.")
+        if until is not None and until < start_date:
+            raise ValueError("Tanggal akhir pengulangan lebih awal dari tanggal mulai.")
+        if weekdays and not all(0 <= day < 7 for day in weekdays):
+            raise ValueError("Hari pengulangan tidak valid.")
+        self.start_date = start_date
+        self.frequency = frequency
+        self.interval = interval
+        self.until = until
+        self.weekdays = tuple(sorted(set(weekdays))) if weekdays else (start_date.weekday(),)
+        self._week_start = start_date - timedelta(days=start_date.weekday())
+
+    @classmethod
+    def from_row(cls, row):
+        # row: baris Kegiatan_Berulang
+        until = date.fromisoformat(row['tanggal_akhir']) if row['tanggal_akhir'] else None
+        return cls(date.fromisoformat(row['tanggal_mulai']), row['frekuensi'], row['selang'],
+                   parse_weekdays(row['hari_minggu']), until)
+
+    def describe(self):
+        unit = {'harian': 'hari', 'mingguan': 'minggu', 'bulanan': 'bulan'}[self.frequency]
+        text = f"Setiap {unit}" if self.interval == 1 else f"Setiap {self.interval} {unit}"
+        if self.frequency == 'mingguan':
+            text += f" ({', '.join(WEEKDAY_NAMES[day] for day in self.weekdays)})"
+        elif self.frequency == 'bulanan':
+            text += f" (tanggal {self.start_date.day})"
+        if self.until is not None:
+            text += f" sampai {self.until.isoformat()}"
+        return text
+
+    def occurs_on(self, day):
+        if day < self.start_date or (self.until is not None and day > self.until):
+            return False
+        if self.frequency == 'harian':
+            return (day - self.start_date).days % self.interval == 0
+        if self.frequency == 'mingguan':
+            return day.weekday() in self.weekdays and ((day - self._week_start).days // 7) % self.interval == 0
+        return day.day == self.start_date.day and _months_between(self.start_date, day) % self.interval == 0
+
+    def occurrences(self, range_start, range_end):
+        # Semua tanggal kejadian dalam [range_start, range_end], terurut, dihasilkan satu per satu
+        first = max(range_start, self.start_date)
+        last = range_end if self.until is None else min(range_end, self.until)
+        if first > last:
+            return
+
+        if self.frequency == 'harian':
+            steps = -(-(first - self.start_date).days // self.interval) # Pembulatan ke atas
+            day = self.start_date + timedelta(days=steps * self.interval)
+            while day <= last:
+                yield day
+                day += timedelta(days=self.interval)
+
+        elif self.frequency == 'mingguan':
+            week_index = (first - self._week_start).days // 7
+            week_index += -week_index % self.interval # Minggu aktif pertama yang tidak lebih awal
+            while True:
+                week = self._week_start + timedelta(weeks=week_index)
+                if week > last:
+                    return
+                for weekday in self.weekdays:
+                    day = week + timedelta(days=weekday)
+                    if day > last:
+                        return
+                    if day >= first:
+                        yield day
+                week_index += self.interval
+
+        else:
+            month_index = max(_months_between(self.start_date, first), 0)
+            month_index += -month_index % self.interval
+            while True:
+                year, month = divmod(self.start_date.month - 1 + month_index, 12)
+                year += self.start_date.year
+                if date(year, month + 1, 1) > last:
+                    return
+                if self.start_date.day <= calendar.monthrange(year, month + 1)[1]:
+                    day = date(year, month + 1, self.start_date.day)
+                    if first <= day <= last:
+                        yield day
+                month_index += self.interval
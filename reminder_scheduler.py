@@ -0,0 +1,189 @@
+import heapq
+import logging
+import threading
+from datetime import datetime, timedelta
+
+import db_handler
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LEAD_MINUTES = (15,) # Pengingat 15 menit sebelum kegiatan dimulai
+LEAD_MINUTES_ENV = 'JADWAL_PENGINGAT_MENIT' # mis. "60,15": pengingat 1 jam dan 15 menit sebelumnya
+DEFAULT_WINDOW_HOURS = 24 # Hanya kegiatan yang dimulai dalam 24 jam ke depan yang dimuat
+DEFAULT_RECHECK_SECONDS = 300 # Interval maksimum untuk memeriksa perubahan dari proses lain
+
+def parse_lead_minutes(text):
+    # "60, 15" -> (60, 15). ValueError jika kosong atau ada nilai yang bukan bilangan bulat positif
+    try:
+        values = tuple(int(part) for part in text.split(',') if part.strip())
+    except ValueError:
+        values = ()
+    if not values or any(value <= 0 for value in values):
+        raise ValueError(f"Waktu pengingat '{text}' tidak valid, gunakan menit positif dipisah koma (mis. 60,15).")
+    return values
+
+def _activity_start(activity):
+    return datetime.strptime(f"{activity['tanggal_kegiatan']} {activity['waktu_mulai_kegiatan']}", '%Y-%m-%d %H:%M')
+
+
+# Penjadwal pengingat berbasis event: menyimpan heap waktu pengingat untuk kegiatan
+# dalam jendela waktu dekat, lalu tidur sampai pengingat berikutnya jatuh tempo.
+# Perubahan kegiatan dari GUI dikirim lewat reload/refresh_activity/remove_activity/refresh_date;
+# perubahan dari proses lain terdeteksi lewat PRAGMA data_version.
+# on_reminder(activity, lead_minutes) dipanggil dari thread penjadwal.
+# backend: modul db_handler (default) atau api_client.ApiClient untuk mode klien server.
+class ReminderScheduler:
+    def __init__(self, on_reminder, lead_minutes=DEFAULT_LEAD_MINUTES, window_hours=DEFAULT_WINDOW_HOURS,
+                 recheck_seconds=DEFAULT_RECHECK_SECONDS, backend=db_handler):
+        self.on_reminder = on_reminder
+        self.backend = backend
+        self.lead_minutes = tuple(sorted(set(lead_minutes), reverse=True))
+        # Jendela dimuat ulang setiap setengah jalan, jadi setengahnya harus mencakup lead time terpanjang
+        self.window = max(timedelta(hours=window_hours), timedelta(minutes=2 * self.lead_minutes[0]))
+        self.recheck_seconds = recheck_seconds
+
+        self._heap = [] # (remind_at, activity_id, lead_minutes, start)
+        self._activities = {} # activity_id -> (start, activity row); entri heap lain dianggap basi
+        self._fired = set() # (activity_id, start, lead_minutes) yang sudah ditampilkan
+        self._window_end = None
+        self._data_version = None
+
+        self._commands = []
+        self._stopped = False
+        self._condition = threading.Condition()
+        self._thread = None
+
+    # --- API untuk GUI (aman dipanggil dari thread mana pun) ---
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+
+    def reload(self):
+        self._post('reload', None)
+
+    def refresh_activity(self, activity_id):
+        self._post('activity', activity_id)
+
+    def remove_activity(self, activity_id):
+        self._post('remove', activity_id)
+
+    def refresh_date(self, activity_date):
+        self._post('date', activity_date)
+
+    def _post(self, command, argument):
+        with self._condition:
+            self._commands.append((command, argument))
+            self._condition.notify()
+
+    # --- Thread penjadwal ---
+    def _run(self):
+        try:
+            self._guarded(self._load_window, datetime.now())
+            while True:
+                with self._condition:
+                    while not self._commands and not self._stopped:
+                        timeout = self._seconds_until_wakeup(datetime.now())
+                        if timeout <= 0:
+                            break
+                        self._condition.wait(timeout)
+                    if self._stopped:
+                        return
+                    commands, self._commands = self._commands, []
+
+                self._guarded(self._process, commands, datetime.now())
+        finally:
+            self.backend.close_db()
+
+    def _process(self, commands, now):
+        for command, argument in commands:
+            self._apply_command(command, argument, now)
+        if now >= self._window_end - self.window / 2 or self.backend.get_data_version() != self._data_version:
+            self._load_window(now)
+        self.fire_due_reminders(now)
+
+    def _guarded(self, func, *args):
+        # Kesalahan database/server tidak boleh menghentikan thread; coba lagi di pemeriksaan berikutnya
+        try:
+            func(*args)
+        except Exception:
+            logger.exception("An unexpected error occurred in the reminder scheduler")
+            self._data_version = None # Paksa muat ulang jendela saat berhasil terhubung lagi
+
+    def _seconds_until_wakeup(self, now):
+        wakeup = min(now + timedelta(seconds=self.recheck_seconds), self._window_end - self.window / 2)
+        if self._heap:
+            wakeup = min(wakeup, self._heap[0][0])
+        return (wakeup - now).total_seconds()
+
+    def _apply_command(self, command, argument, now):
+        if command == 'reload':
+            self._load_window(now)
+        elif command == 'remove':
+            self._activities.pop(argument, None)
+        elif command == 'activity':
+            self._activities.pop(argument, None)
+            activity = self.backend.get_activity_by_id(argument)
+            if activity is not None:
+                self._schedule(activity, now)
+        elif command == 'date':
+            for activity_id in [a_id for a_id, (start, _) in self._activities.items()
+                                if start.strftime('%Y-%m-%d') == argument]:
+                self._activities.pop(activity_id)
+            if now.strftime('%Y-%m-%d') <= argument <= self._window_end.strftime('%Y-%m-%d'):
+                for activity in self.backend.get_activities_in_range(argument, argument):
+                    self._schedule(activity, now)
+        # _data_version sengaja tidak diperbarui di sini: hanya _load_window yang menyetelnya,
+        # agar perubahan dari proses lain yang terjadi bersamaan tidak ikut dianggap sudah dimuat
+
+    # --- Logika inti (tanpa thread, bisa dipanggil langsung mis. dari benchmark) ---
+    def _load_window(self, now):
+        # Muat ulang hanya kegiatan yang dimulai dalam [now, now + window]
+        self._heap = []
+        self._activities = {}
+        self._window_end = now + self.window
+        for activity in self.backend.get_activities_in_range(now.strftime('%Y-%m-%d'), self._window_end.strftime('%Y-%m-%d')):
+            self._schedule(activity, now)
+        self._data_version = self.backend.get_data_version()
+        # Lupakan pengingat untuk kegiatan yang sudah lewat
+        self._fired = {key for key in self._fired if key[1] > now}
+
+    def _schedule(self, activity, now):
+        try:
+            start = _activity_start(activity)
+        except ValueError as e:
+            logger.warning("Error parsing date/time for activity ID %s: %s", activity['id'], e)
+            return
+        if not (now <= start <= self._window_end):
+            return
+        self._activities[activity['id']] = (start, activity)
+        for lead in self.lead_minutes:
+            heapq.heappush(self._heap, (start - timedelta(minutes=lead), activity['id'], lead, start))
+
+    def fire_due_reminders(self, now):
+        # Tampilkan semua pengingat yang jatuh tempo (remind_at <= now < start).
+        # Jika beberapa lead time sudah lewat sekaligus, hanya yang terdekat ke waktu mulai yang ditampilkan.
+        due = {}
+        while self._heap and self._heap[0][0] <= now:
+            remind_at, activity_id, lead, start = heapq.heappop(self._heap)
+            scheduled = self._activities.get(activity_id)
+            if scheduled is None or scheduled[0] != start or now >= start:
+                continue # Entri basi (kegiatan diubah/dihapus) atau kegiatan sudah dimulai
+            if (activity_id, start, lead) in self._fired:
+                continue
+            self._fired.add((activity_id, start, lead))
+            if activity_id not in due or lead < due[activity_id][1]:
+                due[activity_id] = (scheduled[1], lead)
+
+        for activity, lead in due.values():
+            try:
+                self.on_reminder(activity, lead)
+            except Exception:
+                logger.exception("An unexpected error occurred during notification")
+        return len(due)
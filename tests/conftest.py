@@ -0,0 +1,21 @@
+import os
+import sys
+
+import pytest
+
+# Modul aplikasi ada di root repositori (tanpa package)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db_handler
+
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    # Database SQLite baru per test; koneksi per thread ditutup setelahnya
+    monkeypatch.setattr(db_handler, 'DATABASE_NAME', str(tmp_path / 'test.db'))
+    db_handler.close_all_connections()
+    db_handler.clear_conflict_indexes()
+    db_handler.create_table()
+    yield db_handler
+    db_handler.close_all_connections()
+    db_handler.clear_conflict_indexes()
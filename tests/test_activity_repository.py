@@ -0,0 +1,39 @@
+from activity_repository import ActivityRepository
+
+
+class CountingBackend:
+    # Backend minimal seperti api_client.ApiClient yang mencatat setiap panggilan
+    def __init__(self):
+        self.data_version = 1
+        self.calls = []
+
+    def get_data_version(self):
+        self.calls.append('get_data_version')
+        return self.data_version
+
+    def get_activities_for_month(self, year, month, pimpinan_ids=None):
+        self.calls.append('get_activities_for_month')
+        return [{'id': 1, 'tanggal_kegiatan': f"{year:04d}-{month:02d}-02"}]
+
+
+def test_remote_data_version_checked_at_most_once_per_interval(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr('activity_repository.time.monotonic', lambda: clock[0])
+    backend = CountingBackend()
+    repository = ActivityRepository(backend=backend, check_interval=5)
+
+    for day in ('2025-06-02', '2025-06-03', '2025-06-02'):
+        repository.get_activities_for_date(day)
+    assert backend.calls == ['get_data_version', 'get_activities_for_month']
+
+    # Perubahan di server terlihat setelah interval berlalu, dan membuang cache
+    backend.data_version = 2
+    clock[0] += 5
+    assert [a['id'] for a in repository.get_activities_for_date('2025-06-02')] == [1]
+    assert backend.calls[2:] == ['get_data_version', 'get_activities_for_month']
+
+
+def test_local_backend_checked_on_every_read(temp_db):
+    repository = ActivityRepository()
+    assert repository.check_interval == 0
+    assert repository.get_activities_for_date('2025-06-02') == []
@@ -0,0 +1,59 @@
+from conflict_index import DayConflictIndex, IntervalIndex, time_range_to_minutes
+
+
+def test_interval_index_overlapping_is_half_open():
+    index = IntervalIndex()
+    index.add(540, 600, 1) # 09:00-10:00
+    index.add(600, 660, 2) # 10:00-11:00
+    assert [item[2] for item in index.overlapping(570, 630)] == [1, 2]
+    # Berakhir tepat saat yang lain mulai tidak dianggap beririsan
+    assert [item[2] for item in index.overlapping(600, 610)] == [2]
+    assert index.overlapping(660, 700) == []
+
+
+def test_interval_index_finds_long_interval_starting_early():
+    index = IntervalIndex()
+    index.add(480, 1020, 1) # 08:00-17:00
+    index.add(900, 930, 2)
+    assert [item[2] for item in index.overlapping(960, 990)] == [1]
+
+
+def test_interval_index_remove():
+    index = IntervalIndex()
+    index.add(540, 600, 1)
+    index.add(540, 600, 2)
+    index.remove(1)
+    assert len(index) == 1
+    assert [item[2] for item in index.overlapping(540, 600)] == [2]
+
+
+def test_time_range_past_midnight_ends_at_end_of_day():
+    assert time_range_to_minutes('23:00', '01:00') == (1380, 1439)
+
+
+def test_find_conflicts_reports_pimpinan_room_and_participants():
+    index = DayConflictIndex('2025-06-02')
+    index.add(1, 540, 600, 7, {'staf ahli'}, 'aula')
+    index.add(2, 570, 630, 8, {'biro humas'}, None)
+
+    conflicts = index.find_conflicts(580, 620, 7, {'biro humas'}, room='aula')
+    assert [c['id'] for c in conflicts] == [1, 2]
+    first, second = conflicts
+    assert first['pimpinan'] and first['ruangan'] and first['participants'] == set()
+    assert not second['pimpinan'] and not second['ruangan'] and second['participants'] == {'biro humas'}
+
+
+def test_find_conflicts_ignores_unrelated_and_excluded():
+    index = DayConflictIndex('2025-06-02')
+    index.add(1, 540, 600, 7, set(), 'aula')
+    # Pimpinan, ruangan dan peserta lain pada waktu yang sama bukan bentrok
+    assert index.find_conflicts(540, 600, 8, {'kadis pu'}, room='r1') == []
+    # Kegiatan yang sedang diubah tidak bentrok dengan dirinya sendiri
+    assert index.find_conflicts(550, 590, 7, set(), exclude_id=1, room='aula') == []
+
+
+def test_find_conflicts_after_remove():
+    index = DayConflictIndex('2025-06-02')
+    index.add(1, 540, 600, 7, {'staf ahli'}, 'aula')
+    index.remove(1)
+    assert index.find_conflicts(540, 600, 7, {'staf ahli'}, room='aula') == []
@@ -0,0 +1,157 @@
+import pytest
+
+pytest.importorskip('pandas')
+openpyxl = pytest.importorskip('openpyxl')
+
+from excel_exporter import EXPORT_COLUMNS
+from excel_importer import SourceRows, activity_fingerprint, source_key_prefix, sync_activities_from_excel
+
+
+def _row(tanggal, waktu, uraian, pimpinan='Gub', tempat='Aula'):
+    return [tanggal, waktu, uraian, tempat, pimpinan, '', 'Budi', '0812', '01-06-2025', '08:00']
+
+
+def _write_book(path, rows, sheet_name='JUNI 2025'):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = sheet_name
+    sheet.append(list(EXPORT_COLUMNS))
+    for row in rows:
+        sheet.append(row)
+    workbook.save(path)
+    return str(path)
+
+
+def _schedule(db):
+    return sorted((row['uraian_kegiatan'], row['waktu_mulai_kegiatan'], row['waktu_akhir_kegiatan'])
+                  for row in db.connect_db().execute("SELECT * FROM Kegiatan"))
+
+
+def _data(uraian, mulai='09:00', akhir='10:00', tanggal='2025-06-02', id_pimpinan=1):
+    return {'tanggal_kegiatan': tanggal, 'waktu_mulai_kegiatan': mulai, 'waktu_akhir_kegiatan': akhir,
+            'uraian_kegiatan': uraian, 'tempat_ruangan': 'Aula', 'id_pimpinan': id_pimpinan,
+            'daftar_peserta': '', 'narahubung': 'Budi', 'kontak_person': '0812',
+            'tanggal_input': '2025-06-01', 'waktu_input': '08:00'}
+
+
+def _seed_source_row(db, key, data):
+    # Baris seolah-olah hasil impor sebelumnya dengan kunci_sumber key
+    assert db.add_activity(dict(data, kunci_sumber=key, sidik_jari=activity_fingerprint(data)))[0]
+    return db.connect_db().execute("SELECT id FROM Kegiatan WHERE kunci_sumber = ?", (key,)).fetchone()['id']
+
+
+def _summary(inserted=0, updated=0, unchanged=0, removed=0, failed=0):
+    return {'inserted': inserted, 'updated': updated, 'unchanged': unchanged, 'removed': removed, 'failed': failed}
+
+
+@pytest.mark.parametrize('remove_missing', [False, True])
+@pytest.mark.parametrize('chunk_size', [500, 1])
+def test_reimport_swapped_times(temp_db, tmp_path, remove_missing, chunk_size):
+    path = tmp_path / 'jadwal.xlsx'
+    _write_book(path, [_row('02-06-2025', '09:00 - 10:00', 'A'), _row('02-06-2025', '10:00 - 11:00', 'B')])
+    assert sync_activities_from_excel(str(path)) == (_summary(inserted=2), [])
+
+    _write_book(path, [_row('02-06-2025', '10:00 - 11:00', 'A'), _row('02-06-2025', '09:00 - 10:00', 'B')])
+    summary, errors = sync_activities_from_excel(str(path), chunk_size=chunk_size, remove_missing=remove_missing)
+    assert (summary, errors) == (_summary(updated=2), [])
+    assert _schedule(temp_db) == [('A', '10:00', '11:00'), ('B', '09:00', '10:00')]
+
+
+@pytest.mark.parametrize('chunk_size', [500, 1])
+def test_reimport_shifted_times(temp_db, tmp_path, chunk_size):
+    path = tmp_path / 'jadwal.xlsx'
+    _write_book(path, [_row('02-06-2025', '09:00 - 10:00', 'A'), _row('02-06-2025', '10:00 - 11:00', 'B')])
+    sync_activities_from_excel(str(path))
+
+    _write_book(path, [_row('02-06-2025', '10:00 - 11:00', 'A'), _row('02-06-2025', '11:00 - 12:00', 'B')])
+    assert sync_activities_from_excel(str(path), chunk_size=chunk_size) == (_summary(updated=2), [])
+    assert _schedule(temp_db) == [('A', '10:00', '11:00'), ('B', '11:00', '12:00')]
+
+
+def test_failed_update_keeps_old_slot(temp_db, tmp_path):
+    # B tidak bisa pindah (bentrok dengan kegiatan lain), jadi A tidak boleh memakai slot lama B
+    path = tmp_path / 'jadwal.xlsx'
+    _write_book(path, [_row('02-06-2025', '09:00 - 10:00', 'A'), _row('02-06-2025', '10:00 - 11:00', 'B')])
+    sync_activities_from_excel(str(path))
+    pimpinan_id = temp_db.get_all_pimpinan()[0]['id']
+    temp_db.add_activity({'tanggal_kegiatan': '2025-06-02', 'waktu_mulai_kegiatan': '13:00',
+                          'waktu_akhir_kegiatan': '14:00', 'uraian_kegiatan': 'Lain', 'tempat_ruangan': '',
+                          'id_pimpinan': pimpinan_id, 'daftar_peserta': '', 'tanggal_input': '2025-06-01',
+                          'waktu_input': '08:00', 'narahubung': '', 'kontak_person': ''})
+
+    _write_book(path, [_row('02-06-2025', '10:00 - 11:00', 'A'), _row('02-06-2025', '13:00 - 14:00', 'B')])
+    summary, errors = sync_activities_from_excel(str(path))
+    assert summary == _summary(failed=2)
+    assert len(errors) == 2
+    assert _schedule(temp_db) == [('A', '09:00', '10:00'), ('B', '10:00', '11:00'), ('Lain', '13:00', '14:00')]
+
+
+def test_reimport_unchanged_and_removed(temp_db, tmp_path):
+    path = tmp_path / 'jadwal.xlsx'
+    _write_book(path, [_row('02-06-2025', '09:00 - 10:00', 'A'), _row('02-06-2025', '10:00 - 11:00', 'B')])
+    sync_activities_from_excel(str(path))
+    assert sync_activities_from_excel(str(path)) == (_summary(unchanged=2), [])
+
+    _write_book(path, [_row('02-06-2025', '10:00 - 11:00', 'B')])
+    assert sync_activities_from_excel(str(path), remove_missing=True) == (_summary(unchanged=1, removed=1), [])
+    assert _schedule(temp_db) == [('B', '10:00', '11:00')]
+
+
+def test_activity_fingerprint_ignores_input_timestamp():
+    data = _data('A')
+    assert activity_fingerprint(data) == activity_fingerprint(dict(data, tanggal_input='2025-07-01', waktu_input='17:00'))
+    assert activity_fingerprint(dict(data, narahubung=None)) == activity_fingerprint(dict(data, narahubung=''))
+    assert activity_fingerprint(data) != activity_fingerprint(dict(data, waktu_akhir_kegiatan='10:30'))
+    assert activity_fingerprint(data) != activity_fingerprint(dict(data, uraian_kegiatan='A '))
+
+
+def test_source_rows_classify(temp_db):
+    temp_db.add_pimpinan('Gub')
+    identity = f"{source_key_prefix('jadwal.xlsx', 'JUNI 2025')}2025-06-02/1"
+    id_a = _seed_source_row(temp_db, f"{identity}/1", _data('A', '09:00', '10:00'))
+    id_b = _seed_source_row(temp_db, f"{identity}/2", _data('B', '10:00', '11:00'))
+
+    # Urutan baris bergeser: tetap dikenali sebagai tidak berubah lewat sidik jari
+    source_rows = SourceRows('jadwal.xlsx', ['JUNI 2025'])
+    assert source_rows.ids == {id_a, id_b}
+    parsed = [('Baris 2', _data('B', '10:00', '11:00'), 'Gub'), ('Baris 3', _data('A', '09:00', '10:00'), 'Gub')]
+    assert source_rows.classify('JUNI 2025', parsed) == ([], 2)
+
+    # Baris yang berubah memakai baris lama yang belum dipakai (urutan terkecil); sisanya baris baru
+    source_rows = SourceRows('jadwal.xlsx', ['JUNI 2025'])
+    parsed = [('Baris 2', _data('B', '10:00', '11:00'), 'Gub'), ('Baris 3', _data('A2', '13:00', '14:00'), 'Gub'),
+              ('Baris 4', _data('C', '15:00', '16:00'), 'Gub')]
+    to_validate, unchanged = source_rows.classify('JUNI 2025', parsed)
+    assert unchanged == 1
+    assert [(label, data['kunci_sumber'], activity_id, old_date)
+            for label, data, _, activity_id, old_date in to_validate] == [
+        ('Baris 3', f"{identity}/1", id_a, '2025-06-02'),
+        ('Baris 4', f"{identity}/3", None, None),
+    ]
+    assert to_validate[0][1]['sidik_jari'] == activity_fingerprint(_data('A2', '13:00', '14:00'))
+
+
+def test_source_rows_scoped_to_sheet(temp_db):
+    temp_db.add_pimpinan('Gub')
+    _seed_source_row(temp_db, f"{source_key_prefix('jadwal.xlsx', 'MEI 2025')}2025-05-02/1/1", _data('A', tanggal='2025-05-02'))
+    assert SourceRows('jadwal.xlsx', ['JUNI 2025']).ids == set()
+    assert len(SourceRows('jadwal.xlsx').ids) == 1
+    assert SourceRows('lain.xlsx').ids == set()
+
+
+@pytest.mark.parametrize('max_dates', [1, 366])
+def test_conflicts_across_evicted_dates(temp_db, tmp_path, monkeypatch, max_dates):
+    # Index tanggal yang dibuang dibangun ulang dari database, termasuk baris file ini yang sudah ditulis
+    monkeypatch.setattr('excel_importer.VALIDATOR_MAX_DATES', max_dates)
+    path = tmp_path / 'jadwal.xlsx'
+    _write_book(path, [_row('02-06-2025', '09:00 - 10:00', 'A'), _row('03-06-2025', '09:00 - 10:00', 'B'),
+                       _row('02-06-2025', '09:30 - 10:30', 'C'), _row('03-06-2025', '11:00 - 12:00', 'D')])
+    summary, errors = sync_activities_from_excel(str(path), chunk_size=1)
+    assert summary == _summary(inserted=3, failed=1)
+    assert len(errors) == 1 and '(Kegiatan: C)' in errors[0]
+
+    _write_book(path, [_row('02-06-2025', '10:00 - 11:00', 'A'), _row('03-06-2025', '09:00 - 10:00', 'B'),
+                       _row('03-06-2025', '11:00 - 12:00', 'D'), _row('02-06-2025', '09:00 - 10:00', 'C')])
+    assert sync_activities_from_excel(str(path), chunk_size=1) == (_summary(inserted=1, updated=1, unchanged=2), [])
+    assert _schedule(temp_db) == [('A', '10:00', '11:00'), ('B', '09:00', '10:00'), ('C', '09:00', '10:00'),
+                                  ('D', '11:00', '12:00')]
@@ -0,0 +1,46 @@
+from ics_calendar import export_activities_to_ics, import_ics
+
+
+def _add(db, uraian, start, end, id_pimpinan, kunci_sumber=None):
+    success, message = db.add_activity({
+        'tanggal_kegiatan': '2025-06-02', 'waktu_mulai_kegiatan': start, 'waktu_akhir_kegiatan': end,
+        'uraian_kegiatan': uraian, 'tempat_ruangan': 'Aula', 'id_pimpinan': id_pimpinan,
+        'daftar_peserta': 'Staf Ahli', 'tanggal_input': '2025-06-01', 'waktu_input': '08:00',
+        'narahubung': 'Budi', 'kontak_person': '0812', 'kunci_sumber': kunci_sumber,
+    })
+    assert success, message
+
+
+def _write_and_reimport(db, tmp_path):
+    path = str(tmp_path / 'jadwal.ics')
+    success, message, count = export_activities_to_ics('2025-06-01', '2025-06-30', None, path, backend=db)
+    assert success, message
+    return count, import_ics(path)
+
+
+def test_export_import_round_trip_is_unchanged(temp_db, tmp_path):
+    _, _, id_pimpinan = temp_db.add_pimpinan('Gub')
+    _add(temp_db, 'Dibuat di aplikasi', '09:00', '10:00', id_pimpinan)
+    _add(temp_db, 'Dari Excel', '10:00', '11:00', id_pimpinan, 'excel:jadwal.xlsx/JUNI 2025/2025-06-02/1/1')
+
+    count, (summary, errors) = _write_and_reimport(temp_db, tmp_path)
+    assert count == 2
+    assert errors == []
+    assert summary == {'inserted': 0, 'updated': 0, 'unchanged': 2, 'failed': 0}
+
+
+def test_reimport_updates_excel_imported_row_in_place(temp_db, tmp_path):
+    _, _, id_pimpinan = temp_db.add_pimpinan('Gub')
+    source_key = 'excel:jadwal.xlsx/JUNI 2025/2025-06-02/1/1'
+    _add(temp_db, 'Dari Excel', '10:00', '11:00', id_pimpinan, source_key)
+    path = str(tmp_path / 'jadwal.ics')
+    export_activities_to_ics('2025-06-01', '2025-06-30', None, path, backend=temp_db)
+    with open(path, encoding='utf-8') as f:
+        content = f.read()
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content.replace('Dari Excel', 'Dari Excel (revisi)'))
+
+    summary, errors = import_ics(path)
+    assert (summary['updated'], summary['inserted'], errors) == (1, 0, [])
+    rows = temp_db.connect_db().execute("SELECT uraian_kegiatan, kunci_sumber FROM Kegiatan").fetchall()
+    assert [tuple(row) for row in rows] == [('Dari Excel (revisi)', source_key)]
@@ -0,0 +1,63 @@
+from datetime import date, timedelta
+
+import pytest
+
+from recurrence import RecurrenceRule, occurrence_id, parse_occurrence_id
+
+
+def _brute_force(rule, first, last):
+    days = (first + timedelta(days=i) for i in range((last - first).days + 1))
+    return [day for day in days if rule.occurs_on(day)]
+
+
+def test_daily_with_interval_and_until():
+    rule = RecurrenceRule(date(2025, 6, 2), 'harian', interval=3, until=date(2025, 6, 14))
+    assert list(rule.occurrences(date(2025, 6, 1), date(2025, 6, 30))) == [
+        date(2025, 6, 2), date(2025, 6, 5), date(2025, 6, 8), date(2025, 6, 11), date(2025, 6, 14)]
+    assert not rule.occurs_on(date(2025, 6, 17))
+
+
+def test_weekly_every_two_weeks_on_monday_and_wednesday():
+    rule = RecurrenceRule(date(2025, 6, 2), 'mingguan', interval=2, weekdays=(0, 2))
+    assert list(rule.occurrences(date(2025, 6, 1), date(2025, 6, 30))) == [
+        date(2025, 6, 2), date(2025, 6, 4), date(2025, 6, 16), date(2025, 6, 18), date(2025, 6, 30)]
+    assert not rule.occurs_on(date(2025, 6, 9))
+
+
+def test_monthly_skips_months_without_the_day():
+    rule = RecurrenceRule(date(2025, 1, 31), 'bulanan')
+    assert list(rule.occurrences(date(2025, 1, 1), date(2025, 6, 30))) == [
+        date(2025, 1, 31), date(2025, 3, 31), date(2025, 5, 31)]
+
+
+def test_range_before_start_is_empty():
+    rule = RecurrenceRule(date(2025, 6, 2), 'harian')
+    assert list(rule.occurrences(date(2025, 5, 1), date(2025, 6, 1))) == []
+
+
+@pytest.mark.parametrize('rule', [
+    RecurrenceRule(date(2025, 6, 3), 'harian', interval=4),
+    RecurrenceRule(date(2025, 6, 5), 'mingguan', interval=3, weekdays=(1, 3, 5)),
+    RecurrenceRule(date(2025, 1, 29), 'bulanan', interval=2, until=date(2026, 12, 31)),
+])
+def test_occurrences_matches_occurs_on(rule):
+    # Ekspansi aritmetika harus sama dengan pengecekan per tanggal, juga untuk rentang di tengah seri
+    for first, last in [(date(2025, 1, 1), date(2026, 3, 31)), (date(2025, 8, 13), date(2025, 11, 2))]:
+        assert list(rule.occurrences(first, last)) == _brute_force(rule, first, last)
+
+
+def test_invalid_rules_are_rejected():
+    with pytest.raises(ValueError):
+        RecurrenceRule(date(2025, 6, 2), 'tahunan')
+    with pytest.raises(ValueError):
+        RecurrenceRule(date(2025, 6, 2), 'harian', interval=0)
+    with pytest.raises(ValueError):
+        RecurrenceRule(date(2025, 6, 2), 'harian', until=date(2025, 6, 1))
+
+
+def test_occurrence_id_round_trip():
+    activity_id = occurrence_id(42, date(2025, 6, 2))
+    assert activity_id < 0
+    assert parse_occurrence_id(activity_id) == (42, date(2025, 6, 2))
+    assert parse_occurrence_id(17) is None
+    assert parse_occurrence_id(None) is None
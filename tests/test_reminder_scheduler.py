@@ -0,0 +1,21 @@
+import pytest
+
+from reminder_scheduler import ReminderScheduler, parse_lead_minutes
+
+
+def test_parse_lead_minutes():
+    assert parse_lead_minutes("60, 15") == (60, 15)
+    assert parse_lead_minutes("15") == (15,)
+    for text in ("", ",", "x", "0", "30,-5"):
+        with pytest.raises(ValueError):
+            parse_lead_minutes(text)
+
+
+def test_configured_lead_minutes_are_used():
+    scheduler = ReminderScheduler(lambda activity, lead: None, lead_minutes=parse_lead_minutes("15,60"))
+    assert scheduler.lead_minutes == (60, 15)
+
+
+def test_window_covers_longest_lead_time():
+    scheduler = ReminderScheduler(lambda activity, lead: None, lead_minutes=(2 * 24 * 60,), window_hours=24)
+    assert scheduler.window.total_seconds() == 4 * 24 * 3600